@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Benchmark for EntitySelector: cost of constructing a selector (i.e. parsing and 
+compiling the selector string), and of filtering entities with it, for the 
+selectors used by the site data lists and fields.
+
+Run from the `src/annalist_root` directory, thus:
+
+    python ../../spike/selector-benchmark/selector_benchmark.py
+
+If the selector compilation cache is present (see `annalist.models.entityfinder`),
+construction costs are reported both with and without the cache.
+"""
+
+from __future__ import print_function
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', "annalist_site.settings.runtests")
+
+import django
+django.setup()
+
+from annalist.models import entityfinder
+from annalist.models.entityfinder import EntitySelector
+
+selectors = (
+    [ "'annal:Type' in [@type]"
+    , "'annal:List' in [@type]"
+    , "'annal:View' in [@type]"
+    , "'annal:Field' in [@type]"
+    , "'annal:Field_group' in [@type]"
+    , "'annal:User' in [@type]"
+    , "'annal:Vocabulary' in [@type]"
+    , "\"annal:Enum\" in [@type]"
+    , "annal:View in [@type]"
+    , "entity[annal:view_entity_type] subtype [annal:field_entity_type]"
+    , "entity[annal:list_entity_type] subtype [annal:field_entity_type]"
+    , "entity[annal:group_entity_type] subtype [annal:field_entity_type]"
+    , "entity[annal:field_value_type] subtype [annal:field_entity_type]"
+    ])
+
+class FieldComparison(object):
+    """
+    Stand-in for `entityfinder.FieldComparison` that does not access a collection.
+    """
+    def subtype(self, type1_uri, type2_uri):
+        return (not type2_uri) or (type1_uri == type2_uri)
+
+entity_types = ["annal:Type", "annal:List", "annal:View", "annal:Field", "annal:User"]
+entities = (
+    [ { "@type": [entity_types[i % len(entity_types)]]
+      , "annal:field_entity_type": entity_types[i % 3]
+      }
+      for i in range(1000)
+    ])
+context = { "entity": { "annal:view_entity_type": "annal:Type" } }
+
+def construct():
+    for s in selectors:
+        EntitySelector(s, FieldComparison())
+
+def construct_uncached():
+    for s in selectors:
+        entityfinder.flush_compiled_selectors()
+        EntitySelector(s, FieldComparison())
+
+def select():
+    for s in selectors:
+        sel = EntitySelector(s, FieldComparison())
+        for e in sel.filter(entities, context):
+            pass
+
+def report(name, f, number):
+    t = min(timeit.repeat(f, repeat=3, number=number))
+    print("%-32s %10.1f us per selector"%(name, t*1e6/(number*len(selectors))))
+
+if __name__ == "__main__":
+    if hasattr(entityfinder, "flush_compiled_selectors"):
+        report("construct (uncached)", construct_uncached, 100)
+    report("construct", construct, 100)
+    report("construct + filter 1000 entities", select, 10)
+
+# End.
@@ -69,6 +69,9 @@ COLL_TURTLE_REF         = COLL_BASE_REF + COLL_META_TURTLE
 META_COLL_REF           = "../"
 META_COLL_BASE_REF      = "./"
 COLL_CONTEXT_FILE       = "coll_context.jsonld"
+COLL_DATABASE_FILE      = "coll_data.sqlite3"   # Used by SQLite entity store
+COLL_SEARCH_INDEX_FILE  = "coll_search_index.json"  # Used by entity search index
+COLL_VERSION_FILE       = "coll_version"        # Used by collection change counter
 # COLL_CONTEXT_REF        = COLL_BASE_REF + COLL_CONTEXT_FILE
 
 SITE_TYPEID             = "_site"
@@ -84,6 +87,8 @@ SITE_COLL_VIEW          = "c/%(id)s/"
 SITE_COLL_PATH          = "c/%(id)s"
 SITE_CONTEXT_FILE       = "site_context.jsonld"
 SITE_DATABASE_FILE      = "db.sqlite3"
+SITE_CACHE_DIR          = "cache"               # Used by derived resource cache
+SITE_CACHE_SIZE_FILE    = "cache_size"          # Used by derived resource cache
 
 SITEDATA_BASE_DIR       = SITEDATA_DIR + "/" + COLL_BASE_DIR        # used in tests
 SITEDATA_META_FILE      = COLL_META_FILE                            # used in views
@@ -0,0 +1,248 @@
+"""
+Process-wide index of child entity identifiers.
+
+This module maintains, for each search path used to enumerate child entities (i.e.
+the ordered list of parent directories used for a given entity, entity class and
+scope: see `Entity._children`), the merged list of child entity ids.  Ids that are
+found only in alternative (inherited) parent directories are listed first, in the
+order they are found, followed by ids found in the first (local) directory.
+
+Each index entry records the change stamp of each directory on its search path (see
+`FileEntityStore.change_stamp`), and is rebuilt if any of these has changed (e.g.
+when entities are added or removed by another process).  Entities added, removed
+or renamed by this process update the index entries incrementally (see
+`EntityRoot._save`, `EntityRoot._remove` and `EntityRoot._rename_files`).
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import collections
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist               import util
+
+from annalist.models.entitystore import get_entity_store
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def dir_change_stamp(d):
+    """
+    Returns a change stamp for the indicated directory, an empty tuple if the
+    directory does not exist, or None if the storage used does not provide 
+    change stamps for directories.
+    """
+    store = get_entity_store()
+    stamp = store.change_stamp(d)
+    if (stamp is None) and not store.isdir(d):
+        stamp = ()
+    return stamp
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Child id index entry
+#
+#   -------------------------------------------------------------------------------------------
+
+class ChildIdIndexEntry(object):
+    """
+    Index of child entity ids for a single search path.
+
+    The merged ids are held as two ordered sets (inherited and local ids), and the
+    ids in each directory are held as sets, so that ids can be added and removed
+    without rescanning or re-merging the directory contents.
+    """
+
+    def __init__(self, dirs, dir_ids, stamps):
+        """
+        Initialize a new child id index entry.
+
+        dirs        is a list of directories on the search path, local directory first.
+        dir_ids     is a list of lists of valid child ids in each directory.
+        stamps      is a list of change stamps for each directory.
+        """
+        super(ChildIdIndexEntry, self).__init__()
+        self._dirs      = dirs
+        self._stamps    = stamps
+        self._dir_sets  = [ set(ids) for ids in dir_ids ]
+        self._local     = collections.OrderedDict( (i, None) for i in dir_ids[0] )
+        self._inherited = collections.OrderedDict()
+        for ids in dir_ids[1:]:
+            for i in ids:
+                if (i not in self._local) and (i not in self._inherited):
+                    self._inherited[i] = None
+        return
+
+    def copy(self):
+        """
+        Returns a copy of the current index entry, which can be updated independently.
+        """
+        entry = ChildIdIndexEntry(list(self._dirs), [[]], list(self._stamps))
+        entry._dir_sets  = [ set(ids) for ids in self._dir_sets ]
+        entry._local     = self._local.copy()
+        entry._inherited = self._inherited.copy()
+        return entry
+
+    def get_stamps(self):
+        return self._stamps
+
+    def get_ids(self):
+        """
+        Returns list of all child ids: inherited ids first, then local ids.
+        """
+        return list(self._inherited) + list(self._local)
+
+    def get_local_ids(self):
+        """
+        Returns list of child ids in the local directory.
+        """
+        return list(self._local)
+
+    def get_dir_id_sets(self):
+        """
+        Returns a list of sets of child ids in each directory on the search path.
+        """
+        return self._dir_sets
+
+    def add_id(self, k, entity_id, stamp):
+        """
+        Add child id to the k'th directory on the search path.
+
+        stamp       is the new change stamp for the directory.
+        """
+        self._dir_sets[k].add(entity_id)
+        self._stamps[k] = stamp
+        if k == 0:
+            self._inherited.pop(entity_id, None)
+            if entity_id not in self._local:
+                self._local[entity_id] = None
+        elif (entity_id not in self._local) and (entity_id not in self._inherited):
+            self._inherited[entity_id] = None
+        return
+
+    def remove_id(self, k, entity_id, stamp):
+        """
+        Remove child id from the k'th directory on the search path.
+
+        stamp       is the new change stamp for the directory.
+        """
+        self._dir_sets[k].discard(entity_id)
+        self._stamps[k] = stamp
+        if k == 0:
+            self._local.pop(entity_id, None)
+        if entity_id not in self._local:
+            if any( entity_id in s for s in self._dir_sets[1:] ):
+                if entity_id not in self._inherited:
+                    self._inherited[entity_id] = None
+            else:
+                self._inherited.pop(entity_id, None)
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Child id index
+#
+#   -------------------------------------------------------------------------------------------
+
+class ChildIdIndex(object):
+    """
+    Collection of child id index entries, indexed by search path.
+    """
+
+    def __init__(self):
+        super(ChildIdIndex, self).__init__()
+        self._entries        = {}   # tuple(dirs) -> ChildIdIndexEntry
+        self._entries_by_dir = {}   # dir -> set(tuple(dirs))
+        return
+
+    def get_entry(self, dirs):
+        """
+        Returns an index entry for the supplied search path (list of directories),
+        creating or rebuilding the entry if needed.
+
+        If the storage used does not provide change stamps for directories, a new
+        index entry is created, but not saved.
+        """
+        dirs   = tuple( os.path.normpath(d) for d in dirs )
+        stamps = [ dir_change_stamp(d) for d in dirs ]
+        entry  = self._entries.get(dirs, None)
+        if entry and (entry.get_stamps() == stamps) and (None not in stamps):
+            return entry
+        store   = get_entity_store()
+        dir_ids = [ [ i for i in store.listdir(d) if util.valid_id(i) ] for d in dirs ]
+        entry   = ChildIdIndexEntry(list(dirs), dir_ids, stamps)
+        if None not in stamps:
+            self._entries[dirs] = entry
+            for d in dirs:
+                self._entries_by_dir.setdefault(d, set()).add(dirs)
+        return entry
+
+    def update_entries(self, parent_dir, entity_id, added):
+        """
+        Update index entries for a child id added to or removed from a parent directory.
+        """
+        parent_dir = os.path.normpath(parent_dir)
+        keys       = self._entries_by_dir.get(parent_dir, None)
+        if keys:
+            stamp = dir_change_stamp(parent_dir)
+            for dirs in list(keys):
+                entry = self._entries[dirs]
+                for k in [ k for k in range(len(dirs)) if dirs[k] == parent_dir ]:
+                    if added:
+                        entry.add_id(k, entity_id, stamp)
+                    else:
+                        entry.remove_id(k, entity_id, stamp)
+        return
+
+    def flush(self):
+        self._entries        = {}
+        self._entries_by_dir = {}
+        return
+
+child_id_index = ChildIdIndex()
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Index access functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def get_child_id_index(dirs):
+    """
+    Returns a child id index entry for the supplied list of directories.
+    """
+    return child_id_index.get_entry(dirs)
+
+def child_id_added(entity_dir):
+    """
+    Update child id index for a new entity stored in the indicated directory.
+    """
+    if util.valid_id(os.path.basename(os.path.normpath(entity_dir))):
+        (parent_dir, entity_id) = os.path.split(os.path.normpath(entity_dir))
+        child_id_index.update_entries(parent_dir, entity_id, True)
+    return
+
+def child_id_removed(entity_dir):
+    """
+    Update child id index for an entity removed from the indicated directory.
+    """
+    (parent_dir, entity_id) = os.path.split(os.path.normpath(entity_dir))
+    child_id_index.update_entries(parent_dir, entity_id, False)
+    return
+
+def flush_child_id_index():
+    """
+    Remove all child id index entries.
+    """
+    child_id_index.flush()
+    return
+
+# End.
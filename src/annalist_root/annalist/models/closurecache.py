@@ -44,6 +44,9 @@ def get_closure(rel, v):
     Return transitive closure of values v1 such that "v rel v1",
     given a dictionary of direct relations.
 
+    (Used to recalculate closures when values are removed:  the ClosureCache
+    class otherwise maintains closures incrementally as relations are added.)
+
     Termination depends on directed relation; i.e.
 
         v1 in rel(v) => v not in get_closure(rel, v1)
@@ -110,6 +113,10 @@ class ClosureCache(object):
     T (transitivity):
 
         v2 in fwd_closure(v1) and v3 in fwd_closure(v2) => v3 in fwd_closure(v1)
+
+    The forward and reverse closures of each value are materialized (as frozensets),
+    and updated incrementally when relations are added or values are removed, so
+    closures are returned and membership tested without recalculation.
     """
     def __init__(self, coll_id, rel):
         """
@@ -133,6 +140,8 @@ class ClosureCache(object):
         self._rel       = rel
         self._fwd_rel   = {}   # Dictonary of direct forward relations in vals: Val -> Val*
         self._rev_rel   = {}   # Dictonary of direct reverse relations in vals: Val -> Val*
+        self._fwd_clo   = {}   # Dictonary of forward closures in vals: Val -> frozenset(Val*)
+        self._rev_clo   = {}   # Dictonary of reverse closures in vals: Val -> frozenset(Val*)
         return
 
     def get_collection_id(self):
@@ -165,14 +174,25 @@ class ClosureCache(object):
         # Add new relation: these assignments occur together, so symmetry of direct relations is preserved
         add_direct_rel(self._fwd_rel, v1, v2)
         add_direct_rel(self._rev_rel, v2, v1)
+        # Update closures: v1 and everything that reaches v1 now reaches v2 and 
+        # everything that v2 reaches, and vice versa for reverse closures.
+        fwd_add = self.fwd_closure(v2) | {v2}
+        rev_add = self.rev_closure(v1) | {v1}
+        for v in rev_add:
+            self._fwd_clo[v] = self.fwd_closure(v) | fwd_add
+        for v in fwd_add:
+            self._rev_clo[v] = self.rev_closure(v) | rev_add
         return True
 
     def remove_val(self, v):
         """
         Remove value from set over which relation is defined.
 
-        Operates by removing all direct relations that mention the value.
+        Operates by removing all direct relations that mention the value, then
+        recalculating closures for values whose closures included the value.
         """
+        fwd_affected = self.rev_closure(v)  # Values whose forward closure includes v
+        rev_affected = self.fwd_closure(v)  # Values whose reverse closure includes v
         updated = False
         if v in self._fwd_rel:
             for v2 in self._fwd_rel[v]:
@@ -188,16 +208,29 @@ class ClosureCache(object):
             # Restore symmetry
             del self._rev_rel[v]
             updated = True
+        self._fwd_clo.pop(v, None)
+        self._rev_clo.pop(v, None)
+        for v1 in fwd_affected:
+            self._fwd_clo[v1] = frozenset(get_closure(self._fwd_rel, v1))
+        for v2 in rev_affected:
+            self._rev_clo[v2] = frozenset(get_closure(self._rev_rel, v2))
         return updated
 
     def fwd_closure(self, v):
         """
         Return transitive closure of values v1 for which "v rel v1"
+
+        The value returned is an immutable set.
         """
-        return get_closure(self._fwd_rel, v)
+        return self._fwd_clo.get(v, frozenset())
 
     def rev_closure(self, v):
-        return get_closure(self._rev_rel, v)
+        """
+        Return transitive closure of values v1 for which "v1 rel v"
+
+        The value returned is an immutable set.
+        """
+        return self._rev_clo.get(v, frozenset())
 
     def get_values(self):
         """
@@ -213,6 +246,9 @@ class ClosureCache(object):
         vr2s = frozenset().union(*[ self._rev_rel[vr1] for vr1 in vr1s ])
         assert vf1s == vr2s
         assert vr1s == vf2s
+        for v in vf1s | vr1s:
+            assert self.fwd_closure(v) == get_closure(self._fwd_rel, v)
+            assert self.rev_closure(v) == get_closure(self._rev_rel, v)
         return vf1s | vr1s
 
 # End.
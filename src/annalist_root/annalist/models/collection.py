@@ -37,11 +37,27 @@ from annalist.exceptions                    import Annalist_Error
 from annalist.identifiers                   import RDF, RDFS, ANNAL
 from annalist.util                          import valid_id, extract_entity_id, make_type_entity_id
 
-from annalist.models.entity                 import Entity
+from annalist.models.entity                 import Entity, invalidate_alt_parents
+from annalist.models.entitystore            import get_entity_store
+from annalist.models.entityvaluecache       import (
+    remove_cached_entity_values, flush_entity_value_caches
+    )
+from annalist.models.childidindex           import flush_child_id_index
+from annalist.models.entitypropertyindex    import property_index_removed, flush_property_index
+from annalist.models.entitysearchindex      import search_index_removed, flush_search_index
+from annalist.models.collectionversion      import (
+    collection_version_dir, collection_version_stamp, check_collection_versions,
+    collection_version_tracker
+    )
+from annalist.models.sitewatcher            import get_site_watcher, site_change_location
+from annalist.models.entitychoicecache      import choice_cache_changed, flush_choice_cache
 from annalist.models.annalistuser           import AnnalistUser
 from annalist.models.collectiontypecache    import CollectionTypeCache
 from annalist.models.collectionfieldcache   import CollectionFieldCache
 from annalist.models.collectionvocabcache   import CollectionVocabCache
+from annalist.models.collectionviewcache    import CollectionViewCache
+from annalist.models.collectionlistcache    import CollectionListCache
+from annalist.models.collectiongroupcache   import CollectionGroupCache
 from annalist.models.recordtype             import RecordType
 from annalist.models.recordview             import RecordView
 from annalist.models.recordlist             import RecordList
@@ -65,6 +81,27 @@ from annalist.models.rendertypeinfo         import (
 type_cache  = CollectionTypeCache()
 field_cache = CollectionFieldCache()
 vocab_cache = CollectionVocabCache()
+view_cache  = CollectionViewCache()
+list_cache  = CollectionListCache()
+group_cache = CollectionGroupCache()
+
+#   Caches used for entities in each collection configuration directory, which are
+#   flushed when changes to that directory are reported by a site change watcher
+#   (see `Collection.flush_watched_changes`)
+
+watched_dir_caches = (
+    { layout.TYPE_DIR:  type_cache
+    , layout.FIELD_DIR: field_cache
+    , layout.VOCAB_DIR: vocab_cache
+    , layout.VIEW_DIR:  view_cache
+    , layout.LIST_DIR:  list_cache
+    , layout.GROUP_DIR: group_cache
+    })
+
+#   Process-wide cache of loaded collection objects (see `Collection.load_cached`),
+#   indexed by (site URL, site directory, collection id)
+
+coll_object_cache = {}
 
 #   ---------------------------------------------------------------------------
 #
@@ -107,6 +144,8 @@ class Collection(Entity):
             parentsite.site_data_collection()
             )
         super(Collection, self).__init__(parentsite, coll_id, altparent=self._parentcoll)
+        self._load_stamp  = None
+        self._alt_parents = {}
         return
 
     def _migrate_values(self, collmetadata):
@@ -128,6 +167,16 @@ class Collection(Entity):
         type_cache.flush_cache(self)
         field_cache.flush_cache(self)
         vocab_cache.flush_cache(self)
+        view_cache.flush_cache(self)
+        list_cache.flush_cache(self)
+        group_cache.flush_cache(self)
+        flush_entity_value_caches(self._entitydir)
+        property_index_removed(self._entitydir)
+        search_index_removed(self._entitydir)
+        flush_choice_cache(self._entitydir)
+        for key in coll_object_cache.keys():
+            if key[2] == self.get_id():
+                del coll_object_cache[key]
         return
 
     @classmethod
@@ -138,6 +187,16 @@ class Collection(Entity):
         type_cache.flush_all()
         field_cache.flush_all()
         vocab_cache.flush_all()
+        view_cache.flush_all()
+        list_cache.flush_all()
+        group_cache.flush_all()
+        flush_entity_value_caches()
+        flush_child_id_index()
+        flush_property_index()
+        flush_search_index()
+        flush_choice_cache()
+        collection_version_tracker.flush()
+        coll_object_cache.clear()
         return
 
     # Site
@@ -156,6 +215,13 @@ class Collection(Entity):
 
     # Alternate collections handling
 
+    def _alt_parents_cache(self):
+        """
+        Returns a dictionary used to cache alternative parent lists for the current
+        collection and its RecordTypeData entities.
+        """
+        return self._alt_parents
+
     def set_alt_entities(self, altparent):
         """
         Update the alternative parent for the current collection.
@@ -288,6 +354,152 @@ class Collection(Entity):
             cls._set_alt_parent_coll(parent, coll)
         return coll
 
+    @classmethod
+    def load_cached(cls, parent, coll_id):
+        """
+        Return a collection object for the indicated collection, using a process-wide
+        cache of loaded collection objects.
+
+        A cached collection object is used only if neither its metadata nor that of 
+        any collection from which it inherits have changed since it was loaded (see 
+        `get_change_stamp`);  otherwise the collection is re-loaded and cached.
+        Cached collection data are also discarded if they have been changed by
+        another process (see `flush_changed_caches`).
+
+        NOTE: cached collection objects are shared between requests, so they should 
+        not be updated other than by methods that also save the updated values.
+
+        cls         is the Collection class object.
+        parent      is the site from which the collection is descended.
+        coll_id     is the local identifier (slug) for the collection.
+
+        Returns a Collection object, or None if there is no such collection.
+        """
+        key  = (parent.get_url(), parent._entitydir, coll_id)
+        coll = coll_object_cache.get(key, None)
+        if coll and coll.flush_changed_caches():
+            coll = None
+        if coll and (coll._load_stamp == coll.get_change_stamp()):
+            return coll
+        coll_stamp = cls(parent, coll_id)._change_stamp()
+        coll       = cls.load(parent, coll_id, altscope="all")
+        if coll is None:
+            coll_object_cache.pop(key, None)
+        else:
+            coll.flush_changed_caches()
+            coll._load_stamp = coll.get_change_stamp()
+            if coll._load_stamp[0] == coll_stamp:
+                # Not cached if updated while loading
+                coll_object_cache[key] = coll
+        return coll
+
+    def get_change_stamp(self):
+        """
+        Returns a value that changes whenever the metadata for the current collection,
+        or for any collection from which it inherits, is updated.
+        """
+        return tuple( c._change_stamp() for c in self.get_alt_entities(altscope="all") )
+
+    def get_data_stamp(self):
+        """
+        Returns a value that changes whenever any data in the current collection, 
+        or in any collection from which it inherits, is updated.  The value is a 
+        tuple of collection change counter stamps `(mtime, instance, count)` (see
+        `annalist.models.collectionversion`).
+
+        This is used to validate responses whose content may depend on any entity in
+        the collection (e.g. entity lists and rendered entity views).
+        """
+        return tuple(
+            collection_version_stamp(collection_version_dir(c._entitydir))
+            for c in self.get_alt_entities(altscope="all")
+            )
+
+    def flush_changed_caches(self):
+        """
+        Flush caches for the current collection if its data, or the data of any
+        collection from which it inherits, have been changed by another process 
+        since they were last checked by this process.
+
+        If a site change watcher is enabled (see `annalist.models.sitewatcher`), 
+        only cached data affected by the changes reported by the watcher are 
+        flushed (see `flush_watched_changes`), except that saved field choice
+        lists (see `annalist.models.entitychoicecache`) and cached alternative 
+        parent lists (see `Entity.get_alt_entities`) are flushed if the 
+        collection data have been changed, as the polling watcher does not 
+        report changes to entity data files or type data directories.
+
+        Returns True if all caches for the current collection were flushed.
+        """
+        changed = check_collection_versions(
+            collection_version_dir(self._entitydir),
+            [ collection_version_dir(c._entitydir) 
+              for c in self.get_alt_entities(altscope="all") 
+            ])
+        watcher = get_site_watcher()
+        if watcher:
+            self.flush_watched_changes(watcher.get_site_dir(), watcher.take_changes())
+            if changed:
+                flush_choice_cache(self._entitydir)
+                invalidate_alt_parents()
+            return False
+        if changed:
+            log.info(
+                "Collection.flush_changed_caches: %s changed in %r"%
+                (self.get_id(), changed)
+                )
+            if collection_version_dir(self.get_site_data()._entitydir) in changed:
+                self.flush_all_caches()
+            else:
+                self.flush_collection_caches()
+        return bool(changed)
+
+    @classmethod
+    def flush_watched_changes(cls, site_dir, paths):
+        """
+        Flush cached data affected by changes to the indicated files or directories
+        in a site data directory (see `annalist.models.sitewatcher`).
+
+        Changes to entities in a collection configuration directory (e.g. type or
+        field definitions) flush the corresponding cache (see `watched_dir_caches`)
+        for the collection containing them, and for any cached collection that
+        inherits from that collection.  Changes to collection metadata or to a
+        collection database flush all such caches.  Cached values of changed 
+        entities, and saved field choice lists that may include them, are also
+        discarded, and creation or removal of a type data directory discards
+        cached alternative parent lists.
+        """
+        for p in paths:
+            (coll_id, type_dir, entity_id) = site_change_location(site_dir, p)
+            if coll_id is None:
+                continue
+            remove_cached_entity_values(p)
+            flush_entity_value_caches(p)
+            choice_cache_changed(p)
+            if type_dir is None:
+                caches = watched_dir_caches.values()
+            elif type_dir in watched_dir_caches:
+                caches = [watched_dir_caches[type_dir]]
+            else:
+                if entity_id is None:
+                    # Type data directory created or removed
+                    invalidate_alt_parents()
+                continue
+            log.info("Collection.flush_watched_changes: %s"%(p,))
+            if coll_id == layout.SITEDATA_ID:
+                for cache in caches:
+                    cache.flush_site_cache()
+                continue
+            coll_ids = { coll_id }
+            for coll in coll_object_cache.values():
+                alt_ids = [ c.get_id() for c in coll.get_alt_entities(altscope="all") ]
+                if coll_id in alt_ids:
+                    coll_ids.add(coll.get_id())
+            for cache in caches:
+                for cid in coll_ids:
+                    cache.flush_cache_id(cid)
+        return
+
     @classmethod
     def _set_alt_parent_coll(cls, parent, coll):
         """
@@ -373,7 +585,6 @@ class Collection(Entity):
 
         Returns namespace vocabulary entity if found, otherwise None.
         """
-        vocab_cache.get_vocab(self, vocab_id)
         t = vocab_cache.get_vocab(self, vocab_id)
         # Was it previously created but not cached?
         if not t and RecordType.exists(self, vocab_id, altscope="all"):
@@ -421,7 +632,6 @@ class Collection(Entity):
 
         Returns type entity if found, otherwise None.
         """
-        type_cache.get_type(self, type_id)
         t = type_cache.get_type(self, type_id)
         # Was it previously created but not cached?
         if not t and RecordType.exists(self, type_id, altscope="all"):
@@ -550,10 +760,8 @@ class Collection(Entity):
         """
         Generator enumerates and returns record views that may be stored
         """
-        for f in self._children(RecordView, altscope=altscope):
-            v = self.get_view(f)
-            if v and v.get_id() != layout.INITIAL_VALUES_ID:
-                yield v
+        for v in view_cache.get_all_views(self, altscope=altscope):
+            yield v
         return
 
     def add_view(self, view_id, view_meta):
@@ -578,7 +786,7 @@ class Collection(Entity):
 
         returns a RecordView object for the identified view, or None.
         """
-        v = RecordView.load(self, view_id, altscope="all")
+        v = self.cache_get_view(view_id)
         return v
 
     def remove_view(self, view_id):
@@ -612,16 +820,54 @@ class Collection(Entity):
         log.info("Collection.get_default_view: %s/%s/%s"%(view_id, type_id, entity_id))
         return (view_id, type_id, entity_id) 
 
+    def cache_add_view(self, view_entity):
+        """
+        Add or update view information in view cache.
+        """
+        log.debug("Collection.cache_add_view %s in %s"%(view_entity.get_id(), self.get_id()))
+        view_cache.remove_view(self, view_entity.get_id())
+        view_cache.set_view(self, view_entity)
+        return
+
+    def cache_get_view(self, view_id):
+        """
+        Retrieve view from cache.
+
+        Returns view entity if found, otherwise None.
+        """
+        v = view_cache.get_view(self, view_id)
+        # Was it previously created but not cached?
+        if not v and RecordView.exists(self, view_id, altscope="all"):
+            msg = (
+                "Collection.get_view %s present but not cached for collection %s"%
+                (view_id, self.get_id())
+                )
+            log.warning(msg)
+            v = RecordView.load(self, view_id, altscope="all")
+            view_cache.set_view(self, v)
+        return v
+
+    def cache_remove_view(self, view_id):
+        """
+        Remove view from view cache.
+        """
+        view_cache.remove_view(self, view_id)
+        return
+
+    def cache_get_all_view_ids(self, altscope="all"):
+        """
+        Iterator over view ids of views stored in the current collection.
+        """
+        return view_cache.get_all_view_ids(self, altscope=altscope)
+
     # Record lists
 
     def lists(self, altscope="all"):
         """
         Generator enumerates and returns record lists that may be stored
         """
-        for f in self._children(RecordList, altscope=altscope):
-            l = self.get_list(f)
-            if l and l.get_id() != layout.INITIAL_VALUES_ID:
-                yield l
+        for l in list_cache.get_all_lists(self, altscope=altscope):
+            yield l
         return
 
     def add_list(self, list_id, list_meta):
@@ -646,7 +892,7 @@ class Collection(Entity):
 
         returns a RecordList object for the identified list, or None.
         """
-        l = RecordList.load(self, list_id, altscope="all")
+        l = self.cache_get_list(list_id)
         return l
 
     def remove_list(self, list_id):
@@ -676,7 +922,7 @@ class Collection(Entity):
         Return the default list to be displayed for the current collection.
         """
         list_id = self.get(ANNAL.CURIE.default_list, None)
-        if list_id and not RecordList.exists(self, list_id, altscope="all"):
+        if list_id and not self.cache_get_list(list_id):
             log.warning(
                 "Default list %s for collection %s does not exist"%
                 (list_id, self.get_id())
@@ -684,6 +930,88 @@ class Collection(Entity):
             list_id = None
         return list_id 
 
+    def cache_add_list(self, list_entity):
+        """
+        Add or update list information in list cache.
+        """
+        log.debug("Collection.cache_add_list %s in %s"%(list_entity.get_id(), self.get_id()))
+        list_cache.remove_list(self, list_entity.get_id())
+        list_cache.set_list(self, list_entity)
+        return
+
+    def cache_get_list(self, list_id):
+        """
+        Retrieve list from cache.
+
+        Returns list entity if found, otherwise None.
+        """
+        l = list_cache.get_list(self, list_id)
+        # Was it previously created but not cached?
+        if not l and RecordList.exists(self, list_id, altscope="all"):
+            msg = (
+                "Collection.get_list %s present but not cached for collection %s"%
+                (list_id, self.get_id())
+                )
+            log.warning(msg)
+            l = RecordList.load(self, list_id, altscope="all")
+            list_cache.set_list(self, l)
+        return l
+
+    def cache_remove_list(self, list_id):
+        """
+        Remove list from list cache.
+        """
+        list_cache.remove_list(self, list_id)
+        return
+
+    def cache_get_all_list_ids(self, altscope="all"):
+        """
+        Iterator over list ids of lists stored in the current collection.
+        """
+        return list_cache.get_all_list_ids(self, altscope=altscope)
+
+    # Field groups (deprecated: retained for migrating field references to groups)
+
+    def groups(self, altscope="all"):
+        """
+        Iterator over field groups stored in the current collection.
+        """
+        return group_cache.get_all_groups(self, altscope=altscope)
+
+    def cache_add_group(self, group_entity):
+        """
+        Add or update field group information in group cache.
+        """
+        log.debug("Collection.cache_add_group %s in %s"%(group_entity.get_id(), self.get_id()))
+        group_cache.remove_group(self, group_entity.get_id())
+        group_cache.set_group(self, group_entity)
+        return
+
+    def cache_get_group(self, group_id):
+        """
+        Retrieve field group from cache.
+
+        Returns field group entity if found, otherwise None.
+        """
+        g = group_cache.get_group(self, group_id)
+        # Was it previously created but not cached?
+        if not g and RecordGroup_migration.exists(self, group_id, altscope="all"):
+            msg = (
+                "Collection.get_group %s present but not cached for collection %s"%
+                (group_id, self.get_id())
+                )
+            log.warning(msg)
+            g = RecordGroup_migration.load(self, group_id, altscope="all")
+            group_cache.set_group(self, g)
+        return g
+
+    def cache_remove_group(self, group_id):
+        """
+        Remove field group from group cache.
+        """
+        group_cache.remove_group(self, group_id)
+        return
+
     # View (and list) fields and properties
 
     #@@
@@ -718,7 +1046,6 @@ class Collection(Entity):
 
         Returns field entity if found, otherwise None.
         """
-        field_cache.get_field(self, field_id)
         t = field_cache.get_field(self, field_id)
         # Was it previously created but not cached?
         if not t and RecordField.exists(self, field_id, altscope="all"):
@@ -826,6 +1153,22 @@ class Collection(Entity):
 
     # JSON-LD context data
 
+    def get_context_path(self):
+        """
+        Returns the location of the collection JSON-LD context file (see 
+        `generate_coll_jsonld_context`).
+        """
+        (coll_dir, coll_meta_file) = self._dir_path()
+        context_path = os.path.join(coll_dir, layout.META_COLL_BASE_REF, layout.COLL_CONTEXT_FILE)
+        return os.path.normpath(context_path)
+
+    def get_context_stamp(self):
+        """
+        Returns a change stamp for the collection JSON-LD context file (see 
+        `generate_coll_jsonld_context`), or None if the context file is not present.
+        """
+        return get_entity_store().change_stamp(self.get_context_path())
+
     def generate_coll_jsonld_context(self, flags=None):
         """
         (Re)generate JSON-LD context description for the current collection.
@@ -950,7 +1293,7 @@ class Collection(Entity):
         # In due course, field groups will replaced by inline field lists.
         # This code does not process field lists for fields referenced by a group.
         #@@
-        for g in self.child_entities(RecordGroup_migration, altscope="all"):
+        for g in self.groups(altscope="all"):
             for gref in g[ANNAL.CURIE.group_fields]:
                 fid  = extract_entity_id(gref[ANNAL.CURIE.field_id])
                 guri = gref.get(ANNAL.CURIE.property_uri, None)
@@ -29,6 +29,7 @@ from annalist.models.site           import Site
 from annalist.models.entityfinder   import EntityFinder
 from annalist.models.entitytypeinfo import EntityTypeInfo, TYPE_CLASS_MAP
 from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitysearchindex import rebuild_search_index
 
 def initialize_coll_data(src_data_dir, tgt_coll):
     """
@@ -168,4 +169,24 @@ def migrate_coll_data(coll):
     coll.generate_coll_jsonld_context()    
     return errs
 
+def rebuild_coll_search_index(coll):
+    """
+    Rebuild the search index for entities stored in the specified collection,
+    and save it in the collection data directory.
+
+    Returns the number of entities indexed.
+    """
+    log.info("Rebuild search index for collection %s"%(coll.get_id()))
+    def coll_entity_paths():
+        for type_id in coll.cache_get_all_type_ids(altscope="all"):
+            if type_id == layout.COLL_TYPEID:
+                continue
+            typeinfo = EntityTypeInfo(coll, type_id)
+            if typeinfo.entityparent:
+                for ep in typeinfo.entityparent._child_entity_paths(typeinfo.entityclass):
+                    yield ep
+        return
+    (coll_data_dir, coll_meta_file) = coll._dir_path()
+    return rebuild_search_index(coll_data_dir, coll_entity_paths())
+
 # End.
@@ -20,6 +20,26 @@ from annalist.identifiers           import ANNAL, RDFS
 # 
 #   ---------------------------------------------------------------------------
 
+#   Process-wide count of changes to collection entity caches.  This is incremented
+#   whenever any cached entity is updated or removed, or any cache is flushed, and is
+#   used to validate information derived from cached configuration entities (e.g. 
+#   compiled form descriptions, see `annalist.views.form_utils.formdescriptioncache`).
+
+config_cache_version = 0
+
+def config_cache_changed():
+    """
+    Note a change to a collection entity cache.
+    """
+    global config_cache_version
+    config_cache_version += 1
+    return
+
+def get_config_cache_version():
+    """
+    Returns a value that changes whenever any collection entity cache is updated.
+    """
+    return config_cache_version
 
 #   ---------------------------------------------------------------------------
 # 
@@ -45,9 +65,12 @@ class CollectionEntityCacheObject(object):
     """
     This class is an entity cache for a specified collection and entity type.
 
-    NOTE: entities are instantiated with respect to a specified collection,
-    but the collection objects are transient (regenerated for each request), so
-    the cache stores the entity values but not the instantiated entities.
+    NOTE: entities are instantiated with respect to a specified collection, but
+    the collection objects are transient (regenerated for each request).  The cache
+    stores the id of each entity's parent with a snapshot of the entity values, and
+    returns entities whose parent is taken from the collection supplied by the
+    caller, and which share the snapshot values until they are updated (see
+    `EntityRoot._shared_copy`).
 
     Two kinds of information are cached:
 
@@ -56,9 +79,11 @@ class CollectionEntityCacheObject(object):
     2.  scope cache: lists of entity ids that are visible in different scopes: used 
         when returning entity enumerations (see method "get_all_entities").
 
-    The scope cache is populated by calls to "get_all_entities".  When a entity is 
-    added to or removed from the entity cache, lacking information about the scopes 
-    where it is visible, the scope cache is cleared.
+    The scope cache is populated by calls to "get_all_entities".  For each scope, it
+    holds the ids of the collection and its alternative parents in that scope, and a
+    copy of the child id index entry for those parents (see `annalist.models.childidindex`).
+    When an entity is added to or removed from the entity cache, the scope cache entries
+    are updated in place according to the position of the entity's parent in each scope.
 
     Scope values currently include "user", "all", "site"; None => "coll".
     Apart from treating None as collection local scope, the logic in this class
@@ -81,36 +106,56 @@ class CollectionEntityCacheObject(object):
         self._entity_ids_by_scope = {}
         return
 
-    def _make_entity(self, coll, entity_id, entity_values):
+    def _make_entity(self, entity):
         """
-        Internal helper method to construct an entity given its Id and values.
+        Internal helper method to construct a cache entry for a supplied entity.
+
+        entity          is the entity from which the cache entry is created.
 
-        coll            is collection entity to which the new identity will belong
-        entity_id       is the new entity id
-        entity_values   is a dictionbary containing:
+        Returns a dictionary containing:
                         ["parent_id"] is the id of the parent entity
-                        ["data"] is a dictionary of values for the new entity
-
-        Returns None if either Id or values evaluate as Boolean False (i.e. are None or empty).
-        """
-        entity = None
-        if entity_id and entity_values:
-            parent_id = entity_values["parent_id"]
-            parent    = coll
-            if coll.get_id() != parent_id:
-                for parent in coll.get_alt_entities(altscope="all"):
-                    if parent.get_id() == parent_id:
-                        break
-                else:
-                    msg = (
-                        "Saved parent id %s not found for entity %s/%s in collection %s"%
-                        (parent_id, self._type_id, entity_id, coll.get_id())
-                        )
-                    log.error(msg)
-                    raise ValueError(msg)
-            entity = self._entity_cls._child_init(parent, entity_id)
-            entity.set_values(entity_values["data"])
-        return entity
+                        ["entity"] is a snapshot entity whose values are the 
+                        supplied entity's saved values.
+        """
+        parent   = entity.get_parent()
+        snapshot = self._entity_cls._child_init(parent, entity.get_id())
+        snapshot.set_values(entity.get_save_values())
+        return {"parent_id": parent.get_id(), "entity": snapshot}
+
+    def _bind_entity(self, coll, entity_id, entity_entry):
+        """
+        Internal helper method to construct an entity from a cache entry, whose 
+        parent is the supplied collection or one of its alternative parents.
+
+        coll            is collection entity to which the returned entity will belong
+        entity_id       is the entity id
+        entity_entry    is a cache entry created by `_make_entity`.
+
+        If the parent differs from that of the cached snapshot, the snapshot is 
+        replaced by an entity with the new parent, so that subsequent requests 
+        using the same collection object can return a copy directly.
+
+        Returns an entity that shares values with the cached snapshot.
+        """
+        parent_id = entity_entry["parent_id"]
+        parent    = coll
+        if coll.get_id() != parent_id:
+            for parent in coll.get_alt_entities(altscope="all"):
+                if parent.get_id() == parent_id:
+                    break
+            else:
+                msg = (
+                    "Saved parent id %s not found for entity %s/%s in collection %s"%
+                    (parent_id, self._type_id, entity_id, coll.get_id())
+                    )
+                log.error(msg)
+                raise ValueError(msg)
+        snapshot = entity_entry["entity"]
+        if parent is not snapshot.get_parent():
+            entity   = self._entity_cls._child_init(parent, entity_id)
+            entity._share_values(snapshot)
+            snapshot = entity_entry["entity"] = entity
+        return snapshot._shared_copy()
 
     def _load_entity(self, coll, entity, entity_uri=None):
         """
@@ -121,16 +166,33 @@ class CollectionEntityCacheObject(object):
         entity_id     = entity.get_id()
         if not entity_uri:
             entity_uri    = entity.get_uri()
-        entity_parent = entity.get_parent().get_id()
-        entity_data   = entity.get_save_values()
         add_entity    = False
         if entity_id not in self._entities_by_id:
-            self._entities_by_id[entity_id]     = {"parent_id": entity_parent, "data": entity_data}
+            self._entities_by_id[entity_id]     = self._make_entity(entity)
             self._entity_ids_by_uri[entity_uri] = entity_id
-            self._entity_ids_by_scope           = {}
+            self._update_scope_ids(entity_id, entity.get_parent().get_id(), True)
             add_entity = True
         return add_entity
 
+    def _update_scope_ids(self, entity_id, parent_id, added):
+        """
+        Internal helper method updates scope cache for an entity added or removed.
+
+        The scope cache entry for each scope has a search path of the ids of the 
+        collection and its alternative parents in that scope:  the entity is added
+        to or removed from each entry according to the position of its parent on the 
+        search path, so the resulting entity ids are ordered as if the entry were
+        regenerated (inherited entities first, then collection entities).
+        """
+        for (alt_ids, scope_entry) in self._entity_ids_by_scope.values():
+            for k, alt_id in enumerate(alt_ids):
+                if alt_id == parent_id:
+                    if added:
+                        scope_entry.add_id(k, entity_id, None)
+                    else:
+                        scope_entry.remove_id(k, entity_id, None)
+        return
+
     def _load_entities(self, coll):
         """
         Initialize cache of entities, if not already done.
@@ -151,13 +213,13 @@ class CollectionEntityCacheObject(object):
 
         Returns the entity removed, or None if not found.
         """
-        entity_values = self._entities_by_id.get(entity_id, None)
-        entity        = self._make_entity(coll, entity_id, entity_values)
-        if entity:
+        entity_entry = self._entities_by_id.pop(entity_id, None)
+        entity       = None
+        if entity_entry:
+            entity     = entity_entry["entity"]
             entity_uri = entity.get_uri()
-            self._entities_by_id.pop(entity_id, None)
             self._entity_ids_by_uri.pop(entity_uri, None)
-            self._entity_ids_by_scope = {}
+            self._update_scope_ids(entity_id, entity_entry["parent_id"], False)
         return entity
 
     def set_site_cache(self, site_cache):
@@ -194,9 +256,9 @@ class CollectionEntityCacheObject(object):
         if not defined in the current cache object.
         """
         self._load_entities(coll)
-        entity_values = self._entities_by_id.get(entity_id, None)
-        if entity_values:
-            return self._make_entity(coll, entity_id, entity_values)
+        entity_entry = self._entities_by_id.get(entity_id, None)
+        if entity_entry:
+            return self._bind_entity(coll, entity_id, entity_entry)
         # If not in collection cache, look for value in site cache:
         if self._site_cache:
             return self._site_cache.get_entity(coll.get_site_data(), entity_id)
@@ -231,15 +293,17 @@ class CollectionEntityCacheObject(object):
         """
         self._load_entities(coll)
         scope_name = altscope or "coll"     # 'None' designates collection-local scope
-        if scope_name in self._entity_ids_by_scope:
-            scope_entity_ids = self._entity_ids_by_scope[scope_name]
-        else:
+        if scope_name not in self._entity_ids_by_scope:
             # Generate scope cache for named scope
-            scope_entity_ids = []
-            for entity_id in coll._children(self._entity_cls, altscope=altscope):
-                if entity_id != layout.INITIAL_VALUES_ID:
-                    scope_entity_ids.append(entity_id)
-            self._entity_ids_by_scope[scope_name] = scope_entity_ids
+            (alt_parents, child_index) = coll._child_id_index(self._entity_cls, altscope=altscope)
+            alt_ids     = [ alt.get_id() for alt in alt_parents ]
+            self._entity_ids_by_scope[scope_name] = (alt_ids, child_index.copy())
+        (alt_ids, scope_entry) = self._entity_ids_by_scope[scope_name]
+        scope_entity_ids = (
+            [ entity_id 
+              for entity_id in scope_entry.get_ids()
+              if entity_id != layout.INITIAL_VALUES_ID
+            ])
         return scope_entity_ids
 
     def get_all_entities(self, coll, altscope=None):
@@ -316,8 +380,16 @@ class CollectionEntityCache(object):
 
         coll        is a collection object for which a cache is removed.
         """
-        coll_id = coll.get_id()
-        cache   = self._caches.pop(coll_id, None)
+        return self.flush_cache_id(coll.get_id())
+
+    def flush_cache_id(self, coll_id):
+        """
+        Remove all cached data for a collection with a specified id.
+
+        Returns True if the cache object was defined, otherwise False.
+        """
+        cache = self._caches.pop(coll_id, None)
+        config_cache_changed()
         log.info(
             "CollectionEntityCache: flushed %s cache for collection %s"%
             (self._type_id, coll_id)
@@ -329,12 +401,23 @@ class CollectionEntityCache(object):
         Remove all cached data for all collections.
         """
         self._caches = {}
+        config_cache_changed()
         log.info(
             "CollectionEntityCache: flushed %s cache for all collections"%
             (self._type_id,)
             )
         return
 
+    def flush_site_cache(self):
+        """
+        Remove all cached site-wide data, and all cached data for all collections 
+        (which refer to the site-wide data).
+        """
+        self._site_cache = self._cache_cls(layout.SITEDATA_ID, self._entity_cls)
+        site_cache_by_type_id[self._type_id] = self._site_cache
+        self.flush_all()
+        return
+
     # Collection cache alllocation and access methods
 
     def set_entity(self, coll, entity):
@@ -342,6 +425,7 @@ class CollectionEntityCache(object):
         Save a new or updated type definition
         """
         entity_cache = self._get_cache(coll)
+        config_cache_changed()
         return entity_cache.set_entity(coll, entity)
 
     def remove_entity(self, coll, entity_id):
@@ -351,6 +435,7 @@ class CollectionEntityCache(object):
         Returns the entity removed if found, or None if not defined.
         """
         entity_cache = self._get_cache(coll)
+        config_cache_changed()
         return entity_cache.remove_entity(coll, entity_id)
 
     def get_entity(self, coll, entity_id):
@@ -41,6 +41,7 @@ class CollectionFieldCacheObject(CollectionEntityCacheObject):
         """
         super(CollectionFieldCacheObject, self).__init__(coll_id, entity_cls)
         self._superproperty_closure = ClosureCache(coll_id, ANNAL.CURIE.superproperty_uri)
+        self._subproperty_uris      = {}    # superproperty URI -> set(subproperty URIs) of cached fields
         return
 
     def _load_entity(self, coll, field_entity):
@@ -62,16 +63,10 @@ class CollectionFieldCacheObject(CollectionEntityCacheObject):
             for superproperty_obj in field_data.get(ANNAL.CURIE.superproperty_uri, []):
                 superproperty_uri = superproperty_obj["@id"]
                 self._superproperty_closure.add_rel(property_uri, superproperty_uri)
+                self._subproperty_uris.setdefault(superproperty_uri, set()).add(property_uri)
             # Also add relations for references *to* the new property URI
-            for try_subproperty_obj in self.get_all_entities(coll):
-                sub_superp_objs = try_subproperty_obj.get(ANNAL.CURIE.superproperty_uri, [])
-                sub_superp_uris = (
-                    [ sub_superp_obj["@id"] for sub_superp_obj in sub_superp_objs ]
-                    )
-                if property_uri in sub_superp_uris:
-                    subproperty_uri = try_subproperty_obj.get(ANNAL.CURIE.property_uri, None)
-                    if subproperty_uri:
-                        self._superproperty_closure.add_rel(subproperty_uri, property_uri)
+            for subproperty_uri in self._subproperty_uris.get(property_uri, set()):
+                self._superproperty_closure.add_rel(subproperty_uri, property_uri)
         return add_field
 
     def _drop_entity(self, coll, field_id):
@@ -85,6 +80,8 @@ class CollectionFieldCacheObject(CollectionEntityCacheObject):
         if field_entity:
             property_uri = field_entity.get_property_uri()
             self._superproperty_closure.remove_val(property_uri)
+            for superproperty_obj in field_entity.get(ANNAL.CURIE.superproperty_uri, []):
+                self._subproperty_uris.get(superproperty_obj["@id"], set()).discard(property_uri)
         return field_entity
 
     def get_superproperty_uris(self, property_uri):
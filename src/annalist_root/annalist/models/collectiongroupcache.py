@@ -0,0 +1,80 @@
+"""
+This module is used to cache per-collection field group information.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist                       import layout
+from annalist.exceptions            import Annalist_Error
+from annalist.identifiers           import ANNAL, RDFS
+
+from annalist.models.collectionentitycache  import (
+    Cache_Error, CollectionEntityCacheObject, CollectionEntityCache
+    )
+from annalist.models.recordgroup            import RecordGroup_migration
+
+#   ---------------------------------------------------------------------------
+# 
+#   Collection field group cache class
+# 
+#   ---------------------------------------------------------------------------
+
+class CollectionGroupCache(CollectionEntityCache):
+    """
+    This class manages and accesses field group cache objects for multiple collections.
+
+    Per-collection cacheing is implemented by CollectionEntityCacheObject.
+    """
+    def __init__(self):
+        """
+        Initialize.
+
+        Initializes a field group cache with no per-collection data.
+        """
+        super(CollectionGroupCache, self).__init__(CollectionEntityCacheObject, RecordGroup_migration)
+        return
+
+    # Collection field group cache alllocation and access methods
+
+    def set_group(self, coll, group_entity):
+        """
+        Save a new or updated field group
+        """
+        return self.set_entity(coll, group_entity)
+
+    def remove_group(self, coll, group_id):
+        """
+        Remove field group from collection cache.
+
+        Returns the field group entity removed if found, or None if not defined.
+        """
+        return self.remove_entity(coll, group_id)
+
+    def get_group(self, coll, group_id):
+        """
+        Retrieve a field group for a given Id.
+
+        Returns a field group object for the specified collecion and Id.
+        """
+        return self.get_entity(coll, group_id)
+
+    def get_all_group_ids(self, coll, altscope=None):
+        """
+        Returns all field group ids currently available for a collection in the 
+        indicated scope.  Default scope is field groups defined directly in the collection.
+        """
+        return self.get_all_entity_ids(coll, altscope=altscope)
+
+    def get_all_groups(self, coll, altscope=None):
+        """
+        Returns all field groups currently available for a collection in the 
+        indicated scope.  Default scope is field groups defined directly in the collection.
+        """
+        return self.get_all_entities(coll, altscope=altscope)
+
+# End.
@@ -0,0 +1,80 @@
+"""
+This module is used to cache per-collection list description information.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist                       import layout
+from annalist.exceptions            import Annalist_Error
+from annalist.identifiers           import ANNAL, RDFS
+
+from annalist.models.collectionentitycache  import (
+    Cache_Error, CollectionEntityCacheObject, CollectionEntityCache
+    )
+from annalist.models.recordlist             import RecordList
+
+#   ---------------------------------------------------------------------------
+# 
+#   Collection list description cache class
+# 
+#   ---------------------------------------------------------------------------
+
+class CollectionListCache(CollectionEntityCache):
+    """
+    This class manages and accesses list description cache objects for multiple collections.
+
+    Per-collection cacheing is implemented by CollectionEntityCacheObject.
+    """
+    def __init__(self):
+        """
+        Initialize.
+
+        Initializes a list description cache with no per-collection data.
+        """
+        super(CollectionListCache, self).__init__(CollectionEntityCacheObject, RecordList)
+        return
+
+    # Collection list description cache alllocation and access methods
+
+    def set_list(self, coll, list_entity):
+        """
+        Save a new or updated list description
+        """
+        return self.set_entity(coll, list_entity)
+
+    def remove_list(self, coll, list_id):
+        """
+        Remove list description from collection cache.
+
+        Returns the list description entity removed if found, or None if not defined.
+        """
+        return self.remove_entity(coll, list_id)
+
+    def get_list(self, coll, list_id):
+        """
+        Retrieve a list description for a given Id.
+
+        Returns a list description object for the specified collecion and Id.
+        """
+        return self.get_entity(coll, list_id)
+
+    def get_all_list_ids(self, coll, altscope=None):
+        """
+        Returns all list description ids currently available for a collection in the 
+        indicated scope.  Default scope is list descriptions defined directly in the collection.
+        """
+        return self.get_all_entity_ids(coll, altscope=altscope)
+
+    def get_all_lists(self, coll, altscope=None):
+        """
+        Returns all list descriptions currently available for a collection in the 
+        indicated scope.  Default scope is list descriptions defined directly in the collection.
+        """
+        return self.get_all_entities(coll, altscope=altscope)
+
+# End.
@@ -41,6 +41,7 @@ class CollectionTypeCacheObject(CollectionEntityCacheObject):
         """
         super(CollectionTypeCacheObject, self).__init__(coll_id, entity_cls)
         self._supertype_closure = ClosureCache(coll_id, ANNAL.CURIE.supertype_uri)
+        self._subtype_uris      = {}    # supertype URI -> set(subtype URIs) of cached types
         return
 
     def _load_entity(self, coll, type_entity):
@@ -60,14 +61,10 @@ class CollectionTypeCacheObject(CollectionEntityCacheObject):
             for supertype_obj in type_data.get(ANNAL.CURIE.supertype_uri, []):
                 supertype_uri = supertype_obj["@id"]
                 self._supertype_closure.add_rel(type_uri, supertype_uri)
+                self._subtype_uris.setdefault(supertype_uri, set()).add(type_uri)
             # Also add relations for references *to* the new type URI
-            for try_subtype in self.get_all_entities(coll):
-                sub_st_objs = try_subtype.get(ANNAL.CURIE.supertype_uri, [])
-                sub_st_uris = [ sub_st_obj["@id"] for sub_st_obj in sub_st_objs ]
-                if type_uri in sub_st_uris:
-                    subtype_uri = try_subtype.get(ANNAL.CURIE.uri, None)
-                    if subtype_uri:
-                        self._supertype_closure.add_rel(subtype_uri, type_uri)
+            for subtype_uri in self._subtype_uris.get(type_uri, set()):
+                self._supertype_closure.add_rel(subtype_uri, type_uri)
         return add_type
 
     def _drop_entity(self, coll, type_id):
@@ -81,6 +78,8 @@ class CollectionTypeCacheObject(CollectionEntityCacheObject):
         if type_entity:
             type_uri = type_entity.get_uri()
             self._supertype_closure.remove_val(type_uri)
+            for supertype_obj in type_entity.get(ANNAL.CURIE.supertype_uri, []):
+                self._subtype_uris.get(supertype_obj["@id"], set()).discard(type_uri)
         return type_entity
 
     def get_type_uri_supertype_uris(self, type_uri):
@@ -0,0 +1,237 @@
+"""
+Persistent per-collection change counter.
+
+Each collection directory holds a small file (see `layout.COLL_VERSION_FILE`) with
+a version value for the collection data, which is updated whenever an entity in the
+collection is created, updated, renamed or removed (see `EntityRoot._save`,
+`EntityRoot._remove` and `EntityRoot._rename_files`), or when collection data are
+installed by copying directory trees (see `Site.replace_site_data_dir`).  Changes to
+site-level data outside any collection directory are counted against the site data
+collection.
+
+The version value is a pair `(instance, count)`, where `count` is incremented by
+each change, and `instance` is a random identifier allocated when the counter is
+created, so that a collection that is removed and re-created does not repeat
+earlier version values.  The current version is obtained by a single small file
+read, so it can be used by all server processes as a validation key for information
+derived from collection data (e.g. process caches and HTTP entity tags) without
+scanning the collection data.
+
+Counter updates are serialized between processes by locking the counter file, where
+file locking is available, and are written in place as a fixed-size record.
+
+Changes made to collection data other than through Annalist (e.g. by editing data
+files directly) are not counted.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import uuid
+import errno
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None            # File locking not available (e.g. on Windows)
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf import settings
+
+from annalist   import layout
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def parse_version(data):
+    """
+    Returns a version value `(instance, count)` read from a counter file, or None
+    if the data supplied is not a valid version record.
+
+    >>> parse_version(format_version(("0123456789abcdef", 42)))
+    ('0123456789abcdef', 42)
+    >>> parse_version("") is None
+    True
+    """
+    try:
+        (instance, count) = data.split()
+        return (instance, int(count))
+    except ValueError:
+        return None
+
+def format_version(version):
+    """
+    Returns a fixed-size record for a version value `(instance, count)`.
+
+    >>> format_version(("0123456789abcdef", 42))
+    '0123456789abcdef 00000000000000000042\\n'
+    """
+    return "%s %020d\n"%version
+
+def update_version(coll_dir, increment):
+    """
+    Adds `increment` to the change counter for the collection stored in the indicated
+    directory, creating a new counter if none is present.
+
+    Returns a pair `(old_version, new_version)`, where `old_version` is None if a new
+    counter is created, or None if the collection directory does not exist.
+    """
+    if not os.path.isdir(coll_dir):
+        return None
+    path = os.path.join(coll_dir, layout.COLL_VERSION_FILE)
+    fd   = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        old_version = parse_version(os.read(fd, 256))
+        if old_version is None:
+            new_version = (uuid.uuid4().hex, 0)
+        else:
+            new_version = (old_version[0], old_version[1] + increment)
+        if new_version != old_version:
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, format_version(new_version))
+    finally:
+        os.close(fd)        # Also releases lock
+    return (old_version, new_version)
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Collection version access functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def collection_version_dir(p):
+    """
+    Returns the collection directory whose change counter is used for the indicated
+    entity file or directory, or None if it is not within the site data directory.
+    """
+    site_dir = os.path.join(settings.BASE_DATA_DIR, layout.SITE_DIR)
+    rel_path = os.path.relpath(os.path.normpath(p), os.path.normpath(site_dir))
+    segs     = rel_path.split(os.sep)
+    if segs[0] == os.pardir:
+        return None
+    if (len(segs) >= 2) and (segs[0] == layout.SITE_COLL_PATH.split("/")[0]):
+        return os.path.join(site_dir, segs[0], segs[1])
+    return os.path.join(site_dir, layout.SITEDATA_DIR)
+
+def read_collection_version(coll_dir):
+    """
+    Returns the current version value `(instance, count)` for the collection stored
+    in the indicated directory, or None if the collection directory does not exist.
+    """
+    try:
+        with open(os.path.join(coll_dir, layout.COLL_VERSION_FILE), "rb") as f:
+            version = parse_version(f.read())
+    except IOError as e:
+        if e.errno != errno.ENOENT:
+            raise
+        version = None
+    if version is None:
+        # Counter not yet created, or being created by another process
+        versions = update_version(coll_dir, 0)
+        version  = versions and versions[1]
+    return version
+
+def collection_version_stamp(coll_dir):
+    """
+    Returns a change stamp `(mtime, instance, count)` for the collection stored in the
+    indicated directory, where `(instance, count)` is the current version value and 
+    `mtime` is the time of the most recent counted change, or None if the collection 
+    directory does not exist.
+    """
+    version = read_collection_version(coll_dir)
+    if version is None:
+        return None
+    try:
+        mtime = os.stat(os.path.join(coll_dir, layout.COLL_VERSION_FILE)).st_mtime
+    except OSError:
+        return None
+    return (mtime,) + version
+
+def bump_collection_version(p):
+    """
+    Increments the change counter for the collection containing the indicated entity
+    file or directory.
+
+    Returns the new version value, or None if there is no such collection directory.
+    """
+    coll_dir = collection_version_dir(p)
+    versions = coll_dir and update_version(coll_dir, 1)
+    if not versions:
+        return None
+    collection_version_tracker.version_updated(coll_dir, versions[0], versions[1])
+    return versions[1]
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Collection version tracker
+#
+#   -------------------------------------------------------------------------------------------
+
+class CollectionVersionTracker(object):
+    """
+    Records the collection versions seen by the current process, so that changes
+    made by other processes can be detected.
+
+    For each collection whose data are cached by this process, the tracker records the
+    versions of that collection and of the collections from which it inherits, as seen
+    when they were last checked.  When this process updates a collection, recorded
+    versions are advanced to the new version if the counter was not also changed by
+    another process since it was last checked.
+    """
+
+    def __init__(self):
+        super(CollectionVersionTracker, self).__init__()
+        self._seen = {}     # coll_dir -> { alt_dir: version }
+        return
+
+    def check_versions(self, coll_dir, alt_dirs):
+        """
+        Checks versions of the indicated collections used by the collection stored in
+        `coll_dir`, and returns a list of those that have changed other than by this
+        process since they were last checked.
+        """
+        seen    = self._seen.setdefault(coll_dir, {})
+        changed = []
+        for d in alt_dirs:
+            version = read_collection_version(d)
+            if (d in seen) and (seen[d] != version):
+                changed.append(d)
+            seen[d] = version
+        return changed
+
+    def version_updated(self, alt_dir, old_version, new_version):
+        """
+        Note update of the indicated collection by the current process.
+        """
+        for seen in self._seen.values():
+            if (old_version is not None) and (seen.get(alt_dir, None) == old_version):
+                seen[alt_dir] = new_version
+        return
+
+    def flush(self):
+        """
+        Forget all recorded versions.
+        """
+        self._seen = {}
+        return
+
+collection_version_tracker = CollectionVersionTracker()
+
+def check_collection_versions(coll_dir, alt_dirs):
+    """
+    Returns a list of collection directories from `alt_dirs` whose data have been
+    changed by another process since they were last checked for the collection stored
+    in `coll_dir` (see `CollectionVersionTracker`).
+    """
+    return collection_version_tracker.check_versions(coll_dir, alt_dirs)
+
+# End.
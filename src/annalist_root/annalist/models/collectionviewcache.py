@@ -0,0 +1,80 @@
+"""
+This module is used to cache per-collection view description information.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist                       import layout
+from annalist.exceptions            import Annalist_Error
+from annalist.identifiers           import ANNAL, RDFS
+
+from annalist.models.collectionentitycache  import (
+    Cache_Error, CollectionEntityCacheObject, CollectionEntityCache
+    )
+from annalist.models.recordview             import RecordView
+
+#   ---------------------------------------------------------------------------
+# 
+#   Collection view description cache class
+# 
+#   ---------------------------------------------------------------------------
+
+class CollectionViewCache(CollectionEntityCache):
+    """
+    This class manages and accesses view description cache objects for multiple collections.
+
+    Per-collection cacheing is implemented by CollectionEntityCacheObject.
+    """
+    def __init__(self):
+        """
+        Initialize.
+
+        Initializes a view description cache with no per-collection data.
+        """
+        super(CollectionViewCache, self).__init__(CollectionEntityCacheObject, RecordView)
+        return
+
+    # Collection view description cache alllocation and access methods
+
+    def set_view(self, coll, view_entity):
+        """
+        Save a new or updated view description
+        """
+        return self.set_entity(coll, view_entity)
+
+    def remove_view(self, coll, view_id):
+        """
+        Remove view description from collection cache.
+
+        Returns the view description entity removed if found, or None if not defined.
+        """
+        return self.remove_entity(coll, view_id)
+
+    def get_view(self, coll, view_id):
+        """
+        Retrieve a view description for a given Id.
+
+        Returns a view description object for the specified collecion and Id.
+        """
+        return self.get_entity(coll, view_id)
+
+    def get_all_view_ids(self, coll, altscope=None):
+        """
+        Returns all view description ids currently available for a collection in the 
+        indicated scope.  Default scope is view descriptions defined directly in the collection.
+        """
+        return self.get_all_entity_ids(coll, altscope=altscope)
+
+    def get_all_views(self, coll, altscope=None):
+        """
+        Returns all view descriptions currently available for a collection in the 
+        indicated scope.  Default scope is view descriptions defined directly in the collection.
+        """
+        return self.get_all_entities(coll, altscope=altscope)
+
+# End.
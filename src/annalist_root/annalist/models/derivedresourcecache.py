@@ -0,0 +1,257 @@
+"""
+Site-wide cache of derived resource representations.
+
+Some resource representations (notably Turtle: see `turtle_resource_file` in
+`annalist.models.entityresourceaccess`) are derived from entity or list JSON-LD data
+by an expensive conversion.  This module saves derived representations as files in
+a cache directory in the site data area (see `layout.SITE_CACHE_DIR`), so that they
+can be re-used by all server processes while the data from which they are derived
+is unchanged.
+
+Each cached representation is identified by a resource id (e.g. the representation
+format and the base URL and name of the resource), and is saved with a version key
+computed from the data from which it is derived and the version of any other
+information on which it depends (e.g. the collection JSON-LD context).  A cached
+representation is used only if its version key matches the current version, so
+no explicit invalidation is needed when entities are updated.  A single file is
+saved for each resource id, which is replaced when a new version is saved.
+
+Cached representations of data from an entity or collection are saved in a cache
+subdirectory corresponding to the location of that entity or collection in the site 
+data, and are removed when the entity or collection is removed or renamed (see
+`EntityRoot._remove` and `EntityRoot._rename_files`).  The total size of the cache
+is limited by the `ANNALIST_DERIVED_RESOURCE_CACHE_SIZE` site setting.  A running
+total of the cache size is kept in a small file in the cache directory (see
+`layout.SITE_CACHE_SIZE_FILE`), which is updated when representations are saved or
+removed;  updates are serialized between processes by locking the file, where file
+locking is available.  When a saved representation takes the total over the limit,
+the least recently used representations are discarded until the cache is reduced
+to a fraction of that limit (see `CACHE_EVICT_FRACTION`), so that the cache files
+are not scanned again for each subsequent save.
+
+Caching is enabled by the `ANNALIST_DERIVED_RESOURCE_CACHE` site setting.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import shutil
+import hashlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None            # File locking not available (e.g. on Windows)
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf import settings
+
+from annalist   import layout
+
+# Fraction of the cache size limit to which the cache is reduced by evicting 
+# least recently used resources.
+CACHE_EVICT_FRACTION = 0.9
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def _hash_str(s):
+    """
+    Returns a byte string for hashing a supplied string or other value.
+    """
+    if isinstance(s, unicode):
+        return s.encode("utf-8")
+    if not isinstance(s, str):
+        return repr(s)
+    return s
+
+def derived_resource_version(*parts):
+    """
+    Returns a version key for a derived resource, computed from the supplied
+    strings (or other values, which are hashed using their `repr`).
+
+    >>> derived_resource_version("data", (1.5, 2)) == derived_resource_version("data", (1.5, 2))
+    True
+    >>> derived_resource_version("data", (1.5, 2)) == derived_resource_version("data", (1.5, 3))
+    False
+    >>> derived_resource_version("ab", "c") == derived_resource_version("a", "bc")
+    False
+    """
+    h = hashlib.sha1()
+    for p in parts:
+        p = _hash_str(p)
+        h.update("%d:"%(len(p),))
+        h.update(p)
+    return h.hexdigest()
+
+def derived_resource_cache_dir(resource_dir=None):
+    """
+    Returns the cache directory for resources derived from data in the indicated 
+    directory (e.g. an entity or collection directory), or the base cache directory
+    if no directory is supplied or it is not in the site data area.
+    """
+    cache_dir = os.path.join(settings.BASE_SITE_DIR, layout.SITE_CACHE_DIR)
+    if resource_dir:
+        rel_dir = os.path.relpath(os.path.normpath(resource_dir), settings.BASE_SITE_DIR)
+        if not rel_dir.startswith(os.pardir):
+            cache_dir = os.path.join(cache_dir, rel_dir)
+    return cache_dir
+
+def derived_resource_path(resource_id, resource_dir=None):
+    """
+    Returns the cache file location for a derived resource.
+
+    resource_dir    if supplied, is the directory containing the data from which
+                    the resource is derived.
+    """
+    return os.path.join(
+        derived_resource_cache_dir(resource_dir),
+        hashlib.sha1(_hash_str(resource_id)).hexdigest()
+        )
+
+def derived_resource_files(d):
+    """
+    Returns a list of `(mtime, size, path)` for cached resource files in the
+    indicated cache directory and its subdirectories.
+    """
+    cache_files = []
+    for (dirpath, dirnames, filenames) in os.walk(d):
+        for f in filenames:
+            if f == layout.SITE_CACHE_SIZE_FILE:
+                continue
+            path = os.path.join(dirpath, f)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            cache_files.append((st.st_mtime, st.st_size, path))
+    return cache_files
+
+def evict_derived_resources(max_size):
+    """
+    Removes least recently used (i.e. by file modification time) derived resources
+    until the total size of the cache is no more than the indicated size in bytes.
+
+    Returns the total size of the remaining cached resources.
+    """
+    cache_files = derived_resource_files(derived_resource_cache_dir())
+    cache_size  = sum( size for (mtime, size, path) in cache_files )
+    if cache_size > max_size:
+        cache_files.sort()
+        for (mtime, size, path) in cache_files:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            cache_size -= size
+            if cache_size <= max_size:
+                break
+    return cache_size
+
+def update_cache_size(increment, max_size):
+    """
+    Adds `increment` to the recorded total size of the derived resource cache, 
+    and evicts least recently used resources if the new total exceeds the 
+    indicated size in bytes.  If no total has been recorded, it is calculated
+    from the cached resource files.
+
+    Returns the new total size of the cache.
+    """
+    cache_dir = derived_resource_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return 0
+    path = os.path.join(cache_dir, layout.SITE_CACHE_SIZE_FILE)
+    fd   = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            cache_size = int(os.read(fd, 64)) + increment
+        except ValueError:
+            cache_size = sum( size for (mtime, size, p) in derived_resource_files(cache_dir) )
+        if cache_size > max_size:
+            cache_size = evict_derived_resources(int(max_size*CACHE_EVICT_FRACTION))
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, "%020d\n"%max(cache_size, 0))
+    finally:
+        os.close(fd)        # Also releases lock
+    return cache_size
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Derived resource cache access functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def get_derived_resource(resource_id, version, resource_dir=None):
+    """
+    Returns cached data for the indicated derived resource if it has been saved with
+    the supplied version key, otherwise None.
+
+    The modification time of the cache file is updated when data is returned, so 
+    that recently used resources are retained (see `evict_derived_resources`).
+    """
+    if not settings.ANNALIST_DERIVED_RESOURCE_CACHE:
+        return None
+    path = derived_resource_path(resource_id, resource_dir=resource_dir)
+    try:
+        with open(path, "rb") as f:
+            if f.readline().rstrip("\n") == version:
+                data = f.read()
+                os.utime(path, None)
+                return data
+    except (IOError, OSError):
+        pass
+    return None
+
+def save_derived_resource(resource_id, version, data, resource_dir=None):
+    """
+    Saves data for the indicated derived resource with the supplied version key,
+    replacing any previously saved version, then updates the recorded cache size,
+    discarding least recently used resources if the cache size limit is exceeded.
+    """
+    if not settings.ANNALIST_DERIVED_RESOURCE_CACHE:
+        return
+    path      = derived_resource_path(resource_id, resource_dir=resource_dir)
+    temp_path = "%s.%d.tmp"%(path, os.getpid())
+    try:
+        cache_dir = os.path.dirname(path)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        with open(temp_path, "wb") as f:
+            f.write(version+"\n")
+            f.write(data)
+        increment = os.path.getsize(temp_path)
+        if os.path.exists(path):
+            increment -= os.path.getsize(path)
+            if os.name != "posix":
+                os.remove(path)
+        os.rename(temp_path, path)
+    except (IOError, OSError) as e:
+        log.warning("save_derived_resource: error saving %s (%s)"%(path, e))
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return
+    update_cache_size(increment, settings.ANNALIST_DERIVED_RESOURCE_CACHE_SIZE)
+    return
+
+def derived_resources_removed(d):
+    """
+    Removes cached resources derived from data in the indicated directory (e.g. an
+    entity or collection directory), which is being removed.
+    """
+    cache_dir = derived_resource_cache_dir(d)
+    if (cache_dir != derived_resource_cache_dir()) and os.path.isdir(cache_dir):
+        removed_size = sum( size for (mtime, size, p) in derived_resource_files(cache_dir) )
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        update_cache_size(-removed_size, settings.ANNALIST_DERIVED_RESOURCE_CACHE_SIZE)
+    return
+
+# End.
@@ -31,7 +31,9 @@ from annalist                   import message
 from annalist.exceptions        import Annalist_Error
 from annalist.identifiers       import ANNAL
 
-from annalist.models.entityroot import EntityRoot
+from annalist.models.entityroot   import EntityRoot
+from annalist.models.entitystore  import get_entity_store
+from annalist.models.childidindex import get_child_id_index
 
 #   -------------------------------------------------------------------------------------------
 #
@@ -51,6 +53,21 @@ def test_is_true(v):
     """
     return bool(v)
 
+#   Generation number for alternative parent lists cached by `Entity.get_alt_entities`.
+#   This is incremented by any change that may affect alternative parent lists (i.e. 
+#   setting a new alternative parent, or creating or removing a RecordTypeData entity):  
+#   these are infrequent, so all cached alternative parent lists are discarded.
+
+alt_parents_generation = 0
+
+def invalidate_alt_parents():
+    """
+    Invalidate all alternative parent lists cached by `Entity.get_alt_entities`.
+    """
+    global alt_parents_generation
+    alt_parents_generation += 1
+    return
+
 #   -------------------------------------------------------------------------------------------
 #
 #   Entity
@@ -223,6 +240,7 @@ class Entity(EntityRoot):
         """
         # Set new alternative parent
         self._altparent = altparent
+        invalidate_alt_parents()
         # Build list of accessible parents, check for recursion
         parents = [self] + self._find_alt_parents(altscope="all")
         # log.info(
@@ -373,13 +391,32 @@ class Entity(EntityRoot):
                 log.error("".join(traceback.format_stack()))
                 raise ValueError("altscope must be string (%r supplied)"%(altscope))
         # log.debug("Entity.get_alt_entities: %s/%s"%(self.get_type_id(), self.get_id()))
-        alt_parents = [self] + self._find_alt_parents(altscope=altscope)
+        alt_cache = self._alt_parents_cache()
+        if alt_cache is None:
+            return [self] + self._find_alt_parents(altscope=altscope)
+        alt_key   = (self._entitytypeid, self.get_id(), altscope)
+        alt_entry = alt_cache.get(alt_key, None)
+        if (alt_entry is None) or (alt_entry[0] != alt_parents_generation):
+            alt_entry = (alt_parents_generation, self._find_alt_parents(altscope=altscope))
+            alt_cache[alt_key] = alt_entry
+        alt_parents = [self] + alt_entry[1]
         # log.info(
         #     "@@ Entity.get_alt_entities: %s/%s -> %r"%
         #     (self.get_type_id(), self.get_id(), [ p.get_id() for p in alt_parents ])
         #     )
         return alt_parents
 
+    def _alt_parents_cache(self):
+        """
+        Returns a dictionary used to cache alternative parent lists for the current 
+        entity (see `get_alt_entities`), or None if the lists are not cached.
+
+        Cached lists are indexed by (type id, entity id, altscope), and are used only
+        by the same parent collection object, so this method is overridden by classes 
+        whose alternative parents are determined by their collection.
+        """
+        return None
+
     def try_alt_entities(self, func, test=test_is_true, altscope=None):
         """
         Try applying the supplied function to the current entity and then any alternatives
@@ -540,31 +577,71 @@ class Entity(EntityRoot):
         altscope    if supplied, indicates a scope other than the current entity to
                     search for children.
 
-        @@NOTE:  The logic in this method is intended to return inherited values before
-        values defined in the current collection.  It should probably be re-worked to return 
-        entries in order from all inherited definitions.  The logic here could possibly
-        be simplified to extract all values in the "alt parents" loop, (though the ordering 
-        might be tricky to preserve that way).
+        Values inherited from alternative parents are returned before values defined
+        in the current entity.  The ids are obtained from a process-wide index that
+        is maintained as entities are added and removed (see `_child_id_index`).
         """
         # log.info("@@ Entity._children: parent %s, altscope %s"%(self.get_id(), altscope))
-        coll_entity_ids = list(super(Entity, self)._children(cls, altscope=None))
-        alt_parents     = self.get_alt_entities(altscope=altscope)
-        # parent_entity_ids = list(itertools.chain.from_iterable(
-        #     ( super(Entity, alt)._children(cls, altscope=altscope) 
-        #       for alt in alt_parents # self.get_alt_entities(altscope=altscope)
-        #     )))     # See https://docs.python.org/2/library/itertools.html#itertools.chain
-        parent_entity_ids = []
-        for alt in alt_parents:
-            for eid in super(Entity, alt)._children(cls, altscope=altscope):
-                # Filter out duplicates
-                if eid not in parent_entity_ids:
-                    parent_entity_ids.append(eid)
-        # log.info("@@ Entity._children: coll_entity_ids %r, parent_entity_ids %r"%(coll_entity_ids, parent_entity_ids))
-        # if altscope == "all" and self._altparent:
-        #     parent_entity_ids = self._altparent._children(cls, altscope=altscope)
-        for entity_id in [f for f in parent_entity_ids if f not in coll_entity_ids] + coll_entity_ids:
-            if util.valid_id(entity_id):
-                yield entity_id
+        (alt_parents, child_index) = self._child_id_index(cls, altscope=altscope)
+        return iter(child_index.get_ids())
+
+    def _child_id_index(self, cls, altscope=None):
+        """
+        Returns a pair `(alt_parents, child_index)`, where `alt_parents` is the list 
+        of the current entity and its alternatives in the indicated scope (see 
+        `get_alt_entities`), and `child_index` is a child id index entry (see 
+        `annalist.models.childidindex`) for directories in which children of the
+        indicated class are found.
+
+        The index entry lists ids from the alternative parents (in order of the 
+        alternatives list, without duplicates, and omitting ids also present in the
+        current entity), followed by ids from the current entity.  When altscope is
+        "site", only ids from the current entity are listed (see `EntityRoot._children`).
+        """
+        alt_parents = self.get_alt_entities(altscope=altscope)
+        if altscope == "site":
+            alt_parents = alt_parents[:1]
+        child_dirs  = [ alt._child_dir(cls) for alt in alt_parents ]
+        return (alt_parents, get_child_id_index(child_dirs))
+
+    def _child_entity_paths(self, cls, altscope=None):
+        """
+        Iterates over child entities of an indicated class, yielding for each a pair
+        `(entity, body_path)`, where `entity` is an instantiated (but not loaded) entity 
+        descended from the current entity or the alternative parent from which it is 
+        obtained, and `body_path` is the location of the child entity body.
+
+        Child entities are enumerated in the same order as `_children`, and each is 
+        resolved to the first of the current entity and its alternatives (see 
+        `get_alt_entities`) that holds a body for it.  This is equivalent to calling 
+        `exists` or `load` for each id returned by `_children`, but lists each parent 
+        directory once and tests just one body file for each entity, rather than 
+        probing each alternative parent for each entity id.
+
+        cls         is a subclass of Entity indicating the type of children to
+                    iterate over.
+        altscope    if supplied, indicates a scope other than the current entity to
+                    search for children.
+        """
+        (alt_parents, child_index) = self._child_id_index(cls, altscope=altscope)
+        alt_child_sets = child_index.get_dir_id_sets()
+        store = get_entity_store()
+        for entity_id in child_index.get_ids():
+            uv = None
+            for alt, alt_ids in zip(alt_parents, alt_child_sets):
+                if entity_id not in alt_ids:
+                    continue
+                if alt is self:
+                    e = cls._child_init(self, entity_id)
+                else:
+                    # View URL is taken from the entity as if descended from self
+                    uv = uv or cls._child_init(self, entity_id)._entityviewurl
+                    e  = cls._child_init(alt, entity_id, entityviewurl=uv)
+                (d, p) = e._dir_path()
+                body_path = p if store.isfile(p) else e._exists_path()
+                if body_path:
+                    yield (e, body_path)
+                    break
         return
 
     def resource_file(self, resource_ref):
@@ -579,9 +656,21 @@ class Entity(EntityRoot):
             )
         return file_obj
 
+    def resource_change_stamp(self, resource_ref):
+        """
+        Returns a change stamp for a resource associated with the current entity, or 
+        with a corresponding entity with the same id descended from an alternative 
+        parent (cf. `resource_file`), or None if the resource is not present.
+        """
+        stamp = self.try_alt_entities(
+            lambda e: super(Entity,e).resource_change_stamp(resource_ref), 
+            altscope="all"
+            )
+        return stamp
+
     # Create and access functions
 
-    def child_entities(self, cls, altscope=None):
+    def child_entities(self, cls, altscope=None, entity_filter=None):
         """
         Iterates over child entities of an indicated class.
         The supplied class is used to determine a subdirectory to be scanned, 
@@ -591,10 +680,21 @@ class Entity(EntityRoot):
                     iterate over.
         altscope    if supplied, indicates a scope other than the current entity to
                     search for children.  See `_find_alt_parents` for more details.
-        """
-        for i in self._children(cls, altscope=altscope):
-            e = cls.load(self, i, altscope=altscope)
-            if e:
+        entity_filter
+                    if supplied, is an entity filter (see `PropertyValueFilter` and
+                    `SearchTermFilter`): child entities that it does not select are
+                    skipped without being loaded, and the values of entities that
+                    are loaded are passed to the filter to update its index.
+        """
+        for (e, body_path) in self._child_entity_paths(cls, altscope=altscope):
+            if entity_filter and not entity_filter.select_entity(e, body_path):
+                continue
+            v = e._load_values(body_file=body_path)
+            if v:
+                v = e._migrate_values(v)
+                if entity_filter:
+                    entity_filter.entity_loaded(e, body_path, v)
+                e.set_values(v)
                 yield e
         return
 
@@ -0,0 +1,188 @@
+"""
+Per-collection cache of choice lists for fields that reference entities of a type.
+
+Fields that refer to an entity (e.g. enumerated value selections) offer a list of
+choices drawn from all entities of the referenced type and its subtypes that are
+selected by the field's restriction selector (see `FieldDescription`).  Building the
+choice list requires all of those entities to be enumerated and loaded, so the
+resulting lists are saved here, for each collection, keyed by a value that includes
+the referenced type, the restriction selector and any view context values that the
+selector refers to (see `EntitySelector.get_context_values`).
+
+Each saved choice list records the collection directories from which its entities
+are drawn (i.e. the collection and those from which it inherits) and the type
+directories that are enumerated.  Saved choice lists are discarded when:
+
+- an entity stored in one of the recorded type directories is created, updated,
+  renamed or removed by this process (see `EntityRoot._save`, `EntityRoot._remove`,
+  `EntityRoot._rename_files` and `Site.replace_site_data_dir`);
+- a type definition is changed in any of the recorded collections, as this may
+  change the subtypes enumerated or the entities selected;
+- any collection metadata are changed, as this may change collection inheritance
+  or the collection entities that are enumerated;
+- collection data are changed by another process (see `Collection.flush_changed_caches`).
+
+Saved choice lists are shared by all users of the cache, and must not be modified.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist                           import layout
+
+from annalist.models.collectionversion  import collection_version_dir
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def choice_change_location(p):
+    """
+    Returns a pair `(coll_dir, type_dir)` for the collection directory and type
+    directory containing the indicated entity file or directory, where `type_dir`
+    is None for changes to the collection itself, or None if the location is not
+    within the site data directory.
+    """
+    coll_dir = collection_version_dir(p)
+    if coll_dir is None:
+        return None
+    segs = os.path.relpath(os.path.normpath(p), coll_dir).split(os.sep)
+    if (len(segs) > 1) and (segs[0] == layout.COLL_BASE_DIR):
+        return (coll_dir, segs[1])
+    return (coll_dir, None)
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Entity choice cache
+#
+#   -------------------------------------------------------------------------------------------
+
+# Number of choice lists saved for each collection.  Keys depend on view context values
+# used by field restrictions (e.g. the entity type of a view being edited), so the number
+# of distinct keys is normally small;  the limit just guards against unbounded growth.
+choice_cache_max = 250
+
+class EntityChoiceCache(object):
+    """
+    Choice lists saved for each collection, indexed by collection directory.
+    """
+
+    def __init__(self):
+        super(EntityChoiceCache, self).__init__()
+        self._caches = {}   # coll_dir -> { key: (alt_dirs, type_dirs, choices) }
+        return
+
+    def get_choices(self, coll_dir, key):
+        """
+        Returns a saved choice list for the indicated collection and key, or None.
+        """
+        entry = self._caches.get(coll_dir, {}).get(key, None)
+        return entry and entry[2]
+
+    def set_choices(self, coll_dir, key, alt_dirs, type_dirs, choices):
+        """
+        Save a choice list for the indicated collection and key.
+
+        alt_dirs    is a list of collection directories from which choices are drawn.
+        type_dirs   is a list of type directories from which choices are drawn.
+        choices     is the choice list to be saved.
+        """
+        cache = self._caches.setdefault(coll_dir, {})
+        if len(cache) >= choice_cache_max:
+            cache.clear()
+        cache[key] = (frozenset(alt_dirs), frozenset(type_dirs), choices)
+        return
+
+    def changed(self, p):
+        """
+        Discard choice lists that may be affected by a change to the indicated
+        entity file or directory.
+        """
+        loc = choice_change_location(p)
+        if loc is None:
+            return
+        (changed_dir, type_dir) = loc
+        if type_dir is None:
+            # Collection change: may affect any collection
+            self.flush()
+            return
+        for cache in self._caches.values():
+            for key in list(cache):
+                (alt_dirs, type_dirs, choices) = cache[key]
+                if ( (changed_dir in alt_dirs) and
+                     ((type_dir in type_dirs) or (type_dir == layout.TYPE_DIR)) ):
+                    del cache[key]
+        return
+
+    def flush_collection(self, coll_dir):
+        """
+        Discard all choice lists for the indicated collection.
+        """
+        self._caches.pop(coll_dir, None)
+        return
+
+    def flush(self):
+        self._caches = {}
+        return
+
+entity_choice_cache = EntityChoiceCache()
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Choice cache access functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def get_cached_choices(coll, key, make_choices=None):
+    """
+    Returns a choice list for the indicated collection and key, using a saved choice
+    list if available.  If no choice list is saved and `make_choices` is None, 
+    returns None.
+
+    coll        is the collection for which choices are required.
+    key         is a hashable value that identifies the choice list, which must include
+                all values (other than the collection data) on which the choices depend.
+    make_choices
+                is a function that returns a pair `(type_ids, choices)`, where
+                `choices` is a new choice list, and `type_ids` is a list of the
+                ids of the types whose entities are enumerated to build it (which
+                are also the names of the corresponding type directories).
+    """
+    coll_dir = collection_version_dir(coll._entitydir)
+    choices  = entity_choice_cache.get_choices(coll_dir, key)
+    if (choices is None) and make_choices:
+        (type_ids, choices) = make_choices()
+        alt_dirs = [ collection_version_dir(c._entitydir)
+                     for c in coll.get_alt_entities(altscope="all")
+                   ]
+        entity_choice_cache.set_choices(coll_dir, key, alt_dirs, type_ids, choices)
+    return choices
+
+def choice_cache_changed(p):
+    """
+    Discard saved choice lists affected by a change to the indicated entity file or
+    directory.
+    """
+    entity_choice_cache.changed(p)
+    return
+
+def flush_choice_cache(coll_dir=None):
+    """
+    Discard saved choice lists for the collection stored in the indicated directory,
+    or all saved choice lists if no directory is specified.
+    """
+    if coll_dir is None:
+        entity_choice_cache.flush()
+    else:
+        entity_choice_cache.flush_collection(collection_version_dir(coll_dir))
+    return
+
+# End.
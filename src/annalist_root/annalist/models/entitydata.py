@@ -32,6 +32,7 @@ class EntityData(Entity):
     _entityfile     = layout.ENTITY_DATA_FILE
     _contextbase    = layout.ENTITY_COLL_BASE_REF
     _contextref     = layout.ENTITY_CONTEXT_FILE
+    _entitycache    = True
 
     def __init__(self, parent, entity_id):
         """
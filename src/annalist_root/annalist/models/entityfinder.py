@@ -11,6 +11,8 @@ import logging
 log = logging.getLogger(__name__)
 
 import re
+import json
+import heapq
 from pyparsing import Word, QuotedString, Literal, Group, Empty, StringEnd, ParseException
 from pyparsing import alphas, alphanums
 
@@ -20,6 +22,8 @@ from annalist.util                  import valid_id, extract_entity_id
 from annalist.models.recordtype     import RecordType
 from annalist.models.recordtypedata import RecordTypeData
 from annalist.models.entitytypeinfo import EntityTypeInfo
+from annalist.models.entitypropertyindex import PropertyValueFilter, property_value_keys
+from annalist.models.entitysearchindex   import SearchTermFilter
 
 #   -------------------------------------------------------------------
 #   Auxilliary functions
@@ -33,13 +37,37 @@ def order_entity_key(entity):
 
         sorted(entities, order_entity_key)
     """
-    type_id   = entity.get_type_id() 
-    entity_id = entity.get_id()
+    return order_entity_id_key((entity.get_type_id(), entity.get_id()))
+
+def order_entity_id_key(type_entity_id):
+    """
+    Function returns sort key for ordering `(type_id, entity_id)` pairs in the
+    same order as the corresponding entities (see `order_entity_key`).
+
+    >>> sorted([("t", "e"), ("_t", "e"), ("t", "_e")], key=order_entity_id_key)
+    [('_t', 'e'), ('t', '_e'), ('t', 'e')]
+    """
+    (type_id, entity_id) = type_entity_id
     key = ( 0 if type_id.startswith('_')   else 1, type_id, 
             0 if entity_id.startswith('_') else 1, entity_id
           )
     return key
 
+def sorted_range(items, key, offset=0, limit=None):
+    """
+    Returns a sorted list of the supplied items, skipping the first `offset` items
+    and, if `limit` is supplied, containing at most `limit` items.  Only the first
+    `offset+limit` items are retained while sorting.
+
+    >>> sorted_range([3, 1, 4, 5, 2], None, offset=1, limit=2)
+    [2, 3]
+    """
+    if limit is None:
+        items = sorted(items, key=key)
+    else:
+        items = heapq.nsmallest(offset+limit, items, key=key)
+    return items[offset:] if offset else items
+
 #   -------------------------------------------------------------------
 #   EntityFinder
 #   -------------------------------------------------------------------
@@ -90,20 +118,23 @@ class EntityFinder(object):
         else:
             log.warning("EntityFinder.get_collection_subtype_ids: no type_uri for %s"%(supertype_id,))
 
-    def get_type_entities(self, type_id, user_permissions, altscope):
+    def get_type_entities(self, type_id, user_permissions, altscope, entity_filter=None):
         """
         Iterate over entities from collection matching the supplied type.
 
         'altscope' is used to determine the extent of data to be included in the listing:
         a value of 'all' means that site-wide entyities are icnluded in the listing.
         Otherwise only collection entities are included.        
+
+        'entity_filter', if supplied, is used to skip entities that cannot be selected
+        without loading them (see `Entity.child_entities`).
         """
         #@@
         # log.info("get_type_entities: type_id %s, user_permissions %r"%(type_id,user_permissions))
         #@@
         entitytypeinfo = EntityTypeInfo(self._coll, type_id)
         for e in entitytypeinfo.enum_entities_with_implied_values(
-                user_permissions, altscope=altscope
+                user_permissions, altscope=altscope, entity_filter=entity_filter
                 ):
             if e.get_id() != layout.INITIAL_VALUES_ID:
                 #@@
@@ -112,7 +143,7 @@ class EntityFinder(object):
                 yield e
         return
 
-    def get_subtype_entities(self, type_id, user_permissions, altscope):
+    def get_subtype_entities(self, type_id, user_permissions, altscope, entity_filter=None):
         """
         Iterate over entities from collection that are of the indicated type
         or any of its subtypes.
@@ -124,7 +155,7 @@ class EntityFinder(object):
         for subtype_id in self.get_collection_subtype_ids(type_id, "all"):
             subtype_info = EntityTypeInfo(self._coll, subtype_id)
             es = subtype_info.enum_entities_with_implied_values(
-                    user_permissions, altscope=altscope
+                    user_permissions, altscope=altscope, entity_filter=entity_filter
                     )
             #@@
             # es = list(es) #@@ Force strict eval
@@ -135,7 +166,7 @@ class EntityFinder(object):
                     yield e
         return
 
-    def get_all_types_entities(self, types, user_permissions, altscope):
+    def get_all_types_entities(self, types, user_permissions, altscope, entity_filter=None):
         """
         Iterate over all entities of all types from a supplied type iterator
         """
@@ -143,26 +174,54 @@ class EntityFinder(object):
         # log.info("@@@@ get_all_types_entities")
         #@@
         for t in types:
-            for e in self.get_type_entities(t, user_permissions, altscope):
+            for e in self.get_type_entities(t, user_permissions, altscope, entity_filter=entity_filter):
                 #@@
                 # log.info("get_all_types_entities: type %s/%s"%(t,e.get_id()))
                 #@@
                 yield e
         return
 
-    def get_base_entities(self, type_id=None, user_permissions=None, altscope=None):
+    def get_selected_entity(self, type_id, entity_id, supertype_id=None, context={}):
+        """
+        Returns the identified entity of the indicated type, with implied values, if 
+        it would be returned by `get_entities` for the indicated supertype (or type)
+        and context, otherwise None.  Only the identified entity is loaded.
+        """
+        if entity_id == layout.INITIAL_VALUES_ID:
+            return None
+        if type_id not in self.get_collection_subtype_ids(supertype_id or type_id, "all"):
+            return None
+        entitytypeinfo = EntityTypeInfo(self._coll, type_id)
+        entity         = entitytypeinfo.get_entity(entity_id)
+        if entity is None:
+            return None
+        if entitytypeinfo.recordtype:
+            entity = entitytypeinfo.get_entity_implied_values(entity)
+        if not self._selector.select_entity(entity, context):
+            return None
+        return entity
+
+    def get_base_entities(self, 
+        type_id=None, user_permissions=None, altscope=None, entity_filter=None
+        ):
         """
         Iterate over base entities from collection, matching the supplied type id if supplied.
 
         If a type_id is supplied, site data values are included.
+
+        If an entity filter is supplied, entities that it does not select are 
+        skipped without being loaded.
         """
         entities = None
         if type_id:
-            entities = self.get_subtype_entities(type_id, user_permissions, altscope)
+            entities = self.get_subtype_entities(
+                type_id, user_permissions, altscope, entity_filter=entity_filter
+                )
             # return self.get_type_entities(type_id, user_permissions, scope)
         else:
             entities = self.get_all_types_entities(
-                self.get_collection_type_ids(altscope="all"), user_permissions, altscope
+                self.get_collection_type_ids(altscope="all"), user_permissions, altscope,
+                entity_filter=entity_filter
                 )
         #@@
         # entities = list(entities)  #@@ Force strict eval
@@ -185,20 +244,36 @@ class EntityFinder(object):
         """
         Iterates over entities of the specified type, matching search term and visible to 
         supplied user permissions.
+
+        Entities that cannot satisfy the selector or contain the search term are
+        skipped using the entity property and search indexes, where possible (see
+        `annalist.models.entitypropertyindex` and `annalist.models.entitysearchindex`).
         """
-        entities = self._selector.filter(
-            self.get_base_entities(type_id, user_permissions, altscope), context=context
+        entity_filter = self._selector.get_property_filter(context)
+        if search:
+            entity_filter = SearchTermFilter(search, base_filter=entity_filter)
+        entities      = self._selector.filter(
+            self.get_base_entities(
+                type_id, user_permissions, altscope, entity_filter=entity_filter
+                ), 
+            context=context
             )
         if search:
             entities = self.search_entities(entities, search)
         return entities
 
     def get_entities_sorted(self, 
-        user_permissions=None, type_id=None, altscope=None, context={}, search=None
+        user_permissions=None, type_id=None, altscope=None, context={}, search=None,
+        offset=0, limit=None
         ):
         """
         Get sorted list of entities of the specified type, matching search term and 
         visible to supplied user permissions.
+
+        offset      is the number of entities to skip from the start of the sorted list.
+        limit       if supplied, is the maximum number of entities returned.  Only the
+                    first `offset+limit` entities are retained while selecting entities,
+                    rather than sorting the full list.
         """
         entities = self.get_entities(
             user_permissions, type_id=type_id, altscope=altscope, 
@@ -208,7 +283,46 @@ class EntityFinder(object):
         # entities = list(entities)  #@@ Force strict eval
         # log.info("get_entities_sorted: %r"%([e.get_id() for e in entities],))
         #@@
-        return sorted(entities, key=order_entity_key)
+        return sorted_range(entities, order_entity_key, offset=offset, limit=limit)
+
+    def get_entity_ids_sorted(self, 
+        user_permissions=None, type_id=None, altscope=None, context={}, search=None,
+        offset=0, limit=None
+        ):
+        """
+        Get sorted list of `(type_id, entity_id)` pairs for the entities that are
+        returned by `get_entities_sorted`.  Each entity is released once it has been
+        selected, so the values of all selected entities are not held together.
+
+        The entities may be loaded using `iter_entities`.
+        """
+        entity_ids = (
+            (e.get_type_id(), e.get_id())
+            for e in self.get_entities(
+                user_permissions, type_id=type_id, altscope=altscope, 
+                context=context, search=search
+                )
+            )
+        return sorted_range(entity_ids, order_entity_id_key, offset=offset, limit=limit)
+
+    def iter_entities(self, entity_ids):
+        """
+        Iterate over entities, with implied values, identified by the supplied
+        `(type_id, entity_id)` pairs (e.g. as returned by `get_entity_ids_sorted`).
+        Entities that no longer exist are skipped.
+        """
+        typeinfos = {}
+        for (type_id, entity_id) in entity_ids:
+            if type_id not in typeinfos:
+                typeinfos[type_id] = EntityTypeInfo(self._coll, type_id)
+            entitytypeinfo = typeinfos[type_id]
+            entity         = entitytypeinfo.get_entity(entity_id)
+            if entity is None:
+                continue
+            if entitytypeinfo.recordtype:
+                entity = entitytypeinfo.get_entity_implied_values(entity)
+            yield entity
+        return
 
     @classmethod
     def entity_contains(cls, e, search):
@@ -265,6 +379,46 @@ class EntityFinder(object):
             return search in val
         return False
 
+#   -------------------------------------------------------------------
+#   Selector grammar and compiled selector cache
+#   -------------------------------------------------------------------
+
+def make_selector_grammar():
+    """
+    Returns a pyparsing parser for entity selector strings.
+
+    See `EntitySelector.parse_selector` for the selector formats recognized.
+    """
+    p_name     = Word(alphas+"_", alphanums+"_")
+    p_id       = Word(alphas+"_@", alphanums+"_-.~:/?#@!$&'()*+,;=)")
+    p_val      = ( Group( Literal("[") + p_id + Literal("]") )
+                 | Group( p_name + Literal("[") + p_id + Literal("]") )
+                 | Group( QuotedString('"', "\\") )
+                 | Group( QuotedString("'", "\\") )
+                 | Group( p_id )
+                 )
+    p_comp     = ( Literal("==") | Literal("in") | p_name )
+    p_selector = ( p_val + p_comp + p_val + StringEnd() )
+    return p_selector
+
+selector_grammar = make_selector_grammar()
+
+# Compiled selectors, keyed by selector string.  Each entry is a pair of a 
+# predicate function of (entity, context, fieldcomp), and a property filter
+# function of (context, fieldcomp) or None (see `EntitySelector.compile_selector`).
+# Selector strings are drawn from list and field definitions, so the number of 
+# entries is small; the limit just guards against unbounded growth from arbitrary
+# request-supplied selectors.
+compiled_selectors      = {}
+compiled_selectors_max  = 1000
+
+def flush_compiled_selectors():
+    """
+    Discard all compiled selector predicates.
+    """
+    compiled_selectors.clear()
+    return
+
 #   -------------------------------------------------------------------
 #   EntitySelector
 #   -------------------------------------------------------------------
@@ -313,11 +467,19 @@ class EntitySelector(object):
     True
     >>> EntitySelector(f12).select_entity(e, c)
     False
+
+    Compiled selectors are shared by selectors using the same selector string:
+
+    >>> EntitySelector.get_compiled_selector(f1) is EntitySelector.get_compiled_selector(f1)
+    True
+    >>> EntitySelector.get_compiled_selector(f3) is None
+    True
     """
     def __init__(self, selector, fieldcomp=None):
         self._fieldcomp = fieldcomp
         # Returns None if no filter is applied, otherwise a predcicate function
         self._selector  = self.compile_selector_filter(selector)
+        self._index_f   = self.get_compiled_selector_index(selector)
         return
 
     def filter(self, entities, context=None):
@@ -352,6 +514,16 @@ class EntitySelector(object):
             return self._selector(entity, context)
         return True
 
+    def get_property_filter(self, context={}):
+        """
+        Returns a property value filter (see `annalist.models.entitypropertyindex`)
+        that selects a superset of the entities selected by the current selector in
+        the supplied context, or None if no such filter can be determined.
+        """
+        if self._index_f:
+            return self._index_f(context or {}, self._fieldcomp)
+        return None
+
     @classmethod  #@@ @staticmethod, no cls?
     def parse_selector(cls, selector):
         """
@@ -383,6 +555,8 @@ class EntitySelector(object):
                          / "*" / "+" / "," / ";" / "="
 
         Parser uses pyparsing combinators (cf. http://pyparsing.wikispaces.com).
+        The grammar is constructed once, when this module is loaded (see
+        `make_selector_grammar`).
         """
         def get_value(val_list):
             if len(val_list) == 1:
@@ -393,18 +567,8 @@ class EntitySelector(object):
                 return { 'type': 'context', 'name': val_list[0], 'field_id': val_list[2], 'value': None }
             else:
                 return { 'type': 'unknown', 'name': None,        'field_id': None,        'value': None }
-        p_name     = Word(alphas+"_", alphanums+"_")
-        p_id       = Word(alphas+"_@", alphanums+"_-.~:/?#@!$&'()*+,;=)")
-        p_val      = ( Group( Literal("[") + p_id + Literal("]") )
-                     | Group( p_name + Literal("[") + p_id + Literal("]") )
-                     | Group( QuotedString('"', "\\") )
-                     | Group( QuotedString("'", "\\") )
-                     | Group( p_id )
-                     )
-        p_comp     = ( Literal("==") | Literal("in") | p_name )
-        p_selector = ( p_val + p_comp + p_val + StringEnd() )
         try:
-            resultlist = p_selector.parseString(selector).asList()
+            resultlist = selector_grammar.parseString(selector).asList()
         except ParseException:
             return None
         resultdict = {}
@@ -414,6 +578,51 @@ class EntitySelector(object):
             resultdict['val2'] = get_value(resultlist[2])
         return resultdict
 
+    @classmethod
+    def get_context_values(cls, selector, context):
+        """
+        Returns a tuple of `(name, field_id, value)` for each context value referenced
+        by a selector, where `value` is the referenced value encoded as a JSON string.
+        Entities selected in a given context depend only on these values, so the
+        result may be used as part of a key for saved selection results.
+
+        >>> c = { 'view': { 'v:a': '1', 'v:b': ['2', '3'] } }
+        >>> EntitySelector.get_context_values("[p:a] in view[v:b]", c)
+        (('view', 'v:b', '["2", "3"]'),)
+        >>> EntitySelector.get_context_values("[p:a] in entity[v:b]", c)
+        (('entity', 'v:b', 'null'),)
+        >>> EntitySelector.get_context_values("'1' == [p:a]", c)
+        ()
+        >>> EntitySelector.get_context_values("ALL", c)
+        ()
+        """
+        values = []
+        for (name, field_id) in cls.get_context_refs(selector):
+            c  = (context or {}).get(name, None)
+            cv = c.get(field_id, None) if c else None
+            values.append((name, field_id, json.dumps(cv, sort_keys=True, default=str)))
+        return tuple(values)
+
+    @classmethod
+    def get_context_refs(cls, selector):
+        """
+        Returns a tuple of `(name, field_id)` for each context value referenced by
+        a selector.
+
+        >>> EntitySelector.get_context_refs("[p:a] in view[v:b]")
+        (('view', 'v:b'),)
+        >>> EntitySelector.get_context_refs("ALL")
+        ()
+        """
+        if selector in {None, "", "ALL"}:
+            return ()
+        sel  = cls.parse_selector(selector) or {}
+        refs = []
+        for v in (sel.get('val1', None), sel.get('val2', None)):
+            if v and (v['type'] == "context"):
+                refs.append((v['name'], v['field_id']))
+        return tuple(refs)
+
     def compile_selector_filter(self, selector):
         """
         Return filter for for testing entities matching a supplied selector.
@@ -422,7 +631,73 @@ class EntitySelector(object):
 
         Selector formats: see `parse_selector` above.
 
-        This function returns a filter function compiled from the supplied selector.
+        This function returns a filter function compiled from the supplied selector,
+        using the field comparison object supplied to the constructor.
+        """
+        selector_f = self.get_compiled_selector(selector)
+        if selector_f is None:
+            return None
+        fieldcomp = self._fieldcomp
+        def selector_filter_f(e, c):
+            return selector_f(e, c, fieldcomp)
+        return selector_filter_f
+
+    @classmethod
+    def _get_compiled(cls, selector):
+        """
+        Return compiled selector pair for a supplied selector (see `compile_selector`), 
+        using a previously compiled selector if available.
+
+        Returns (None, None) if no selection is performed.
+        """
+        if selector in {None, "", "ALL"}:
+            return (None, None)
+        compiled = compiled_selectors.get(selector, None)
+        if compiled is None:
+            compiled = cls.compile_selector(selector)
+            if len(compiled_selectors) >= compiled_selectors_max:
+                compiled_selectors.clear()
+            compiled_selectors[selector] = compiled
+        return compiled
+
+    @classmethod
+    def get_compiled_selector(cls, selector):
+        """
+        Return predicate function for testing entities matching a supplied selector,
+        using a previously compiled predicate if available.
+
+        Returns None if no selection is performed; i.e. all possible entities are selected.
+        """
+        return cls._get_compiled(selector)[0]
+
+    @classmethod
+    def get_compiled_selector_index(cls, selector):
+        """
+        Return property filter function for a supplied selector, using a previously
+        compiled selector if available.
+
+        Returns None if no selection is performed, or if the selector does not test
+        an entity property value against a value that does not depend on the entity.
+        """
+        return cls._get_compiled(selector)[1]
+
+    @classmethod
+    def compile_selector(cls, selector):
+        """
+        Return a pair of functions for testing entities matching a supplied selector.
+
+        Selector formats: see `parse_selector` above.
+
+        The first function returned is a predicate function of (entity, context, 
+        fieldcomp), where `fieldcomp` is a FieldComparison object used by comparisons 
+        other than "==" and "in".  It does not depend on any particular collection, 
+        so may be shared by all selectors using the same selector string.
+
+        The second function returned is a function of (context, fieldcomp) that 
+        returns a property value filter (`PropertyValueFilter`) used to select 
+        candidate entities via the entity property index, or None if no such filter
+        can be determined.  It is None if the selector does not compare an entity 
+        property value with a literal or context value.
         """
         def get_entity(field_id):
             "Get field from entity tested by filter"
@@ -457,12 +732,12 @@ class EntitySelector(object):
                 assert False, "Unrecognized value type from selector"
         #
         def match_eq(v1f, v2f):
-            def match_eq_f(e, c):
+            def match_eq_f(e, c, fc):
                 return v1f(e, c) == v2f(e, c)
             return match_eq_f
         #
         def match_in(v1f, v2f):
-            def match_in_f(e, c):
+            def match_in_f(e, c, fc):
                 v1 = v1f(e, c)
                 if not v1: return True
                 v2 = v2f(e, c)
@@ -472,24 +747,68 @@ class EntitySelector(object):
             return match_in_f
         #
         def match_subtype(v1f, v2f):
-            def match_subtype_f(e, c):
-                return self._fieldcomp.subtype(v1f(e, c), v2f(e, c))
+            def match_subtype_f(e, c, fc):
+                return fc.subtype(v1f(e, c), v2f(e, c))
             return match_subtype_f
         #
-        if selector in {None, "", "ALL"}:
+        def index_eq(p, vf):
+            # Entity property value equal to value
+            def index_eq_f(c, fc):
+                keys = property_value_keys(vf(None, c))
+                return None if keys is None else PropertyValueFilter(p, keys)
+            return index_eq_f
+        #
+        def index_contains(p, vf):
+            # Entity property value contains or is equal to value
+            def index_contains_f(c, fc):
+                v = vf(None, c)
+                if not v:
+                    return None     # All entities selected
+                keys = property_value_keys(v)
+                return None if keys is None else PropertyValueFilter(p, keys)
+            return index_contains_f
+        #
+        def index_supertype(p, vf):
+            # Entity property value is a supertype of value
+            def index_supertype_f(c, fc):
+                v = vf(None, c)
+                if not fc or isinstance(v, (list, dict)):
+                    return None
+                keys = set()
+                if v:
+                    keys.add(v)
+                    keys.update(fc.supertype_uris(v))
+                return PropertyValueFilter(p, keys)
+            return index_supertype_f
+        #
+        def get_index_f(sel):
+            (val1, comp, val2) = (sel['val1'], sel['comp'], sel['val2'])
+            if val1['type'] == "entity" and val2['type'] in ["literal", "context"]:
+                (p, vf) = (val1['field_id'], get_val_f(val2))
+                if comp in ["==", "in"]:
+                    return index_eq(p, vf)
+            if val2['type'] == "entity" and val1['type'] in ["literal", "context"]:
+                (p, vf) = (val2['field_id'], get_val_f(val1))
+                if comp == "==":
+                    return index_eq(p, vf)
+                if comp == "in":
+                    return index_contains(p, vf)
+                if comp == "subtype":
+                    return index_supertype(p, vf)
             return None
-        sel = self.parse_selector(selector)
+        #
+        sel = cls.parse_selector(selector)
         if not sel:
             msg = "Unrecognized selector syntax (%s)"%selector
             raise ValueError(msg)
         v1f = get_val_f(sel['val1'])
         v2f = get_val_f(sel['val2'])
         if sel['comp'] == "==":
-            return match_eq(v1f, v2f)
+            return (match_eq(v1f, v2f), get_index_f(sel))
         if sel['comp'] == "in":
-            return match_in(v1f, v2f)
+            return (match_in(v1f, v2f), get_index_f(sel))
         if sel['comp'] == "subtype":
-            return match_subtype(v1f, v2f)
+            return (match_subtype(v1f, v2f), get_index_f(sel))
         # Drop through: raise error
         msg = "Unrecognized entity selector (%s)"%selector
         raise ValueError(msg)
@@ -531,11 +850,18 @@ class FieldComparison(object):
             return True
         if not type1_uri:
             return False
-        type1_info = self.get_uri_type_info(type1_uri)
-        type1_supertype_uris = (type1_info and type1_info.get_all_type_uris()) or []
+        type1_supertype_uris = self.supertype_uris(type1_uri)
         # log.info("FieldComparison.subtype: type1_uris (supertypes) %r"%(type1_uris,))
         return type2_uri in type1_supertype_uris
 
+    def supertype_uris(self, type_uri):
+        """
+        Returns a list of the supplied type URI and all its supertype URIs, or an
+        empty list if the type URI does not correspond to a defined type.
+        """
+        type_info = self.get_uri_type_info(type_uri)
+        return (type_info and type_info.get_all_type_uris()) or []
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
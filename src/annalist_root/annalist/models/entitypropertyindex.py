@@ -0,0 +1,251 @@
+"""
+Process-wide index of selected entity property values.
+
+This module maintains, for entity bodies read from Annalist storage, the values of
+entity properties that are tested by list selectors (see `EntitySelector`).  When
+enumerating the entities of a type, a property value filter can use the index to
+skip entities that cannot satisfy the selector, without loading (and migrating, and
+adding implied values to) each entity.
+
+The index is organized by type directory (i.e. per collection and type), with an
+entry for each entity body, and is populated on demand:  a property is indexed for
+an entity when it is loaded by an enumeration using a filter on that property (see
+`Entity.child_entities`), so entity bodies are not read separately to build the
+index.  Entities that are not yet indexed are treated as candidates.  Each entry
+records the change stamp of the entity body (see `FileEntityStore.change_stamp`),
+and is re-read if the stamp has changed (e.g. when the entity is updated by another
+process).  Entities updated, removed or renamed by this process update the index
+directly (see `EntityRoot._save`, `EntityRoot._remove` and `EntityRoot._rename_files`).
+
+The filter is conservative: it may return entities that do not satisfy the selector
+(notably, entities for which the property has no value, or has values that cannot
+be indexed), so the selector must still be applied to the entities returned.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist.models.entitystore import get_entity_store
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def property_value_keys(value):
+    """
+    Returns a frozenset of keys under which an entity property value is indexed,
+    or None if the value cannot be indexed (e.g. it contains dictionaries).
+
+    Simple values are indexed as themselves, and lists as their members.  Missing
+    or empty values return an empty set.
+
+    >>> sorted(property_value_keys(["a", "b"]))
+    ['a', 'b']
+    >>> property_value_keys("") == frozenset()
+    True
+    >>> property_value_keys([{"@id": "a"}]) is None
+    True
+    """
+    if isinstance(value, list):
+        keys = set()
+        for v in value:
+            if isinstance(v, (list, dict)):
+                return None
+            if v not in (None, ""):
+                keys.add(v)
+        return frozenset(keys)
+    if isinstance(value, dict):
+        return None
+    if value in (None, ""):
+        return frozenset()
+    return frozenset([value])
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Entity property index
+#
+#   -------------------------------------------------------------------------------------------
+
+class EntityPropertyIndex(object):
+    """
+    Index of property values for entities, indexed by type directory and entity body path.
+    """
+
+    def __init__(self):
+        super(EntityPropertyIndex, self).__init__()
+        self._entries = {}  # type_dir -> { body_path: (stamp, { property_uri: keys }) }
+        return
+
+    def _type_dir(self, body_path):
+        """
+        Returns the type directory for an entity body path, used to group index entries.
+        """
+        return os.path.dirname(os.path.dirname(os.path.normpath(body_path)))
+
+    def _get_props(self, body_path, stamp):
+        """
+        Returns the dictionary of index keys recorded for an entity body with the
+        supplied change stamp, or an empty dictionary if the entity body is not 
+        indexed or has changed since it was indexed.
+        """
+        dir_index  = self._entries.get(self._type_dir(body_path), {})
+        (old_stamp, props) = dir_index.get(body_path, (None, {}))
+        if (stamp is None) or (old_stamp != stamp):
+            return {}
+        return props
+
+    def get_keys(self, body_path, property_uri):
+        """
+        Returns index keys for the indicated property of an entity, or None if the 
+        property has not been indexed or the entity body has changed since it was 
+        indexed.
+
+        body_path       is the location of the entity body.
+        property_uri    is the property whose index keys are returned.
+        """
+        stamp = get_entity_store().change_stamp(body_path)
+        return self._get_props(body_path, stamp).get(property_uri, None)
+
+    def set_keys(self, body_path, property_uris, values):
+        """
+        Index the indicated properties of an entity, using values loaded from the 
+        entity body.
+
+        body_path       is the location of the entity body.
+        property_uris   is a list of properties to be indexed.
+        values          is the (migrated) entity values read from `body_path`.
+        """
+        stamp = get_entity_store().change_stamp(body_path)
+        if stamp is not None:
+            props = dict(self._get_props(body_path, stamp))
+            for p in property_uris:
+                props[p] = property_value_keys(values.get(p, None))
+            self._entries.setdefault(self._type_dir(body_path), {})[body_path] = (stamp, props)
+        return
+
+    def update_entry(self, body_path, values):
+        """
+        Update index entry for an entity body saved with the supplied values.
+        """
+        type_dir  = self._type_dir(body_path)
+        dir_index = self._entries.get(type_dir, None)
+        if dir_index and (body_path in dir_index):
+            stamp = get_entity_store().change_stamp(body_path)
+            if stamp is None:
+                del dir_index[body_path]
+            else:
+                props = (
+                    { p: property_value_keys(values.get(p, None))
+                      for p in dir_index[body_path][1]
+                    })
+                dir_index[body_path] = (stamp, props)
+        return
+
+    def remove_tree(self, d):
+        """
+        Remove index entries for all entities stored under directory `d`
+        (e.g. an entity, all entities of a type, or all entities in a collection).
+        """
+        d      = os.path.normpath(d)
+        prefix = os.path.join(d, "")
+        for type_dir in list(self._entries):
+            if (type_dir == d) or type_dir.startswith(prefix):
+                del self._entries[type_dir]
+            elif d.startswith(os.path.join(type_dir, "")):
+                dir_index = self._entries[type_dir]
+                for body_path in [ p for p in dir_index if p.startswith(prefix) ]:
+                    del dir_index[body_path]
+        return
+
+    def flush(self):
+        self._entries = {}
+        return
+
+entity_property_index = EntityPropertyIndex()
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Property value filter
+#
+#   -------------------------------------------------------------------------------------------
+
+class PropertyValueFilter(object):
+    """
+    Filter that selects candidate entities whose indexed value for a property has
+    any of a given set of values, is empty, or cannot be indexed.
+    """
+
+    def __init__(self, property_uri, values):
+        """
+        Initialize a new property value filter.
+
+        property_uri    is the property whose value is tested.
+        values          is a set of property values (or list members) for which
+                        an entity is selected.
+        """
+        super(PropertyValueFilter, self).__init__()
+        self._property_uri = property_uri
+        self._values       = frozenset(values)
+        return
+
+    def __repr__(self):
+        return "PropertyValueFilter(%r, %r)"%(self._property_uri, sorted(self._values))
+
+    def get_property_uris(self):
+        """
+        Returns a list of properties whose indexed values are tested by this filter.
+        """
+        return [self._property_uri]
+
+    def select_entity(self, entity, body_path):
+        """
+        Returns True if the entity whose body is at the indicated location is a
+        candidate for selection.
+        """
+        keys = entity_property_index.get_keys(body_path, self._property_uri)
+        return (not keys) or not self._values.isdisjoint(keys)
+
+    def entity_loaded(self, entity, body_path, values):
+        """
+        Called with the values of each entity selected by this filter that is 
+        subsequently loaded, and updates the index for that entity.
+        """
+        entity_property_index.set_keys(body_path, [self._property_uri], values)
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Index maintenance functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def property_index_saved(body_path, values):
+    """
+    Update property index for an entity body saved with the supplied values.
+    """
+    entity_property_index.update_entry(body_path, values)
+    return
+
+def property_index_removed(d):
+    """
+    Remove property index entries for entities stored under the indicated directory.
+    """
+    entity_property_index.remove_tree(d)
+    return
+
+def flush_property_index():
+    """
+    Remove all property index entries.
+    """
+    entity_property_index.flush()
+    return
+
+# End.
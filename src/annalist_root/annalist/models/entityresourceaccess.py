@@ -14,17 +14,28 @@ __license__     = "MIT (http://opensource.org/licenses/MIT)"
 
 import sys
 import os
+import re
 import json
+import urlparse
 import StringIO
 import logging
 log = logging.getLogger(__name__)
 
-from rdflib                             import Graph, URIRef, Literal
+from rdflib                             import Graph, URIRef, Literal, RDF, XSD
+from rdflib_jsonld.context              import Context, UNDEF
+from rdflib_jsonld.keys                 import (
+    CONTEXT, GRAPH, ID, LANG, LIST, REV, SET, TYPE, VALUE, VOCAB
+    )
+from rdflib_jsonld.parser               import TYPE_TERM
 
 from annalist                           import message
 from annalist                           import layout
 
+from annalist.models.entitystore        import get_entity_store
 from annalist.models.entitytypeinfo     import EntityTypeInfo
+from annalist.models.derivedresourcecache import (
+    derived_resource_version, get_derived_resource, save_derived_resource
+    )
 
 # Resource info data for built-in entity data
 
@@ -93,6 +104,371 @@ entity_list_json_resources = (
                                                     "resource_type": "application/ld+json" }
     ])
 
+# JSON-LD context access
+
+coll_context_cache = {}     # context path -> (stamp, context data)
+
+def get_coll_context(coll):
+    """
+    Returns a pair `(stamp, context_data)` for the JSON-LD context of a collection, 
+    where `stamp` is the change stamp of the context file generated by 
+    `Collection.generate_coll_jsonld_context` and `context_data` is the parsed 
+    content of that file.  If the context file is not present or cannot be read,
+    `context_data` is None.
+
+    Parsed context data is cached while the context file is unchanged.
+    """
+    path  = coll.get_context_path()
+    store = get_entity_store()
+    stamp = store.change_stamp(path)
+    if stamp is None:
+        coll_context_cache.pop(path, None)
+        return (None, None)
+    (cached_stamp, context_data) = coll_context_cache.get(path, (None, None))
+    if cached_stamp != stamp:
+        try:
+            with store.open(path, "rt") as f:
+                context_data = json.load(f)
+            coll_context_cache[path] = (stamp, context_data)
+        except (IOError, ValueError) as e:
+            log.warning("get_coll_context: error reading %s (%s)"%(path, e))
+            context_data = None
+    return (stamp, context_data)
+
+def coll_context_resource_info(coll, coll_baseurl, entity=None):
+    """
+    Returns a dictionary of values to be added to the description of a resource 
+    that is derived from collection data, which are used by `turtle_resource_file` 
+    to access the collection JSON-LD context without retrieving it from the server,
+    and to determine if a cached Turtle representation can be used.
+
+    coll_baseurl    is the base URL for the collection data, relative to which the
+                    collection JSON-LD context is located.
+    entity          if supplied, is the entity from which the resource is derived.
+                    Otherwise, the resource is derived from the collection.
+    """
+    (stamp, context_data) = get_coll_context(coll)
+    resource_info = (
+        { "context_version":    stamp
+        , "resource_dir":       (entity or coll)._entitydir
+        })
+    if context_data is not None:
+        resource_info["context_docs"] = (
+            { urlparse.urljoin(coll_baseurl, layout.COLL_CONTEXT_FILE): context_data }
+            )
+    return resource_info
+
+def resolve_context_refs(baseurl, jsondata, context_docs):
+    """
+    Returns JSON-LD data in which references in the top-level context that resolve 
+    to any of the supplied context documents are replaced by the content of those
+    documents, so the JSON-LD parser does not have to retrieve them.
+
+    baseurl         is the base URL for resolving relative context references.
+    jsondata        is the JSON-LD data.
+    context_docs    is a dictionary of JSON-LD context documents, keyed by URL.
+
+    >>> resolve_context_refs(
+    ...     "http://a.example/b/c/", 
+    ...     { "@context": [{"@base": "../"}, "../ctx.jsonld"], "p": 1 },
+    ...     { "http://a.example/b/ctx.jsonld": { "@context": { "q": "http://q.example/" } } }
+    ...     ) == { "@context": [{"@base": "../"}, { "q": "http://q.example/" }], "p": 1 }
+    True
+    """
+    context = jsondata.get("@context", None)
+    if not context:
+        return jsondata
+    context_refs = context if isinstance(context, list) else [context]
+    new_context  = []
+    for c in context_refs:
+        if isinstance(c, basestring):
+            context_doc = context_docs.get(urlparse.urljoin(baseurl, c), None)
+            if context_doc and ("@context" in context_doc):
+                c = context_doc["@context"]
+        new_context.append(c)
+    return dict(jsondata, **{ "@context": new_context })
+
+# Direct Turtle output
+
+class TurtleWriterUnsupported(Exception):
+    """
+    Raised when JSON-LD data uses features not handled by `DirectTurtleWriter`.
+    """
+    pass
+
+class DirectTurtleWriter(object):
+    """
+    Writes Turtle directly from Annalist entity or entity list JSON-LD data.
+
+    Converting data to Turtle via an rdflib graph means building the graph and then
+    serializing it, which is slow for large entity lists.  This class writes Turtle
+    statements as it walks the JSON-LD data, using the same context processing and 
+    term expansion as the rdflib JSON-LD parser, so that the resulting graph is the 
+    same (up to blank node identifiers) as that obtained via rdflib.
+
+    Only the JSON-LD features used by Annalist entity data are handled:  terms and 
+    CURIEs defined by a local context (see `resolve_context_refs`), `@id` and `@type`
+    values, `@id` and `@vocab` type coercion, `@list` and `@set` containers, value
+    objects and nested node objects.  Other features (e.g. context references, 
+    reverse properties, named graphs, or explicit blank node identifiers) raise 
+    `TurtleWriterUnsupported`, in which case the data should be converted via rdflib.
+    """
+
+    prefix_re  = re.compile(r"^[A-Za-z][A-Za-z0-9_\-]*$")
+    local_re   = re.compile(r"^[A-Za-z0-9_]([A-Za-z0-9_\-]*)$")
+    iri_excl   = re.compile(u'[\x00-\x20<>"{}|^`\\\\]')
+
+    def __init__(self, baseurl, jsondata):
+        """
+        Initialize a Turtle writer for the supplied JSON-LD data.
+
+        baseurl     base URL for resolving relative URI references in the data.
+        jsondata    is the JSON-LD data, which must be a single node object whose 
+                    context (if any) does not refer to external documents.
+        """
+        super(DirectTurtleWriter, self).__init__()
+        if not isinstance(jsondata, dict) or (VALUE in jsondata):
+            raise TurtleWriterUnsupported("Top-level JSON-LD value is not a node object")
+        self._jsondata = jsondata
+        self._context  = Context(base=baseurl)
+        context_data   = jsondata.get(CONTEXT, None)
+        if context_data:
+            for c in (context_data if isinstance(context_data, list) else [context_data]):
+                if not isinstance(c, dict):
+                    raise TurtleWriterUnsupported("JSON-LD context reference %r"%(c,))
+            self._context.load(context_data, self._context.base)
+        for k in (CONTEXT, GRAPH, ID, LANG, LIST, REV, SET, TYPE, VALUE):
+            if self._context.get_key(k) != k:
+                raise TurtleWriterUnsupported("JSON-LD keyword alias for %s"%(k,))
+        self._prefixes = {}     # namespace URI -> prefix
+        for name in sorted(self._context.terms, reverse=True):
+            term_id = self._context.terms[name].id
+            if ( isinstance(term_id, basestring) and term_id.endswith(("#", "/")) and 
+                 self.prefix_re.match(name) ):
+                self._prefixes[term_id] = name
+        self._resolved = {}     # id reference -> resolved URI
+        self._pending  = []     # Node objects to be written as separate statements
+        return
+
+    def chunks(self):
+        """
+        Iterates over unicode strings that make up the Turtle data.
+        """
+        for ns in sorted(self._prefixes, key=lambda ns: self._prefixes[ns]):
+            yield u"@prefix %s: <%s> .\n"%(self._prefixes[ns], ns)
+        yield u"\n"
+        self._pending.append(self._jsondata)
+        i = 0
+        while i < len(self._pending):
+            node = self._pending[i]
+            self._pending[i] = None
+            i += 1
+            subj = self._node_ref(node) if isinstance(node.get(ID), basestring) else u"[]"
+            if subj is None:
+                continue
+            statements = self._node_statements(node, 1)
+            if statements:
+                yield u"%s\n    %s .\n\n"%(subj, statements)
+        return
+
+    def _resolve(self, ref):
+        """
+        Resolve an id reference, as `Context.resolve`.
+        """
+        uri = self._resolved.get(ref, None)
+        if uri is None:
+            uri = self._resolved[ref] = self._context.resolve(ref)
+        return uri
+
+    def _uri(self, uri):
+        """
+        Returns Turtle for a URI, using a defined prefix if possible.
+        """
+        if self.iri_excl.search(uri):
+            raise TurtleWriterUnsupported("Cannot write URI %r"%(uri,))
+        split = max(uri.rfind("#"), uri.rfind("/")) + 1
+        if split > 0:
+            prefix = self._prefixes.get(uri[:split], None)
+            if prefix and self.local_re.match(uri[split:]):
+                return u"%s:%s"%(prefix, uri[split:])
+        return u"<%s>"%(uri,)
+
+    def _string(self, value, lang=None):
+        """
+        Returns Turtle for a string literal.
+        """
+        if lang:
+            return Literal(value, lang=lang).n3()
+        return u'"%s"'%(
+            value.replace("\\", "\\\\").replace('"', '\\"')
+                 .replace("\n", "\\n").replace("\r", "\\r")
+            )
+
+    def _literal(self, value, lang=None, datatype=None):
+        """
+        Returns Turtle for a literal value, as created by the rdflib JSON-LD parser.
+        """
+        if isinstance(value, basestring) and not datatype:
+            return self._string(value, lang=lang)
+        if not isinstance(value, (basestring, bool, int, long, float)):
+            raise TurtleWriterUnsupported("Literal value %r"%(value,))
+        if lang:
+            return Literal(value, lang=lang).n3()
+        return Literal(value, datatype=datatype).n3()
+
+    def _node_ref(self, node):
+        """
+        Returns Turtle for a reference to a node object with an `@id` value, or None
+        if the node is not converted to RDF (i.e., its `@id` is not an absolute URI).
+        """
+        id_val = node[ID]
+        if id_val.startswith("_:"):
+            raise TurtleWriterUnsupported("Blank node identifier %r"%(id_val,))
+        uri = self._resolve(id_val)
+        if ":" not in uri:
+            return None
+        return self._uri(uri)
+
+    def _node_statements(self, node, depth):
+        """
+        Returns Turtle for the predicates and objects of a node object, or an 
+        empty string if the node has no predicates.
+        """
+        pred_objs = []
+        for key in sorted(node):
+            if key in (CONTEXT, ID):
+                continue
+            if key == REV:
+                raise TurtleWriterUnsupported("Reverse property")
+            po = self._pred_objs(key, node[key], depth)
+            if po:
+                pred_objs.append(po)
+        return (u" ;\n" + u"    "*depth).join(pred_objs)
+
+    def _pred_objs(self, key, value, depth):
+        """
+        Returns Turtle for a predicate and its objects, or None.
+        """
+        values = value if isinstance(value, list) else [value]
+        term   = self._context.terms.get(key)
+        if term:
+            if term.reverse:
+                raise TurtleWriterUnsupported("Reverse property %s"%(key,))
+            if term.container == LIST:
+                values = [{LIST: values}]
+            elif isinstance(value, dict) and term.container not in (UNDEF, SET):
+                raise TurtleWriterUnsupported("Container %s for %s"%(term.container, key))
+        if TYPE in (key, term and term.id):
+            term = TYPE_TERM
+        elif (key in (GRAPH, SET)) or (term and term.id in (GRAPH, SET)):
+            raise TurtleWriterUnsupported("Keyword %s"%(key,))
+        pred_uri = term.id if term else self._context.expand(key)
+        if not pred_uri or pred_uri.startswith("_:"):
+            return None
+        objs = []
+        for v in values:
+            if isinstance(v, dict) and (v.get(SET) is not None):
+                v = v[SET]
+            for o in (v if isinstance(v, list) else [v]):
+                o = self._object(term, o, depth)
+                if o is not None:
+                    objs.append(o)
+        if not objs:
+            return None
+        pred = u"a" if pred_uri == unicode(RDF.type) else self._uri(pred_uri)
+        return u"%s %s"%(pred, u", ".join(objs))
+
+    def _object(self, term, value, depth):
+        """
+        Returns Turtle for an object value, or None (cf. rdflib JSON-LD parser 
+        method `_to_object`).
+        """
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            if value.get(LIST) is not None:
+                return self._list(term, value[LIST], depth)
+        elif not term or not term.type:
+            if isinstance(value, float):
+                return self._literal(value, datatype=XSD.double)
+            lang = self._context.language
+            if term and (term.language is not UNDEF):
+                lang = term.language
+            return self._literal(value, lang=lang)
+        elif not isinstance(value, basestring):
+            raise TurtleWriterUnsupported("Value %r for %s"%(value, term.name))
+        elif term.type == ID:
+            value = {ID: self._resolve(value)}
+        elif term.type == VOCAB:
+            value = {ID: self._context.expand(value) or self._context.resolve_iri(value)}
+        else:
+            value = {TYPE: term.type, VALUE: value}
+        lang = value.get(LANG)
+        if lang or (VALUE in value):
+            v = value[VALUE] if VALUE in value else None
+            if v is None:
+                return None
+            datatype = (not lang) and value.get(TYPE) or None
+            if datatype:
+                datatype = self._context.expand(datatype)
+            return self._literal(v, lang=lang, datatype=datatype)
+        if CONTEXT in value:
+            raise TurtleWriterUnsupported("Nested JSON-LD context")
+        if isinstance(value.get(ID), basestring):
+            ref = self._node_ref(value)
+            if ref and (len(value) > 1):
+                self._pending.append(value)
+            return ref
+        statements = self._node_statements(value, depth+1)
+        if not statements:
+            return u"[]"
+        return u"[\n%s%s\n%s]"%(u"    "*(depth+1), statements, u"    "*depth)
+
+    def _list(self, term, values, depth):
+        """
+        Returns Turtle for an RDF collection.
+        """
+        objs = []
+        for v in (values if isinstance(values, list) else [values]):
+            if v is None:
+                continue
+            o = self._object(term, v, depth)
+            if o is None:
+                # rdflib creates a malformed list in this case
+                raise TurtleWriterUnsupported("Unconverted list member %r"%(v,))
+            objs.append(o)
+        if len(objs) <= 1:
+            return u"( %s )"%(u"".join(objs),) if objs else u"()"
+        sep = u"\n" + u"    "*(depth+1)
+        return u"(%s%s\n%s)"%(sep, sep.join(objs), u"    "*depth)
+
+def turtle_resource_chunks(baseurl, jsondata):
+    """
+    Iterates over UTF-8 encoded strings that make up a Turtle version of the 
+    supplied JSON-LD data, written by `DirectTurtleWriter`.  If the data cannot 
+    be handled, `TurtleWriterUnsupported` is raised.
+
+    >>> jsondata = (
+    ...     { "@context":   [{"@base": "../"}, {"ex": "http://example.org/", "ex:r": {"@type": "@id"}}]
+    ...     , "@id":        "e1"
+    ...     , "@type":      "ex:T"
+    ...     , "ex:r":       ["e2", "http://example.net/e3"]
+    ...     , "ex:s":       "\\"Hello\\"\\n"
+    ...     })
+    >>> print "".join(turtle_resource_chunks("http://a.example/b/c/", jsondata))
+    @prefix ex: <http://example.org/> .
+    <BLANKLINE>
+    <http://a.example/b/e1>
+        a ex:T ;
+        ex:r <http://a.example/b/e2>, <http://example.net/e3> ;
+        ex:s "\\"Hello\\"\\n" .
+    <BLANKLINE>
+    <BLANKLINE>
+    """
+    for chunk in DirectTurtleWriter(baseurl, jsondata).chunks():
+        yield chunk.encode("utf-8")
+    return
+
 # Resource access functions
 
 def entity_resource_file(entity, resource_info):
@@ -110,16 +486,88 @@ def json_resource_file(baseurl, jsondata, resource_info):
     response_file.seek(0)
     return response_file
 
+def json_list_resource_chunks(jsondata, list_key, list_values):
+    """
+    Iterates over strings that make up a JSON version of the supplied list data, 
+    formatted as `json_resource_file`, where the list values are read from an 
+    iterator and formatted as they are read.
+
+    jsondata    is the list data, without the list of values.
+    list_key    is the key for the list of values, which must sort after all other 
+                keys of `jsondata`.
+    list_values is an iterator over values for the list.
+
+    >>> list_data = { "@id": "list", "a:list": [{ "v": 1 }, { "v": [2, 3] }] }
+    >>> chunks    = json_list_resource_chunks(
+    ...     { "@id": "list" }, "a:list", iter(list_data["a:list"])
+    ...     )
+    >>> "".join(chunks) == json_resource_file(None, list_data, None).read()
+    True
+    >>> chunks    = json_list_resource_chunks({ "@id": "list" }, "a:list", iter([]))
+    >>> "".join(chunks) == json_resource_file(None, { "@id": "list", "a:list": [] }, None).read()
+    True
+    """
+    head = json.dumps(
+        dict(jsondata, **{list_key: []}), indent=2, separators=(',', ': '), sort_keys=True
+        )
+    tail = "[]\n}"
+    assert head.endswith(tail), "List key must sort after other keys"
+    # The head is sent with the first list value, so that the first string 
+    # returned includes a formatted value (see `resource_stream_response`)
+    sep = head[:-len(tail)] + "[\n    "
+    for v in list_values:
+        yield sep + json.dumps(
+            v, indent=2, separators=(',', ': '), sort_keys=True
+            ).replace("\n", "\n    ")
+        sep = ",\n    "
+    if sep == ",\n    ":
+        yield "\n  ]\n}"
+    else:
+        yield head
+    return
+
 def turtle_resource_file(baseurl, jsondata, resource_info):
     """
     Return a file object that reads out a Turtle version of the supplied entity values data.
 
     baseurl     base URL for resolving relative URI references for Turtle output.
     jsondata    is the data to be formatted and returned.
-    links       is an optional array of link values to be added to the HTTP response
-                (see method add_link_header for description).
+    resource_info
+                is a description of the resource returned.  If this includes a 
+                "context_version" value (see `coll_context_resource_info`), the 
+                Turtle data is saved in the derived resource cache, and re-used
+                while the JSON-LD data and context version are unchanged (a 
+                "resource_dir" value indicates the directory containing the data
+                from which the resource is derived).  If it
+                includes "context_docs", JSON-LD context references to those 
+                documents are resolved without retrieving them, and the Turtle
+                data is written directly (see `DirectTurtleWriter`) if possible.
     """
-    jsondata_file = json_resource_file(baseurl, jsondata, resource_info)
+    jsondata_file   = json_resource_file(baseurl, jsondata, resource_info)
+    context_version = resource_info and resource_info.get("context_version", None)
+    resource_dir    = resource_info and resource_info.get("resource_dir", None)
+    if context_version is not None:
+        resource_id = "\n".join(
+            [ "turtle", baseurl, resource_info["resource_name"], jsondata.get("@id", "") ]
+            )
+        version     = derived_resource_version(jsondata_file.getvalue(), context_version)
+        turtle_data = get_derived_resource(resource_id, version, resource_dir=resource_dir)
+        if turtle_data is not None:
+            return StringIO.StringIO(turtle_data)
+    context_docs = resource_info and resource_info.get("context_docs", None)
+    if context_docs:
+        jsondata = resolve_context_refs(baseurl, jsondata, context_docs)
+        try:
+            turtle_data = "".join(turtle_resource_chunks(baseurl, jsondata))
+        except TurtleWriterUnsupported as e:
+            log.info("turtle_resource_file: using rdflib for %s (%s)"%(baseurl, e))
+        else:
+            if context_version is not None:
+                save_derived_resource(
+                    resource_id, version, turtle_data, resource_dir=resource_dir
+                    )
+            return StringIO.StringIO(turtle_data)
+        jsondata_file = json_resource_file(baseurl, jsondata, resource_info)
     g = Graph()
     g = g.parse(source=jsondata_file, publicID=baseurl, format="json-ld")
     response_file = StringIO.StringIO()
@@ -133,6 +581,11 @@ def turtle_resource_file(baseurl, jsondata, resource_info):
         response_file.write(message.TURTLE_SERIALIZE_ERROR)
         response_file.write("\n\n%s:\n\n"%message.TURTLE_SERIALIZE_REASON)
         response_file.write(reason)
+    else:
+        if context_version is not None:
+            save_derived_resource(
+                resource_id, version, response_file.getvalue(), resource_dir=resource_dir
+                )
     response_file.seek(0)
     return response_file
 
@@ -32,6 +32,17 @@ from annalist.identifiers   import ANNAL, RDF, RDFS
 from annalist.resourcetypes import file_extension, file_extension_for_content_type
 from annalist.util          import make_type_entity_id, make_entity_base_url
 
+from annalist.models.entitystore       import get_entity_store
+from annalist.models.entityvaluecache  import (
+    get_entity_value_cache, remove_cached_entity_values, flush_entity_value_caches
+    )
+from annalist.models.childidindex      import child_id_added, child_id_removed
+from annalist.models.entitypropertyindex import property_index_saved, property_index_removed
+from annalist.models.entitysearchindex   import search_index_saved, search_index_removed
+from annalist.models.collectionversion   import bump_collection_version
+from annalist.models.entitychoicecache   import choice_cache_changed
+from annalist.models.derivedresourcecache import derived_resources_removed
+
 #   -------------------------------------------------------------------------------------------
 #
 #   EntityRoot
@@ -56,6 +67,13 @@ class EntityRoot(object):
         self._entitybasedir base directory where all data is stored
         self._values        dictionary of values in entity body
 
+    Entity objects may share their values dictionary with other entity objects
+    (see `_shared_copy`), in which case the values are copied before they are 
+    updated or returned by `get_values`.
+
+    Values of entity classes with `_entitycache` set are held in a process-wide
+    cache when they are read from storage (see `annalist.models.entityvaluecache`).
+
     See also 'Entity'
     """
 
@@ -66,6 +84,8 @@ class EntityRoot(object):
     _entityref      = None          # Relative ref to entity from body file
     _contextbase    = None          # Relative ref to collection base URI from body file
     _contextref     = None          # Relative ref to context file from body file
+    _entitycache    = False         # Set True to cache values read (see `_load_values`)
+    _values_shared  = False         # Set True when values are shared with another entity
 
     def __init__(self, entityurl, entityviewurl, entitydir, entitybasedir):
         """
@@ -177,6 +197,7 @@ class EntityRoot(object):
         Set or update values for a collection
         """
         self._values = values.copy()
+        self._values_shared = False
         self._values[ANNAL.CURIE.id]        = self._values.get(ANNAL.CURIE.id,      self._entityid)
         self._values[ANNAL.CURIE.type_id]   = self._values.get(ANNAL.CURIE.type_id, self._entitytypeid)
         self._values[ANNAL.CURIE.type]      = self._values.get(ANNAL.CURIE.type,    self._entitytype)
@@ -189,8 +210,45 @@ class EntityRoot(object):
         """
         Return collection metadata values
         """
+        self._unshare_values()
         return self._values
 
+    def _unshare_values(self):
+        """
+        If values of the current entity are shared with another entity, replace 
+        them with a copy that can be updated.
+        """
+        if self._values_shared:
+            if self._values is not None:
+                self._values = self._values.copy()
+            self._values_shared = False
+        return
+
+    def _shared_copy(self):
+        """
+        Returns a new entity object that is a copy of the current entity, sharing
+        the same values dictionary.  The values are copied when either entity
+        object is updated (i.e. copy-on-write), so neither update is visible 
+        through the other.
+
+        This is used to return cached entities without copying their values.
+        """
+        e = object.__new__(self.__class__)
+        e.__dict__.update(self.__dict__)
+        e._values_shared    = True
+        self._values_shared = True
+        return e
+
+    def _share_values(self, other):
+        """
+        Set the values of the current entity to be shared with the indicated 
+        entity, with copy-on-write as for `_shared_copy`.
+        """
+        self._values         = other._values
+        self._values_shared  = True
+        other._values_shared = True
+        return
+
     def get_save_values(self):
         """
         Return values that are or will be recorded when entity is saved.
@@ -266,8 +324,19 @@ class EntityRoot(object):
             body_dir = self._entitydir
             log.debug("EntityRoot.resource_file: dir %s, resource_ref %s"%(body_dir, resource_ref))
             file_name = os.path.join(body_dir, resource_ref)
-            if os.path.isfile(file_name):
-                return open(file_name, "rb")
+            store     = get_entity_store()
+            if store.isfile(file_name):
+                return store.open(file_name, "rb")
+        return None
+
+    def resource_change_stamp(self, resource_ref):
+        """
+        Returns a value that changes whenever a resource associated with an entity
+        is updated, or None if the resource is not present.
+        """
+        if self._exists_path():
+            file_name = os.path.join(self._entitydir, resource_ref)
+            return get_entity_store().change_stamp(file_name)
         return None
 
     def get_field(self, path):
@@ -293,9 +362,29 @@ class EntityRoot(object):
         """
         if altscope == "select":
             altscope = "all"
+        for (e, body_path) in self._child_entity_paths(cls, altscope=altscope):
+            yield e.get_id()
+        return
+
+    def _child_entity_paths(self, cls, altscope=None):
+        """
+        Iterates over child entities of an indicated class, yielding for each a pair
+        `(entity, body_path)`, where `entity` is an instantiated (but not loaded) entity 
+        whose parent is the entity from which the child is obtained, and `body_path` is 
+        the location of the child entity body.
+
+        cls         is a subclass of Entity indicating the type of children to
+                    iterate over.
+        altscope    if supplied, indicates a scope other than the current entity to
+                    search for children.
+
+        NOTE: `Entity` class overrides this to scan alternative parents.
+        """
         for i in self._children(cls, altscope=altscope):
-            if cls.exists(self, i, altscope=altscope):
-                yield i
+            e = cls._child_init(self, i)
+            body_path = e._exists_path()
+            if body_path:
+                yield (e, body_path)
         return
 
     # I/O helper functions
@@ -338,13 +427,14 @@ class EntityRoot(object):
         returns path of of object body, or None
         """
         (d, p, u) = self._dir_path_uri()
+        store     = get_entity_store()
         # log.debug("EntityRoot._exists_path %s"%(p))
-        if d and os.path.isdir(d):
-            if p and os.path.isfile(p):
+        if d and store.isdir(d):
+            if p and store.isfile(p):
                 # log.debug("EntityRoot._exists_path %s: OK"%(p))
                 return p
             mp = self._migrate_path()
-            if mp and os.path.isfile(mp):
+            if mp and store.isfile(mp):
                 assert mp == p, "EntityRoot._exists_path: Migrated filename %s, expected %s"%(mp, p)
                 # log.info("EntityRoot._exists_path %s: Migrated from %s"%(mp, p))
                 return mp
@@ -359,6 +449,14 @@ class EntityRoot(object):
         """
         return self._exists_path() is not None
 
+    def _change_stamp(self):
+        """
+        Returns a value that changes whenever the body of the entity denoted by
+        the current object is updated, or None if the entity body does not exist.
+        """
+        (d, p) = self._dir_path()
+        return get_entity_store().change_stamp(p)
+
     def _get_types(self, types):
         """
         Processes a supplied type value and returns a list of types to be stored.
@@ -414,11 +512,18 @@ class EntityRoot(object):
             log.error(msg)
             raise ValueError(msg)
         # Create directory (if needed) and save data
-        util.ensure_dir(body_dir)
+        store  = get_entity_store()
+        store.makedirs(body_dir)
         values = self.get_save_values()
-        with open(fullpath, "wt") as entity_io:
+        with store.open(fullpath, "wt") as entity_io:
             json.dump(values, entity_io, indent=2, separators=(',', ': '), sort_keys=True)
+        remove_cached_entity_values(fullpath)
+        property_index_saved(fullpath, values)
+        search_index_saved(fullpath, values)
+        choice_cache_changed(self._entitydir)
+        child_id_added(self._entitydir)
         self._post_update_processing(values, post_update_flags)
+        bump_collection_version(self._entitydir)
         return
 
     def _remove(self, type_uri, post_remove_flags=None):
@@ -429,28 +534,50 @@ class EntityRoot(object):
         d = self._entitydir
         # Extra check to guard against accidentally deleting wrong thing
         if type_uri in self._values['@type'] and d.startswith(self._entitybasedir):
-            shutil.rmtree(d)
+            get_entity_store().remove_tree(d)
+            flush_entity_value_caches(d)
+            property_index_removed(d)
+            search_index_removed(d)
+            derived_resources_removed(d)
+            choice_cache_changed(d)
+            child_id_removed(d)
         else:
             log.error("Expected type_uri: %r, got %r"%(type_uri, e[ANNAL.CURIE.type]))
             log.error("Expected dirbase:  %r, got %r"%(parent._entitydir, d))
             raise Annalist_Error("Entity %s unexpected type %s or path %s"%(entityid, e[ANNAL.CURIE.type_id], d))
         self._post_remove_processing(post_remove_flags)
+        bump_collection_version(d)
         return
 
-    def _load_values(self):
+    def _load_values(self, body_file=None):
         """
         Read current entity from Annalist storage, and return entity body.
 
         Adds value for 'annal:url' to the entity data returned.
+
+        body_file   if supplied, is the location of the entity body, already known to
+                    exist (e.g. from `_child_entity_paths`).
         """
         # log.debug("EntityRoot._load_values %s/%s"%(self.get_type_id(), self.get_id()))
-        body_file = self._exists_path()
+        cache = get_entity_value_cache() if self._entitycache else None
+        if cache:
+            store      = get_entity_store()
+            cache_file = body_file or self._dir_path()[1]
+            entitydata = cache.get_values(cache_file, store.change_stamp(cache_file))
+            if entitydata is not None:
+                entitydata[ANNAL.CURIE.url] = self.get_view_url_path()
+                return entitydata
+        body_file = body_file or self._exists_path()
         if body_file:
             # log.debug("EntityRoot._load_values body_file %r"%(body_file,))
             try:
-                # @@TODO: rework name access to support different underlays
-                with self._read_stream() as f:
-                    entitydata = json.load(util.strip_comments(f))
+                # Stamp is read first so any concurrent update will invalidate entry
+                body_stamp = cache and store.change_stamp(body_file)
+                with self._read_stream(body_file=body_file) as f:
+                    body_text  = util.strip_comments(f).getvalue()
+                    entitydata = json.loads(body_text)
+                    if cache:
+                        cache.set_values(body_file, body_stamp, entitydata, len(body_text))
                     # log.debug("EntityRoot._load_values: url_path %s"%(self.get_view_url_path()))
                     entitydata[ANNAL.CURIE.url] = self.get_view_url_path()
                     return entitydata
@@ -490,18 +617,19 @@ class EntityRoot(object):
         if self._migrate_filenames() is None:
             # log.debug("EntityRoot._migrate_path (skip)")
             return
+        store = get_entity_store()
         for old_data_filename in self._migrate_filenames():
             # This logic migrates data from previous filenames
             (basedir, old_data_filepath) = util.entity_dir_path(self._entitydir, [], old_data_filename)
-            if basedir and os.path.isdir(basedir):
-                if old_data_filepath and os.path.isfile(old_data_filepath):
+            if basedir and store.isdir(basedir):
+                if old_data_filepath and store.isfile(old_data_filepath):
                     # Old body file found here
                     (d, new_data_filepath) = self._dir_path()
                     log.info(
                         "EntityRoot._migrate_path: Migrate file %s to %s"%
                         (old_data_filepath, new_data_filepath)
                         )
-                    os.rename(old_data_filepath, new_data_filepath)
+                    store.rename(old_data_filepath, new_data_filepath)
                     return new_data_filepath
         # log.debug("EntityRoot._migrate_path (not found)")
         return None
@@ -586,16 +714,22 @@ class EntityRoot(object):
         cls         is a subclass of Entity indicating the type of children to
                     iterate over.
         """
-        parent_dir = os.path.dirname(os.path.join(self._entitydir, cls._entityroot or ""))
-        assert "%" not in parent_dir, "_entityroot template variable interpolation may be in filename part only"
-        child_files = []
-        if os.path.isdir(parent_dir):
-            child_files = os.listdir(parent_dir)
+        child_files = get_entity_store().listdir(self._child_dir(cls))
         for fil in child_files:
             if util.valid_id(fil):
                 yield fil
         return
 
+    def _child_dir(self, cls):
+        """
+        Returns the directory in which child entities of an indicated class are stored.
+
+        cls         is a subclass of Entity indicating the type of children.
+        """
+        parent_dir = os.path.dirname(os.path.join(self._entitydir, cls._entityroot or ""))
+        assert "%" not in parent_dir, "_entityroot template variable interpolation may be in filename part only"
+        return parent_dir
+
     def _children(self, cls, altscope=None):
         """
         Iterates over candidate child identifiers that are possible instances of an 
@@ -615,23 +749,18 @@ class EntityRoot(object):
         return iter(())     # Empty iterator
 
     def _entity_files(self):
-        #@@TODO: abstract logic to work with non-file storage
-        #        Used by 'entitytypeinfo'
         """
         Iterates over files/resources (not subdirectories) that are part of the current entity.
 
         Returns pairs (p,f), where 'p' is a full path name, and 'f' is a filename within the 
         current entity directory. 
         """
-        for f in os.listdir(self._entitydir):
+        for f in get_entity_store().listfiles(self._entitydir):
             p = os.path.join(self._entitydir, f)
-            if os.path.isfile(p):
-                yield (p, f)
+            yield (p, f)
         return
 
     def _copy_entity_files(self, src_entity):
-        #@@TODO: abstract logic to work with non-file storage
-        #        Used by 'entityedit', 'am_managecollections'
         """
         Copy metadata abnd attached resources from the supplied `src_entity` 
         to the current entity.
@@ -658,22 +787,18 @@ class EntityRoot(object):
         return msgs
 
     def _exists_file(self, f):
-        #@@TODO: abstract logic to work with non-file storage
-        #        Used by 'entitytypeinfo'
         """
         Test if a file named 'f' exists in the current entity directory
         """
-        return os.path.isfile(os.path.join(self._entitydir, f))
+        return get_entity_store().isfile(os.path.join(self._entitydir, f))
 
     def _copy_file(self, p, f):
-        #@@TODO: abstract logic to work with non-file storage
-        #        Used by 'entitytypeinfo'
         """
         Copy file with path 'p' to a new file 'f' in the current entity directory
         """
         new_p = os.path.join(self._entitydir, f)
         try:
-            shutil.copy(p, new_p)
+            get_entity_store().copy_file(p, new_p)
         except shutil.Error as e:
             log.error('shutil.copy error: %s' % e)
             return None
@@ -683,14 +808,13 @@ class EntityRoot(object):
         return new_p
 
     def _rename_files(self, old_entity):
-        #@@TODO: abstract logic to work with non-file storage
-        #        Used by 'entitytypeinfo'
         """
         Rename old entity files to path of current entity (which must not exist),
         and return path to resulting entity, otherwise None.
         """
         new_p = None
-        if os.path.exists(self._entitydir):
+        store = get_entity_store()
+        if store.exists(self._entitydir):
             log.error("EntityRoot._rename_files: destination %s already exists"%(self._entitydir,))
         elif not self._entitydir.startswith(self._entitybasedir):
             log.error(
@@ -704,16 +828,26 @@ class EntityRoot(object):
                 )
         else:
             try:
-                os.rename(old_entity._entitydir, self._entitydir)
+                store.rename(old_entity._entitydir, self._entitydir)
+                flush_entity_value_caches(old_entity._entitydir)
+                flush_entity_value_caches(self._entitydir)
+                property_index_removed(old_entity._entitydir)
+                property_index_removed(self._entitydir)
+                search_index_removed(old_entity._entitydir)
+                search_index_removed(self._entitydir)
+                derived_resources_removed(old_entity._entitydir)
+                derived_resources_removed(self._entitydir)
+                choice_cache_changed(old_entity._entitydir)
+                choice_cache_changed(self._entitydir)
+                child_id_removed(old_entity._entitydir)
+                child_id_added(self._entitydir)
+                bump_collection_version(self._entitydir)
                 new_p = self._entitydir
             except IOError as e:
                 log.error("EntityRoot._rename_files: os.rename IOError: %s" % e.strerror)
         return new_p
 
     def _fileobj(self, localname, filetypeuri, mimetype, mode):
-        #@@TODO: abstract logic to work with non-file storage
-        #        Used by 'entity', 'entitytypeinfo', 'site', 'entityedit', 'util',
-        #                'test_import_resource', 'test_render_ref_multifields', 'test_upload_file'
         """
         Returns a file object for accessing a blob associated with the current entity.
 
@@ -732,11 +866,9 @@ class EntityRoot(object):
             file_extension(filetypeuri)
             )
         file_name = os.path.join(body_dir, localname+"."+file_ext)
-        return open(file_name, mode)
+        return get_entity_store().open(file_name, mode)
 
     def _metaobj(self, localpath, localname, mode):
-        #@@TODO: abstract logic to work with non-file storage
-        #        Used by 'collection', 'site'
         """
         Returns a file object for accessing a metadata resource associated with 
         the current entity.
@@ -750,17 +882,21 @@ class EntityRoot(object):
         """
         (body_dir, body_file) = self._dir_path()  # Same as `_save`
         local_dir = os.path.join(body_dir, localpath)
-        util.ensure_dir(local_dir)
-        filename = os.path.join(local_dir, localname)
+        store     = get_entity_store()
+        store.makedirs(local_dir)
+        filename  = os.path.join(local_dir, localname)
         # log.debug("entityroot._metaobj: self._entitydir %s"%(self._entitydir,))
         # log.debug("entityroot._metaobj: body_dir %s, body_file %s"%(body_dir, body_file))
         # log.debug("entityroot._metaobj: filename %s"%(filename,))
-        return open(filename, mode)
+        return store.open(filename, mode)
 
-    def _read_stream(self):
+    def _read_stream(self, body_file=None):
         """
         Opens a (file-like) stream to read entity data.
 
+        body_file   if supplied, is the location of the entity body, already known to
+                    exist.
+
         Returns the stream object, which implements the context protocol to
         close the stream on exit from a containign with block; e.g.
 
@@ -769,12 +905,11 @@ class EntityRoot(object):
             // f is closed here
 
         """
-        # @@TODO: factor out logic in common with _metaobj/_fileobj
         f_stream  = None
-        body_file = self._exists_path()
+        body_file = body_file or self._exists_path()
         if body_file:
             try:
-                f_stream = open(body_file, "rt")
+                f_stream = get_entity_store().open(body_file, "rt")
             except IOError, e:
                 if e.errno != errno.ENOENT:
                     raise
@@ -820,6 +955,7 @@ class EntityRoot(object):
         if self._values and key in self._values and self._values[key]:
             result = self._values[key]
         else:
+            self._unshare_values()
             self._values[key] = default
             result = default
         return result
@@ -834,6 +970,7 @@ class EntityRoot(object):
         """
         Allow direct indexing to update collection metadata value fields
         """
+        self._unshare_values()
         self._values[k] = v
 
 # End.
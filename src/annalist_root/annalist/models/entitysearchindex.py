@@ -0,0 +1,494 @@
+"""
+Per-collection inverted index of words used in entity values, used for list searches.
+
+Entity list searches (see `EntityFinder.entity_contains`) select entities that have
+a string value containing the search term.  This module maintains, for each
+collection data directory, an index of the words (maximal runs of alphanumeric
+characters) that appear in string values of each entity, and the inverse mapping
+from words to entities.  Any entity containing the search term must have, for each
+word in the search term, an indexed word that contains it, so the index can be used
+to skip entities that cannot contain the search term without loading them.  The
+index is conservative, and the search test is still applied to the entities returned.
+
+To find the indexed words that contain a search term word, the index keeps a sorted
+list of the suffixes of all indexed words:  a word contains the term if the term is a
+prefix of one of its suffixes, and these are found by binary search.  The suffix list
+is updated in place as words are added to or removed from the index.
+
+Index entries are keyed by the location of the entity body relative to the
+collection data directory, and record the change stamp of the entity body (see
+`FileEntityStore.change_stamp`):  entries that are missing or out of date (e.g.
+following an update by another process) are treated as candidates, and are created
+when the entity is next loaded by an enumeration using the index (see
+`Entity.child_entities`).
+Entities updated, removed or renamed by this process update the index directly (see
+`EntityRoot._save`, `EntityRoot._remove` and `EntityRoot._rename_files`).
+
+A snapshot of the index for a collection may be saved in the collection data
+directory (see `layout.COLL_SEARCH_INDEX_FILE` and `annalist-manager rebuildsearchindex`),
+and is used to initialize the index when the collection is first searched.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import re
+import json
+import bisect
+import datetime
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist                    import layout
+
+from annalist.models.entitystore import get_entity_store
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+word_re = re.compile(r"\w+", re.UNICODE)
+
+def value_words(value, words=None):
+    """
+    Returns a set of words used in string values in the supplied entity value.
+    As with `EntityFinder.value_contains`, dictionary keys are not included.
+
+    >>> sorted(value_words({"a": "red car", "b": ["blue-green", {"c": "red"}], "d": 3}))
+    ['blue', 'car', 'green', 'red']
+    """
+    if words is None:
+        words = set()
+    if isinstance(value, dict):
+        for k in value:
+            value_words(value[k], words)
+    elif isinstance(value, list):
+        for v in value:
+            value_words(v, words)
+    elif isinstance(value, (str, unicode)):
+        words.update(word_re.findall(value))
+    return words
+
+def search_words(search):
+    """
+    Returns a list of distinct words in a search term.
+
+    >>> search_words("d:car re")
+    ['d', 'car', 're']
+    """
+    words = []
+    for w in word_re.findall(search):
+        if w not in words:
+            words.append(w)
+    return words
+
+def split_body_path(body_path):
+    """
+    Returns a pair `(base_dir, rel_path)` for an entity body, where `base_dir` is the
+    collection data directory and `rel_path` is the entity body location relative to
+    it.  (Entity bodies are stored as `<base_dir>/<type>/<entity_id>/<file>`.)
+    """
+    body_path = os.path.normpath(body_path)
+    entity_dir = os.path.dirname(body_path)
+    base_dir   = os.path.dirname(os.path.dirname(entity_dir))
+    return (base_dir, os.path.relpath(body_path, base_dir))
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Collection search index
+#
+#   -------------------------------------------------------------------------------------------
+
+class CollectionSearchIndex(object):
+    """
+    Inverted index of words used in entity values, for a single collection data directory.
+    """
+
+    def __init__(self, base_dir):
+        super(CollectionSearchIndex, self).__init__()
+        self._base_dir = base_dir
+        self._entries  = {}     # rel_path -> (stamp, frozenset(words))
+        self._postings = {}     # word -> set(rel_path)
+        self._suffixes = []     # sorted [ (suffix, word) ]
+        return
+
+    def _add_word(self, w):
+        """
+        Adds suffixes of a newly indexed word to the suffix list.
+        """
+        for i in range(len(w)):
+            bisect.insort(self._suffixes, (w[i:], w))
+        return
+
+    def _remove_word(self, w):
+        """
+        Removes suffixes of a word no longer indexed from the suffix list.
+        """
+        for i in range(len(w)):
+            j = bisect.bisect_left(self._suffixes, (w[i:], w))
+            if (j < len(self._suffixes)) and (self._suffixes[j] == (w[i:], w)):
+                del self._suffixes[j]
+        return
+
+    def get_words(self, rel_path, stamp):
+        """
+        Returns the set of words indexed for an entity body, or None if the entity
+        is not indexed, or was indexed with a different change stamp.
+        """
+        entry = self._entries.get(rel_path, None)
+        if entry and (stamp is not None) and (entry[0] == stamp):
+            return entry[1]
+        return None
+
+    def set_entry(self, rel_path, stamp, words):
+        """
+        Sets the words indexed for an entity body.
+        """
+        self.remove_entry(rel_path)
+        words = frozenset(words)
+        self._entries[rel_path] = (stamp, words)
+        for w in words:
+            if w not in self._postings:
+                self._postings[w] = set()
+                self._add_word(w)
+            self._postings[w].add(rel_path)
+        return
+
+    def remove_entry(self, rel_path):
+        """
+        Removes index entry for an entity body.
+        """
+        entry = self._entries.pop(rel_path, None)
+        if entry:
+            for w in entry[1]:
+                paths = self._postings.get(w, None)
+                if paths is not None:
+                    paths.discard(rel_path)
+                    if not paths:
+                        del self._postings[w]
+                        self._remove_word(w)
+        return
+
+    def remove_tree(self, rel_dir):
+        """
+        Removes index entries for entity bodies under the indicated relative directory.
+        """
+        prefix = os.path.join(rel_dir, "")
+        for rel_path in [ p for p in self._entries if p.startswith(prefix) ]:
+            self.remove_entry(rel_path)
+        return
+
+    def matching_words(self, term):
+        """
+        Returns the set of indexed words that contain the supplied search term word.
+        """
+        words = set()
+        i     = bisect.bisect_left(self._suffixes, (term,))
+        while (i < len(self._suffixes)) and self._suffixes[i][0].startswith(term):
+            words.add(self._suffixes[i][1])
+            i += 1
+        return words
+
+    def candidates(self, terms):
+        """
+        Returns the set of indexed entity body locations for which each of the
+        supplied search term words is contained in an indexed word.
+        """
+        result = None
+        for t in terms:
+            paths = set()
+            for w in self.matching_words(t):
+                paths.update(self._postings[w])
+            result = paths if result is None else (result & paths)
+            if not result:
+                break
+        return result or set()
+
+    def get_snapshot(self):
+        """
+        Returns a JSON-serializable snapshot of the current index entries.
+        """
+        return (
+            { rel_path: [list(stamp), " ".join(sorted(words))]
+              for (rel_path, (stamp, words)) in self._entries.items()
+            })
+
+    def load_snapshot(self, snapshot):
+        """
+        Adds index entries from a snapshot returned by `get_snapshot`.
+
+        The entries are added together, and the suffix list is then sorted once
+        rather than updated for each new word.
+        """
+        for rel_path in snapshot:
+            self.remove_entry(rel_path)
+        for (rel_path, (stamp, words)) in snapshot.items():
+            words = frozenset(words.split())
+            self._entries[rel_path] = (tuple(stamp), words)
+            for w in words:
+                if w not in self._postings:
+                    self._postings[w] = set()
+                    self._suffixes.extend( (w[i:], w) for i in range(len(w)) )
+                self._postings[w].add(rel_path)
+        self._suffixes.sort()
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Entity search index
+#
+#   -------------------------------------------------------------------------------------------
+
+class EntitySearchIndex(object):
+    """
+    Collection of collection search indexes, indexed by collection data directory.
+    """
+
+    def __init__(self):
+        super(EntitySearchIndex, self).__init__()
+        self._indexes = {}  # base_dir -> CollectionSearchIndex
+        return
+
+    def get_index(self, base_dir, create=True):
+        """
+        Returns search index for a collection data directory, initialized from a saved
+        snapshot if one is present, or None if `create` is False and the index is not
+        already loaded.
+        """
+        index = self._indexes.get(base_dir, None)
+        if (index is None) and create:
+            index = CollectionSearchIndex(base_dir)
+            index.load_snapshot(read_search_index_snapshot(base_dir))
+            self._indexes[base_dir] = index
+        return index
+
+    def _index_entity(self, index, rel_path, stamp, entity, body_path):
+        """
+        Reads entity values and adds them to the supplied index, returning the set of
+        words indexed, or None if the entity values cannot be read.
+        """
+        v = entity._load_values(body_file=body_path)
+        if not v:
+            return None
+        words = value_words(entity._migrate_values(v))
+        if stamp is not None:
+            index.set_entry(rel_path, stamp, words)
+        return words
+
+    def select_entity(self, entity, body_path, terms, candidates):
+        """
+        Returns True if the entity whose body is at the indicated location may
+        contain the supplied search term words.
+
+        candidates  is a dictionary used to hold index candidate sets for the
+                    search terms, keyed by collection data directory, which is
+                    updated as index candidates are determined.
+        """
+        stamp = get_entity_store().change_stamp(body_path)
+        (base_dir, rel_path) = split_body_path(body_path)
+        index = self.get_index(base_dir)
+        if index.get_words(rel_path, stamp) is None:
+            # Not indexed (or out of date): indexed when loaded (see `entity_loaded`)
+            return True
+        if base_dir not in candidates:
+            candidates[base_dir] = index.candidates(terms)
+        return rel_path in candidates[base_dir]
+
+    def entity_loaded(self, body_path, values):
+        """
+        Add index entry for an entity body loaded with the supplied values.
+        """
+        stamp = get_entity_store().change_stamp(body_path)
+        if stamp is not None:
+            (base_dir, rel_path) = split_body_path(body_path)
+            self.get_index(base_dir).set_entry(rel_path, stamp, value_words(values))
+        return
+
+    def update_entry(self, body_path, values):
+        """
+        Update index entry for an entity body saved with the supplied values.
+        """
+        (base_dir, rel_path) = split_body_path(body_path)
+        index = self.get_index(base_dir, create=False)
+        if index:
+            stamp = get_entity_store().change_stamp(body_path)
+            if stamp is None:
+                index.remove_entry(rel_path)
+            else:
+                index.set_entry(rel_path, stamp, value_words(values))
+        return
+
+    def remove_tree(self, d):
+        """
+        Remove index entries for all entities stored under directory `d`
+        (e.g. an entity, all entities of a type, or a collection).
+        """
+        d      = os.path.normpath(d)
+        prefix = os.path.join(d, "")
+        for base_dir in list(self._indexes):
+            if (base_dir == d) or base_dir.startswith(prefix):
+                del self._indexes[base_dir]
+            elif d.startswith(os.path.join(base_dir, "")):
+                self._indexes[base_dir].remove_tree(os.path.relpath(d, base_dir))
+        return
+
+    def flush(self):
+        self._indexes = {}
+        return
+
+entity_search_index = EntitySearchIndex()
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Search term filter
+#
+#   -------------------------------------------------------------------------------------------
+
+class SearchTermFilter(object):
+    """
+    Filter that selects candidate entities that may contain a search term.
+
+    The filter may be combined with another entity filter (e.g. a property value
+    filter), in which case entities are selected only if they are also selected
+    by that filter.
+    """
+
+    def __init__(self, search, base_filter=None):
+        """
+        Initialize a new search term filter.
+
+        search      is the search term.
+        base_filter if supplied, is another entity filter that is also applied.
+        """
+        super(SearchTermFilter, self).__init__()
+        self._search      = search
+        self._terms       = search_words(search)
+        self._base_filter = base_filter
+        self._candidates  = {}
+        return
+
+    def get_property_uris(self):
+        """
+        Returns a list of properties whose indexed values are tested by this filter.
+        """
+        if self._base_filter:
+            return self._base_filter.get_property_uris()
+        return []
+
+    def select_entity(self, entity, body_path):
+        """
+        Returns True if the entity whose body is at the indicated location is a
+        candidate for selection.
+        """
+        if self._base_filter and not self._base_filter.select_entity(entity, body_path):
+            return False
+        if not self._terms:
+            return True
+        if self._search in entity.get_view_url_path():
+            # URL is added to entity values when loaded, so is also searched
+            return True
+        return entity_search_index.select_entity(
+            entity, body_path, self._terms, self._candidates
+            )
+
+    def entity_loaded(self, entity, body_path, values):
+        """
+        Called with the values of each entity selected by this filter that is 
+        subsequently loaded, and updates the search index for that entity.
+        """
+        if self._base_filter:
+            self._base_filter.entity_loaded(entity, body_path, values)
+        if self._terms:
+            entity_search_index.entity_loaded(body_path, values)
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Index maintenance functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def search_index_saved(body_path, values):
+    """
+    Update search index for an entity body saved with the supplied values.
+    """
+    entity_search_index.update_entry(body_path, values)
+    return
+
+def search_index_removed(d):
+    """
+    Remove search index entries for entities stored under the indicated directory.
+    """
+    entity_search_index.remove_tree(d)
+    return
+
+def flush_search_index():
+    """
+    Remove all search index entries.
+    """
+    entity_search_index.flush()
+    return
+
+def rebuild_search_index(base_dir, entities):
+    """
+    Rebuild search index for a collection data directory from the supplied entities,
+    and save a snapshot of the new index in that directory.
+
+    base_dir    is the collection data directory.
+    entities    is an iterator over pairs `(entity, body_path)` for entities stored 
+                under `base_dir` (see `Entity._child_entity_paths`); other entities
+                are ignored.
+
+    Returns the number of entities indexed.
+    """
+    store    = get_entity_store()
+    base_dir = os.path.normpath(base_dir)
+    index    = CollectionSearchIndex(base_dir)
+    count    = 0
+    for (entity, body_path) in entities:
+        (entity_base_dir, rel_path) = split_body_path(body_path)
+        if entity_base_dir == base_dir:
+            stamp = store.change_stamp(body_path)
+            if entity_search_index._index_entity(index, rel_path, stamp, entity, body_path):
+                count += 1
+    entity_search_index._indexes[base_dir] = index
+    write_search_index_snapshot(base_dir)
+    return count
+
+def read_search_index_snapshot(base_dir):
+    """
+    Returns search index entries saved in the indicated collection data directory,
+    or an empty dictionary if no valid snapshot is present.
+    """
+    store = get_entity_store()
+    path  = os.path.join(base_dir, layout.COLL_SEARCH_INDEX_FILE)
+    if store.isfile(path):
+        try:
+            with store.open(path, "rt") as f:
+                return json.load(f).get("entities", {})
+        except (IOError, ValueError) as e:
+            log.warning("read_search_index_snapshot: error reading %s (%s)"%(path, e))
+    return {}
+
+def write_search_index_snapshot(base_dir):
+    """
+    Saves current search index entries for the indicated collection data directory.
+    """
+    index = entity_search_index.get_index(base_dir)
+    datetime_str = datetime.datetime.today().replace(microsecond=0).isoformat(' ')
+    path  = os.path.join(base_dir, layout.COLL_SEARCH_INDEX_FILE)
+    with get_entity_store().open(path, "wt") as f:
+        json.dump(
+            { "_comment": "Generated by write_search_index_snapshot on %s"%datetime_str
+            , "entities": index.get_snapshot()
+            },
+            f, separators=(',', ':'), sort_keys=True
+            )
+    return
+
+# End.
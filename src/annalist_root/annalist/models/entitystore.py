@@ -0,0 +1,510 @@
+"""
+Entity storage backends.
+
+This module abstracts the underlying storage used for Annalist entity data
+(entity bodies, metadata files and attached resources) from the organization
+of entities and their relationships implemented by `EntityRoot` and `Entity`.
+
+Entity data are located by (absolute) file system style path names, as
+constructed by the entity classes:  a storage backend maps these to the
+underlying storage.  Two backends are provided:
+
+    "file"      stores each entity as a directory of files in the file system.
+                This is the default, and the original Annalist storage layout.
+    "sqlite"    stores all entity data for a collection in a single SQLite
+                database file in the collection directory, with entity bodies
+                and attached resources keyed by entity path (type directory and
+                entity id) and file name.  Site-wide data (including the
+                installed site data collection, which is updated by copying
+                file trees) continue to use the file system.
+
+The backend used is selected by the `ANNALIST_ENTITY_STORE` site setting.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import os.path
+import io
+import shutil
+import errno
+import time
+import sqlite3
+import contextlib
+import threading
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf import settings
+
+from annalist               import layout
+from annalist               import util
+from annalist.exceptions    import Annalist_Error
+
+#   -------------------------------------------------------------------------------------------
+#
+#   File system entity store
+#
+#   -------------------------------------------------------------------------------------------
+
+class FileEntityStore(object):
+    """
+    Entity store that keeps entity data as files and directories in the local
+    file system.
+
+    This class also defines the interface presented by all entity stores.
+    """
+
+    def isdir(self, d):
+        """
+        Test if the indicated entity directory exists.
+        """
+        return os.path.isdir(d)
+
+    def isfile(self, p):
+        """
+        Test if the indicated entity file exists.
+        """
+        return os.path.isfile(p)
+
+    def exists(self, p):
+        """
+        Test if the indicated entity file or directory exists.
+        """
+        return self.isdir(p) or self.isfile(p)
+
+    def change_stamp(self, p):
+        """
+        Returns a value that changes whenever the indicated entity file is updated,
+        or None if the file does not exist.
+        """
+        try:
+            st = os.stat(p)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def listdir(self, d):
+        """
+        Returns a list of names of files and directories contained in the indicated
+        directory, or an empty list if the directory does not exist.
+        """
+        if os.path.isdir(d):
+            return os.listdir(d)
+        return []
+
+    def listfiles(self, d):
+        """
+        Returns a list of names of files (not subdirectories) contained in the
+        indicated directory.
+        """
+        return [ f for f in self.listdir(d) if os.path.isfile(os.path.join(d, f)) ]
+
+    def makedirs(self, d):
+        """
+        Ensure that the indicated directory exists.
+        """
+        util.ensure_dir(d)
+        return
+
+    def open(self, p, mode):
+        """
+        Returns a file object for accessing the indicated entity file, opened in the
+        indicated mode (using the same values as the built-in `open` function).
+        """
+        return open(p, mode)
+
+    def remove_tree(self, d):
+        """
+        Remove indicated directory and all its contents.
+        """
+        shutil.rmtree(d)
+        return
+
+    def rename(self, old_p, new_p):
+        """
+        Rename indicated file or directory.
+        """
+        os.rename(old_p, new_p)
+        return
+
+    def copy_file(self, old_p, new_p):
+        """
+        Copy file 'old_p' to 'new_p'.
+        """
+        shutil.copy(old_p, new_p)
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   SQLite entity store
+#
+#   -------------------------------------------------------------------------------------------
+
+class SQLiteStoredFile(io.BytesIO):
+    """
+    File-like object returned for writing data to an SQLite entity store.
+
+    Data written are saved to the store when the object is closed.
+    """
+
+    def __init__(self, store, p, data=""):
+        super(SQLiteStoredFile, self).__init__(data)
+        self.name   = p
+        self._store = store
+        self.seek(0, io.SEEK_END)
+        return
+
+    def write(self, data):
+        if isinstance(data, unicode):
+            data = data.encode("utf-8")
+        return super(SQLiteStoredFile, self).write(data)
+
+    def close(self):
+        if not self.closed:
+            self._store._write_file(self.name, self.getvalue())
+        super(SQLiteStoredFile, self).close()
+        return
+
+class SQLiteEntityStore(FileEntityStore):
+    """
+    Entity store that keeps the entity data for each collection in an SQLite
+    database in the collection directory.
+
+    Paths that are not within a user collection (i.e. site data) are passed
+    to the file system entity store.
+    """
+
+    _schema = (
+        [ "CREATE TABLE IF NOT EXISTS entity_dirs "+
+          "( dir_path TEXT PRIMARY KEY, parent_path TEXT, dir_name TEXT )"
+        , "CREATE INDEX IF NOT EXISTS entity_dirs_parent ON entity_dirs (parent_path)"
+        , "CREATE TABLE IF NOT EXISTS entity_files "+
+          "( dir_path TEXT, file_name TEXT, data BLOB, mtime REAL, "+
+          "PRIMARY KEY (dir_path, file_name) )"
+        ])
+
+    def __init__(self, sitedir):
+        """
+        Initialize SQLite entity store.
+
+        sitedir     is the base directory for the site whose collection data are
+                    kept in SQLite databases.
+        """
+        super(SQLiteEntityStore, self).__init__()
+        self._sitedir = os.path.normpath(sitedir)
+        self._local   = threading.local()
+        return
+
+    def _db_key(self, p):
+        """
+        Returns a pair (coll_dir, key) for the indicated path, where 'coll_dir' is the
+        collection directory containing the SQLite database in which the data are
+        stored, and 'key' is the path of the data relative to that directory.
+
+        Returns (None, None) if the path is not stored in an SQLite database.
+        """
+        rel_path = os.path.relpath(os.path.normpath(p), self._sitedir)
+        segs     = rel_path.split(os.sep)
+        if ( (len(segs) > 2) and
+             (segs[0] == layout.SITE_COLL_PATH.split("/")[0]) and
+             (segs[1] != layout.SITEDATA_ID) ):
+            return (os.path.join(self._sitedir, segs[0], segs[1]), "/".join(segs[2:]))
+        return (None, None)
+
+    def _connect(self, coll_dir, create=False):
+        """
+        Returns a database connection for the collection whose data are stored in
+        the indicated directory, or None if `create` is False and the database
+        does not exist.
+
+        Connections are kept open for reuse by the current thread.  A connection
+        is discarded if the database file has been removed or replaced since it
+        was opened, and the schema is created only when a new database file is
+        created.
+        """
+        db_file = os.path.join(coll_dir, layout.COLL_DATABASE_FILE)
+        conns   = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        try:
+            st = os.stat(db_file)
+        except OSError:
+            st = None
+        db_ident = st and (st.st_dev, st.st_ino)
+        if db_file in conns:
+            (conn, conn_ident) = conns[db_file]
+            if db_ident and (db_ident == conn_ident):
+                return conn
+            del conns[db_file]
+            conn.close()
+        if not db_ident:
+            if not create:
+                return None
+            util.ensure_dir(coll_dir)
+        conn = sqlite3.connect(db_file)
+        if not db_ident:
+            for s in self._schema:
+                conn.execute(s)
+            conn.commit()
+            st       = os.stat(db_file)
+            db_ident = (st.st_dev, st.st_ino)
+        conns[db_file] = (conn, db_ident)
+        return conn
+
+    @contextlib.contextmanager
+    def _db(self, coll_dir, create=False):
+        """
+        Context manager returns a database connection for the collection whose
+        data are stored in the indicated directory.  Changes are committed on exit
+        from a containing `with` block, or rolled back if an exception is raised.
+
+        If `create` is False and the database does not exist, returns None.
+        """
+        conn = self._connect(coll_dir, create=create)
+        if conn is None:
+            yield None
+            return
+        try:
+            yield conn
+        except:
+            conn.rollback()
+            raise
+        conn.commit()
+        return
+
+    def _makedirs(self, conn, key):
+        while key:
+            (parent, name) = key.rsplit("/", 1) if "/" in key else ("", key)
+            conn.execute(
+                "INSERT OR IGNORE INTO entity_dirs (dir_path, parent_path, dir_name) "+
+                "VALUES (?, ?, ?)",
+                (key, parent, name)
+                )
+            key = parent
+        return
+
+    def _write_file(self, p, data):
+        (coll_dir, key) = self._db_key(p)
+        (dir_key, name) = key.rsplit("/", 1) if "/" in key else ("", key)
+        with self._db(coll_dir, create=True) as conn:
+            self._makedirs(conn, dir_key)
+            conn.execute(
+                "INSERT OR REPLACE INTO entity_files (dir_path, file_name, data, mtime) "+
+                "VALUES (?, ?, ?, ?)",
+                (dir_key, name, sqlite3.Binary(data), time.time())
+                )
+        return
+
+    def _read_file(self, coll_dir, key):
+        """
+        Returns data from indicated file, or None if it is not present.
+        """
+        (dir_key, name) = key.rsplit("/", 1) if "/" in key else ("", key)
+        with self._db(coll_dir) as conn:
+            if conn:
+                row = conn.execute(
+                    "SELECT data FROM entity_files WHERE dir_path = ? AND file_name = ?",
+                    (dir_key, name)
+                    ).fetchone()
+                if row:
+                    return str(row[0])
+        return None
+
+    def isdir(self, d):
+        (coll_dir, key) = self._db_key(d)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).isdir(d)
+        with self._db(coll_dir) as conn:
+            if conn:
+                row = conn.execute(
+                    "SELECT 1 FROM entity_dirs WHERE dir_path = ?", (key,)
+                    ).fetchone()
+                return row is not None
+        return False
+
+    def isfile(self, p):
+        (coll_dir, key) = self._db_key(p)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).isfile(p)
+        (dir_key, name) = key.rsplit("/", 1) if "/" in key else ("", key)
+        with self._db(coll_dir) as conn:
+            if conn:
+                row = conn.execute(
+                    "SELECT 1 FROM entity_files WHERE dir_path = ? AND file_name = ?",
+                    (dir_key, name)
+                    ).fetchone()
+                return row is not None
+        return False
+
+    def change_stamp(self, p):
+        (coll_dir, key) = self._db_key(p)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).change_stamp(p)
+        (dir_key, name) = key.rsplit("/", 1) if "/" in key else ("", key)
+        with self._db(coll_dir) as conn:
+            if conn:
+                row = conn.execute(
+                    "SELECT mtime, length(data) FROM entity_files "+
+                    "WHERE dir_path = ? AND file_name = ?",
+                    (dir_key, name)
+                    ).fetchone()
+                if row:
+                    return tuple(row)
+        return None
+
+    def listdir(self, d):
+        (coll_dir, key) = self._db_key(d)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).listdir(d)
+        names = []
+        with self._db(coll_dir) as conn:
+            if conn:
+                names = (
+                    [ r[0] for r in conn.execute(
+                        "SELECT dir_name FROM entity_dirs WHERE parent_path = ?", (key,)
+                        ) ] +
+                    [ r[0] for r in conn.execute(
+                        "SELECT file_name FROM entity_files WHERE dir_path = ?", (key,)
+                        ) ]
+                    )
+        return names
+
+    def listfiles(self, d):
+        (coll_dir, key) = self._db_key(d)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).listfiles(d)
+        names = []
+        with self._db(coll_dir) as conn:
+            if conn:
+                names = [ r[0] for r in conn.execute(
+                    "SELECT file_name FROM entity_files WHERE dir_path = ?", (key,)
+                    ) ]
+        return names
+
+    def makedirs(self, d):
+        (coll_dir, key) = self._db_key(d)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).makedirs(d)
+        with self._db(coll_dir, create=True) as conn:
+            self._makedirs(conn, key)
+        return
+
+    def open(self, p, mode):
+        (coll_dir, key) = self._db_key(p)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).open(p, mode)
+        data = None
+        if ("r" in mode) or ("a" in mode):
+            data = self._read_file(coll_dir, key)
+            if data is None and "r" in mode:
+                raise IOError(errno.ENOENT, "No such file in entity store", p)
+        if ("r" in mode) and ("+" not in mode):
+            f = io.BytesIO(data)
+            f.name = p
+            return f
+        return SQLiteStoredFile(self, p, data=(data if "w" not in mode else None) or "")
+
+    def remove_tree(self, d):
+        (coll_dir, key) = self._db_key(d)
+        if coll_dir is None:
+            return super(SQLiteEntityStore, self).remove_tree(d)
+        with self._db(coll_dir) as conn:
+            if conn:
+                conn.execute(
+                    "DELETE FROM entity_files "+
+                    "WHERE dir_path = ? OR substr(dir_path, 1, ?) = ?",
+                    (key, len(key)+1, key+"/")
+                    )
+                conn.execute(
+                    "DELETE FROM entity_dirs "+
+                    "WHERE dir_path = ? OR substr(dir_path, 1, ?) = ?",
+                    (key, len(key)+1, key+"/")
+                    )
+        return
+
+    def rename(self, old_p, new_p):
+        (old_coll_dir, old_key) = self._db_key(old_p)
+        (new_coll_dir, new_key) = self._db_key(new_p)
+        if (old_coll_dir is None) and (new_coll_dir is None):
+            return super(SQLiteEntityStore, self).rename(old_p, new_p)
+        if old_coll_dir != new_coll_dir:
+            msg = "Cannot rename entity data between collections (%s, %s)"%(old_p, new_p)
+            log.error(msg)
+            raise Annalist_Error(msg)
+        with self._db(old_coll_dir) as conn:
+            if not conn:
+                raise IOError(errno.ENOENT, "No such file in entity store", old_p)
+            (old_dir, old_name) = old_key.rsplit("/", 1) if "/" in old_key else ("", old_key)
+            old_file = conn.execute(
+                "SELECT 1 FROM entity_files WHERE dir_path = ? AND file_name = ?",
+                (old_dir, old_name)
+                ).fetchone()
+            if old_file:
+                (new_dir, new_name) = new_key.rsplit("/", 1) if "/" in new_key else ("", new_key)
+                self._makedirs(conn, new_dir)
+                conn.execute(
+                    "UPDATE entity_files SET dir_path = ?, file_name = ? "+
+                    "WHERE dir_path = ? AND file_name = ?",
+                    (new_dir, new_name, old_dir, old_name)
+                    )
+            else:
+                n = len(old_key)
+                conn.execute(
+                    "UPDATE entity_files SET dir_path = ? || substr(dir_path, ?) "+
+                    "WHERE dir_path = ? OR substr(dir_path, 1, ?) = ?",
+                    (new_key, n+1, old_key, n+1, old_key+"/")
+                    )
+                conn.execute(
+                    "UPDATE entity_dirs SET dir_path = ? || substr(dir_path, ?), "+
+                    "parent_path = ? || substr(parent_path, ?) "+
+                    "WHERE substr(dir_path, 1, ?) = ?",
+                    (new_key, n+1, new_key, n+1, n+1, old_key+"/")
+                    )
+                conn.execute("DELETE FROM entity_dirs WHERE dir_path = ?", (old_key,))
+                self._makedirs(conn, new_key)
+        return
+
+    def copy_file(self, old_p, new_p):
+        with self.open(old_p, "rb") as old_f:
+            with self.open(new_p, "wb") as new_f:
+                shutil.copyfileobj(old_f, new_f)
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Entity store selection
+#
+#   -------------------------------------------------------------------------------------------
+
+ENTITY_STORE_CLASSES = (
+    { "file":   FileEntityStore
+    , "sqlite": SQLiteEntityStore
+    })
+
+entity_stores = {}
+
+def get_entity_store():
+    """
+    Returns the entity store selected for the current site by the
+    `ANNALIST_ENTITY_STORE` setting.
+    """
+    store_name = settings.ANNALIST_ENTITY_STORE
+    site_dir   = os.path.join(settings.BASE_DATA_DIR, layout.SITE_DIR)
+    if (store_name, site_dir) not in entity_stores:
+        store_cls  = ENTITY_STORE_CLASSES.get(store_name, None)
+        if store_cls is None:
+            msg = "Unknown entity store"
+            log.error("%s: %s"%(msg, store_name))
+            raise Annalist_Error(store_name, msg)
+        if store_cls is SQLiteEntityStore:
+            store = store_cls(site_dir)
+        else:
+            store = store_cls()
+        entity_stores[(store_name, site_dir)] = store
+    return entity_stores[(store_name, site_dir)]
+
+# End.
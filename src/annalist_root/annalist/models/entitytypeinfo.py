@@ -607,28 +607,34 @@ class EntityTypeInfo(object):
             log.warning("EntityTypeInfo.enum_entity_ids: missing entityparent; type_id %s"%(self.type_id))
         return
 
-    def enum_entities(self, user_perms=None, altscope=None):
+    def enum_entities(self, user_perms=None, altscope=None, entity_filter=None):
         """
         Iterate over entities in collection with current type.
+
+        If entity_filter is supplied, it is used to skip entities without loading 
+        them (see `Entity.child_entities`).
         """
         if (not user_perms or 
             self.permissions_map['list'] in user_perms[ANNAL.CURIE.user_permission]):
             if not self.entityparent:
                 log.warning("EntityTypeInfo.enum_entities: missing entityparent; type_id %s"%(self.type_id))
             else:
-                for eid in self.entityparent.child_entity_ids(
-                        self.entityclass, 
-                        altscope=altscope):
-                    yield self.get_entity(eid)
+                for e in self._enum_child_entities(altscope=altscope, entity_filter=entity_filter):
+                    yield e
         return
 
-    def enum_entities_with_implied_values(self, user_perms=None, altscope=None):
+    def enum_entities_with_implied_values(self, user_perms=None, altscope=None, entity_filter=None):
         """
         Iterate over entities in collection with current type.
         Returns entities with alias and inferred fields instantiated.
 
         If user_perms is supplied and not None, checks that they contain permission to
         list values of the appropriate type. 
+
+        If entity_filter is supplied, it is used to skip entities without loading 
+        them (see `Entity.child_entities`).  The filter is not used if any property
+        it tests is the target of a field alias, as indexed values do not include 
+        implied values.
         """
         #@@
         # log.info(
@@ -649,10 +655,8 @@ class EntityTypeInfo(object):
                     (self.type_id)
                     )
                 # No record type info: return base entity without implied values
-                for eid in self.entityparent.child_entity_ids(
-                        self.entityclass, 
-                        altscope=altscope):
-                    yield self.get_entity(eid)
+                for e in self._enum_child_entities(altscope=altscope, entity_filter=entity_filter):
+                    yield e
             else:
                 #@@
                 # log.info(
@@ -660,10 +664,37 @@ class EntityTypeInfo(object):
                 #     (self.entityparent.get_id(), altscope)
                 #     )
                 #@@
-                for eid in self.entityparent.child_entity_ids(
-                        self.entityclass, 
-                        altscope=altscope):
-                    yield self.get_entity_implied_values(self.get_entity(eid))
+                if entity_filter:
+                    alias_targets = (
+                        [ alias[ANNAL.CURIE.alias_target] 
+                          for alias in self.recordtype.get(ANNAL.CURIE.field_aliases, [])
+                        ])
+                    if set(entity_filter.get_property_uris()) & set(alias_targets):
+                        entity_filter = None
+                for e in self._enum_child_entities(altscope=altscope, entity_filter=entity_filter):
+                    yield self.get_entity_implied_values(e)
+        return
+
+    def _enum_child_entities(self, altscope=None, entity_filter=None):
+        """
+        Local helper iterates over entities of the current type, loading each one
+        directly from the location found when enumerating the parent's children
+        (see `Entity.child_entities`), rather than re-resolving each entity id.
+
+        The entity filter, if supplied, is not applied to collections.
+        """
+        if self.type_id == layout.COLL_TYPEID:
+            # Collections are loaded via `Collection.load` to set up inheritance
+            for eid in self.entityparent.child_entity_ids(
+                    self.entityclass, 
+                    altscope=altscope):
+                yield self.get_entity(eid)
+        else:
+            for e in self.entityparent.child_entities(
+                    self.entityclass, 
+                    altscope=altscope,
+                    entity_filter=entity_filter):
+                yield e
         return
 
     def get_initial_entity_values(self, entity_id, copy_entity_id=layout.INITIAL_VALUES_ID):
@@ -0,0 +1,192 @@
+"""
+Process-wide cache of entity values read from Annalist storage.
+
+Entity values are cached as parsed from the entity body, keyed by the location of
+the body (which encodes the site, collection, type and entity id of the entity).
+The cache holds entries in least-recently-used order, and the total size of
+cached entries (measured as the size of the entity body from which they were read)
+is limited by the `ANNALIST_ENTITY_CACHE_SIZE` site setting;  when adding an
+entry would exceed this budget, least recently used entries are discarded.
+
+Each cache entry records the change stamp of the entity body from which it was
+read (see `FileEntityStore.change_stamp`), and is used only if the stamp is
+unchanged, so entities updated by another process are re-read.  Entities updated,
+removed or renamed by this process are also explicitly discarded from the cache
+(see `EntityRoot._save`, `EntityRoot._remove` and `EntityRoot._rename_files`).
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import collections
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf import settings
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def copy_values(v):
+    """
+    Returns a copy of the supplied entity value (i.e. a JSON-compatible value),
+    with new dictionaries and lists, so that cached values are not updated when
+    the copy is updated.
+
+    >>> v1 = {"a": [1, {"b": "c"}], "d": "e"}
+    >>> v2 = copy_values(v1)
+    >>> v2 == v1
+    True
+    >>> v2["a"][1] is v1["a"][1]
+    False
+    """
+    if isinstance(v, dict):
+        return { k: copy_values(e) for (k, e) in v.iteritems() }
+    if isinstance(v, list):
+        return [ copy_values(e) for e in v ]
+    return v
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Entity value cache
+#
+#   -------------------------------------------------------------------------------------------
+
+class EntityValueCache(object):
+    """
+    Bounded least-recently-used cache of entity values, keyed by entity body path.
+    """
+
+    def __init__(self, max_size):
+        """
+        Initialize a new entity value cache.
+
+        max_size    is the maximum total size (in bytes) of cached entity bodies.
+        """
+        super(EntityValueCache, self).__init__()
+        self._max_size = max_size
+        self._size     = 0
+        self._entries  = collections.OrderedDict()  # path -> (stamp, values, size)
+        self.hits      = 0
+        self.misses    = 0
+        return
+
+    def get_size(self):
+        """
+        Returns total size of cached entity bodies.
+        """
+        return self._size
+
+    def get_values(self, path, stamp):
+        """
+        Returns a copy of the values cached for the entity body at `path`, or None
+        if no values are cached, or if the cached values were read from a body
+        with a change stamp other than `stamp`.
+        """
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        if (stamp is None) or (entry[0] != stamp):
+            self._size  -= entry[2]
+            self.misses += 1
+            return None
+        self._entries[path] = entry     # Move to most recently used position
+        self.hits += 1
+        return copy_values(entry[1])
+
+    def set_values(self, path, stamp, values, size):
+        """
+        Caches a copy of values read from the entity body at `path`.
+
+        path        is the location of the entity body.
+        stamp       is the change stamp of the entity body when it was read.
+        values      are the entity values read.
+        size        is the size of the entity body, which is used as a measure
+                    of the memory used by the cached values.
+        """
+        self.remove_values(path)
+        if (stamp is None) or (size > self._max_size):
+            return
+        while self._entries and (self._size + size > self._max_size):
+            (p, old_entry) = self._entries.popitem(last=False)
+            self._size -= old_entry[2]
+        self._entries[path] = (stamp, copy_values(values), size)
+        self._size += size
+        return
+
+    def remove_values(self, path):
+        """
+        Removes any values cached for the entity body at `path`.
+        """
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._size -= entry[2]
+        return
+
+    def remove_tree(self, d):
+        """
+        Removes values cached for all entities stored under directory `d`
+        (e.g. all entities of a type, or all entities in a collection).
+        """
+        prefix = os.path.join(d, "")
+        for path in [ p for p in self._entries if p.startswith(prefix) ]:
+            self.remove_values(path)
+        return
+
+    def flush(self):
+        """
+        Removes all cached values.
+        """
+        self._entries.clear()
+        self._size = 0
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Get entity value cache for current settings
+#
+#   -------------------------------------------------------------------------------------------
+
+entity_value_caches = {}
+
+def get_entity_value_cache():
+    """
+    Returns the entity value cache with size determined by the
+    `ANNALIST_ENTITY_CACHE_SIZE` setting, or None if the size is zero
+    (i.e. entity value caching is disabled).
+    """
+    max_size = settings.ANNALIST_ENTITY_CACHE_SIZE
+    if not max_size:
+        return None
+    if max_size not in entity_value_caches:
+        entity_value_caches[max_size] = EntityValueCache(max_size)
+    return entity_value_caches[max_size]
+
+def remove_cached_entity_values(path):
+    """
+    Removes any values cached for the entity body at `path`.
+    """
+    for cache in entity_value_caches.values():
+        cache.remove_values(path)
+    return
+
+def flush_entity_value_caches(d=None):
+    """
+    Removes values cached for entities stored under directory `d`, or all
+    cached entity values if `d` is not specified.
+    """
+    for cache in entity_value_caches.values():
+        if d is None:
+            cache.flush()
+        else:
+            cache.remove_tree(d)
+    return
+
+# End.
@@ -103,12 +103,23 @@ class RecordGroup(EntityData):
 
         This method is called when a RecordGroup entity has been updated.  
 
-        It invokes the containing collection method to regenerate the JSON LD context 
-        for the collection to which the group belongs.
+        It updates the collection group cache, and invokes the containing collection 
+        method to regenerate the JSON LD context for the collection to which the 
+        group belongs.
         """
+        self._parent.cache_add_group(self)
         self._parent.generate_coll_jsonld_context(flags=post_update_flags)
         return entitydata
 
+    def _post_remove_processing(self, post_update_flags):
+        """
+        Post-remove processing.
+
+        This method is called when a RecordGroup entity has been removed.  
+        """
+        self._parent.cache_remove_group(self.get_id())
+        return
+
 class RecordGroup_migration(RecordGroup):
     """
     Variation of RecordGroup with suppressed instantiation warning,
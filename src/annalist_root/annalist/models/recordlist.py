@@ -94,4 +94,22 @@ class RecordList(EntityData):
         # Return result
         return entitydata
 
+    def _post_update_processing(self, entitydata, post_update_flags):
+        """
+        Post-update processing.
+
+        This method is called when a RecordList entity has been created or updated.
+        """
+        self._parent.cache_add_list(self)
+        return entitydata
+
+    def _post_remove_processing(self, post_update_flags):
+        """
+        Post-remove processing.
+
+        This method is called when a RecordList entity has been removed.  
+        """
+        self._parent.cache_remove_list(self.get_id())
+        return
+
 # End.
@@ -20,7 +20,7 @@ from annalist                   import layout
 from annalist.exceptions        import Annalist_Error
 from annalist.identifiers       import ANNAL
 from annalist                   import util
-from annalist.models.entity     import Entity
+from annalist.models.entity     import Entity, invalidate_alt_parents
 from annalist.models.entitydata import EntityData
 
 class RecordTypeData(Entity):
@@ -69,6 +69,32 @@ class RecordTypeData(Entity):
         t = EntityData.remove(self, entity_id)
         return t
 
+    def _alt_parents_cache(self):
+        """
+        Alternative parents for a RecordTypeData entity are determined by its parent
+        collection, and are cached with the collection's alternative parents.
+        """
+        return self._parent._alt_parents_cache()
+
+    def _post_update_processing(self, entitydata, post_update_flags):
+        """
+        Post-update processing.
+
+        A new RecordTypeData entity may be an alternative parent for RecordTypeData 
+        entities in other collections, so cached alternative parent lists are discarded.
+        """
+        invalidate_alt_parents()
+        return entitydata
+
+    def _post_remove_processing(self, post_update_flags):
+        """
+        Post-remove processing.
+
+        Cached alternative parent lists that may include the removed entity are discarded.
+        """
+        invalidate_alt_parents()
+        return
+
     def _local_find_alt_parents(self):
         """
         Returns a list of alternative parents for the current inheritance branch only;
@@ -88,10 +88,21 @@ class RecordView(EntityData):
 
         This method is called when a RecordView entity has been updated.  
 
-        It invokes the containing collection method to regenerate the JSON LD context 
-        for the collection to which the entity belongs.
+        It updates the collection view cache, and invokes the containing collection 
+        method to regenerate the JSON LD context for the collection to which the 
+        entity belongs.
         """
+        self._parent.cache_add_view(self)
         self._parent.generate_coll_jsonld_context(flags=post_update_flags)
         return entitydata
 
+    def _post_remove_processing(self, post_update_flags):
+        """
+        Post-remove processing.
+
+        This method is called when a RecordView entity has been removed.  
+        """
+        self._parent.cache_remove_view(self.get_id())
+        return
+
 # End.
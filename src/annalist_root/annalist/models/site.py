@@ -36,6 +36,8 @@ from annalist.models.annalistuser   import AnnalistUser
 from annalist.models.entityroot     import EntityRoot
 from annalist.models.sitedata       import SiteData
 from annalist.models.collection     import Collection
+from annalist.models.collectionversion import bump_collection_version
+from annalist.models.entitychoicecache import choice_cache_changed
 from annalist.models.recordvocab    import RecordVocab
 from annalist.models.recordview     import RecordView
 from annalist.models.recordfield    import RecordField
@@ -47,6 +49,11 @@ from annalist.models.rendertypeinfo import (
     is_render_type_object,
     )
 
+#   Process-wide cache of site objects (see `Site.get_cached`),
+#   indexed by (site base URI, site base directory, host)
+
+site_object_cache = {}
+
 class Site(EntityRoot):
 
     _entitytype     = ANNAL.CURIE.Site
@@ -69,10 +76,32 @@ class Site(EntityRoot):
         siteuripath    = urlparse.urljoin(sitebaseuri, sitepath) 
         sitedir        = os.path.join(sitebasedir, sitepath)
         self._sitedata = None
+        self._sitedata_stamp = None
         super(Site, self).__init__(host+siteuripath, siteuripath, sitedir, sitebasedir)
         self.set_id(layout.SITEDATA_ID)
         return
 
+    @classmethod
+    def get_cached(cls, sitebaseuri, sitebasedir, host=""):
+        """
+        Returns a site object from a process-wide cache of site objects, creating a 
+        new one if needed.  Site data loaded by a cached site object are discarded 
+        if they have been updated since they were loaded (see `site_data_collection`).
+
+        sitebaseuri     the base URI of the site
+        sitebasedir     the base directory for site information
+        host            the host name used to access the site
+        """
+        key  = (sitebaseuri, sitebasedir, host)
+        site = site_object_cache.get(key, None)
+        if site is None:
+            site = cls(sitebaseuri, sitebasedir, host=host)
+            site_object_cache[key] = site
+        elif ( (site._sitedata is not None) and 
+               (site._sitedata_stamp != site._sitedata._change_stamp()) ):
+            site._sitedata = None
+        return site
+
     def _exists(self):
         """
         The site entity has no explicit data, so always respond with 'True' to an _exists() query
@@ -117,7 +146,8 @@ class Site(EntityRoot):
                     metadata does not exist.
         """
         if self._sitedata is None:
-            self._sitedata = SiteData.load_sitedata(self, test_exists=test_exists)
+            self._sitedata_stamp = SiteData(self)._change_stamp()
+            self._sitedata       = SiteData.load_sitedata(self, test_exists=test_exists)
         return self._sitedata
 
     def site_data_stream(self):
@@ -137,6 +167,7 @@ class Site(EntityRoot):
         site_data  = self.site_data_collection().get_values()
         if not site_data:
             return None
+        site_data  = site_data.copy()   # Site data collection may be cached: don't update
         site_data["title"] = site_data.get(RDFS.CURIE.label, message.SITE_NAME_DEFAULT)
         # log.info("site.site_data: site_data %r"%(site_data))
         colls = collections.OrderedDict()
@@ -174,7 +205,7 @@ class Site(EntityRoot):
         """
         log.debug("site.collections: basedir: %s"%(self._entitydir))
         for f in self._base_children(Collection):
-            c = Collection.load(self, f)
+            c = Collection.load_cached(self, f)
             # log.info("Site.colections: Collection.load %s %r"%(f, c.get_values()))
             if c:
                 yield c
@@ -438,6 +469,8 @@ class Site(EntityRoot):
         d = os.path.join(site_data_tgt, sdir)
         if os.path.isdir(s):
             replacetree(s, d)
+            choice_cache_changed(d)
+            bump_collection_version(d)
         return
 
     @staticmethod
@@ -451,6 +484,8 @@ class Site(EntityRoot):
         d = os.path.join(site_data_tgt, sdir)
         if os.path.isdir(s):
             updatetree(s, d)
+            choice_cache_changed(d)
+            bump_collection_version(d)
         return
 
     @staticmethod
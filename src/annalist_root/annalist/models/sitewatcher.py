@@ -0,0 +1,392 @@
+"""
+Site data change watcher, used to keep cached collection data consistent between
+server processes.
+
+Collection configuration data (types, fields, vocabularies, etc.) are cached by each
+server process (see `annalist.models.collection`).  When the `ANNALIST_SITE_WATCHER`
+site setting is enabled, each server process runs a background thread that watches
+the site data directory for changes made by any process, and records the locations
+of changed files.  The recorded changes are collected when a collection is accessed
+(see `Collection.load_cached`), and only the cached data affected by the changed
+files are discarded (see `Collection.flush_watched_changes`).
+
+Two watcher implementations are provided:
+
+    InotifySiteWatcher  uses Linux inotify events to report changes to files in
+                        collection metadata and configuration directories (see
+                        `site_watched_dir`).  This requires the optional 
+                        `pyinotify` package.
+    PollingSiteWatcher  periodically checks the status of collection metadata and
+                        configuration files (see `site_config_files`), at an interval
+                        given by the `ANNALIST_SITE_WATCHER_POLL_INTERVAL` setting.
+                        This is used when `pyinotify` is not available.
+
+Entity data values cached by a server process are validated against the stored
+data when they are used (see `annalist.models.entityvaluecache`), so neither 
+watcher checks entity data files other than collection configuration entities.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import threading
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None        # Use polling watcher
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf import settings
+
+from annalist   import layout
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Local helper functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def site_change_location(site_dir, path):
+    """
+    Returns a tuple `(coll_id, type_dir, entity_id)` describing the location of a
+    changed file or directory in the indicated site data directory, where any
+    element may be None if the location is not within a collection, collection
+    type directory or entity directory respectively.
+
+    >>> site_change_location("/site", "/site/c/coll/d/_type/type1/type_meta.jsonld")
+    ('coll', '_type', 'type1')
+    >>> site_change_location("/site", "/site/c/coll/d/_field")
+    ('coll', '_field', None)
+    >>> site_change_location("/site", "/site/c/coll/d/coll_meta.jsonld")
+    ('coll', None, None)
+    >>> site_change_location("/site", "/site/c/coll/coll_data.sqlite3")
+    ('coll', None, None)
+    >>> site_change_location("/site", "/site/c/coll/coll_version")
+    (None, None, None)
+    >>> site_change_location("/site", "/site/site_meta.jsonld")
+    (None, None, None)
+    """
+    rel_path = os.path.relpath(os.path.normpath(path), os.path.normpath(site_dir))
+    segs     = rel_path.split(os.sep)
+    if (len(segs) < 2) or (segs[0] != layout.SITE_COLL_PATH.split("/")[0]):
+        return (None, None, None)
+    coll_id   = segs[1]
+    coll_segs = segs[2:]
+    if coll_segs in (
+            [], [layout.COLL_BASE_DIR], [layout.COLL_BASE_DIR, layout.COLL_META_FILE],
+            [layout.COLL_DATABASE_FILE]
+            ):
+        # Collection directory, metadata or database
+        return (coll_id, None, None)
+    if (len(coll_segs) > 1) and (coll_segs[0] == layout.COLL_BASE_DIR):
+        return (coll_id, coll_segs[1], coll_segs[2] if len(coll_segs) > 2 else None)
+    return (None, None, None)
+
+def site_watched_dir(site_dir, path):
+    """
+    Returns True if the indicated directory in the site data directory is watched
+    for changes by `InotifySiteWatcher`.  These are the directory containing all
+    collections, and for each collection the collection directory, the collection
+    data directory, and its configuration directories (see `layout.COLL_DIRS`) and
+    the entity directories they contain.
+
+    >>> site_watched_dir("/site", "/site/c")
+    True
+    >>> site_watched_dir("/site", "/site/c/coll/d")
+    True
+    >>> site_watched_dir("/site", "/site/c/coll/d/_type/type1")
+    True
+    >>> site_watched_dir("/site", "/site/c/coll/d/type1/entity1")
+    False
+    >>> site_watched_dir("/site", "/site/cache/c/coll")
+    False
+    >>> site_watched_dir("/site", "/site")
+    False
+    """
+    rel_path = os.path.relpath(os.path.normpath(path), os.path.normpath(site_dir))
+    segs     = rel_path.split(os.sep)
+    if segs[0] != layout.SITE_COLL_PATH.split("/")[0]:
+        return False
+    if len(segs) <= 2:
+        # Collections directory or collection directory
+        return True
+    if segs[2] != layout.COLL_BASE_DIR:
+        return False
+    return (len(segs) == 3) or ((len(segs) <= 5) and (segs[3] in layout.COLL_DIRS))
+
+def site_watch_dirs(site_dir, top_dir=None):
+    """
+    Returns a list of directories in the site data directory that are watched for
+    changes by `InotifySiteWatcher` (see `site_watched_dir`).
+
+    top_dir     if supplied, is a watched directory, and only that directory and
+                watched directories within it are returned.
+    """
+    if top_dir is None:
+        top_dir = os.path.join(site_dir, layout.SITE_COLL_PATH.split("/")[0])
+    watch_dirs = []
+    for (d, dirnames, filenames) in os.walk(top_dir):
+        dirnames[:] = [ n for n in dirnames if site_watched_dir(site_dir, os.path.join(d, n)) ]
+        watch_dirs.append(d)
+    return watch_dirs
+
+def site_config_files(site_dir):
+    """
+    Returns a dictionary of change stamps `(mtime, size)` for collection metadata
+    and configuration files in the indicated site data directory, keyed by file
+    location.
+
+    The files included are collection metadata files and SQLite databases (see
+    `annalist.models.entitystore`), and files in the entity directories of each
+    collection configuration directory (see `layout.COLL_DIRS`).
+    """
+    stamps    = {}
+    colls_dir = os.path.join(site_dir, layout.SITE_COLL_PATH.split("/")[0])
+    def add_stamp(p):
+        try:
+            st = os.stat(p)
+        except OSError:
+            return
+        stamps[p] = (st.st_mtime, st.st_size)
+        return
+    def listdir(d):
+        try:
+            return os.listdir(d)
+        except OSError:
+            return []
+    for coll_id in listdir(colls_dir):
+        coll_dir = os.path.join(colls_dir, coll_id)
+        data_dir = os.path.join(coll_dir, layout.COLL_BASE_DIR)
+        add_stamp(os.path.join(coll_dir, layout.COLL_DATABASE_FILE))
+        add_stamp(os.path.join(data_dir, layout.COLL_META_FILE))
+        for type_dir in layout.COLL_DIRS:
+            type_path = os.path.join(data_dir, type_dir)
+            for entity_id in listdir(type_path):
+                entity_dir = os.path.join(type_path, entity_id)
+                for f in listdir(entity_dir):
+                    add_stamp(os.path.join(entity_dir, f))
+    return stamps
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Site change watcher classes
+#
+#   -------------------------------------------------------------------------------------------
+
+class SiteWatcher(object):
+    """
+    Base class for site data change watchers, which records locations of changed
+    files until they are collected.
+    """
+
+    def __init__(self, site_dir):
+        super(SiteWatcher, self).__init__()
+        self._site_dir = site_dir
+        self._lock     = threading.Lock()
+        self._changes  = set()
+        return
+
+    def get_site_dir(self):
+        return self._site_dir
+
+    def changed(self, path):
+        """
+        Record change to the indicated file or directory.
+        """
+        with self._lock:
+            self._changes.add(os.path.normpath(path))
+        return
+
+    def take_changes(self):
+        """
+        Returns a list of files and directories changed since the previous call,
+        and clears the record of changes.
+        """
+        with self._lock:
+            changes       = self._changes
+            self._changes = set()
+        return sorted(changes)
+
+    def start(self):
+        """
+        Start watching for changes.  The base class does not watch for changes,
+        so changes are recorded only by calls to `changed`.
+        """
+        return
+
+    def stop(self):
+        """
+        Stop watching for changes.
+        """
+        return
+
+class PollingSiteWatcher(SiteWatcher):
+    """
+    Site data change watcher that periodically checks collection metadata and
+    configuration files for changes.
+    """
+
+    def __init__(self, site_dir, interval):
+        super(PollingSiteWatcher, self).__init__(site_dir)
+        self._interval = interval
+        self._stamps   = site_config_files(site_dir)
+        self._stopping = threading.Event()
+        self._thread   = None
+        return
+
+    def poll(self):
+        """
+        Check for changes since the previous call.
+        """
+        stamps = site_config_files(self._site_dir)
+        for p in set(stamps) | set(self._stamps):
+            if stamps.get(p, None) != self._stamps.get(p, None):
+                self.changed(p)
+        self._stamps = stamps
+        return
+
+    def _run(self):
+        while not self._stopping.wait(self._interval):
+            try:
+                self.poll()
+            except Exception as e:
+                log.warning("PollingSiteWatcher: error checking %s (%s)"%(self._site_dir, e))
+        return
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="PollingSiteWatcher")
+        self._thread.daemon = True
+        self._thread.start()
+        return
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return
+
+class InotifySiteWatcher(SiteWatcher):
+    """
+    Site data change watcher that uses inotify events to detect changes to files
+    in collection metadata and configuration directories.
+
+    Only the directories that contain such files are watched (see `site_watch_dirs`),
+    rather than every directory in the site data, so that the number of inotify 
+    watches used by each server process does not grow with the amount of entity 
+    data.  Watched directories that are created while watching are added to the
+    watched directories.
+    """
+
+    _event_mask = (
+        ( pyinotify.IN_CLOSE_WRITE | pyinotify.IN_CREATE | pyinotify.IN_DELETE |
+          pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO
+        ) if pyinotify else 0
+        )
+
+    def __init__(self, site_dir):
+        super(InotifySiteWatcher, self).__init__(site_dir)
+        self._watch_manager = None
+        self._notifier      = None
+        return
+
+    def watch_dir(self, d):
+        """
+        Start watching the indicated directory.
+        """
+        self._watch_manager.add_watch(d, self._event_mask)
+        return
+
+    def add_watches(self, top_dir=None):
+        """
+        Start watching the indicated watched directory and watched directories 
+        within it, or all watched directories if no directory is supplied.
+        """
+        for d in site_watch_dirs(self._site_dir, top_dir):
+            self.watch_dir(d)
+        return
+
+    def process_event(self, path, is_dir):
+        """
+        Record change reported by an inotify event, and start watching a newly
+        created or moved directory if it is a watched directory.
+        """
+        self.changed(path)
+        if is_dir and site_watched_dir(self._site_dir, path) and os.path.isdir(path):
+            self.add_watches(path)
+        return
+
+    def start(self):
+        watcher = self
+        class SiteEventHandler(pyinotify.ProcessEvent):
+            def process_default(self, event):
+                watcher.process_event(event.pathname, event.dir)
+                return
+        self._watch_manager = pyinotify.WatchManager()
+        self._notifier      = pyinotify.ThreadedNotifier(self._watch_manager, SiteEventHandler())
+        self._notifier.daemon = True
+        self._notifier.start()
+        self.add_watches()
+        return
+
+    def stop(self):
+        if self._notifier:
+            self._notifier.stop()
+            self._notifier = None
+        return
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Site change watcher access functions
+#
+#   -------------------------------------------------------------------------------------------
+
+site_watchers      = {}                 # site_dir -> (pid, watcher)
+site_watchers_lock = threading.Lock()   # Ensures one watcher is started per site
+
+def get_site_watcher():
+    """
+    Returns a started site change watcher for the current process and site, or None
+    if site change watching is not enabled by the `ANNALIST_SITE_WATCHER` setting.
+    """
+    if not settings.ANNALIST_SITE_WATCHER:
+        return None
+    site_dir = os.path.join(settings.BASE_DATA_DIR, layout.SITE_DIR)
+    (pid, watcher) = site_watchers.get(site_dir, (None, None))
+    if pid != os.getpid():
+        with site_watchers_lock:
+            # Re-check, in case another request thread has started a watcher
+            (pid, watcher) = site_watchers.get(site_dir, (None, None))
+            if pid != os.getpid():
+                # Not yet started by this process (watcher threads are not 
+                # inherited by a forked server process)
+                if pyinotify:
+                    watcher = InotifySiteWatcher(site_dir)
+                else:
+                    watcher = PollingSiteWatcher(
+                        site_dir, settings.ANNALIST_SITE_WATCHER_POLL_INTERVAL
+                        )
+                watcher.start()
+                log.info(
+                    "get_site_watcher: started %s for %s"%(type(watcher).__name__, site_dir)
+                    )
+                site_watchers[site_dir] = (os.getpid(), watcher)
+    return watcher
+
+def stop_site_watchers():
+    """
+    Stop all site change watchers started by this process.
+    """
+    with site_watchers_lock:
+        for (pid, watcher) in site_watchers.values():
+            if pid == os.getpid():
+                watcher.stop()
+        site_watchers.clear()
+    return
+
+# End.
@@ -84,6 +84,15 @@ class TestBoundField(object):
         attr = "@@TestBoundField.%s@@"%(name,)
         return attr
 
+    def get_field_option(self, value):
+        """
+        Returns the option corresponding to the supplied field value, or None.
+        """
+        for o in self._field.get("options", []):
+            if o.value == value:
+                return o
+        return None
+
     # Define methods to facilitate access to values using dictionary operations
     # on the FieldDescription object
 
@@ -0,0 +1,106 @@
+"""
+Tests for child entity id index.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf    import settings
+from tests          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testentitydata          import entitydata_create_values
+from entity_testutils               import collection_create_values
+
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+from annalist.models.childidindex   import ChildIdIndexEntry
+
+#   -----------------------------------------------------------------------------
+#
+#   Child id index tests
+#
+#   -----------------------------------------------------------------------------
+
+class ChildIdIndexTest(AnnalistTestCase):
+    """
+    Tests for child entity id index
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection(self.testsite, "testcoll")
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def test_index_entry(self):
+        entry = ChildIdIndexEntry(
+            ["local", "alt1", "alt2"],
+            [["a", "b"], ["c", "a", "d"], ["d", "e"]],
+            [1, 1, 1]
+            )
+        self.assertEqual(entry.get_ids(), ["c", "d", "e", "a", "b"])
+        # Add local id that is also inherited
+        entry.add_id(0, "d", 2)
+        self.assertEqual(entry.get_ids(), ["c", "e", "a", "b", "d"])
+        self.assertEqual(entry.get_stamps(), [2, 1, 1])
+        # Add inherited id that is also local
+        entry.add_id(2, "a", 3)
+        self.assertEqual(entry.get_ids(), ["c", "e", "a", "b", "d"])
+        # Remove local id that is still inherited
+        entry.remove_id(0, "a", 4)
+        self.assertEqual(entry.get_ids(), ["c", "e", "a", "b", "d"])
+        self.assertEqual(entry.get_local_ids(), ["b", "d"])
+        # Remove inherited ids
+        entry.remove_id(1, "a", 5)
+        self.assertEqual(entry.get_ids(), ["c", "e", "a", "b", "d"])
+        entry.remove_id(2, "a", 5)
+        self.assertEqual(entry.get_ids(), ["c", "e", "b", "d"])
+        entry.remove_id(1, "d", 5)
+        self.assertEqual(entry.get_ids(), ["c", "e", "b", "d"])
+        return
+
+    def test_entity_children(self):
+        newcoll  = Collection.create(self.testsite, "newcoll", collection_create_values("newcoll"))
+        newcoll.set_alt_entities(self.testcoll)
+        testdata = RecordTypeData.create(self.testcoll, "testtype", {})
+        newdata  = RecordTypeData.create(newcoll, "testtype", {})
+        EntityData.create(testdata, "entity1", entitydata_create_values("entity1"))
+        EntityData.create(newdata,  "entity2", entitydata_create_values("entity2"))
+        def children():
+            return list(newdata._children(EntityData, altscope="all"))
+        self.assertEqual(children(), ["entity1", "entity2"])
+        # Entity added, overriding inherited entity
+        EntityData.create(newdata,  "entity1", entitydata_create_values("entity1"))
+        self.assertEqual(children(), ["entity2", "entity1"])
+        # Inherited entity added
+        EntityData.create(testdata, "entity3", entitydata_create_values("entity3"))
+        self.assertEqual(set(children()), {"entity1", "entity2", "entity3"})
+        self.assertEqual(children()[0], "entity3")
+        # Entity removed, revealing inherited entity
+        EntityData.remove(newdata, "entity1")
+        self.assertEqual(set(children()), {"entity1", "entity2", "entity3"})
+        self.assertEqual(children()[-1], "entity2")
+        # Renamed entity
+        e2 = EntityData(newdata, "entity4")
+        e2._rename_files(EntityData(newdata, "entity2"))
+        self.assertEqual(set(children()), {"entity1", "entity3", "entity4"})
+        self.assertEqual(list(newdata._children(EntityData)), ["entity4"])
+        return
+
+# End.
@@ -188,6 +188,30 @@ class ClosureCacheTest(AnnalistTestCase):
         self.assertEqual(self.closurecache.rev_closure("val5"), {"val3", "val4"})
         return
 
+    def test_multipath_closure_remove_and_restore(self):
+        self.assertTrue(self.closurecache.add_rel("val1", "val2"))
+        self.assertTrue(self.closurecache.add_rel("val2", "val3"))
+        self.assertTrue(self.closurecache.add_rel("val2", "val4"))
+        self.assertTrue(self.closurecache.add_rel("val3", "val5"))
+        self.assertTrue(self.closurecache.add_rel("val4", "val5"))
+        self.assertTrue(self.closurecache.remove_val("val3"))
+        self.assertEqual(self.closurecache.fwd_closure("val1"), {"val2", "val4", "val5"})
+        self.assertEqual(self.closurecache.rev_closure("val5"), {"val1", "val2", "val4"})
+        # Restore relations in a different order
+        self.assertTrue(self.closurecache.add_rel("val3", "val5"))
+        self.assertTrue(self.closurecache.add_rel("val2", "val3"))
+        self.assertEqual(self.closurecache.get_values(),        {"val1", "val2", "val3", "val4", "val5"})
+        self.assertEqual(self.closurecache.fwd_closure("val1"), {"val2", "val3", "val4", "val5"})
+        self.assertEqual(self.closurecache.fwd_closure("val3"), {"val5"})
+        self.assertEqual(self.closurecache.rev_closure("val3"), {"val1", "val2"})
+        self.assertEqual(self.closurecache.rev_closure("val5"), {"val1", "val2", "val3", "val4"})
+        # Closures returned are not affected by subsequent updates
+        fwd1 = self.closurecache.fwd_closure("val1")
+        self.assertTrue(self.closurecache.remove_val("val5"))
+        self.assertEqual(fwd1, {"val2", "val3", "val4", "val5"})
+        self.assertEqual(self.closurecache.fwd_closure("val1"), {"val2", "val3", "val4"})
+        return
+
     def test_reflexive_relation(self):
         self.assertTrue(self.closurecache.add_rel("val1", "val2"))
         with self.assertRaises(Closure_Error):
@@ -29,6 +29,7 @@ from annalist.models.site           import Site
 from annalist.models.collection     import Collection
 from annalist.models.annalistuser   import AnnalistUser
 from annalist.models.recordtype     import RecordType
+from annalist.models.recordtypedata import RecordTypeData
 
 from annalist.views.collection      import CollectionEditView
 
@@ -425,6 +426,46 @@ class CollectionTest(AnnalistTestCase):
         self.assertEquals(testuser["rdfs:label"], "Test User")
         return
 
+    def test_alt_parents_cached(self):
+        # Alternative parent lists are cached, and updated when inheritance changes
+        coll_id = "newcoll"
+        newcoll = Collection.create(self.testsite, coll_id, collection_create_values(coll_id))
+        p1 = newcoll.get_alt_entities(altscope="all")
+        p2 = newcoll.get_alt_entities(altscope="all")
+        self.assertEqual([ p.get_id() for p in p1 ], ["newcoll", layout.SITEDATA_ID])
+        self.assertEqual(p1, p2)
+        self.assertIsNot(p1, p2)
+        newcoll.set_alt_entities(self.testcoll)
+        p3 = newcoll.get_alt_entities(altscope="all")
+        self.assertEqual([ p.get_id() for p in p3 ], ["newcoll", "testcoll", layout.SITEDATA_ID])
+        # RecordTypeData alternatives follow creation of type data in inherited collection
+        newdata = RecordTypeData(newcoll, "newtype")
+        self.assertEqual([ p.get_id() for p in newdata.get_alt_entities(altscope="all") ], ["newtype"])
+        testdata = RecordTypeData.create(self.testcoll, "newtype", {})
+        self.assertEqual(
+            [ p.get_parent().get_id() for p in newdata.get_alt_entities(altscope="all") ], 
+            ["newcoll", "testcoll"]
+            )
+        return
+
+    # Cached collection objects
+
+    def test_collection_load_cached(self):
+        c1 = Collection.load_cached(self.testsite, "testcoll")
+        c2 = Collection.load_cached(self.testsite, "testcoll")
+        self.assertIs(c1, c2)
+        self.assertEqual(c1["rdfs:label"], "Collection testcoll")
+        # Update collection metadata: cached object is replaced
+        c1["rdfs:label"] = "Updated label for collection testcoll"
+        c1._save()
+        c3 = Collection.load_cached(self.testsite, "testcoll")
+        self.assertIsNot(c3, c1)
+        self.assertEqual(c3["rdfs:label"], "Updated label for collection testcoll")
+        self.assertIs(Collection.load_cached(self.testsite, "testcoll"), c3)
+        # Missing collection
+        self.assertIsNone(Collection.load_cached(self.testsite, "nocoll"))
+        return
+
 #   -----------------------------------------------------------------------------
 #
 #   CollectionEditView tests
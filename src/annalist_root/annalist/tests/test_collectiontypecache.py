@@ -26,6 +26,7 @@ from entity_testtypedata                    import (
     recordtype_delete_confirm_form_data
     )
 
+from annalist.identifiers                  import RDFS
 from annalist.models.site                   import Site
 from annalist.models.collection             import Collection
 from annalist.models.recordtype             import RecordType
@@ -238,6 +239,76 @@ class CollectionTypeCacheTest(AnnalistTestCase):
         self.assertEqual(self.typecache.get_type_from_uri(self.testcoll1_b, "test:type22").get_id(),  "type22")
         return
 
+    def test_get_type_shared_values(self):
+        self.create_test_type_entities()
+        t1 = self.typecache.get_type(self.testcoll1_a, "type1")
+        t2 = self.typecache.get_type(self.testcoll1_a, "type1")
+        self.assertIsNot(t1, t2)
+        self.assertIs(t1._values, t2._values)
+        # Updating a returned entity does not affect the cached values
+        label = t2[RDFS.CURIE.label]
+        t1[RDFS.CURIE.label] = "Updated label"
+        self.assertEqual(t1[RDFS.CURIE.label], "Updated label")
+        self.assertEqual(t2[RDFS.CURIE.label], label)
+        t3 = self.typecache.get_type(self.testcoll1_a, "type1")
+        self.assertEqual(t3[RDFS.CURIE.label], label)
+        t3.get_values()[RDFS.CURIE.label] = "Updated label 3"
+        self.assertEqual(self.typecache.get_type(self.testcoll1_a, "type1")[RDFS.CURIE.label], label)
+        return
+
+    def test_get_type_rebinds_parent(self):
+        self.create_test_type_entities()
+        t1 = self.typecache.get_type(self.testcoll1_a, "type1")
+        self.assertIs(t1.get_parent(), self.testcoll1_a)
+        # Same type retrieved through different collection and site objects
+        t2 = self.typecache.get_type(self.testcoll1_b, "type1")
+        self.assertIs(t2.get_parent(), self.testcoll1_b)
+        self.assertIs(t2._values, t1._values)
+        testsite_b = Site(TestBaseUri, TestBaseDir)
+        testcoll_b = Collection(testsite_b, "testcoll1")
+        t3 = self.typecache.get_type(testcoll_b, "type1")
+        self.assertIs(t3.get_parent(), testcoll_b)
+        self.assertIs(t3.get_parent().get_site(), testsite_b)
+        self.assertEqual(t3.get_values(), t1.get_values())
+        self.assertEqual(t3._entitydir, t1._entitydir)
+        self.assertIs(self.typecache.get_type(self.testcoll1_a, "type1").get_parent(), self.testcoll1_a)
+        return
+
+    def test_get_all_type_ids_updated(self):
+        self.create_test_type_entities()
+        coll_ids    = self.typecache.get_all_type_ids(self.testcoll1_a)
+        all_ids     = self.typecache.get_all_type_ids(self.testcoll1_a, altscope="all")
+        scope_cache = self.typecache._get_cache(self.testcoll1_a)._entity_ids_by_scope
+        all_entry   = scope_cache["all"]
+        self.assertEqual(set(all_ids), self.expect_all_type_ids)
+        # Scope lists are updated in place when types are added or removed
+        type3 = RecordType(self.testcoll1_a, "type3")
+        type3.set_values(recordtype_create_values(type_id="type3", type_uri="test:type3"))
+        self.create_type_record(self.testcoll1_a, type3)
+        self.typecache.set_type(self.testcoll1_a, type3)
+        self.assertIs(scope_cache["all"], all_entry)
+        self.assertEqual(self.typecache.get_all_type_ids(self.testcoll1_a), coll_ids+["type3"])
+        self.assertEqual(
+            self.typecache.get_all_type_ids(self.testcoll1_a, altscope="all"), 
+            all_ids+["type3"]
+            )
+        self.typecache.remove_type(self.testcoll1_a, "type3")
+        self.assertEqual(self.typecache.get_all_type_ids(self.testcoll1_a), coll_ids)
+        # Locally defined type overrides inherited type
+        deftype = RecordType(self.testcoll1_a, "Default_type")
+        deftype.set_values(recordtype_create_values(type_id="Default_type", type_uri="test:deftype"))
+        self.create_type_record(self.testcoll1_a, deftype)
+        self.typecache.set_type(self.testcoll1_a, deftype)
+        all_ids_2 = self.typecache.get_all_type_ids(self.testcoll1_a, altscope="all")
+        self.assertEqual(all_ids_2[-1], "Default_type")
+        self.assertEqual(set(all_ids_2), self.expect_all_type_ids)
+        self.assertEqual(len(all_ids_2), len(all_ids))
+        # Removing local definition reveals inherited type
+        self.typecache.remove_type(self.testcoll1_a, "Default_type")
+        self.assertEqual(set(self.typecache.get_all_type_ids(self.testcoll1_a, altscope="all")), self.expect_all_type_ids)
+        self.assertIs(scope_cache["all"], all_entry)
+        return
+
     def test_get_all_types_scope_coll(self):
         self.create_test_type_entities()
         type_ids = set(t.get_id() for t in self.typecache.get_all_types(self.testcoll1_a))
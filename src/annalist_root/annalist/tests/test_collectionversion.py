@@ -0,0 +1,144 @@
+"""
+Tests for collection change counter.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf    import settings
+from tests          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testtypedata            import recordtype_create_values
+from entity_testentitydata          import entitydata_create_values
+
+from annalist                       import layout
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtype     import RecordType
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+from annalist.models.collectionversion import (
+    collection_version_dir, read_collection_version, update_version
+    )
+
+#   -----------------------------------------------------------------------------
+#
+#   Collection change counter tests
+#
+#   -----------------------------------------------------------------------------
+
+class CollectionVersionTest(AnnalistTestCase):
+    """
+    Tests for collection change counter
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection.create(self.testsite, "testcoll", {})
+        self.testdata = RecordTypeData.create(self.testcoll, "testtype", {})
+        self.coll_dir = collection_version_dir(self.testcoll._entitydir)
+        self.site_dir = collection_version_dir(self.testcoll.get_site_data()._entitydir)
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def test_collection_version_dir(self):
+        site_dir = os.path.join(TestBaseDir, "")
+        self.assertEqual(self.coll_dir, os.path.join(TestBaseDir, "c/testcoll"))
+        self.assertEqual(self.site_dir, os.path.join(TestBaseDir, layout.SITEDATA_DIR))
+        self.assertEqual(
+            collection_version_dir(os.path.join(site_dir, "c/testcoll/d/testtype/entity1")),
+            self.coll_dir
+            )
+        self.assertEqual(
+            collection_version_dir(os.path.join(site_dir, layout.SITE_META_FILE)),
+            self.site_dir
+            )
+        self.assertIsNone(collection_version_dir(os.path.dirname(TestBaseDir)))
+        return
+
+    def test_entity_changes_counted(self):
+        v0 = read_collection_version(self.coll_dir)
+        self.assertEqual(read_collection_version(self.coll_dir), v0)
+        e1 = EntityData.create(self.testdata, "entity1", entitydata_create_values("entity1"))
+        v1 = read_collection_version(self.coll_dir)
+        self.assertEqual(v1, (v0[0], v0[1]+1))
+        e1["rdfs:label"] = "Updated entity 1"
+        e1._save()
+        v2 = read_collection_version(self.coll_dir)
+        self.assertEqual(v2, (v0[0], v0[1]+2))
+        e2 = EntityData(self.testdata, "entity2")
+        e2._rename_files(e1)
+        v3 = read_collection_version(self.coll_dir)
+        self.assertEqual(v3, (v0[0], v0[1]+3))
+        EntityData.remove(self.testdata, "entity2")
+        v4 = read_collection_version(self.coll_dir)
+        self.assertEqual(v4, (v0[0], v0[1]+4))
+        # Site data version unchanged
+        sv = read_collection_version(self.site_dir)
+        EntityData.create(self.testdata, "entity3", entitydata_create_values("entity3"))
+        self.assertEqual(read_collection_version(self.site_dir), sv)
+        return
+
+    def test_data_stamp(self):
+        s1 = self.testcoll.get_data_stamp()
+        self.assertEqual(len(s1), 2)
+        self.assertEqual(self.testcoll.get_data_stamp(), s1)
+        EntityData.create(self.testdata, "entity1", entitydata_create_values("entity1"))
+        s2 = self.testcoll.get_data_stamp()
+        self.assertNotEqual(s2, s1)
+        self.assertEqual(s2[1], s1[1])
+        # Site data change
+        sitedata = self.testcoll.get_site_data()
+        Site.replace_site_data_dir(sitedata, layout.ENUM_LIST_TYPE_DIR,
+            os.path.join(settings.SITE_SRC_ROOT, "annalist/data/sitedata")
+            )
+        s3 = self.testcoll.get_data_stamp()
+        self.assertNotEqual(s3[1], s2[1])
+        return
+
+    def test_recreated_collection_version(self):
+        v1 = read_collection_version(self.coll_dir)
+        self.testsite.remove_collection("testcoll")
+        self.assertIsNone(read_collection_version(self.coll_dir))
+        Collection.create(self.testsite, "testcoll", {})
+        v2 = read_collection_version(self.coll_dir)
+        self.assertNotEqual(v2[0], v1[0])
+        return
+
+    def test_flush_changed_caches(self):
+        RecordType.create(
+            self.testcoll, "testtype", recordtype_create_values("testcoll", "testtype")
+            )
+        coll = Collection.load_cached(self.testsite, "testcoll")
+        self.assertIn("testtype", coll.cache_get_all_type_ids())
+        self.assertFalse(coll.flush_changed_caches())
+        # Changes by this process do not flush caches
+        EntityData.create(self.testdata, "entity1", entitydata_create_values("entity1"))
+        self.assertFalse(coll.flush_changed_caches())
+        self.assertIs(Collection.load_cached(self.testsite, "testcoll"), coll)
+        # Changes by another process flush caches
+        update_version(self.coll_dir, 1)
+        coll2 = Collection.load_cached(self.testsite, "testcoll")
+        self.assertIsNot(coll2, coll)
+        self.assertFalse(coll2.flush_changed_caches())
+        self.assertIs(Collection.load_cached(self.testsite, "testcoll"), coll2)
+        # Site data changes by another process
+        update_version(self.site_dir, 1)
+        self.assertTrue(coll2.flush_changed_caches())
+        return
+
+# End.
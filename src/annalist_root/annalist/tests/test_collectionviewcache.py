@@ -0,0 +1,163 @@
+"""
+Tests for collection view, list and field group caches.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import json
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf                    import settings
+from tests                          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testviewdata            import recordview_create_values
+from entity_testlistdata            import recordlist_create_values
+
+from annalist                       import layout
+from annalist.identifiers           import RDFS, ANNAL
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection, list_cache
+from annalist.models.recordview     import RecordView
+from annalist.models.recordlist     import RecordList
+from annalist.models.recordgroup    import RecordGroup_migration
+
+#   -----------------------------------------------------------------------------
+#
+#   Collection view, list and group cache tests
+#
+#   -----------------------------------------------------------------------------
+
+class CollectionViewCacheTest(AnnalistTestCase):
+    """
+    Tests for view, list and field group descriptions accessed through a collection
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection.create(self.testsite, "testcoll", {})
+        Collection.flush_all_caches()
+        return
+
+    def tearDown(self):
+        resetSitedata(scope="collections")
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def test_view_cache(self):
+        self.assertIsNone(self.testcoll.get_view("testview"))
+        site_view_ids = [ v.get_id() for v in self.testcoll.views() ]
+        self.assertIn("Default_view", site_view_ids)
+        self.assertEqual(list(self.testcoll.views(altscope=None)), [])
+        # Create view
+        self.testcoll.add_view("testview", recordview_create_values(view_id="testview"))
+        v1 = self.testcoll.get_view("testview")
+        self.assertEqual(v1[RDFS.CURIE.label], "RecordView testcoll/testview")
+        self.assertEqual(
+            [ v.get_id() for v in self.testcoll.views(altscope=None) ], ["testview"]
+            )
+        self.assertEqual(
+            [ v.get_id() for v in self.testcoll.views() ], site_view_ids+["testview"]
+            )
+        # Update view
+        RecordView.create(self.testcoll, "testview",
+            recordview_create_values(view_id="testview", update="Updated RecordView")
+            )
+        v2 = self.testcoll.get_view("testview")
+        self.assertEqual(v2[RDFS.CURIE.label], "Updated RecordView testcoll/testview")
+        # Values of entities returned from cache are not shared with the cache
+        v2[RDFS.CURIE.label] = "Modified label"
+        v3 = self.testcoll.get_view("testview")
+        self.assertEqual(v3[RDFS.CURIE.label], "Updated RecordView testcoll/testview")
+        # Remove view
+        self.testcoll.remove_view("testview")
+        self.assertIsNone(self.testcoll.get_view("testview"))
+        self.assertEqual(list(self.testcoll.views(altscope=None)), [])
+        return
+
+    def test_list_cache(self):
+        self.assertIsNone(self.testcoll.get_list("testlist"))
+        site_list_ids = [ l.get_id() for l in self.testcoll.lists() ]
+        self.assertIn("Default_list", site_list_ids)
+        # Create list
+        self.testcoll.add_list("testlist", recordlist_create_values(list_id="testlist"))
+        l1 = self.testcoll.get_list("testlist")
+        self.assertEqual(l1[RDFS.CURIE.label], "RecordList testcoll/testlist")
+        self.assertEqual(
+            [ l.get_id() for l in self.testcoll.lists(altscope=None) ], ["testlist"]
+            )
+        self.testcoll.set_default_list("testlist")
+        self.assertEqual(self.testcoll.get_default_list(), "testlist")
+        # Update list
+        RecordList.create(self.testcoll, "testlist",
+            recordlist_create_values(list_id="testlist", update="Updated RecordList")
+            )
+        l2 = self.testcoll.get_list("testlist")
+        self.assertEqual(l2[RDFS.CURIE.label], "Updated RecordList testcoll/testlist")
+        # Remove list
+        self.testcoll.remove_list("testlist")
+        self.assertIsNone(self.testcoll.get_list("testlist"))
+        self.assertIsNone(self.testcoll.get_default_list())
+        self.assertEqual(list(self.testcoll.lists(altscope=None)), [])
+        return
+
+    def test_group_cache(self):
+        self.assertEqual(list(self.testcoll.groups(altscope=None)), [])
+        group_values = (
+            { ANNAL.CURIE.type_id:          layout.GROUP_TYPEID
+            , RDFS.CURIE.label:             "Test group"
+            , ANNAL.CURIE.group_fields:     []
+            })
+        RecordGroup_migration.create(self.testcoll, "testgroup", group_values)
+        g1 = self.testcoll.cache_get_group("testgroup")
+        self.assertEqual(g1[RDFS.CURIE.label], "Test group")
+        self.assertEqual(
+            [ g.get_id() for g in self.testcoll.groups(altscope=None) ], ["testgroup"]
+            )
+        RecordGroup_migration.remove(self.testcoll, "testgroup")
+        self.assertIsNone(self.testcoll.cache_get_group("testgroup"))
+        self.assertEqual(list(self.testcoll.groups(altscope=None)), [])
+        return
+
+    def test_view_cache_watched_changes(self):
+        self.testcoll.add_view("testview", recordview_create_values(view_id="testview"))
+        self.assertEqual(
+            self.testcoll.get_view("testview")[RDFS.CURIE.label],
+            "RecordView testcoll/testview"
+            )
+        # Update view definition directly (as if by another process)
+        view_file = os.path.join(
+            self.testcoll._entitydir, layout.COLL_VIEW_PATH%{'id': "testview"},
+            layout.VIEW_META_FILE
+            )
+        with open(view_file, "rt") as f:
+            values = json.load(f)
+        values[RDFS.CURIE.label] = "Updated view label"
+        with open(view_file, "wt") as f:
+            json.dump(values, f)
+        self.assertEqual(
+            self.testcoll.get_view("testview")[RDFS.CURIE.label],
+            "RecordView testcoll/testview"
+            )
+        # View cache flushed; list cache retained
+        self.assertIsNotNone(self.testcoll.get_list("Default_list"))
+        Collection.flush_watched_changes(os.path.normpath(TestBaseDir), [view_file])
+        self.assertEqual(
+            self.testcoll.get_view("testview")[RDFS.CURIE.label], "Updated view label"
+            )
+        self.assertTrue(list_cache.flush_cache(self.testcoll))
+        return
+
+# End.
@@ -0,0 +1,191 @@
+"""
+Tests for derived resource cache.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import time
+import shutil
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf                    import settings
+from django.test.utils              import override_settings
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from tests                          import TestBaseUri, TestBaseDir
+from entity_testentitydata          import entitydata_create_values
+
+from annalist                             import layout
+
+import annalist.models.entityresourceaccess
+import annalist.models.derivedresourcecache
+from annalist.models.entityresourceaccess import turtle_resource_file
+from annalist.models.site                 import Site
+from annalist.models.collection           import Collection
+from annalist.models.recordtypedata       import RecordTypeData
+from annalist.models.entitydata           import EntityData
+from annalist.models.derivedresourcecache import (
+    derived_resource_path, derived_resource_cache_dir, derived_resource_files,
+    update_cache_size, get_derived_resource, save_derived_resource
+    )
+
+#   -----------------------------------------------------------------------------
+#
+#   Derived resource cache tests
+#
+#   -----------------------------------------------------------------------------
+
+class NoGraph(object):
+    """
+    Stand-in for rdflib Graph, used to check that cached Turtle data is returned.
+    """
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("Turtle data not returned from cache")
+
+class DerivedResourceCacheTest(AnnalistTestCase):
+    """
+    Tests for derived resource cache
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        shutil.rmtree(derived_resource_cache_dir(), ignore_errors=True)
+        self.jsondata = (
+            { "@id":                        "http://example.com/entity1"
+            , "http://example.com/label":   "Entity 1"
+            })
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def turtle_data(self, jsondata, context_version):
+        resource_info = (
+            { "resource_name":      "entity_data.ttl"
+            , "context_version":    context_version
+            })
+        f = turtle_resource_file("http://example.com/", jsondata, resource_info)
+        try:
+            return f.read()
+        finally:
+            f.close()
+
+    def test_save_get_derived_resource(self):
+        save_derived_resource("test:resource", "version1", "data1\nmore data")
+        self.assertEqual(get_derived_resource("test:resource", "version1"), "data1\nmore data")
+        self.assertIsNone(get_derived_resource("test:resource", "version2"))
+        self.assertIsNone(get_derived_resource("test:other", "version1"))
+        save_derived_resource("test:resource", "version2", "data2")
+        self.assertIsNone(get_derived_resource("test:resource", "version1"))
+        self.assertEqual(get_derived_resource("test:resource", "version2"), "data2")
+        with override_settings(ANNALIST_DERIVED_RESOURCE_CACHE=False):
+            self.assertIsNone(get_derived_resource("test:resource", "version2"))
+        return
+
+    def test_evict_derived_resources(self):
+        def set_used(resource_id, t):
+            os.utime(derived_resource_path(resource_id), (t, t))
+            return
+        t = time.time()
+        for i in range(4):
+            save_derived_resource("test:resource%d"%i, "version1", "x"*100)
+            set_used("test:resource%d"%i, t-100+i)
+        # Reading a resource marks it as recently used
+        self.assertEqual(get_derived_resource("test:resource0", "version1"), "x"*100)
+        # Least recently used resources are removed when the size limit is exceeded,
+        # until the cache is within a fraction of that limit
+        with override_settings(ANNALIST_DERIVED_RESOURCE_CACHE_SIZE=400):
+            save_derived_resource("test:resource4", "version1", "x"*100)
+        self.assertEqual(get_derived_resource("test:resource0", "version1"), "x"*100)
+        self.assertIsNone(get_derived_resource("test:resource1", "version1"))
+        self.assertIsNone(get_derived_resource("test:resource2", "version1"))
+        self.assertEqual(get_derived_resource("test:resource3", "version1"), "x"*100)
+        self.assertEqual(get_derived_resource("test:resource4", "version1"), "x"*100)
+        return
+
+    def test_derived_resource_cache_size(self):
+        def cache_files_size():
+            return sum( size for (mtime, size, path) in derived_resource_files(cache_dir) )
+        cache_dir = derived_resource_cache_dir()
+        save_derived_resource("test:resource", "version1", "x"*100)
+        self.assertEqual(update_cache_size(0, 1000000), cache_files_size())
+        # Cache files are not scanned when the recorded size is within the limit
+        evict_derived_resources = annalist.models.derivedresourcecache.evict_derived_resources
+        def no_evict(max_size):
+            raise AssertionError("Unexpected derived resource eviction")
+        try:
+            annalist.models.derivedresourcecache.evict_derived_resources = no_evict
+            save_derived_resource("test:resource", "version2", "x"*200)
+            save_derived_resource("test:other",    "version1", "x"*300)
+        finally:
+            annalist.models.derivedresourcecache.evict_derived_resources = evict_derived_resources
+        self.assertEqual(update_cache_size(0, 1000000), cache_files_size())
+        # Recorded size is recalculated if missing
+        os.remove(os.path.join(cache_dir, layout.SITE_CACHE_SIZE_FILE))
+        self.assertEqual(update_cache_size(0, 1000000), cache_files_size())
+        # Recorded size is reduced when resources are removed
+        testsite = Site(TestBaseUri, TestBaseDir)
+        testcoll = Collection.create(testsite, "testcoll", {})
+        save_derived_resource("test:resource", "version1", "x"*400, resource_dir=testcoll._entitydir)
+        self.assertEqual(update_cache_size(0, 1000000), cache_files_size())
+        testsite.remove_collection("testcoll")
+        self.assertEqual(update_cache_size(0, 1000000), cache_files_size())
+        return
+
+    def test_derived_resources_removed(self):
+        testsite = Site(TestBaseUri, TestBaseDir)
+        testcoll = Collection.create(testsite, "testcoll", {})
+        testdata = RecordTypeData.create(testcoll, "testtype", {})
+        entity1  = EntityData.create(testdata, "entity1", entitydata_create_values("entity1"))
+        entity2  = EntityData.create(testdata, "entity2", entitydata_create_values("entity2"))
+        for e in (testcoll, entity1, entity2):
+            save_derived_resource("test:resource", "version1", e.get_id(), resource_dir=e._entitydir)
+        # Removing an entity removes resources derived from it
+        EntityData.remove(testdata, "entity1")
+        self.assertIsNone(
+            get_derived_resource("test:resource", "version1", resource_dir=entity1._entitydir)
+            )
+        self.assertEqual(
+            get_derived_resource("test:resource", "version1", resource_dir=entity2._entitydir), 
+            "entity2"
+            )
+        # Removing a collection removes all resources derived from its data
+        testsite.remove_collection("testcoll")
+        for e in (testcoll, entity2):
+            self.assertIsNone(
+                get_derived_resource("test:resource", "version1", resource_dir=e._entitydir)
+                )
+        return
+
+    def test_turtle_resource_cached(self):
+        turtle1 = self.turtle_data(self.jsondata, (1.0, 100))
+        self.assertIn("Entity 1", turtle1)
+        saved_graph = annalist.models.entityresourceaccess.Graph
+        try:
+            annalist.models.entityresourceaccess.Graph = NoGraph
+            # Unchanged data and context version: cached result returned
+            self.assertEqual(self.turtle_data(self.jsondata, (1.0, 100)), turtle1)
+            # Changed context version or data: Turtle data regenerated
+            with self.assertRaises(AssertionError):
+                self.turtle_data(self.jsondata, (2.0, 100))
+            with self.assertRaises(AssertionError):
+                self.turtle_data(dict(self.jsondata, **{"http://example.com/label": "Entity 2"}), (1.0, 100))
+            # No context version: Turtle data not cached
+            with self.assertRaises(AssertionError):
+                self.turtle_data(self.jsondata, None)
+        finally:
+            annalist.models.entityresourceaccess.Graph = saved_graph
+        turtle2 = self.turtle_data(dict(self.jsondata, **{"http://example.com/label": "Entity 2"}), (1.0, 100))
+        self.assertIn("Entity 2", turtle2)
+        return
+
+# End.
@@ -0,0 +1,188 @@
+"""
+Tests for saved field choice lists.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf                    import settings
+from tests                          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testtypedata            import recordtype_create_values
+from entity_testentitydata          import entitydata_create_values
+
+from annalist.identifiers           import RDFS, ANNAL
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtype     import RecordType
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+
+from annalist.views.fields.field_description    import FieldDescription, get_field_choices
+
+#   -----------------------------------------------------------------------------
+#
+#   Field choice cache tests
+#
+#   -----------------------------------------------------------------------------
+
+class EntityChoiceCacheTest(AnnalistTestCase):
+    """
+    Tests for saved field choice lists
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection.create(self.testsite, "testcoll", {})
+        for type_id in ("testtype", "othertype"):
+            RecordType.create(
+                self.testcoll, type_id, recordtype_create_values("testcoll", type_id)
+                )
+        self.testdata  = RecordTypeData.create(self.testcoll, "testtype", {})
+        self.otherdata = RecordTypeData.create(self.testcoll, "othertype", {})
+        for entity_id in ("entity1", "entity2"):
+            EntityData.create(self.testdata, entity_id, entitydata_create_values(entity_id))
+        Collection.flush_all_caches()
+        return
+
+    def tearDown(self):
+        resetSitedata(scope="collections")
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def get_choices(self, selector="ALL", view_context=None, blank_label=None):
+        return get_field_choices(
+            self.testcoll, "testtype", selector,
+            view_context=view_context, blank_label=blank_label
+            )
+
+    def test_choices_saved(self):
+        c1 = self.get_choices()
+        self.assertEqual(list(c1), ["testtype/entity1", "testtype/entity2"])
+        self.assertEqual(c1["testtype/entity1"].label, "Entity testcoll/testtype/entity1")
+        self.assertIs(self.get_choices(), c1)
+        c2 = self.get_choices(blank_label="(none)")
+        self.assertIsNot(c2, c1)
+        self.assertEqual(list(c2), ["", "testtype/entity1", "testtype/entity2"])
+        self.assertIs(self.get_choices(blank_label="(none)"), c2)
+        return
+
+    def test_choices_entity_changes(self):
+        c1 = self.get_choices()
+        # Changes to entities of other types do not affect choices
+        EntityData.create(self.otherdata, "other1", entitydata_create_values("other1"))
+        self.assertIs(self.get_choices(), c1)
+        # Create entity
+        EntityData.create(self.testdata, "entity3", entitydata_create_values("entity3"))
+        c2 = self.get_choices()
+        self.assertEqual(
+            list(c2), ["testtype/entity1", "testtype/entity2", "testtype/entity3"]
+            )
+        # Update entity
+        e1 = EntityData.load(self.testdata, "entity1")
+        e1["rdfs:label"] = "Updated entity 1"
+        e1._save()
+        c3 = self.get_choices()
+        self.assertEqual(c3["testtype/entity1"].label, "Updated entity 1")
+        # Rename entity
+        e4 = EntityData(self.testdata, "entity4")
+        e4._rename_files(e1)
+        c4 = self.get_choices()
+        self.assertEqual(
+            list(c4), ["testtype/entity2", "testtype/entity3", "testtype/entity4"]
+            )
+        # Remove entity
+        EntityData.remove(self.testdata, "entity2")
+        c5 = self.get_choices()
+        self.assertEqual(list(c5), ["testtype/entity3", "testtype/entity4"])
+        return
+
+    def test_choices_context_values(self):
+        selector = "[entity:ref] in view[view:ref]"
+        for (entity_id, ref) in (("entity1", "ref1"), ("entity2", "ref3")):
+            e = EntityData.load(self.testdata, entity_id)
+            e["entity:ref"] = ref
+            e._save()
+        c1 = self.get_choices(selector, view_context={'view': {'view:ref': "ref1"}})
+        self.assertEqual(list(c1), ["testtype/entity1"])
+        c2 = self.get_choices(selector, view_context={'view': {'view:ref': "ref2"}})
+        self.assertEqual(list(c2), [])
+        self.assertIs(
+            self.get_choices(selector, view_context={'view': {'view:ref': "ref1"}}), c1
+            )
+        # Unreferenced context values do not affect choices
+        self.assertIs(
+            self.get_choices(selector,
+                view_context={'view': {'view:ref': "ref1"}, 'entity': {'entity:ref': "ref2"}}
+                ),
+            c1
+            )
+        return
+
+    def test_choices_flushed(self):
+        c1 = self.get_choices()
+        # Type definition changes
+        RecordType.create(
+            self.testcoll, "subtype",
+            recordtype_create_values("testcoll", "subtype", supertype_uris=[])
+            )
+        c2 = self.get_choices()
+        self.assertIsNot(c2, c1)
+        self.assertEqual(list(c2), list(c1))
+        # Collection caches flushed (e.g. following change by another process)
+        self.testcoll.flush_collection_caches()
+        c3 = self.get_choices()
+        self.assertIsNot(c3, c2)
+        self.assertEqual(list(c3), list(c1))
+        return
+
+    def test_field_choice_lazy(self):
+        e2 = EntityData.load(self.testdata, "entity2")
+        e2["entity:ref"] = "ref2"
+        e2._save()
+        EntityData.create(self.otherdata, "other1", entitydata_create_values("other1"))
+        recordfield = (
+            { ANNAL.CURIE.id:                       "testfield"
+            , ANNAL.CURIE.field_render_type:        "Enum_optional"
+            , ANNAL.CURIE.field_ref_type:           "testtype"
+            , ANNAL.CURIE.field_ref_restriction:    "[entity:ref] in view[view:ref]"
+            , ANNAL.CURIE.placeholder:              "(none)"
+            })
+        view_context = {'view': {'view:ref': "ref1"}}
+        test_values = (
+            [ "", "testtype/entity1", "testtype/entity2", "testtype/entity9"
+            , "othertype/other1", "entity1", "testtype/_initial_values"
+            ])
+        fd1 = FieldDescription(self.testcoll, recordfield, view_context=view_context)
+        # View context changes after field description is created
+        view_context['view']['view:ref'] = "ref2"
+        # Choices for individual values are determined without enumerating choices
+        lazy_choices = [ fd1.get_field_choice(v) for v in test_values ]
+        self.assertIsNone(fd1._field_desc['field_choices'])
+        # Same choices as full enumeration
+        fd2 = FieldDescription(
+            self.testcoll, recordfield, view_context={'view': {'view:ref': "ref1"}}
+            )
+        choices = fd2['field_choices']
+        self.assertEqual(list(choices), ["", "testtype/entity1"])
+        self.assertEqual(lazy_choices, [ choices.get(v, None) for v in test_values ])
+        # Saved choices are used when available
+        self.assertIs(fd1.get_field_choice("testtype/entity1"), choices["testtype/entity1"])
+        self.assertIs(fd1['field_choices'], choices)
+        return
+
+# End.
@@ -14,6 +14,7 @@ __copyright__   = "Copyright 2014, G. Klyne"
 __license__     = "MIT (http://opensource.org/licenses/MIT)"
 
 import os
+import json
 import urlparse
 import unittest
 import logging
@@ -196,6 +197,48 @@ class EntityGenericListViewTest(AnnalistTestCase):
         self.assertEqual(len(entity_types_ids), 5)
         return
 
+    def test_enumerate_entities_paged(self):
+        # Test bounded selection of a page of entities matches full sorted list
+        def entity_ids(**kwargs):
+            entity_list = (
+                EntityFinder(self.testcoll, selector="ALL")
+                    .get_entities_sorted(type_id=layout.FIELD_TYPEID, altscope="all",
+                        context={}, search="", **kwargs
+                        )
+                )
+            return [ e.get_id() for e in entity_list ]
+        all_ids = entity_ids()
+        self.assertEqual(entity_ids(limit=10),            all_ids[:10])
+        self.assertEqual(entity_ids(offset=10, limit=10), all_ids[10:20])
+        self.assertEqual(entity_ids(offset=10),           all_ids[10:])
+        self.assertEqual(entity_ids(offset=len(all_ids)-2, limit=10), all_ids[-2:])
+        return
+
+    def test_enumerate_entity_ids_sorted(self):
+        # Test selected entity ids match sorted entities, and that entities are reloaded
+        # from their ids with implied values
+        entity_finder = EntityFinder(self.testcoll, selector="ALL")
+        entity_list = entity_finder.get_entities_sorted(
+            type_id=layout.FIELD_TYPEID, altscope="all", context={}, search="Entity_"
+            )
+        entity_ids = entity_finder.get_entity_ids_sorted(
+            type_id=layout.FIELD_TYPEID, altscope="all", context={}, search="Entity_"
+            )
+        self.assertGreater(len(entity_ids), 0)
+        self.assertEqual(entity_ids, [ (e.get_type_id(), e.get_id()) for e in entity_list ])
+        self.assertEqual(
+            entity_finder.get_entity_ids_sorted(
+                type_id=layout.FIELD_TYPEID, altscope="all", context={}, search="Entity_",
+                offset=1, limit=2
+                ),
+            entity_ids[1:3]
+            )
+        entities = list(entity_finder.iter_entities(entity_ids+[(layout.FIELD_TYPEID, "nosuchentity")]))
+        self.assertEqual(
+            [ e.get_values() for e in entities ], [ e.get_values() for e in entity_list ]
+            )
+        return
+
     def test_get_default_all_list(self):
         # List all entities in current collection
         u = entitydata_list_all_url("testcoll", list_id="Default_list_all") + "?continuation_url=/xyzzy/"
@@ -651,6 +694,101 @@ class EntityGenericListViewTest(AnnalistTestCase):
         check_field_list_context_fields(self, r, field_entities)
         return
 
+    def test_get_fields_list_paged(self):
+        u = entitydata_list_type_url(
+            "testcoll", layout.FIELD_TYPEID, list_id="Field_list", scope="all",
+            query_params={"search": "Coll_", "limit": "3", "offset": "3"}
+            )
+        r = self.client.get(u)
+        self.assertEqual(r.status_code,   200)
+        self.assertEqual(r.reason_phrase, "OK")
+        entities = context_list_entities(r.context)
+        self.assertEqual(
+            [ e['annal:id'] for e in entities ],
+            ["Coll_default_view_id", "Coll_default_view_type", "Coll_parent"]
+            )
+        prev_url = r.context['list_prev_url']
+        next_url = r.context['list_next_url']
+        self.assertEqual(
+            urlparse.parse_qs(urlparse.urlsplit(prev_url).query),
+            {"search": ["Coll_"], "scope": ["all"], "limit": ["3"]}
+            )
+        self.assertEqual(
+            urlparse.parse_qs(urlparse.urlsplit(next_url).query),
+            {"search": ["Coll_"], "scope": ["all"], "limit": ["3"], "offset": ["6"]}
+            )
+        self.assertContains(r, 'title="Show previous page of entities">Previous</a>')
+        self.assertContains(r, 'title="Show next page of entities">Next</a>')
+        # Last page
+        r = self.client.get(next_url)
+        self.assertEqual(r.status_code,   200)
+        entities = context_list_entities(r.context)
+        self.assertEqual([ e['annal:id'] for e in entities ], ["Coll_software_version"])
+        self.assertIsNone(r.context['list_next_url'])
+        self.assertNotContains(r, ">Next</a>")
+        return
+
+    def test_get_list_data_paged(self):
+        list_url = entitydata_list_type_url("testcoll", "testtype", list_id="Default_list")
+        u = list_url + layout.ENTITY_LIST_FILE + "?limit=2"
+        r = self.client.get(u)
+        self.assertEqual(r.status_code,   200)
+        list_data = json.loads("".join(r.streaming_content))
+        self.assertEqual(
+            [ e['annal:id'] for e in list_data['annal:entity_list'] ],
+            ["entity1", "entity2"]
+            )
+        self.assertIn('rel="next"', r['Link'])
+        self.assertNotIn('rel="prev"', r['Link'])
+        u = list_url + layout.ENTITY_LIST_FILE + "?limit=2&offset=2"
+        r = self.client.get(u)
+        self.assertEqual(r.status_code,   200)
+        list_data = json.loads("".join(r.streaming_content))
+        self.assertEqual(
+            [ e['annal:id'] for e in list_data['annal:entity_list'] ],
+            ["entity3"]
+            )
+        self.assertIn('rel="prev"', r['Link'])
+        self.assertNotIn('rel="next"', r['Link'])
+        # No paging parameters: full list
+        r = self.client.get(list_url + layout.ENTITY_LIST_FILE)
+        list_data = json.loads("".join(r.streaming_content))
+        self.assertEqual(len(list_data['annal:entity_list']), 3)
+        return
+
+    def test_get_list_data_stream_error(self):
+        list_url = entitydata_list_type_url("testcoll", "testtype", list_id="Default_list")
+        u = list_url + layout.ENTITY_LIST_FILE
+        strip_context_values = EntityGenericListView.strip_context_values
+        def fail_entity(fail_id):
+            def strip_values(self, listinfo, entity, base_url):
+                if entity.get_id() == fail_id:
+                    raise ValueError("Test error for %s"%fail_id)
+                return strip_context_values(self, listinfo, entity, base_url)
+            return strip_values
+        try:
+            # Error formatting first entity: error response
+            EntityGenericListView.strip_context_values = fail_entity("entity1")
+            with SuppressLogging(logging.ERROR):
+                r = self.client.get(u)
+            self.assertEqual(r.status_code, 500)
+            self.assertContains(r, "Test error for entity1", status_code=500)
+            # Error formatting later entity: response ends with error message
+            EntityGenericListView.strip_context_values = fail_entity("entity2")
+            with SuppressLogging(logging.ERROR):
+                r = self.client.get(u)
+                self.assertEqual(r.status_code, 200)
+                content = "".join(r.streaming_content)
+        finally:
+            EntityGenericListView.strip_context_values = strip_context_values
+        self.assertIn('"annal:id": "entity1"', content)
+        self.assertNotIn('"annal:id": "entity2"', content)
+        self.assertTrue(content.endswith(
+            "*** Error generating response: Test error for entity2 - see server log for details\n"
+            ))
+        self.assertRaises(ValueError, json.loads, content)
+        return
+
     def test_get_list_select_by_type(self):
         u = entitydata_list_type_url("testcoll", layout.FIELD_TYPEID, list_id=None)
         r = self.client.get(u)
@@ -27,6 +27,7 @@ from annalist.models.site           import Site
 from annalist.models.collection     import Collection
 from annalist.models.recordtype     import RecordType
 from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.recordfield    import RecordField
 from annalist.models.entitydata     import EntityData
 
 from annalist.views.uri_builder             import uri_params, uri_with_params, continuation_params_url
@@ -423,6 +424,27 @@ class EntityInheritListViewTest(AnnalistTestCase):
         self.assertEqual(testcoll_alts, ["testcoll", "Annalist_schema", "RDF_schema_defs", "_annalist_site"])
         return
 
+    def test_collection_child_entities_alt_parents(self):
+        # Single-pass enumeration matches per-entity id resolution
+        rdf_coll = install_annalist_named_coll("RDF_schema_defs")
+        ann_coll = install_annalist_named_coll("Annalist_schema")
+        testcoll = create_test_coll_inheriting("Annalist_schema")
+        for scope in (None, "all", "user", "nosite"):
+            expect = []
+            for field_id in testcoll._children(RecordField, altscope=scope):
+                e = RecordField.load(testcoll, field_id, altscope=scope)
+                if e:
+                    expect.append((e.get_id(), e.get_parent().get_id(), e.get_view_url()))
+            found = [ (e.get_id(), e.get_parent().get_id(), e.get_view_url())
+                      for e in testcoll.child_entities(RecordField, altscope=scope)
+                    ]
+            self.assertEqual(found, expect)
+            self.assertEqual(
+                list(testcoll.child_entity_ids(RecordField, altscope=scope)),
+                [ f[0] for f in expect ]
+                )
+        return
+
     def test_get_list_inherited_entities(self):
         rdf_coll = install_annalist_named_coll("RDF_schema_defs")
         ann_coll = install_annalist_named_coll("Annalist_schema")
@@ -0,0 +1,125 @@
+"""
+Tests for entity property value index.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf    import settings
+from tests          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testtypedata            import recordtype_create_values
+from entity_testentitydata          import entitydata_create_values
+
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtype     import RecordType
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+from annalist.models.entityfinder   import EntityFinder, EntitySelector
+from annalist.models.entitypropertyindex import PropertyValueFilter
+
+#   -----------------------------------------------------------------------------
+#
+#   Entity property index tests
+#
+#   -----------------------------------------------------------------------------
+
+class EntityPropertyIndexTest(AnnalistTestCase):
+    """
+    Tests for entity property value index
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection(self.testsite, "testcoll")
+        self.testtype = RecordType.create(
+            self.testcoll, "testtype", recordtype_create_values("testcoll", "testtype")
+            )
+        self.testdata = RecordTypeData.create(self.testcoll, "testtype", {})
+        Collection.flush_all_caches()
+        for i, colour in enumerate(["red", "blue", "red", None]):
+            extra = {"test:colour": colour} if colour else None
+            EntityData.create(self.testdata, "entity%d"%i,
+                entitydata_create_values("entity%d"%i, extra_fields=extra)
+                )
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def find_ids(self, selector, context={}):
+        finder = EntityFinder(self.testcoll, selector=selector)
+        return sorted(
+            e.get_id() for e in finder.get_entities(type_id="testtype", context=context)
+            )
+
+    def test_selector_property_filter(self):
+        f1 = EntitySelector("[test:colour] == 'red'").get_property_filter()
+        self.assertEqual(repr(f1), "PropertyValueFilter('test:colour', ['red'])")
+        f2 = EntitySelector("[test:colour] in view[test:colours]").get_property_filter(
+            {"view": {"test:colours": ["red", "green"]}}
+            )
+        self.assertEqual(repr(f2), "PropertyValueFilter('test:colour', ['green', 'red'])")
+        f3 = EntitySelector("'red' in [test:colour]").get_property_filter()
+        self.assertEqual(repr(f3), "PropertyValueFilter('test:colour', ['red'])")
+        # Selectors that don't compare an entity property with another value
+        self.assertIsNone(EntitySelector("ALL").get_property_filter())
+        self.assertIsNone(EntitySelector("[test:colour] == [test:shade]").get_property_filter())
+        # Value for 'in' not specified: all entities selected
+        self.assertIsNone(EntitySelector("view[test:colour] in [test:colour]").get_property_filter())
+        return
+
+    def test_property_filter_candidates(self):
+        pf = PropertyValueFilter("test:colour", ["red"])
+        def candidate_ids():
+            return sorted(
+                e.get_id() for e in self.testdata.child_entities(EntityData, entity_filter=pf)
+                )
+        # Entities are indexed when first loaded
+        self.assertEqual(candidate_ids(), ["entity0", "entity1", "entity2", "entity3"])
+        # Entities without a value for the property are always candidates
+        self.assertEqual(candidate_ids(), ["entity0", "entity2", "entity3"])
+        # Saved entity updates index
+        e1 = EntityData.load(self.testdata, "entity1")
+        e1["test:colour"] = ["green", "red"]
+        e1._save()
+        self.assertEqual(candidate_ids(), ["entity0", "entity1", "entity2", "entity3"])
+        e0 = EntityData.load(self.testdata, "entity0")
+        e0["test:colour"] = "blue"
+        e0._save()
+        self.assertEqual(candidate_ids(), ["entity1", "entity2", "entity3"])
+        # Removed entity
+        EntityData.remove(self.testdata, "entity2")
+        self.assertEqual(candidate_ids(), ["entity1", "entity3"])
+        return
+
+    def test_entity_finder_selection(self):
+        self.assertEqual(self.find_ids("[test:colour] == 'red'"), ["entity0", "entity2"])
+        self.assertEqual(self.find_ids("'blue' in [test:colour]"), ["entity1"])
+        self.assertEqual(
+            self.find_ids("[test:colour] in view[test:colours]",
+                {"view": {"test:colours": ["blue", "green"]}}
+                ),
+            ["entity1", "entity3"]
+            )
+        e2 = EntityData.load(self.testdata, "entity2")
+        e2["test:colour"] = "blue"
+        e2._save()
+        self.assertEqual(self.find_ids("[test:colour] == 'red'"), ["entity0"])
+        self.assertEqual(self.find_ids("'blue' in [test:colour]"), ["entity1", "entity2"])
+        return
+
+# End.
@@ -0,0 +1,171 @@
+"""
+Tests for entity search index.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf    import settings
+from tests          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testtypedata            import recordtype_create_values
+from entity_testentitydata          import entitydata_create_values
+
+from annalist                       import layout
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtype     import RecordType
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+from annalist.models.entityfinder   import EntityFinder
+from annalist.models.collectiondata import rebuild_coll_search_index
+from annalist.models.entitysearchindex import (
+    CollectionSearchIndex, SearchTermFilter,
+    entity_search_index, flush_search_index, read_search_index_snapshot
+    )
+
+#   -----------------------------------------------------------------------------
+#
+#   Entity search index tests
+#
+#   -----------------------------------------------------------------------------
+
+class EntitySearchIndexTest(AnnalistTestCase):
+    """
+    Tests for entity search index
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection(self.testsite, "testcoll")
+        self.testtype = RecordType.create(
+            self.testcoll, "testtype", recordtype_create_values("testcoll", "testtype")
+            )
+        self.testdata = RecordTypeData.create(self.testcoll, "testtype", {})
+        Collection.flush_all_caches()
+        for i, colour in enumerate(["red car", "blue-green", "dark red", None]):
+            extra = {"test:colour": colour} if colour else None
+            EntityData.create(self.testdata, "entity%d"%i,
+                entitydata_create_values("entity%d"%i, extra_fields=extra)
+                )
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def find_ids(self, search):
+        finder = EntityFinder(self.testcoll)
+        return sorted(
+            e.get_id() for e in finder.get_entities(type_id="testtype", search=search)
+            )
+
+    def candidate_ids(self, search):
+        sf = SearchTermFilter(search)
+        return sorted(
+            e.get_id() for e in self.testdata.child_entities(EntityData, entity_filter=sf)
+            )
+
+    def test_index_candidates(self):
+        index = CollectionSearchIndex("base")
+        index.set_entry("t/e1/entity.jsonld", (1, 1), ["red", "car"])
+        index.set_entry("t/e2/entity.jsonld", (1, 1), ["blue", "green"])
+        index.set_entry("t/e3/entity.jsonld", (1, 1), ["dark", "red"])
+        self.assertEqual(index.candidates(["red"]), {"t/e1/entity.jsonld", "t/e3/entity.jsonld"})
+        self.assertEqual(index.candidates(["re", "ar"]), {"t/e1/entity.jsonld", "t/e3/entity.jsonld"})
+        self.assertEqual(index.candidates(["red", "ca"]), {"t/e1/entity.jsonld"})
+        self.assertEqual(index.candidates(["purple"]), set())
+        self.assertEqual(index.matching_words("ar"), {"car", "dark"})
+        self.assertEqual(index.matching_words("re"), {"red", "green"})
+        self.assertEqual(index.matching_words("z"), set())
+        self.assertEqual(index.get_words("t/e1/entity.jsonld", (1, 1)), {"red", "car"})
+        self.assertIsNone(index.get_words("t/e1/entity.jsonld", (2, 1)))
+        # Update and remove entries
+        index.set_entry("t/e1/entity.jsonld", (2, 1), ["green", "car"])
+        self.assertEqual(index.candidates(["red"]), {"t/e3/entity.jsonld"})
+        index.remove_tree("t/e3")
+        self.assertEqual(index.candidates(["red"]), set())
+        self.assertEqual(index.candidates(["green"]), {"t/e1/entity.jsonld", "t/e2/entity.jsonld"})
+        return
+
+    def test_index_suffixes(self):
+        def all_suffixes(words):
+            return sorted( (w[i:], w) for w in words for i in range(len(w)) )
+        index = CollectionSearchIndex("base")
+        index.set_entry("t/e1/entity.jsonld", (1, 1), ["red", "car"])
+        index.set_entry("t/e2/entity.jsonld", (1, 1), ["card", "red"])
+        self.assertEqual(index._suffixes, all_suffixes(["red", "car", "card"]))
+        self.assertEqual(index.matching_words("ar"), {"car", "card"})
+        index.set_entry("t/e1/entity.jsonld", (2, 1), ["blue"])
+        self.assertEqual(index._suffixes, all_suffixes(["red", "card", "blue"]))
+        self.assertEqual(index.matching_words("ar"), {"card"})
+        index.remove_entry("t/e2/entity.jsonld")
+        self.assertEqual(index._suffixes, all_suffixes(["blue"]))
+        self.assertEqual(index.matching_words("ar"), set())
+        # Load snapshot into existing index
+        index.load_snapshot(
+            { "t/e1/entity.jsonld": [[3, 1], "green car"]
+            , "t/e3/entity.jsonld": [[1, 1], "car dark"]
+            })
+        self.assertEqual(index._suffixes, all_suffixes(["green", "car", "dark"]))
+        self.assertEqual(index.matching_words("ar"), {"car", "dark"})
+        return
+
+    def test_search_candidates(self):
+        # First search indexes entities as they are loaded; second uses index
+        self.assertEqual(self.candidate_ids("red"), ["entity0", "entity1", "entity2", "entity3"])
+        self.assertEqual(self.candidate_ids("red"), ["entity0", "entity2"])
+        self.assertEqual(self.candidate_ids("een"), ["entity1"])
+        # Entity id is included in URL, which is always searched
+        self.assertEqual(self.candidate_ids("entity3"), ["entity3"])
+        # Saved entity updates index
+        e1 = EntityData.load(self.testdata, "entity1")
+        e1["test:colour"] = "reddish"
+        e1._save()
+        self.assertEqual(self.candidate_ids("red"), ["entity0", "entity1", "entity2"])
+        self.assertEqual(self.candidate_ids("een"), [])
+        # Removed entity
+        EntityData.remove(self.testdata, "entity2")
+        self.assertEqual(self.candidate_ids("red"), ["entity0", "entity1"])
+        return
+
+    def test_entity_finder_search(self):
+        self.assertEqual(self.find_ids("red"), ["entity0", "entity2"])
+        self.assertEqual(self.find_ids("red car"), ["entity0"])
+        self.assertEqual(self.find_ids("blue-g"), ["entity1"])
+        self.assertEqual(self.find_ids("red blue"), [])
+        e3 = EntityData.load(self.testdata, "entity3")
+        e3["test:colour"] = "red"
+        e3._save()
+        self.assertEqual(self.find_ids("red"), ["entity0", "entity2", "entity3"])
+        return
+
+    def test_rebuild_search_index(self):
+        count = rebuild_coll_search_index(self.testcoll)
+        self.assertGreaterEqual(count, 4)
+        (coll_dir, coll_meta_file) = self.testcoll._dir_path()
+        snapshot  = read_search_index_snapshot(os.path.normpath(coll_dir))
+        rel_paths = [ p for p in snapshot if p.startswith(os.path.join("testtype", "")) ]
+        self.assertEqual(len(rel_paths), 4)
+        # Index is initialized from snapshot
+        flush_search_index()
+        index = entity_search_index.get_index(os.path.normpath(coll_dir))
+        self.assertEqual(
+            index.candidates(["red"]),
+            { os.path.join("testtype", "entity%d"%i, layout.ENTITY_DATA_FILE) for i in (0, 2) }
+            )
+        self.assertEqual(self.find_ids("red"), ["entity0", "entity2"])
+        return
+
+# End.
@@ -0,0 +1,152 @@
+"""
+Tests for entity storage backends
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf                    import settings
+from django.test                    import TestCase # cf. https://docs.djangoproject.com/en/dev/topics/testing/tools/#assertions
+from django.test.utils              import override_settings
+
+from annalist.identifiers           import RDF, RDFS, ANNAL
+from annalist                       import layout
+from annalist.models.entitystore    import (
+    FileEntityStore, SQLiteEntityStore, get_entity_store
+    )
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+
+from AnnalistTestCase       import AnnalistTestCase
+from tests                  import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+from init_tests             import init_annalist_test_site, init_annalist_test_coll, resetSitedata
+from entity_testentitydata  import (
+    entitydata_dir,
+    entitydata_create_values, entitydata_values
+    )
+
+#   -----------------------------------------------------------------------------
+#
+#   Entity store tests
+#
+#   -----------------------------------------------------------------------------
+
+class EntityStoreTest(AnnalistTestCase):
+    """
+    Tests for entity storage backends
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection(self.testsite, "testcoll")
+        self.testdata = RecordTypeData(self.testcoll, "testtype")
+        self.coll_dir = os.path.join(TestBaseDir, layout.SITE_COLL_PATH%{'id': "testcoll"})
+        self.db_file  = os.path.join(self.coll_dir, layout.COLL_DATABASE_FILE)
+        return
+
+    def tearDown(self):
+        if os.path.isfile(self.db_file):
+            os.remove(self.db_file)
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def test_get_entity_store(self):
+        self.assertIsInstance(get_entity_store(), FileEntityStore)
+        self.assertNotIsInstance(get_entity_store(), SQLiteEntityStore)
+        with override_settings(ANNALIST_ENTITY_STORE="sqlite"):
+            self.assertIsInstance(get_entity_store(), SQLiteEntityStore)
+        return
+
+    def test_sqlite_store_files(self):
+        store = SQLiteEntityStore(TestBaseDir)
+        d     = os.path.join(self.coll_dir, "d/testtype/entity1")
+        p     = os.path.join(d, "entity_data.jsonld")
+        self.assertFalse(store.isdir(d))
+        self.assertFalse(store.isfile(p))
+        self.assertFalse(os.path.isfile(self.db_file))
+        with store.open(p, "wt") as f:
+            f.write('{"test": "value"}')
+        self.assertTrue(os.path.isfile(self.db_file))
+        self.assertFalse(os.path.exists(d))
+        self.assertTrue(store.isdir(d))
+        self.assertTrue(store.isdir(os.path.dirname(d)))
+        self.assertTrue(store.isfile(p))
+        self.assertEqual(store.listdir(os.path.dirname(d)), ["entity1"])
+        self.assertEqual(store.listfiles(d), ["entity_data.jsonld"])
+        with store.open(p, "rt") as f:
+            self.assertEqual(f.read(), '{"test": "value"}')
+        # Copy, rename and remove
+        store.copy_file(p, os.path.join(d, "copy.jsonld"))
+        self.assertEqual(set(store.listfiles(d)), {"entity_data.jsonld", "copy.jsonld"})
+        d2 = os.path.join(self.coll_dir, "d/testtype/entity2")
+        store.rename(d, d2)
+        self.assertFalse(store.isdir(d))
+        self.assertTrue(store.isfile(os.path.join(d2, "entity_data.jsonld")))
+        self.assertEqual(store.listdir(os.path.dirname(d)), ["entity2"])
+        store.remove_tree(d2)
+        self.assertFalse(store.exists(d2))
+        self.assertRaises(IOError, store.open, p, "rt")
+        return
+
+    def test_sqlite_store_connection_reuse(self):
+        store = SQLiteEntityStore(TestBaseDir)
+        p     = os.path.join(self.coll_dir, "d/testtype/entity1/entity_data.jsonld")
+        with store.open(p, "wt") as f:
+            f.write('{"test": "value"}')
+        conn = store._connect(self.coll_dir)
+        self.assertTrue(store.isfile(p))
+        self.assertIs(store._connect(self.coll_dir), conn)
+        # Removing the database file discards the open connection
+        os.remove(self.db_file)
+        self.assertFalse(store.isfile(p))
+        self.assertIsNone(store._connect(self.coll_dir))
+        with store.open(p, "wt") as f:
+            f.write('{"test": "new value"}')
+        self.assertIsNot(store._connect(self.coll_dir), conn)
+        with store.open(p, "rt") as f:
+            self.assertEqual(f.read(), '{"test": "new value"}')
+        return
+
+    def test_sqlite_store_site_data(self):
+        # Site data are stored in files whatever the selected store
+        store     = SQLiteEntityStore(TestBaseDir)
+        site_meta = os.path.join(TestBaseDir, layout.SITEDATA_BASE_DIR, layout.SITEDATA_META_FILE)
+        self.assertTrue(store.isfile(site_meta))
+        self.assertFalse(os.path.isfile(self.db_file))
+        return
+
+    @override_settings(ANNALIST_ENTITY_STORE="sqlite")
+    def test_sqlite_entitydata_create_load(self):
+        e = EntityData.create(self.testdata, "entitydata1", entitydata_create_values("entitydata1"))
+        self.assertEqual(e._entitydir, entitydata_dir(entity_id="entitydata1"))
+        self.assertFalse(os.path.exists(e._entitydir))
+        self.assertTrue(EntityData.exists(self.testdata, "entitydata1"))
+        self.assertIn("entitydata1", list(self.testdata.child_entity_ids(EntityData)))
+        ed = EntityData.load(self.testdata, "entitydata1").get_values()
+        v  = entitydata_values("entitydata1")
+        self.assertKeysMatch(ed, v)
+        self.assertDictionaryMatch(ed, v)
+        # Rename and remove
+        e2 = EntityData(self.testdata, "entitydata2")
+        self.assertEqual(e2._rename_files(e), e2._entitydir)
+        self.assertFalse(EntityData.exists(self.testdata, "entitydata1"))
+        self.assertTrue(EntityData.exists(self.testdata, "entitydata2"))
+        EntityData.remove(self.testdata, "entitydata2")
+        self.assertFalse(EntityData.exists(self.testdata, "entitydata2"))
+        return
+
+# End.
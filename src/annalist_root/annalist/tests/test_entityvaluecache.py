@@ -0,0 +1,130 @@
+"""
+Tests for entity value cache
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf                    import settings
+from django.test                    import TestCase # cf. https://docs.djangoproject.com/en/dev/topics/testing/tools/#assertions
+from django.test.utils              import override_settings
+
+from annalist.identifiers           import RDF, RDFS, ANNAL
+from annalist                       import layout
+from annalist.models.entityvaluecache import (
+    EntityValueCache, get_entity_value_cache
+    )
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+from annalist.models.entitytypeinfo import EntityTypeInfo
+
+from AnnalistTestCase       import AnnalistTestCase
+from tests                  import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+from init_tests             import init_annalist_test_site, init_annalist_test_coll, resetSitedata
+from entity_testentitydata  import entitydata_create_values
+
+#   -----------------------------------------------------------------------------
+#
+#   Entity value cache tests
+#
+#   -----------------------------------------------------------------------------
+
+class EntityValueCacheTest(AnnalistTestCase):
+    """
+    Tests for entity value cache
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection(self.testsite, "testcoll")
+        self.testdata = RecordTypeData(self.testcoll, "testtype")
+        Collection.flush_all_caches()
+        return
+
+    def tearDown(self):
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def test_cache_lru(self):
+        cache = EntityValueCache(30)
+        cache.set_values("/d/e1", (1, 10), {"id": "e1"}, 10)
+        cache.set_values("/d/e2", (1, 10), {"id": "e2"}, 10)
+        cache.set_values("/d/e3", (1, 10), {"id": "e3"}, 10)
+        self.assertEqual(cache.get_size(), 30)
+        self.assertEqual(cache.get_values("/d/e1", (1, 10)), {"id": "e1"})
+        # Least recently used entry is discarded to stay within budget
+        cache.set_values("/d/e4", (1, 15), {"id": "e4"}, 15)
+        self.assertEqual(cache.get_size(), 25)
+        self.assertEqual(cache.get_values("/d/e1", (1, 10)), {"id": "e1"})
+        self.assertEqual(cache.get_values("/d/e2", (1, 10)), None)
+        self.assertEqual(cache.get_values("/d/e3", (1, 10)), None)
+        self.assertEqual(cache.get_values("/d/e4", (1, 15)), {"id": "e4"})
+        # Entries larger than budget are not cached
+        cache.set_values("/d/e5", (1, 40), {"id": "e5"}, 40)
+        self.assertEqual(cache.get_values("/d/e5", (1, 40)), None)
+        self.assertEqual(cache.get_size(), 25)
+        return
+
+    def test_cache_stamp_and_copy(self):
+        cache = EntityValueCache(100)
+        cache.set_values("/d/e1", (1, 10), {"id": "e1", "l": ["a"]}, 10)
+        v = cache.get_values("/d/e1", (1, 10))
+        v["l"].append("b")
+        self.assertEqual(cache.get_values("/d/e1", (1, 10)), {"id": "e1", "l": ["a"]})
+        # Changed stamp discards entry
+        self.assertEqual(cache.get_values("/d/e1", (2, 10)), None)
+        self.assertEqual(cache.get_values("/d/e1", (1, 10)), None)
+        self.assertEqual(cache.get_size(), 0)
+        # Remove entries under directory
+        cache.set_values("/d/e1/body", (1, 10), {"id": "e1"}, 10)
+        cache.set_values("/d/e10/body", (1, 10), {"id": "e10"}, 10)
+        cache.remove_tree("/d/e1")
+        self.assertEqual(cache.get_values("/d/e1/body", (1, 10)), None)
+        self.assertEqual(cache.get_values("/d/e10/body", (1, 10)), {"id": "e10"})
+        return
+
+    def test_entitydata_cached_values(self):
+        cache = get_entity_value_cache()
+        EntityData.create(self.testdata, "entitydata1", entitydata_create_values("entitydata1"))
+        e1 = EntityData.load(self.testdata, "entitydata1")
+        hits = cache.hits
+        e2 = EntityData.load(self.testdata, "entitydata1")
+        self.assertEqual(cache.hits, hits+1)
+        self.assertEqual(e2.get_values(), e1.get_values())
+        # Updates are seen by subsequent loads
+        e2[RDFS.CURIE.label] = "Updated entitydata1"
+        e2._save()
+        e3 = EntityData.load(self.testdata, "entitydata1")
+        self.assertEqual(e3[RDFS.CURIE.label], "Updated entitydata1")
+        # Rename and remove via type information
+        typeinfo = EntityTypeInfo(self.testcoll, "testtype")
+        typeinfo.rename_entity("entitydata2", typeinfo, "entitydata1")
+        self.assertIsNone(EntityData.load(self.testdata, "entitydata1"))
+        self.assertEqual(EntityData.load(self.testdata, "entitydata2")[RDFS.CURIE.label], "Updated entitydata1")
+        typeinfo.remove_entity("entitydata2")
+        self.assertIsNone(EntityData.load(self.testdata, "entitydata2"))
+        return
+
+    @override_settings(ANNALIST_ENTITY_CACHE_SIZE=0)
+    def test_entitydata_cache_disabled(self):
+        self.assertIsNone(get_entity_value_cache())
+        EntityData.create(self.testdata, "entitydata1", entitydata_create_values("entitydata1"))
+        e1 = EntityData.load(self.testdata, "entitydata1")
+        self.assertEqual(e1[ANNAL.CURIE.id], "entitydata1")
+        return
+
+# End.
@@ -0,0 +1,151 @@
+"""
+Tests for compiled form description cache.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf                    import settings
+from tests                          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testviewdata            import recordview_create_values
+from entity_testfielddata           import recordfield_create_values
+
+from annalist                       import layout
+from annalist.identifiers           import RDFS, ANNAL
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordview     import RecordView
+from annalist.models.recordfield    import RecordField
+
+from annalist.views.form_utils.entityvaluemap       import EntityValueMap
+from annalist.views.form_utils.fieldlistvaluemap    import FieldListValueMap
+from annalist.views.form_utils.formdescriptioncache import get_cached_form, flush_form_cache
+
+#   -----------------------------------------------------------------------------
+#
+#   Form description cache tests
+#
+#   -----------------------------------------------------------------------------
+
+class FormDescriptionCacheTest(AnnalistTestCase):
+    """
+    Tests for compiled form descriptions saved between requests
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection.create(self.testsite, "testcoll", {})
+        self.testcoll.add_view("testview", recordview_create_values(view_id="testview"))
+        Collection.flush_all_caches()
+        flush_form_cache()
+        self.form_count = 0
+        return
+
+    def tearDown(self):
+        flush_form_cache()
+        resetSitedata(scope="collections")
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def make_view_form(self):
+        self.form_count += 1
+        view        = self.testcoll.get_view("testview")
+        view_fields = view[ANNAL.CURIE.view_fields]
+        entitymap   = EntityValueMap([])
+        entitymap.add_map_entry(
+            FieldListValueMap('fields', self.testcoll, view_fields, {'view': view})
+            )
+        return entitymap
+
+    def get_view_form(self):
+        return get_cached_form(self.testcoll, ("view", "testview"), self.make_view_form)
+
+    def get_field_descs(self, entitymap):
+        return list(entitymap)[0].get_structure_description()['field_list']
+
+    def test_form_cached(self):
+        f1 = self.get_view_form()
+        f2 = self.get_view_form()
+        self.assertIs(f1, f2)
+        self.assertEqual(self.form_count, 1)
+        # Forms are distinguished by key
+        get_cached_form(self.testcoll, ("list", "testview"), self.make_view_form)
+        self.assertEqual(self.form_count, 2)
+        return
+
+    def test_form_rebuilt_on_view_update(self):
+        f1 = self.get_view_form()
+        self.assertEqual(len(self.get_field_descs(f1)), 4)
+        RecordView.create(self.testcoll, "testview",
+            recordview_create_values(view_id="testview",
+                extra_field="Entity_see_also", extra_field_uri=RDFS.CURIE.seeAlso
+                )
+            )
+        f2 = self.get_view_form()
+        self.assertIsNot(f1, f2)
+        self.assertEqual(self.form_count, 2)
+        self.assertEqual(len(self.get_field_descs(f2)), 5)
+        return
+
+    def test_form_rebuilt_on_field_update(self):
+        f1 = self.get_view_form()
+        RecordField.create(self.testcoll, "testfield", recordfield_create_values(field_id="testfield"))
+        f2 = self.get_view_form()
+        self.assertIsNot(f1, f2)
+        self.assertEqual(self.form_count, 2)
+        return
+
+    def test_form_rebuilt_on_cache_flush(self):
+        f1 = self.get_view_form()
+        self.testcoll.flush_collection_caches()
+        f2 = self.get_view_form()
+        self.assertIsNot(f1, f2)
+        self.assertEqual(self.form_count, 2)
+        return
+
+    def test_bound_form_values_not_shared(self):
+        view  = self.testcoll.get_view("testview")
+        form  = self.get_view_form()
+        b1    = form.bind_view_context({'view': view, 'entity': {}})
+        b2    = form.bind_view_context({'view': view, 'entity': {}})
+        fd    = self.get_field_descs(form)
+        fd1   = self.get_field_descs(b1)
+        fd2   = self.get_field_descs(b2)
+        self.assertEqual(
+            [ f.get_field_id() for f in fd1 ], [ f.get_field_id() for f in fd ]
+            )
+        # Field choices determined for one request are not shared
+        type_fd  = fd[1]
+        type_fd1 = fd1[1]
+        type_fd2 = fd2[1]
+        self.assertEqual(type_fd.get_field_id(), "Entity_type")
+        self.assertIsNot(type_fd1, type_fd)
+        self.assertIsNotNone(type_fd1['field_choices'])
+        self.assertIsNone(type_fd._field_desc['field_choices'])
+        self.assertIsNone(type_fd2._field_desc['field_choices'])
+        # Values set when processing a request are not shared
+        type_fd1['group_list'] = ["group"]
+        self.assertNotIn('group_list', type_fd)
+        self.assertNotIn('group_list', type_fd2)
+        # Field descriptions in value maps are bound along with the field list
+        fieldlistmap = list(b1)[0]
+        row_fds      = [ f for rm in fieldlistmap.fm for f in rm.fd ]
+        self.assertIn(type_fd1, row_fds)
+        return
+
+# End.
@@ -0,0 +1,175 @@
+"""
+Tests for HTTP conditional request handling (ETag, Last-Modified and 304 Not Modified)
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.test.client             import Client
+
+from annalist                       import layout
+from annalist.util                  import make_resource_url
+
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+
+from AnnalistTestCase       import AnnalistTestCase
+from tests                  import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+from init_tests             import init_annalist_test_site, init_annalist_test_coll, resetSitedata
+from entity_testutils       import create_test_user
+from entity_testentitydata  import (
+    entity_url, entity_resource_url, entitydata_list_type_url,
+    entitydata_create_values
+    )
+
+#   -----------------------------------------------------------------------------
+#
+#   HTTP conditional request tests
+#
+#   -----------------------------------------------------------------------------
+
+class HttpConditionalRequestTest(AnnalistTestCase):
+    """
+    Tests for HTTP conditional requests
+    """
+
+    def setUp(self):
+        self.testsite = init_annalist_test_site()
+        self.testcoll = init_annalist_test_coll()
+        self.testdata = RecordTypeData.load(self.testcoll, "testtype")
+        self.testcoll.generate_coll_jsonld_context()
+        create_test_user(self.testcoll, "testuser", "testpassword")
+        self.client = Client(HTTP_HOST=TestHost)
+        loggedin = self.client.login(username="testuser", password="testpassword")
+        self.assertTrue(loggedin)
+        return
+
+    def tearDown(self):
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    #   -----------------------------------------------------------------------------
+    #   Helpers
+    #   -----------------------------------------------------------------------------
+
+    def update_entity1(self, label):
+        e = EntityData.load(self.testdata, "entity1")
+        e["rdfs:label"] = label
+        e._save()
+        return
+
+    def check_conditional_get(self, u, **kwargs):
+        """
+        Check conditional GET requests for an unchanged resource, and return
+        the ETag value.
+        """
+        r = self.client.get(u, **kwargs)
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("ETag", r)
+        self.assertIn("Last-Modified", r)
+        etag = r["ETag"]
+        # Matching ETag
+        r = self.client.get(u, HTTP_IF_NONE_MATCH=etag, **kwargs)
+        self.assertEqual(r.status_code,   304)
+        self.assertEqual(r.reason_phrase, "NOT MODIFIED")
+        self.assertEqual(r["ETag"], etag)
+        self.assertEqual(r.content, "")
+        r = self.client.get(u, HTTP_IF_NONE_MATCH='"other", %s'%etag, **kwargs)
+        self.assertEqual(r.status_code, 304)
+        # Non-matching ETag
+        r = self.client.get(u, HTTP_IF_NONE_MATCH='"other"', **kwargs)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["ETag"], etag)
+        # Modification time (ignored if ETag supplied)
+        last_modified = r["Last-Modified"]
+        r = self.client.get(u, HTTP_IF_MODIFIED_SINCE=last_modified, **kwargs)
+        self.assertEqual(r.status_code, 304)
+        r = self.client.get(u, HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 2015 00:00:00 GMT", **kwargs)
+        self.assertEqual(r.status_code, 200)
+        r = self.client.get(u,
+            HTTP_IF_MODIFIED_SINCE=last_modified, HTTP_IF_NONE_MATCH='"other"', **kwargs
+            )
+        self.assertEqual(r.status_code, 200)
+        return etag
+
+    def check_modified(self, u, etag, **kwargs):
+        """
+        Check that a conditional GET request returns an updated resource.
+        """
+        r = self.client.get(u, HTTP_IF_NONE_MATCH=etag, **kwargs)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r["ETag"], etag)
+        return r
+
+    #   -----------------------------------------------------------------------------
+    #   Tests
+    #   -----------------------------------------------------------------------------
+
+    def test_entity_data_conditional(self):
+        u = TestHostUri + entity_resource_url(
+            coll_id="testcoll", type_id="testtype", entity_id="entity1",
+            resource_ref=layout.ENTITY_DATA_FILE
+            )
+        etag = self.check_conditional_get(u)
+        self.update_entity1("Updated entity 1")
+        r = self.check_modified(u, etag)
+        self.assertIn("Updated entity 1", r.content)
+        return
+
+    def test_entity_turtle_conditional(self):
+        u = TestHostUri + entity_resource_url(
+            coll_id="testcoll", type_id="testtype", entity_id="entity1",
+            resource_ref=layout.ENTITY_DATA_TURTLE
+            )
+        etag = self.check_conditional_get(u)
+        self.update_entity1("Updated entity 1")
+        r = self.check_modified(u, etag)
+        self.assertIn("Updated entity 1", r.content)
+        return
+
+    def test_list_data_conditional(self):
+        list_url = entitydata_list_type_url("testcoll", "testtype")
+        u = make_resource_url(TestHostUri, list_url, layout.ENTITY_LIST_FILE)
+        etag = self.check_conditional_get(u)
+        EntityData.create(self.testdata, "entity9", entitydata_create_values("entity9"))
+        r = self.check_modified(u, etag)
+        self.assertIn("entity9", "".join(r.streaming_content))
+        return
+
+    def test_entity_view_conditional(self):
+        u = entity_url(coll_id="testcoll", type_id="testtype", entity_id="entity1")
+        etag = self.check_conditional_get(u)
+        # Different requested content type
+        r = self.client.get(u, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT="application/ld+json")
+        self.assertEqual(r.status_code, 302)
+        # Rendered view may depend on other entities
+        EntityData.create(self.testdata, "entity9", entitydata_create_values("entity9"))
+        self.check_modified(u, etag)
+        return
+
+    def test_entity_list_conditional(self):
+        u = entitydata_list_type_url("testcoll", "testtype")
+        etag = self.check_conditional_get(u)
+        self.update_entity1("Updated entity 1")
+        r = self.check_modified(u, etag)
+        self.assertIn("Updated entity 1", r.content)
+        # Different user
+        self.client.logout()
+        r = self.client.get(u, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(r.status_code, 304)
+        return
+
+# End.
@@ -0,0 +1,203 @@
+"""
+Tests for compiled field renderers: checks that output is the same as that
+from the corresponding template-based renderers.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import sys
+import os
+import unittest
+import re
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.test.utils                          import override_settings
+
+from annalist.models.site                       import Site
+from annalist.models.collection                 import Collection
+
+from annalist.views.fields.render_fieldvalue    import RenderFieldValue, CompiledRenderFieldValue
+from annalist.views.fields.find_renderers       import (
+    get_field_base_renderer, get_edit_renderer, get_view_renderer
+    )
+from annalist.views.form_utils.fieldchoice      import FieldChoice
+
+from annalist.tests.tests                       import TestBaseUri, TestBaseDir
+from annalist.tests.init_tests                  import init_annalist_test_site, init_annalist_test_coll
+from annalist.tests.field_rendering_support     import FieldRendererTestSupport
+
+#   ---- support values ----
+
+render_modes = (
+    [ "label", "view", "edit"
+    , "label_view", "label_edit"
+    , "col_head", "col_head_view", "col_head_edit"
+    , "col_view", "col_edit"
+    ])
+
+text_values = (
+    [ "text value"
+    , "<b>text & \"quoted\" 'value'</b>"
+    , u"unicode \u00e9\u00e8 value"
+    , ""
+    , None
+    ])
+
+#   ---- test class ----
+
+class CompiledRenderingTest(FieldRendererTestSupport):
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    def _make_compiled_test_context(self, val, tooltip=None, **kwargs):
+        context = self._make_test_context(val, **kwargs)
+        context['field']['entity_link']         = "/testsite/c/testcoll/d/testtype/<entity>/"
+        context['field']['continuation_param']  = "?continuation_url=/test&cont"
+        if tooltip is not None:
+            context['field']['field_tooltip_attr'] = tooltip
+        return context
+
+    def _check_compiled_renderer_results(self, render_type, contexts):
+        template_renderer = get_field_base_renderer(render_type, compiled=False)
+        compiled_renderer = get_field_base_renderer(render_type, compiled=True)
+        self.assertNotIsInstance(template_renderer, CompiledRenderFieldValue)
+        self.assertIsInstance(compiled_renderer, CompiledRenderFieldValue)
+        for context in contexts:
+            for mode in render_modes:
+                expect_render = getattr(template_renderer, mode)().render(context)
+                compiled_render = getattr(compiled_renderer, mode)().render(context)
+                if compiled_render != expect_render:
+                    log.info("render_type %s, mode %s"%(render_type, mode))
+                    log.info("expect   %r"%(expect_render,))
+                    log.info("compiled %r"%(compiled_render,))
+                self.assertEqual(compiled_render, expect_render)
+        return
+
+    def _make_select_test_contexts(self, choices):
+        contexts = []
+        for val in [ "opt_type/aa", "opt_type/<bb>", "opt_type/dd", "", None ]:
+            options = (
+                [ FieldChoice("",               label="(no selection)")
+                , FieldChoice("opt_type/aa",    label="label aa",       link="http://example.org/aa")
+                , FieldChoice("opt_type/<bb>",  label="label <bb> & co", link="http://example.org/<bb>")
+                , FieldChoice("opt_type/cc",    label="label cc",       choice_value=True)
+                , FieldChoice("opt_type/cc",    label="label cc",       choice_value=True)
+                ])
+            contexts.append(
+                self._make_compiled_test_context(val,
+                    field_ref_type="ref_type", options=options[choices:]
+                    )
+                )
+        return contexts
+
+    def test_compiled_renderer_selected(self):
+        self.assertIsInstance(get_field_base_renderer("Text", compiled=True), CompiledRenderFieldValue)
+        self.assertNotIsInstance(get_field_base_renderer("Text", compiled=False), CompiledRenderFieldValue)
+        with override_settings(ANNALIST_COMPILED_RENDERERS=True):
+            self.assertIsInstance(get_field_base_renderer("Enum"), CompiledRenderFieldValue)
+        with override_settings(ANNALIST_COMPILED_RENDERERS=False):
+            self.assertNotIsInstance(get_field_base_renderer("Enum"), CompiledRenderFieldValue)
+        # Render types without compiled renderers use the template-based renderer
+        self.assertNotIsInstance(get_field_base_renderer("CheckBox", compiled=True), CompiledRenderFieldValue)
+        self.assertIsInstance(get_field_base_renderer("CheckBox", compiled=True), RenderFieldValue)
+        return
+
+    def test_compiled_text(self):
+        contexts = (
+            [ self._make_compiled_test_context(val) for val in text_values ] +
+            [ self._make_compiled_test_context("tooltip", tooltip=' title="a &amp; b"')
+            , self._make_compiled_test_context("prefix", repeat_prefix="<prefix>_")
+            ])
+        self._check_compiled_renderer_results("Text", contexts)
+        self._check_compiled_renderer_results("Showtext", contexts)
+        return
+
+    def test_compiled_entityid(self):
+        contexts = [ self._make_compiled_test_context(val) for val in text_values ]
+        self._check_compiled_renderer_results("EntityId", contexts)
+        return
+
+    def test_compiled_markdown(self):
+        contexts = (
+            [ self._make_compiled_test_context("*markdown* <value> & more")
+            , self._make_compiled_test_context("")
+            , self._make_compiled_test_context(None)
+            ])
+        self._check_compiled_renderer_results("Markdown", contexts)
+        self._check_compiled_renderer_results("ShowMarkdown", contexts)
+        return
+
+    def test_compiled_uri_link(self):
+        init_annalist_test_site()
+        init_annalist_test_coll()
+        testsite = Site(TestBaseUri, TestBaseDir)
+        testcoll = Collection(testsite, "testcoll")
+        contexts = (
+            [ self._make_compiled_test_context(val, coll=testcoll)
+              for val in
+                [ "http://example.com/path?a=1&b=2"
+                , "mailto:user@example.com"
+                , "relative/<path>"
+                , ""
+                ]
+            ])
+        self._check_compiled_renderer_results("URILink", contexts)
+        return
+
+    def test_compiled_select(self):
+        for choices in (0, 1):
+            contexts = self._make_select_test_contexts(choices)
+            self._check_compiled_renderer_results("Enum", contexts)
+            self._check_compiled_renderer_results("Enum_choice", contexts)
+            self._check_compiled_renderer_results("EntityTypeId", contexts)
+        return
+
+    def test_compiled_select_no_value(self):
+        # Empty and missing values are displayed as no selection
+        for choices in (0, 1):
+            for context in self._make_select_test_contexts(choices)[3:]:
+                for compiled in (False, True):
+                    for (render_type, template_name) in (
+                            [ ("Enum",          "view_select")
+                            , ("Enum_choice",   "view_choice")
+                            , ("EntityTypeId",  "view_entitytype")
+                            ]):
+                        renderer = get_field_base_renderer(render_type, compiled=compiled)
+                        self.assertEqual(
+                            renderer.view().render(context),
+                            '<div class="view-value small-12 columns">\n'
+                            '  <!-- fields.render_select.%s -->\n'
+                            '    \n'
+                            '    <span class="value-blank">(No \'test label\' selected)</span>\n'
+                            '    \n'
+                            '    \n'
+                            '</div>'%(template_name,)
+                            )
+                        self.assertIn(
+                            '<option value="" selected="selected">',
+                            renderer.edit().render(context)
+                            )
+        return
+
+    def test_compiled_entityref_edit(self):
+        # Edit renderers for fields that refer to an entity are selected by value mode
+        context = self._make_select_test_contexts(0)[0]
+        with override_settings(ANNALIST_COMPILED_RENDERERS=False):
+            expect_edit = get_edit_renderer("Text", "Value_entity").render(context)
+            expect_view = get_view_renderer("Text", "Value_entity").render(context)
+        with override_settings(ANNALIST_COMPILED_RENDERERS=True):
+            compiled_edit = get_edit_renderer("Text", "Value_entity").render(context)
+            compiled_view = get_view_renderer("Text", "Value_entity").render(context)
+        self.assertEqual(compiled_edit, expect_edit)
+        self.assertEqual(compiled_view, expect_view)
+        return
+
+# End.
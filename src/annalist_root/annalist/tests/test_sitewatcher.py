@@ -0,0 +1,258 @@
+"""
+Tests for site data change watcher.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import os
+import json
+import time
+import threading
+import unittest
+
+import logging
+log = logging.getLogger(__name__)
+
+from django.conf                    import settings
+from django.test.utils              import override_settings
+from tests                          import TestHost, TestHostUri, TestBasePath, TestBaseUri, TestBaseDir
+
+from AnnalistTestCase               import AnnalistTestCase
+from init_tests                     import init_annalist_test_site, resetSitedata
+from entity_testtypedata            import recordtype_create_values
+from entity_testentitydata          import entitydata_create_values
+from entity_testutils               import collection_create_values
+
+from annalist                       import layout
+import annalist.models.recordtypedata
+from annalist.models.site           import Site
+from annalist.models.collection     import Collection, field_cache
+from annalist.models.recordtype     import RecordType
+from annalist.models.recordtypedata import RecordTypeData
+from annalist.models.entitydata     import EntityData
+from annalist.models.collectionversion  import update_version, collection_version_dir
+from annalist.models.sitewatcher    import (
+    PollingSiteWatcher, InotifySiteWatcher, pyinotify,
+    get_site_watcher, stop_site_watchers
+    )
+
+#   -----------------------------------------------------------------------------
+#
+#   Site change watcher tests
+#
+#   -----------------------------------------------------------------------------
+
+class SiteWatcherTest(AnnalistTestCase):
+    """
+    Tests for site data change watcher
+    """
+
+    def setUp(self):
+        init_annalist_test_site()
+        self.testsite = Site(TestBaseUri, TestBaseDir)
+        self.testcoll = Collection.create(self.testsite, "testcoll", {})
+        self.testtype = RecordType.create(
+            self.testcoll, "testtype", recordtype_create_values("testcoll", "testtype")
+            )
+        self.testdata = RecordTypeData.create(self.testcoll, "testtype", {})
+        self.site_dir = os.path.normpath(TestBaseDir)
+        self.type_file = os.path.join(
+            self.testcoll._entitydir, layout.COLL_TYPE_PATH%{'id': "testtype"},
+            layout.TYPE_META_FILE
+            )
+        Collection.flush_all_caches()
+        return
+
+    def tearDown(self):
+        stop_site_watchers()
+        return
+
+    @classmethod
+    def tearDownClass(cls):
+        resetSitedata(scope="collections")
+        return
+
+    def update_type_file(self, label):
+        """
+        Update type definition directly (as if by another process)
+        """
+        with open(self.type_file, "rt") as f:
+            values = json.load(f)
+        values["rdfs:label"] = label
+        with open(self.type_file, "wt") as f:
+            json.dump(values, f)
+        return
+
+    def get_type_label(self):
+        coll = Collection.load_cached(self.testsite, "testcoll")
+        return coll.get_type("testtype")["rdfs:label"]
+
+    def check_watcher(self, watcher, poll):
+        self.assertEqual(watcher.take_changes(), [])
+        EntityData.create(self.testdata, "entity1", entitydata_create_values("entity1"))
+        self.update_type_file("Updated type label")
+        changes = []
+        for i in range(100):
+            poll()
+            changes += watcher.take_changes()
+            if os.path.normpath(self.type_file) in changes:
+                break
+        self.assertIn(os.path.normpath(self.type_file), changes)
+        return changes
+
+    def test_polling_watcher(self):
+        watcher = PollingSiteWatcher(self.site_dir, 60)
+        changes = self.check_watcher(watcher, watcher.poll)
+        # Entity data files are not checked
+        self.assertEqual(changes, [os.path.normpath(self.type_file)])
+        return
+
+    @unittest.skipUnless(pyinotify, "pyinotify not installed")
+    def test_inotify_watcher(self):
+        watcher = InotifySiteWatcher(self.site_dir)
+        watcher.start()
+        try:
+            self.check_watcher(watcher, lambda: time.sleep(0.05))
+        finally:
+            watcher.stop()
+        return
+
+    def test_inotify_watch_dirs(self):
+        class TestInotifySiteWatcher(InotifySiteWatcher):
+            # Records watched directories, without using inotify
+            def __init__(self, site_dir):
+                super(TestInotifySiteWatcher, self).__init__(site_dir)
+                self.watched = []
+                return
+            def watch_dir(self, d):
+                self.watched.append(os.path.normpath(d))
+                return
+        EntityData.create(self.testdata, "entity1", entitydata_create_values("entity1"))
+        coll_dir  = os.path.normpath(self.testcoll._entitydir)
+        data_dir  = os.path.join(coll_dir, layout.COLL_BASE_DIR)
+        types_dir = os.path.dirname(os.path.dirname(self.type_file))
+        watcher   = TestInotifySiteWatcher(self.site_dir)
+        watcher.add_watches()
+        self.assertIn(os.path.join(self.site_dir, "c"), watcher.watched)
+        self.assertIn(coll_dir, watcher.watched)
+        self.assertIn(data_dir, watcher.watched)
+        self.assertIn(types_dir, watcher.watched)
+        self.assertIn(os.path.dirname(self.type_file), watcher.watched)
+        # Entity data and derived resource cache directories are not watched
+        self.assertNotIn(os.path.join(data_dir, "testtype"), watcher.watched)
+        self.assertNotIn(os.path.join(data_dir, "testtype", "entity1"), watcher.watched)
+        for d in watcher.watched:
+            self.assertFalse(d.startswith(os.path.join(self.site_dir, layout.SITE_CACHE_DIR)))
+        # New configuration entity directory is watched when created
+        watcher.watched = []
+        RecordType.create(self.testcoll, "newtype", recordtype_create_values("testcoll", "newtype"))
+        newtype_dir = os.path.join(types_dir, "newtype")
+        watcher.process_event(newtype_dir, True)
+        self.assertEqual(watcher.watched, [newtype_dir])
+        # New entity data directory is not watched, but its creation is reported
+        watcher.watched = []
+        EntityData.create(self.testdata, "entity2", entitydata_create_values("entity2"))
+        entity_dir = os.path.join(data_dir, "testtype", "entity2")
+        watcher.process_event(entity_dir, True)
+        self.assertEqual(watcher.watched, [])
+        self.assertEqual(watcher.take_changes(), [newtype_dir, entity_dir])
+        return
+
+    def test_flush_watched_changes(self):
+        original_label = self.testtype["rdfs:label"]
+        self.assertEqual(self.get_type_label(), original_label)
+        self.assertIn("Entity_id", self.testcoll.cache_get_all_field_ids(altscope="all"))
+        self.update_type_file("Updated type label")
+        self.assertEqual(self.get_type_label(), original_label)
+        # Type cache flushed; field cache retained
+        Collection.flush_watched_changes(self.site_dir, [self.type_file])
+        self.assertEqual(self.get_type_label(), "Updated type label")
+        self.assertTrue(field_cache.flush_cache(self.testcoll))
+        # Changes to other files ignored
+        self.update_type_file("Ignored type label")
+        Collection.flush_watched_changes(self.site_dir,
+            [ os.path.join(self.testcoll._entitydir, layout.COLL_VERSION_FILE)
+            , os.path.join(self.site_dir, layout.SITE_META_FILE)
+            ])
+        self.assertEqual(self.get_type_label(), "Updated type label")
+        # Collection metadata change flushes all collection caches
+        Collection.flush_watched_changes(self.site_dir,
+            [ os.path.join(self.testcoll._entitydir, layout.COLL_META_REF) ]
+            )
+        self.assertEqual(self.get_type_label(), "Ignored type label")
+        return
+
+    def test_watched_alt_parents_changed(self):
+        altcoll = Collection.create(self.testsite, "altcoll", collection_create_values("altcoll"))
+        altcoll.set_alt_entities(self.testcoll)
+        altcoll._save()
+        def inherited_entity_ids(type_id):
+            coll     = Collection.load_cached(self.testsite, "altcoll")
+            typedata = RecordTypeData(coll, type_id)
+            return [ e.get_id() for e in typedata.child_entities(EntityData, altscope="all") ]
+        def create_type_data(type_id):
+            # Create type data in inherited collection, as if by another process
+            invalidate_alt_parents = annalist.models.recordtypedata.invalidate_alt_parents
+            try:
+                annalist.models.recordtypedata.invalidate_alt_parents = lambda: None
+                newdata = RecordTypeData.create(self.testcoll, type_id, {})
+                EntityData.create(newdata, "entity1", entitydata_create_values("entity1"))
+            finally:
+                annalist.models.recordtypedata.invalidate_alt_parents = invalidate_alt_parents
+            return newdata
+        with override_settings(
+                ANNALIST_SITE_WATCHER=True, ANNALIST_SITE_WATCHER_POLL_INTERVAL=60
+                ):
+            # Changed collection counter discards alternative parent lists
+            self.assertEqual(inherited_entity_ids("newtype1"), [])
+            create_type_data("newtype1")
+            update_version(collection_version_dir(self.testcoll._entitydir), 1)
+            self.assertEqual(inherited_entity_ids("newtype1"), ["entity1"])
+            # Reported type data directory discards alternative parent lists
+            self.assertEqual(inherited_entity_ids("newtype2"), [])
+            newdata = create_type_data("newtype2")
+            self.assertEqual(inherited_entity_ids("newtype2"), [])
+            Collection.flush_watched_changes(self.site_dir, [newdata._entitydir])
+            self.assertEqual(inherited_entity_ids("newtype2"), ["entity1"])
+        return
+
+    def test_site_watcher_enabled(self):
+        original_label = self.testtype["rdfs:label"]
+        with override_settings(ANNALIST_SITE_WATCHER=False):
+            self.assertIsNone(get_site_watcher())
+        with override_settings(
+                ANNALIST_SITE_WATCHER=True, ANNALIST_SITE_WATCHER_POLL_INTERVAL=0.02
+                ):
+            self.assertEqual(self.get_type_label(), original_label)
+            self.assertIsNotNone(get_site_watcher())
+            self.assertIs(get_site_watcher(), get_site_watcher())
+            self.update_type_file("Updated type label")
+            for i in range(100):
+                time.sleep(0.02)
+                label = self.get_type_label()
+                if label != original_label:
+                    break
+            self.assertEqual(label, "Updated type label")
+        return
+
+    def test_site_watcher_concurrent_start(self):
+        watchers = []
+        def get_watcher():
+            watchers.append(get_site_watcher())
+            return
+        with override_settings(
+                ANNALIST_SITE_WATCHER=True, ANNALIST_SITE_WATCHER_POLL_INTERVAL=0.02
+                ):
+            threads = [ threading.Thread(target=get_watcher) for i in range(8) ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(len(watchers), 8)
+            for w in watchers:
+                self.assertIs(w, get_site_watcher())
+        return
+
+# End.
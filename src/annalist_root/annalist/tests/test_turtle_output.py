@@ -7,6 +7,7 @@ __copyright__   = "Copyright 2017, G. Klyne"
 __license__     = "MIT (http://opensource.org/licenses/MIT)"
 
 import os
+import json
 import urlparse
 import unittest
 import traceback
@@ -14,8 +15,11 @@ import logging
 log = logging.getLogger(__name__)
 
 from django.test.client             import Client
+from django.test.utils              import override_settings
 
 from rdflib                         import Graph, URIRef, Literal
+from rdflib.compare                 import isomorphic
+import rdflib_jsonld.context
 
 from utils.SuppressLoggingContext   import SuppressLogging
 
@@ -36,6 +40,10 @@ from annalist.models.annalistuser   import AnnalistUser
 from annalist.models.recordenum     import RecordEnumFactory
 from annalist.models.entitydata     import EntityData
 from annalist.models.entitytypeinfo import EntityTypeInfo
+from annalist.models.entityresourceaccess import (
+    TurtleWriterUnsupported, 
+    get_coll_context, resolve_context_refs, turtle_resource_chunks, turtle_resource_file
+    )
 
 # from annalist.views.form_utils.fieldchoice  import FieldChoice
 
@@ -252,6 +260,42 @@ class TurtleOutputTest(AnnalistTestCase):
         self.assertNotEqual(len(ts), 0, "Triple %r not in graph"%(t,))
         return
 
+    def assertDirectTurtleIsomorphic(self, jsondata, baseurl):
+        """
+        Assert that Turtle written directly from JSON-LD data describes the same
+        graph as the JSON-LD data parsed by rdflib, and return the graph.
+        """
+        g_rdflib = Graph()
+        g_rdflib.parse(data=json.dumps(jsondata), publicID=baseurl, format="json-ld")
+        g_direct = Graph()
+        g_direct.parse(
+            data="".join(turtle_resource_chunks(baseurl, jsondata)), 
+            publicID=baseurl, format="turtle"
+            )
+        self.assertNotEqual(len(g_rdflib), 0)
+        self.assertEqual(len(g_direct), len(g_rdflib))
+        self.assertTrue(isomorphic(g_direct, g_rdflib), "Graphs differ for %s"%(baseurl,))
+        return g_direct
+
+    def get_local_context_data(self, data_url):
+        """
+        Returns JSON-LD data from the supplied URL, with references to the test 
+        collection context replaced by the context data.
+        """
+        r = self.client.get(data_url)
+        self.assertEqual(r.status_code,   200)
+        content  = r.content if not r.streaming else "".join(r.streaming_content)
+        jsondata = json.loads(content)
+        (stamp, context_data) = get_coll_context(self.testcoll)
+        context_docs = (
+            { urlparse.urljoin(data_url, c): context_data 
+              for c in jsondata["@context"] if isinstance(c, basestring)
+            })
+        jsondata = resolve_context_refs(data_url, jsondata, context_docs)
+        for c in jsondata["@context"]:
+            self.assertIsInstance(c, dict)
+        return jsondata
+
     def get_context_mock_dict(self, base_path, context_path="../../"):
         """
         Uses Django test client results to create a dictionary of mock results for 
@@ -573,6 +617,143 @@ class TurtleOutputTest(AnnalistTestCase):
             self.assertIn( (URIRef(s), URIRef(p), o), g)
         return
 
+    @override_settings(ANNALIST_DERIVED_RESOURCE_CACHE=False)
+    def test_http_turtle_local_context(self):
+        """
+        Read entity and list data as Turtle without retrieving the collection 
+        JSON-LD context using HTTP.
+        """
+        def no_fetch(source):
+            raise AssertionError("Context retrieved: %s"%(source,))
+        self.testcoll.generate_coll_jsonld_context()
+        v = entity_url(coll_id="testcoll", type_id="testtype", entity_id="entity1")
+        u = TestHostUri + entity_resource_url(
+            coll_id="testcoll", type_id="testtype", entity_id="entity1",
+            resource_ref=layout.ENTITY_DATA_TURTLE
+            )
+        l = TestHostUri + entitydata_list_type_url("testcoll", "testtype") + layout.ENTITY_LIST_TURTLE
+        saved_source_to_json = rdflib_jsonld.context.source_to_json
+        try:
+            rdflib_jsonld.context.source_to_json = no_fetch
+            r  = self.client.get(u)
+            rl = self.client.get(l)
+        finally:
+            rdflib_jsonld.context.source_to_json = saved_source_to_json
+        self.assertEqual(r.status_code,   200)
+        g = Graph()
+        result = g.parse(data=r.content, publicID=u, format="turtle")
+        subj   = URIRef(TestHostUri + v.rstrip("/"))
+        self.assertIn( (subj, URIRef(ANNAL.URI.id), Literal("entity1")), g)
+        self.assertIn( (subj, URIRef(ANNAL.URI.type), URIRef(ANNAL.URI.EntityData)), g)
+        self.assertEqual(rl.status_code,  200)
+        g = Graph()
+        result = g.parse(data=rl.content, publicID=l, format="turtle")
+        subj   = URIRef(TestHostUri + v)
+        self.assertIn( (subj, URIRef(ANNAL.URI.id), Literal("entity1")), g)
+        return
+
+    def test_direct_turtle_entities(self):
+        """
+        Turtle written directly from entity data describes the same graph as rdflib output.
+        """
+        self.testcoll.generate_coll_jsonld_context()
+        for type_id, entity_id, resource_ref in (
+            [ ("testtype",  "entity1",             layout.ENTITY_DATA_FILE)
+            , ("_type",     "testtype",            layout.TYPE_META_FILE)
+            , ("_type",     "Default_type",        layout.TYPE_META_FILE)
+            , ("_view",     "Default_view",        layout.VIEW_META_FILE)
+            , ("_view",     "Field_view",          layout.VIEW_META_FILE)
+            , ("_list",     "Default_list",        layout.LIST_META_FILE)
+            , ("_field",    "Entity_id",           layout.FIELD_META_FILE)
+            , ("_field",    "Type_aliases",        layout.FIELD_META_FILE)
+            , ("_user",     "_default_user_perms", layout.USER_META_FILE)
+            , ("_vocab",    "annal",               layout.VOCAB_META_FILE)
+            ]):
+            u = TestHostUri + entity_resource_url(
+                coll_id="testcoll", type_id=type_id, entity_id=entity_id,
+                resource_ref=resource_ref
+                )
+            self.assertDirectTurtleIsomorphic(self.get_local_context_data(u), u)
+        return
+
+    def test_direct_turtle_lists(self):
+        """
+        Turtle written directly from entity list data describes the same graph as rdflib output.
+        """
+        self.testcoll.generate_coll_jsonld_context()
+        for list_url in (
+            [ entitydata_list_type_url("testcoll", "testtype")
+            , entitydata_list_type_url("testcoll", "_field", scope="all")
+            , entitydata_list_all_url("testcoll", list_id="Type_list", scope="all")
+            ]):
+            u = make_resource_url(TestHostUri, list_url, layout.ENTITY_LIST_FILE)
+            g = self.assertDirectTurtleIsomorphic(self.get_local_context_data(u), u)
+            (list_head,) = g.objects(predicate=URIRef(ANNAL.URI.entity_list))
+            self.assertNotEqual(len(list(self.scan_rdf_list(g, list_head))), 0)
+        return
+
+    def test_direct_turtle_values(self):
+        """
+        Turtle written directly for JSON-LD value forms not used by the test data.
+        """
+        baseurl  = "http://example.org/base/"
+        context  = (
+            { "ex":         "http://example.org/vocab#"
+            , "ex:list":    { "@container": "@list" }
+            , "ex:ref":     { "@type":      "@id" }
+            , "ex:date":    { "@type":      "ex:Date" }
+            , "ex:lang":    { "@language":  "fr" }
+            })
+        jsondata = (
+            { "@context":       context
+            , "@id":            "e1"
+            , "@type":          ["ex:Type", "http://example.org/other/Type"]
+            , "ex:string":      "Line 1\nLine 2 \"quoted\" \\ \u00e9"
+            , "ex:number":      [0, 42, -7, 1.5, True, False]
+            , "ex:empty":       ""
+            , "ex:null":        None
+            , "ex:list":        ["a", None, {"@id": "e2"}, {"ex:p": "blank in list"}]
+            , "ex:emptylist":   { "@list": [] }
+            , "ex:set":         { "@set": ["s1", "s2"] }
+            , "ex:ref":         ["e2", "ex:e3", "http://example.com/path/a#b", "../up"]
+            , "ex:date":        "2018-01-01"
+            , "ex:lang":        "bonjour"
+            , "ex:value":       [ { "@value": "hello", "@language": "en" }
+                                , { "@value": "5", "@type": "ex:Int" }
+                                , { "@value": None }
+                                ]
+            , "ex:nested":      { "ex:p": { "ex:q": "deeper" }, "ex:r": {} }
+            , "ex:node":        { "@id": "e4", "ex:p": "node value", "ex:q": {"@id": "e5", "ex:p": 1} }
+            , "undefined":      "ignored"
+            , "ex:local.name":  "not a valid prefixed name"
+            })
+        self.assertDirectTurtleIsomorphic(jsondata, baseurl)
+        for unsupported in (
+            { "@context": context, "@id": "_:b1", "ex:p": "blank node id" },
+            { "@context": context, "@id": "e1", "@reverse": { "ex:p": { "@id": "e2" } } },
+            { "@context": context, "@id": "e1", "ex:p": { "@context": {}, "ex:q": "nested context" } },
+            { "@context": [context, "remote_context.jsonld"], "@id": "e1", "ex:p": "remote" },
+            { "@context": context, "@id": "e1", "ex:p": "http://example.org/a b", "ex:q": { "@id": "a b" } },
+            ):
+            with self.assertRaises(TurtleWriterUnsupported):
+                "".join(turtle_resource_chunks(baseurl, unsupported))
+        # Unsupported data is converted using rdflib
+        unsupported = { "@context": context, "@id": "e1", "@reverse": { "ex:p": { "@id": "e2" } } }
+        resource_info = (
+            { "resource_name":      layout.ENTITY_DATA_TURTLE
+            , "context_docs":       {}
+            })
+        g = Graph()
+        g.parse(
+            data=turtle_resource_file(baseurl, unsupported, resource_info).read(),
+            publicID=baseurl, format="turtle"
+            )
+        self.assertIn(
+            ( URIRef(baseurl+"e2"), URIRef("http://example.org/vocab#p"), URIRef(baseurl+"e1") ), 
+            g
+            )
+        return
+
     def test_http_turtle_type_vocab(self):
         """
         Read type data as Turtle, and check resulting RDF triples
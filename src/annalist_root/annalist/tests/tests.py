@@ -21,8 +21,11 @@ from annalist.layout import Layout
 
 import annalist.util
 
+import annalist.views.fields.field_description
 import annalist.views.fields.find_renderers
+import annalist.views.fields.render_fieldvalue
 import annalist.views.fields.render_placement
+import annalist.models.entityresourceaccess
 
 test_layout     = Layout(settings.BASE_DATA_DIR)    # e.g. ".../sampledata/data/"
 TestBaseDir     = test_layout.SITE_PATH             # e.g. ".../sampledata/data/annalist_site"
@@ -45,9 +48,18 @@ def load_tests(loader, tests, ignore):
         tests.addTests(doctest.DocTestSuite(annalist.views.displayinfo))
         tests.addTests(doctest.DocTestSuite(annalist.views.form_utils.fieldchoice))
         tests.addTests(doctest.DocTestSuite(annalist.views.fields.find_renderers))
+        tests.addTests(doctest.DocTestSuite(annalist.views.fields.render_fieldvalue))
         tests.addTests(doctest.DocTestSuite(annalist.views.fields.bound_field))
         tests.addTests(doctest.DocTestSuite(annalist.views.fields.render_placement))
+        tests.addTests(doctest.DocTestSuite(annalist.views.fields.field_description))
         tests.addTests(doctest.DocTestSuite(annalist.models.entityfinder))
+        tests.addTests(doctest.DocTestSuite(annalist.models.entityvaluecache))
+        tests.addTests(doctest.DocTestSuite(annalist.models.entitypropertyindex))
+        tests.addTests(doctest.DocTestSuite(annalist.models.entitysearchindex))
+        tests.addTests(doctest.DocTestSuite(annalist.models.entityresourceaccess))
+        tests.addTests(doctest.DocTestSuite(annalist.models.derivedresourcecache))
+        tests.addTests(doctest.DocTestSuite(annalist.models.collectionversion))
+        tests.addTests(doctest.DocTestSuite(annalist.models.sitewatcher))
         # For some reason, this won't load in the full test suite
         # tests.addTests(doctest.DocTestSuite(annalist.tests.entity_testutils))
     else:
@@ -23,7 +23,8 @@ from annalist.models.entityresourceaccess import (
     entity_resource_file,
     json_resource_file,
     turtle_resource_file, 
-    make_turtle_resource_info
+    make_turtle_resource_info,
+    coll_context_resource_info
     )
 
 from annalist.views.displayinfo         import DisplayInfo
@@ -87,6 +88,9 @@ class CollectionResourceAccess(AnnalistGenericView):
         if "resource_access" in resource_info:
             # Use indicated resource access renderer
             jsondata      = coll.get_values()
+            resource_info = dict(resource_info, 
+                **coll_context_resource_info(coll, coll_baseurl)
+                )
             resource_file = resource_info["resource_access"](coll_baseurl, jsondata, resource_info)
         else:
             # Return resource data direct from storage
@@ -37,8 +37,6 @@ from annalist.models.entitytypeinfo import (
     )
 from annalist.models.collection     import Collection
 from annalist.models.recordtype     import RecordType
-from annalist.models.recordlist     import RecordList
-from annalist.models.recordview     import RecordView
 from annalist.models.annalistuser   import default_user_id, unknown_user_id
 
 from annalist.views.confirm         import ConfirmView, dict_querydict
@@ -298,7 +296,9 @@ class DisplayInfo(object):
         """
         assert (self.site is not None)
         if not self.http_response:
-            if not Collection.exists(self.site, coll_id):
+            # Collection objects are cached between requests (see Collection.load_cached)
+            coll = Collection.load_cached(self.site, coll_id)
+            if coll is None:
                 self.http_response = self.view.error(
                     dict(self.view.error404values(),
                         message=message.COLLECTION_NOT_EXISTS%{'id': coll_id}
@@ -306,8 +306,7 @@ class DisplayInfo(object):
                     )
             else:
                 self.coll_id    = coll_id
-                #@@TODO: try with altscope="site"?
-                self.collection = Collection.load(self.site, coll_id, altscope="all")
+                self.collection = coll
                 self.orig_coll  = self.collection
                 self.perm_coll  = self.collection
                 ver = self.collection.get(ANNAL.CURIE.software_version, None) or "0.0.0"
@@ -415,7 +414,7 @@ class DisplayInfo(object):
                 #     )
                 #@@
             self.list_id    = list_id
-            self.recordlist = RecordList.load(self.collection, list_id, altscope="all")
+            self.recordlist = self.collection.get_list(list_id)
             if "@error" in self.recordlist:
                 self.http_response = self.view.error(
                     dict(self.view.error500values(),
@@ -458,7 +457,7 @@ class DisplayInfo(object):
                 #     )
                 #@@
             self.view_id    = view_id
-            self.recordview = RecordView.load(self.collection, view_id, altscope="all")
+            self.recordview = self.collection.get_view(view_id)
             if "@error" in self.recordview:
                 self.http_response = self.view.error(
                     dict(self.view.error500values(),
@@ -774,7 +773,7 @@ class DisplayInfo(object):
         Check for existence of list definition: 
         if it exists, return the supplied list_id, else None.
         """
-        if list_id and RecordList.exists(self.collection, list_id, altscope="all"):
+        if list_id and self.collection.get_list(list_id):
             return list_id
         return None
 
@@ -821,7 +820,7 @@ class DisplayInfo(object):
         Check for existence of view definition: 
         if it exists, return the supplied view_id, else None.
         """
-        if view_id and RecordView.exists(self.collection, view_id, altscope="all"):
+        if view_id and self.collection.get_view(view_id):
             return view_id
         return None
 
@@ -41,6 +41,7 @@ from annalist.views.generic             import AnnalistGenericView
 from annalist.views.entityvaluemap      import EntityValueMap
 from annalist.views.simplevaluemap      import SimpleValueMap, StableValueMap
 from annalist.views.fieldlistvaluemap   import FieldListValueMap
+from annalist.views.form_utils.formdescriptioncache import get_cached_form
 
 from annalist.views.fields.field_description    import FieldDescription, field_description_from_view_field
 from annalist.views.fields.bound_field          import bound_field, get_entity_values
@@ -142,6 +143,14 @@ class GenericEntityEditView(AnnalistGenericView):
         if viewinfo.check_authorization(action):
             return viewinfo.http_response
 
+        # Respond to conditional request for existing entity before rendering form
+        validators = (None, None)
+        if action in ["view", "edit"]:
+            validators = self.get_html_response_validators(viewinfo.collection)
+        response   = self.not_modified_response(validators)
+        if response:
+            return response
+
         # Set up values for rendered form response
         self.help_markdown = viewinfo.recordview.get(RDFS.CURIE.comment, None)
         entityvals  = get_entity_values(
@@ -181,7 +190,7 @@ class GenericEntityEditView(AnnalistGenericView):
                     message=str(e)+" - see server log for details"
                     )
                 )
-        return response
+        return self.add_validator_headers(response, validators)
 
     # POST
 
@@ -370,19 +379,28 @@ class GenericEntityEditView(AnnalistGenericView):
         """
         Creates an entity/value map table in the current object incorporating
         information from the form field definitions for an indicated view.
-        """
-        entitymap = EntityValueMap(baseentityvaluemap)
-        # log.debug(
-        #     "GenericEntityEditView.get_view_entityvaluemap entityview: %r"%
-        #     viewinfo.recordview.get_values()
-        #     )
-        view_fields  = viewinfo.recordview.get_values()[ANNAL.CURIE.view_fields]
-        fieldlistmap = FieldListValueMap('fields',
-            viewinfo.collection, view_fields,
+
+        The form structure is built only when the view or field definitions have 
+        changed (see `annalist.views.form_utils.formdescriptioncache`), and is bound
+        to the supplied entity values for the current request.
+        """
+        def make_form():
+            entitymap = EntityValueMap(baseentityvaluemap)
+            # log.debug(
+            #     "GenericEntityEditView.get_view_entityvaluemap entityview: %r"%
+            #     viewinfo.recordview.get_values()
+            #     )
+            view_fields  = viewinfo.recordview.get_values()[ANNAL.CURIE.view_fields]
+            fieldlistmap = FieldListValueMap('fields',
+                viewinfo.collection, view_fields,
+                {'view': viewinfo.recordview}
+                )
+            entitymap.add_map_entry(fieldlistmap)
+            return entitymap
+        entitymap = get_cached_form(viewinfo.collection, ("view", viewinfo.view_id), make_form)
+        return entitymap.bind_view_context(
             {'view': viewinfo.recordview, 'entity': entity_values}
             )
-        entitymap.add_map_entry(fieldlistmap)
-        return entitymap
 
     def get_view_choices_field(self, viewinfo):
         """
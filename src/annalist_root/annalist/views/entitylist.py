@@ -32,7 +32,7 @@ from annalist.models.recordtypedata     import RecordTypeData
 from annalist.models.entitytypeinfo     import EntityTypeInfo, CONFIG_PERMISSIONS
 from annalist.models.entityfinder       import EntityFinder
 
-from annalist.views.uri_builder         import uri_with_params
+from annalist.views.uri_builder         import uri_with_params, uri_param_dict
 from annalist.views.displayinfo         import DisplayInfo
 from annalist.views.confirm             import ConfirmView, dict_querydict
 from annalist.views.generic             import AnnalistGenericView
@@ -42,6 +42,7 @@ from annalist.views.simplevaluemap      import SimpleValueMap, StableValueMap
 from annalist.views.fieldlistvaluemap   import FieldListValueMap
 from annalist.views.fieldvaluemap       import FieldValueMap
 from annalist.views.repeatvaluesmap     import RepeatValuesMap
+from annalist.views.form_utils.formdescriptioncache import get_cached_form
 
 from annalist.views.fields.field_description    import FieldDescription, field_description_from_view_field
 from annalist.views.fields.bound_field          import bound_field, get_entity_values
@@ -67,6 +68,8 @@ listentityvaluemap  = (
         , SimpleValueMap(c='scope',                 e=None, f='scope'            )
         , SimpleValueMap(c='continuation_url',      e=None, f='continuation_url' )
         , SimpleValueMap(c='continuation_param',    e=None, f=None               )
+        , SimpleValueMap(c='list_prev_url',         e=None, f=None               )
+        , SimpleValueMap(c='list_next_url',         e=None, f=None               )
         # Field data is handled separately during processing of the form description
         # Form and interaction control (hidden fields)
         ])
@@ -87,6 +90,7 @@ class EntityGenericListView(AnnalistGenericView):
     def __init__(self):
         super(EntityGenericListView, self).__init__()
         self.help          = "entity-list-help"
+        self.list_more     = False
         return
 
     # Helper functions
@@ -109,40 +113,46 @@ class EntityGenericListView(AnnalistGenericView):
         """
         Creates an entity/value map table in the current object incorporating
         information from the form field definitions for an indicated list display.
+
+        The form structure is built only when the list or field definitions have 
+        changed (see `annalist.views.form_utils.formdescriptioncache`).
         """
-        # Locate and read view description
-        entitymap  = EntityValueMap(listentityvaluemap)
-        # log.debug(
-        #     "EntityGenericListView.get_list_entityvaluemap entitylist %r"%
-        #     listinfo.recordlist.get_values()
-        #     )
-        #
-        # Need to generate
-        # 1. 'fields':  (context receives list of field descriptions used to generate row headers)
-        # 2. 'entities': (context receives a bound field that displays entry for each entity)
-        #
-        # NOTE - supplied entity has single field ANNAL.CURIE.entity_list (see 'get' below)
-        #        entitylist template uses 'fields' from context to display headings
-        list_fields = listinfo.recordlist.get(ANNAL.CURIE.list_fields, [])
-        fieldlistmap = FieldListValueMap('fields', listinfo.collection, list_fields, None)
-        entitymap.add_map_entry(fieldlistmap)  # For access to field headings
-        repeatrows_field_descr = (
-            { ANNAL.CURIE.id:                   "List_rows"
-            , RDFS.CURIE.label:                 "Fields"
-            , RDFS.CURIE.comment:               
-                "This resource describes the repeated field description used when "+
-                "displaying and/or editing a record view description"
-            , ANNAL.CURIE.field_name:           "List_rows"
-            , ANNAL.CURIE.field_render_type:    "RepeatListRow"
-            , ANNAL.CURIE.property_uri:         ANNAL.CURIE.entity_list
-            })
-        repeatrows_descr = FieldDescription(
-            listinfo.collection, 
-            repeatrows_field_descr,
-            field_list=list_fields
-            )
-        entitymap.add_map_entry(FieldValueMap(c="List_rows", f=repeatrows_descr))
-        return entitymap
+        def make_form():
+            # Locate and read view description
+            entitymap  = EntityValueMap(listentityvaluemap)
+            # log.debug(
+            #     "EntityGenericListView.get_list_entityvaluemap entitylist %r"%
+            #     listinfo.recordlist.get_values()
+            #     )
+            #
+            # Need to generate
+            # 1. 'fields':  (context receives list of field descriptions used to generate row headers)
+            # 2. 'entities': (context receives a bound field that displays entry for each entity)
+            #
+            # NOTE - supplied entity has single field ANNAL.CURIE.entity_list (see 'get' below)
+            #        entitylist template uses 'fields' from context to display headings
+            list_fields = listinfo.recordlist.get(ANNAL.CURIE.list_fields, [])
+            fieldlistmap = FieldListValueMap('fields', listinfo.collection, list_fields, None)
+            entitymap.add_map_entry(fieldlistmap)  # For access to field headings
+            repeatrows_field_descr = (
+                { ANNAL.CURIE.id:                   "List_rows"
+                , RDFS.CURIE.label:                 "Fields"
+                , RDFS.CURIE.comment:               
+                    "This resource describes the repeated field description used when "+
+                    "displaying and/or editing a record view description"
+                , ANNAL.CURIE.field_name:           "List_rows"
+                , ANNAL.CURIE.field_render_type:    "RepeatListRow"
+                , ANNAL.CURIE.property_uri:         ANNAL.CURIE.entity_list
+                })
+            repeatrows_descr = FieldDescription(
+                listinfo.collection, 
+                repeatrows_field_descr,
+                field_list=list_fields
+                )
+            entitymap.add_map_entry(FieldValueMap(c="List_rows", f=repeatrows_descr))
+            return entitymap
+        entitymap = get_cached_form(listinfo.collection, ("list", listinfo.list_id), make_form)
+        return entitymap.bind_view_context(None)
 
     # Helper functions assemble and return data for list of entities
 
@@ -160,24 +170,82 @@ class EntityGenericListView(AnnalistGenericView):
         entityvals['@id'] = base_url+entityref+"/"
         return entityvals
 
-    def assemble_list_data(self, listinfo, scope, search_for):
+    def get_list_paging(self, request_dict, default_limit=None):
         """
-        Assemble and return a dict structure of JSON data used to generate
-        entity list responses.
+        Returns a pair `(offset, limit)` of entity list paging parameters, taken from
+        the `offset` and `limit` request parameters.  Missing or invalid values are
+        replaced by 0 and `default_limit` respectively.
+        """
+        def int_param(name, default):
+            try:
+                val = int(request_dict.get(name, ""))
+                if val >= 0:
+                    return val
+            except ValueError:
+                pass
+            return default
+        offset = int_param('offset', 0)
+        limit  = int_param('limit', default_limit)
+        return (offset, limit or default_limit)
+
+    def get_list_page_urls(self, offset, limit):
+        """
+        Returns a pair of URLs for the previous and next pages of the current entity
+        list, based on the current request URL.  None is returned in place of a URL if
+        there is no such page.
+
+        Must be called after `get_list_entity_ids`, which determines if there are more
+        entities to follow the current page.
+        """
+        if limit is None:
+            return (None, None)
+        request_url = self.get_request_path()
+        params      = dict(uri_param_dict(request_url), limit=str(limit))
+        prev_url    = None
+        next_url    = None
+        if offset > 0:
+            prev_offset = max(0, offset-limit)
+            prev_url    = uri_with_params(
+                request_url, dict(params, offset=str(prev_offset) if prev_offset else None)
+                )
+        if self.list_more:
+            next_url = uri_with_params(request_url, dict(params, offset=str(offset+limit)))
+        return (prev_url, next_url)
+
+    def get_list_entity_ids(self, listinfo, scope, search_for, offset=0, limit=None):
+        """
+        Returns a sorted list of `(type_id, entity_id)` pairs for entities selected
+        for an entity list response.  The entities are loaded as their values are 
+        used (see `iter_list_entity_values`), so that the values of all selected 
+        entities are not held together.
+
+        If `limit` is specified, at most `limit` entities starting at `offset` in the
+        sorted list are returned, and `self.list_more` is set to indicate whether there
+        are more entities following.
         """
-        # Prepare list and entity IDs for rendering form
         selector    = listinfo.recordlist.get_values().get(ANNAL.CURIE.list_entity_selector, "")
         user_perms  = self.get_permissions(listinfo.collection)
-        entity_list = (
+        entity_ids  = (
             EntityFinder(listinfo.collection, selector=selector)
-                .get_entities_sorted(
+                .get_entity_ids_sorted(
                     user_perms, type_id=listinfo.type_id, altscope=scope,
-                    context={'list': listinfo.recordlist}, search=search_for
+                    context={'list': listinfo.recordlist}, search=search_for,
+                    offset=offset, limit=None if limit is None else limit+1
                     )
             )
+        self.list_more = (limit is not None) and (len(entity_ids) > limit)
+        if self.list_more:
+            entity_ids = entity_ids[:limit]
         #@@
-        # log.info("assemble_list_data: %r"%([e.get_id() for e in entity_list],))
+        # log.info("get_list_entity_ids: %r"%(entity_ids,))
         #@@
+        return entity_ids
+
+    def get_list_data_head(self, listinfo, scope, search_for):
+        """
+        Returns a dict structure of JSON data used to generate entity list responses,
+        without the list of entities.
+        """
         # typeinfo = listinfo.curr_typeinfo
         base_url = self.get_collection_base_url(listinfo.coll_id)
         list_url = self.get_list_url(
@@ -186,13 +254,9 @@ class EntityGenericListView(AnnalistGenericView):
             scope=scope,
             search=search_for
             )
-        entityvallist = [ self.strip_context_values(listinfo, e, base_url) for e in entity_list ]
-        # print "@@@@ type_id %s"%(listinfo.type_id,)
-        # print "@@@@ entity_list %r"%(entity_list,)
-        # print "@@@@ entityvallist %r"%(entityvallist,)
         # log.debug("@@ listinfo.list_id %s, coll base_url %s"%(listinfo.list_id, base_url))
         log.info(
-            "EntityListDataView.assemble_list_data: list_url %s, base_url %s, context_url %s"%
+            "EntityListDataView.get_list_data_head: list_url %s, base_url %s, context_url %s"%
             (list_url, base_url, base_url+layout.COLL_CONTEXT_FILE)
             )
         jsondata = (
@@ -201,8 +265,39 @@ class EntityGenericListView(AnnalistGenericView):
                 { "@base":  base_url },
                 base_url+layout.COLL_CONTEXT_FILE
                 ]
-            , ANNAL.CURIE.entity_list:  entityvallist
             })
+        return jsondata
+
+    def iter_list_entity_values(self, listinfo, entity_ids):
+        """
+        Iterates over values of the entities identified by the supplied list of
+        `(type_id, entity_id)` pairs for an entity list response (see 
+        `get_list_entity_ids`).
+
+        Each entity is loaded as its values are generated, and released once its
+        values have been used.
+        """
+        base_url = self.get_collection_base_url(listinfo.coll_id)
+        entities = EntityFinder(listinfo.collection).iter_entities(entity_ids)
+        for e in entities:
+            yield self.strip_context_values(listinfo, e, base_url)
+        return
+
+    def assemble_list_data(self, listinfo, scope, search_for, offset=0, limit=None):
+        """
+        Assemble and return a dict structure of JSON data used to generate
+        entity list responses.
+
+        If `limit` is specified, at most `limit` entities starting at `offset` in the
+        sorted list are returned (see `get_list_entity_ids`).
+        """
+        entity_ids  = self.get_list_entity_ids(
+            listinfo, scope, search_for, offset=offset, limit=limit
+            )
+        jsondata    = self.get_list_data_head(listinfo, scope, search_for)
+        jsondata[ANNAL.CURIE.entity_list] = list(
+            self.iter_list_entity_values(listinfo, entity_ids)
+            )
         # print "@@@@ assemble_list_data: jsondata %r"%(jsondata,)
         return jsondata
 
@@ -222,11 +317,19 @@ class EntityGenericListView(AnnalistGenericView):
         listinfo    = self.list_setup(coll_id, type_id, list_id, request.GET.dict())
         if listinfo.http_response:
             return listinfo.http_response
+        validators = self.get_html_response_validators(listinfo.collection)
+        response   = self.not_modified_response(validators)
+        if response:
+            return response
         self.help_markdown = listinfo.recordlist.get(RDFS.CURIE.comment, None)
         log.debug("listinfo.list_id %s"%listinfo.list_id)
+        (offset, limit) = self.get_list_paging(request.GET, settings.ANNALIST_LIST_PAGE_SIZE)
         # Prepare list and entity IDs for rendering form
         try:
-            entityvallist = self.assemble_list_data(listinfo, scope, search_for)
+            entityvallist = self.assemble_list_data(
+                listinfo, scope, search_for, offset=offset, limit=limit
+                )
+            (prev_url, next_url) = self.get_list_page_urls(offset, limit)
             # Set up initial view context
             context_extra_values = (
                 { 'continuation_url':       listinfo.get_continuation_url() or ""
@@ -236,6 +339,8 @@ class EntityGenericListView(AnnalistGenericView):
                 , 'url_type_id':            type_id
                 , 'url_list_id':            list_id
                 , 'search_for':             search_for
+                , 'list_prev_url':          prev_url
+                , 'list_next_url':          next_url
                 , 'list_choices':           self.get_list_choices_field(listinfo)
                 , 'collection_view':        self.collection_view_url
                 , 'default_view_id':        listinfo.recordlist[ANNAL.CURIE.default_view]
@@ -264,7 +369,7 @@ class EntityGenericListView(AnnalistGenericView):
         # Generate and return form data
         json_redirect_url   = make_resource_url("", self.get_request_path(), layout.ENTITY_LIST_FILE)
         turtle_redirect_url = make_resource_url("", self.get_request_path(), layout.ENTITY_LIST_TURTLE)
-        return (
+        response = (
             self.render_html(listcontext, self._entityformtemplate)
             or 
             self.redirect_json(json_redirect_url)
@@ -273,6 +378,7 @@ class EntityGenericListView(AnnalistGenericView):
             or
             self.error(self.error406values())
             )
+        return self.add_validator_headers(response, validators)
 
     # POST
 
@@ -23,7 +23,8 @@ from annalist.util                      import make_type_entity_id
 from annalist.models.entityfinder       import EntityFinder
 from annalist.models.entityresourceaccess import (
     find_list_resource,
-    json_resource_file
+    json_list_resource_chunks,
+    coll_context_resource_info
     )
 
 from annalist.views.entitylist          import EntityGenericListView
@@ -51,6 +52,13 @@ class EntityListDataView(EntityGenericListView):
 
         NOTE: The current implementation returns a full copy of each of the 
         selected entities.
+
+        If `limit` and/or `offset` request parameters are supplied, a single page of
+        the list is returned, with HTTP link headers referring to adjacent pages.
+
+        JSON-LD list data is streamed:  each entity's values are formatted as the 
+        response is sent.  Other list formats (e.g. Turtle) are generated from the
+        full JSON-LD list data.
         """
         scope      = request.GET.get('scope',  None)
         search_for = request.GET.get('search', "")
@@ -63,16 +71,6 @@ class EntityListDataView(EntityGenericListView):
             return listinfo.http_response
         # print "@@@@ listinfo.type_id %s, type_id %s"%(listinfo.type_id, type_id)
         # log.debug("@@ listinfo.list_id %s, coll base_url %s"%(listinfo.list_id, base_url))
-        # Prepare list data for rendering
-        try:
-            jsondata = self.assemble_list_data(listinfo, scope, search_for)
-        except Exception as e:
-            log.exception(str(e))
-            return self.error(
-                dict(self.error500values(),
-                    message=str(e)+" - see server log for details"
-                    )
-                )
         entity_list_info = find_list_resource(type_id, list_id, list_ref)
         if entity_list_info is None:
             return self.error(
@@ -85,14 +83,78 @@ class EntityListDataView(EntityGenericListView):
                     )
                 )
 
+        # Respond to conditional request before selecting entities
+        validators = self.get_response_validators(list(listinfo.collection.get_data_stamp()))
+        response   = self.not_modified_response(validators)
+        if response:
+            return response
+
+        # Select entities for list
+        (offset, limit) = self.get_list_paging(request.GET)
+        try:
+            entity_ids  = self.get_list_entity_ids(
+                listinfo, scope, search_for, offset=offset, limit=limit
+                )
+            jsondata    = self.get_list_data_head(listinfo, scope, search_for)
+        except Exception as e:
+            log.exception(str(e))
+            return self.error(
+                dict(self.error500values(),
+                    message=str(e)+" - see server log for details"
+                    )
+                )
+
         coll_baseurl = listinfo.reqhost + self.get_collection_base_url(coll_id)
         list_baseurl = listinfo.reqhost + self.get_list_base_url(coll_id, type_id, list_id)
-        if "resource_access" in entity_list_info:
-            # Use indicated resource access renderer
-            list_file_access = entity_list_info["resource_access"]
-        else:
-            list_file_access = json_resource_file
-        list_file = list_file_access(list_baseurl, jsondata, entity_list_info)
+        return_type  = entity_list_info["resource_type"]
+        # URL parameter ?type=mime/type overrides specified content type
+        #
+        # @@TODO: this is to allow links to return different content-types:
+        #         is there a cleaner way?
+        if "type" in listinfo.request_dict:
+            return_type = listinfo.request_dict["type"]
+        links=[
+            { "rel": "canonical"
+            , "ref": list_baseurl
+            }]
+        (prev_url, next_url) = self.get_list_page_urls(offset, limit)
+        if prev_url:
+            links.append({ "rel": "prev", "ref": prev_url })
+        if next_url:
+            links.append({ "rel": "next", "ref": next_url })
+        entity_values = self.iter_list_entity_values(listinfo, entity_ids)
+        if "resource_access" not in entity_list_info:
+            # Stream JSON-LD list data
+            list_chunks = json_list_resource_chunks(
+                jsondata, ANNAL.CURIE.entity_list, entity_values
+                )
+            try:
+                response = self.resource_stream_response(list_chunks, return_type, links=links)
+            except Exception as e:
+                log.exception(str(e))
+                return self.error(
+                    dict(self.error500values(),
+                        message=str(e)+" - see server log for details"
+                        )
+                    )
+            return self.add_validator_headers(response, validators)
+
+        # Use indicated resource access renderer
+        try:
+            jsondata[ANNAL.CURIE.entity_list] = list(entity_values)
+        except Exception as e:
+            log.exception(str(e))
+            return self.error(
+                dict(self.error500values(),
+                    message=str(e)+" - see server log for details"
+                    )
+                )
+        list_file_access = entity_list_info["resource_access"]
+        list_file = list_file_access(list_baseurl, jsondata, 
+            dict(entity_list_info, 
+                **coll_context_resource_info(listinfo.collection, coll_baseurl)
+                )
+            )
         if list_file is None:
             return self.error(
                 dict(self.error404values(),
@@ -106,18 +168,8 @@ class EntityListDataView(EntityGenericListView):
 
         # Construct and return list response
         try:
-            return_type = entity_list_info["resource_type"]
-            # URL parameter ?type=mime/type overrides specified content type
-            #
-            # @@TODO: this is to allow links to return different content-types:
-            #         is there a cleaner way?
-            if "type" in listinfo.request_dict:
-                return_type = listinfo.request_dict["type"]
-            links=[
-                { "rel": "canonical"
-                , "ref": list_baseurl
-                }]
             response = self.resource_response(list_file, return_type, links=links)
+            response = self.add_validator_headers(response, validators)
         except Exception as e:
             log.exception(str(e))
             response = self.error(
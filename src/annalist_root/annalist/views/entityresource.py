@@ -30,7 +30,8 @@ from annalist.models.entityresourceaccess import (
     entity_resource_file,
     json_resource_file,
     turtle_resource_file, 
-    make_turtle_resource_info
+    make_turtle_resource_info,
+    coll_context_resource_info
     )
 
 from annalist.views.displayinfo         import DisplayInfo
@@ -101,10 +102,26 @@ class EntityResourceAccess(AnnalistGenericView):
                         }
                     )
                 )
+        # Respond to conditional request before reading or converting resource data
+        if "resource_access" in resource_info:
+            stamps = [entity._change_stamp(), viewinfo.collection.get_context_stamp()]
+        else:
+            stamps = [entity.resource_change_stamp(resource_info["resource_path"])]
+        validators = self.get_response_validators(stamps)
+        response   = self.not_modified_response(validators)
+        if response:
+            return response
         entity_baseurl = viewinfo.reqhost + self.get_entity_base_url(coll_id, type_id, entity_id)
         if "resource_access" in resource_info:
             # Use indicated resource access renderer
             jsondata = entity.get_values()
+            resource_info = dict(resource_info, 
+                **coll_context_resource_info(
+                    viewinfo.collection, 
+                    viewinfo.reqhost + self.get_collection_base_url(coll_id),
+                    entity=entity
+                    )
+                )
             resource_file = resource_info["resource_access"](entity_baseurl, jsondata, resource_info)
         else:
             # Return resource data direct from storage
@@ -130,6 +147,7 @@ class EntityResourceAccess(AnnalistGenericView):
                 , "ref": entity_baseurl
                 }]
             response = self.resource_response(resource_file, return_type, links=links)
+            response = self.add_validator_headers(response, validators)
         except Exception as e:
             log.exception(str(e))
             response = self.error(
@@ -299,11 +299,8 @@ class bound_field(object):
         an enumeration of entities (or some other value with an associated link),
         or None
         """
-        choices = self._field_description['field_choices']  # OrderedDict
-        v       = self.field_value
-        if choices and v in choices:
-            return choices[v].link
-        return None
+        choice = self.get_field_option(self.field_value)
+        return choice and choice.link
 
     def get_field_help_esc(self):
         """
@@ -472,6 +469,20 @@ class bound_field(object):
                   )
         return options
 
+    def get_field_option(self, value):
+        """
+        Returns the option corresponding to the supplied field value, or None.
+
+        For a field that references entities of another type, this does not require
+        all the options to be determined (see `FieldDescription.get_field_choice`).
+        """
+        if self._field_description['field_ref_type']:
+            return self._field_description.get_field_choice(value)
+        for o in self.get_field_options():
+            if o.value == value:
+                return o
+        return None
+
     def __getitem__(self, name):
         return self.__getattr__(name)
 
@@ -7,6 +7,7 @@ __copyright__   = "Copyright 2015, G. Klyne"
 __license__     = "MIT (http://opensource.org/licenses/MIT)"
 
 import sys
+import copy
 import traceback
 import collections
 
@@ -17,11 +18,12 @@ from annalist               import layout
 from annalist               import message
 from annalist.identifiers   import RDFS, ANNAL
 from annalist.exceptions    import Annalist_Error, EntityNotFound_Error, UnexpectedValue_Error
-from annalist.util          import extract_entity_id
+from annalist.util          import extract_entity_id, split_type_entity_id
 
 # from annalist.models.recordfield            import RecordField
 from annalist.models.entitytypeinfo         import EntityTypeInfo
-from annalist.models.entityfinder           import EntityFinder
+from annalist.models.entityfinder           import EntityFinder, EntitySelector
+from annalist.models.entitychoicecache      import get_cached_choices
 
 from annalist.views.fields.field_renderer   import FieldRenderer
 from annalist.views.fields.find_renderers   import (
@@ -39,7 +41,10 @@ class FieldDescription(object):
     manipulations involving the field description.
     """
 
-    __slots__ = ("_collection", "_field_desc", "_field_suffix_index", "_field_suffix")
+    __slots__ = (
+        "_collection", "_field_desc", "_field_suffix_index", "_field_suffix", 
+        "_field_choices_args"
+        )
 
     def __init__(self, 
             collection, recordfield, view_context=None, 
@@ -118,28 +123,20 @@ class FieldDescription(object):
             })
         self._field_suffix_index  = 0    # No dup
         self._field_suffix        = ""
-        # If field references type, pull in copy of type id and link values
+        self._field_choices_args  = None
+        # If field references type, save details used to determine choices when needed
+        # (see `get_field_choices` and `get_field_choice`)
         type_ref = self._field_desc['field_ref_type']
         if type_ref:
             restrict_values = self._field_desc['field_ref_restriction']
-            entity_finder   = EntityFinder(collection, selector=restrict_values)
-            entities        = entity_finder.get_entities_sorted(
-                type_id=type_ref, context=view_context, altscope="select"
-                )
-            # Note: the options list may be used more than once, so the id generator
-            # returned must be materialized as a list
-            # Uses collections.OrderedfDict to preserve entity ordering
-            self._field_desc['field_choices'] = collections.OrderedDict()
+            blank_label     = None
             if field_render_type in ["Enum_optional", "Enum_choice_opt"]:
                 # Add blank choice for optional selections
-                self._field_desc['field_choices'][''] = FieldChoice('', label=field_placeholder)
-            for e in entities:
-                eid = e.get_id()
-                val = e.get_type_entity_id()
-                if eid != layout.INITIAL_VALUES_ID:
-                    self._field_desc['field_choices'][val] = FieldChoice(
-                        val, label=e.get_label(), link=e.get_view_url_path()
-                        )
+                blank_label = field_placeholder
+            self._field_choices_args = (
+                collection, type_ref, restrict_values, 
+                selector_context(restrict_values, view_context), blank_label
+                )
         # If field references or contains field list, pull in field details
         if field_list:
             if field_id in field_ids_seen:
@@ -177,11 +174,48 @@ class FieldDescription(object):
         result._field_desc         = self._field_desc
         result._field_suffix_index = self._field_suffix_index
         result._field_suffix       = self._field_suffix
+        result._field_choices_args = self._field_choices_args
         return result
 
     def copy(self):
         return self.__copy__()
 
+    def bind_view_context(self, view_context, bound=None):
+        """
+        Returns a copy of this field description, and of any field descriptions it
+        contains, for rendering a form with the supplied view context.
+
+        The copy has its own field description values, so that field choices and other
+        values set when processing a request are not shared with other users of this
+        field description (cf. `annalist.views.form_utils.formdescriptioncache`).
+
+        view_context    is a dictionary of additional values that may be used in
+                        determining field choices (see `__init__`).
+        bound           if supplied, a dictionary of field descriptions already bound,
+                        indexed by the `id` of the original field description, which
+                        is used so that the copy of a field description that is
+                        referenced more than once is shared.
+        """
+        if bound is None:
+            bound = {}
+        if id(self) in bound:
+            return bound[id(self)]
+        result = self.__copy__()
+        bound[id(self)]    = result
+        result._field_desc = dict(self._field_desc, field_choices=None)
+        if self._field_choices_args:
+            (collection, type_ref, restrict_values, _, blank_label) = self._field_choices_args
+            result._field_choices_args = (
+                collection, type_ref, restrict_values,
+                selector_context(restrict_values, view_context), blank_label
+                )
+        if self._field_desc['group_field_descs'] is not None:
+            result._field_desc['group_field_descs'] = (
+                [ f.bind_view_context(view_context, bound)
+                  for f in self._field_desc['group_field_descs']
+                ])
+        return result
+
     def resolve_duplicates(self, properties):
         """
         Resolve duplicate property URIs that appear in a common context corresponding to
@@ -272,6 +306,37 @@ class FieldDescription(object):
                     return altkey
         return self.get_field_property_uri()
 
+    def get_field_choices(self):
+        """
+        If the field references entities of another type, returns an ordered 
+        dictionary of choices for the field value, otherwise None.
+
+        The choices are determined when first requested (e.g. when rendering
+        a field for editing).
+        """
+        if (self._field_desc['field_choices'] is None) and self._field_choices_args:
+            self._field_desc['field_choices'] = get_field_choices(*self._field_choices_args)
+        return self._field_desc['field_choices']
+
+    def get_field_choice(self, value):
+        """
+        If the field references entities of another type, returns the choice
+        corresponding to the supplied field value, or None if the value is not one
+        of the choices for the field.
+
+        If the choices for the field have not already been determined, only the
+        referenced entity is loaded (e.g. when rendering a field for viewing).
+        """
+        choices = self._field_desc['field_choices']
+        if (choices is None) and self._field_choices_args:
+            choices = get_field_choices(*self._field_choices_args, saved_only=True)
+            if choices is None:
+                return get_field_choice(*(self._field_choices_args + (value,)))
+            self._field_desc['field_choices'] = choices
+        if choices and value in choices:
+            return choices[value]
+        return None
+
     def group_ref(self):
         """
         If the field itself contains or uses a group of fields, returns an
@@ -394,6 +459,7 @@ class FieldDescription(object):
         """
         Return collection metadata value fields
         """
+        self.get_field_choices()
         return self._field_desc.items()
 
     def get(self, key, default):
@@ -406,6 +472,8 @@ class FieldDescription(object):
         """
         Allow direct indexing to access collection metadata value fields
         """
+        if k == 'field_choices':
+            return self.get_field_choices()
         return self._field_desc[k]
 
     def __setitem__(self, k, v):
@@ -423,6 +491,100 @@ class FieldDescription(object):
             yield k
         return
 
+def selector_context(selector, view_context):
+    """
+    Returns a copy of the values from `view_context` that are referenced by the 
+    supplied entity selector, for use when field choices are determined.
+
+    >>> c = { 'view': { 'v:a': '1', 'v:b': ['2', '3'] }, 'entity': { 'e:a': '4' } }
+    >>> selector_context("[p:a] in view[v:b]", c)
+    {'view': {'v:b': ['2', '3']}}
+    >>> selector_context("ALL", c)
+    {}
+    """
+    context = {}
+    for (name, field_id) in EntitySelector.get_context_refs(selector):
+        c = (view_context or {}).get(name, None)
+        if c:
+            context.setdefault(name, {})[field_id] = copy.deepcopy(c.get(field_id, None))
+    return context
+
+def get_field_choices(
+    collection, type_ref, restrict_values, view_context=None, blank_label=None,
+    saved_only=False
+    ):
+    """
+    Returns an ordered dictionary of choices for a field that references entities
+    of the indicated type, using a saved choice list if available (see 
+    `annalist.models.entitychoicecache`).  The value returned may be shared, and
+    must not be modified.
+
+    collection      is a collection from which data is being rendered.
+    type_ref        is the id of the type whose entities (or subtype entities) are
+                    offered as choices.
+    restrict_values is a selector that restricts the entities offered as choices.
+    view_context    is a dictionary of context values that may be used by the selector.
+    blank_label     if not None, a label for a blank choice that is offered first.
+    saved_only      if True, returns None rather than determining new choices if no
+                    saved choice list is available.
+    """
+    def make_choices():
+        entity_finder = EntityFinder(collection, selector=restrict_values)
+        entities      = entity_finder.get_entities_sorted(
+            type_id=type_ref, context=view_context, altscope="select"
+            )
+        # Note: the options list may be used more than once, so the id generator
+        # returned must be materialized as a list
+        # Uses collections.OrderedfDict to preserve entity ordering
+        choices = collections.OrderedDict()
+        if blank_label is not None:
+            choices[''] = FieldChoice('', label=blank_label)
+        for e in entities:
+            eid = e.get_id()
+            val = e.get_type_entity_id()
+            if eid != layout.INITIAL_VALUES_ID:
+                choices[val] = FieldChoice(
+                    val, label=e.get_label(), link=e.get_view_url_path()
+                    )
+        type_ids = list(entity_finder.get_collection_subtype_ids(type_ref, "all"))
+        return (type_ids, choices)
+    choice_key = (
+        type_ref, restrict_values, 
+        EntitySelector.get_context_values(restrict_values, view_context),
+        collection.get_view_url_path(), blank_label
+        )
+    return get_cached_choices(
+        collection, choice_key, None if saved_only else make_choices
+        )
+
+def get_field_choice(
+    collection, type_ref, restrict_values, view_context, blank_label, value
+    ):
+    """
+    Returns the choice for a supplied value of a field that references entities
+    of the indicated type, or None if the value is not one of the choices that 
+    would be returned by `get_field_choices`.  Only the referenced entity is loaded.
+
+    Parameters are as for `get_field_choices`, and:
+
+    value           is the field value for which a choice is required.
+    """
+    if not isinstance(value, (str, unicode)):
+        return None
+    if value == "":
+        return None if blank_label is None else FieldChoice('', label=blank_label)
+    (type_id, entity_id) = split_type_entity_id(value)
+    if not (type_id and entity_id):
+        return None
+    entity_finder = EntityFinder(collection, selector=restrict_values)
+    entity        = entity_finder.get_selected_entity(
+        type_id, entity_id, supertype_id=type_ref, context=view_context
+        )
+    if entity is None:
+        return None
+    val = entity.get_type_entity_id()
+    return FieldChoice(val, label=entity.get_label(), link=entity.get_view_url_path())
+
 def field_description_from_view_field(
     collection, field, view_context=None, field_ids_seen=[]
     ):
@@ -15,8 +15,10 @@ from collections                import OrderedDict, namedtuple
 from django.conf                import settings
 
 from render_fieldvalue          import RenderFieldValue
-from render_text                import TextValueMapper
-from render_entityid            import EntityIdValueMapper
+from render_text                import (
+    get_compiled_text_renderer, get_compiled_showtext_renderer, TextValueMapper
+    )
+from render_entityid            import get_compiled_entityid_renderer, EntityIdValueMapper
 from render_identifier          import IdentifierValueMapper
 from render_placement           import get_field_placement_renderer
 from render_tokenset            import get_field_tokenset_renderer, TokenSetValueMapper
@@ -24,14 +26,20 @@ from render_bool_checkbox       import get_bool_checkbox_renderer, BoolCheckboxV
 from render_ref_audio           import get_ref_audio_renderer, RefAudioValueMapper
 from render_ref_image           import get_ref_image_renderer, RefImageValueMapper
 from render_text_markdown       import (
-    get_text_markdown_renderer, get_show_markdown_renderer, TextMarkdownValueMapper
+    get_text_markdown_renderer, get_show_markdown_renderer, 
+    get_compiled_text_markdown_renderer, get_compiled_show_markdown_renderer,
+    TextMarkdownValueMapper
     )
 from render_select              import (
     get_select_renderer, get_choice_renderer,
     get_entitytype_renderer, get_view_choice_renderer,
+    get_compiled_select_renderer, get_compiled_choice_renderer,
+    get_compiled_entitytype_renderer,
     SelectValueMapper
     )
-from render_uri_link            import get_uri_link_renderer, URILinkValueMapper
+from render_uri_link            import (
+    get_uri_link_renderer, get_compiled_uri_link_renderer, URILinkValueMapper
+    )
 from render_uri_import          import get_uri_import_renderer, URIImportValueMapper
 from render_file_upload         import get_file_upload_renderer, FileUploadValueMapper
 from render_repeatgroup         import (
@@ -44,7 +52,7 @@ from render_ref_multifields     import get_ref_multifield_renderer, RefMultifiel
 
 # Render type mappings to templates and/or renderer access functions
 
-_field_renderers = {}   # renderer cache
+_field_renderers = {}   # renderer cache: (render_type, compiled) -> renderer
 
 _field_view_files = (
     { "Text":           "field/annalist_view_text.html"
@@ -103,6 +111,30 @@ _field_get_renderer_functions = (
     , "List_sel":           get_choice_renderer
     })
 
+# Renderers implemented in Python code in place of Django templates, used when
+# settings.ANNALIST_COMPILED_RENDERERS is True.  Output from these is the same as 
+# from the corresponding template-based renderers above.
+
+_field_compiled_renderer_functions = (
+    { "Text":               get_compiled_text_renderer
+    , "Showtext":           get_compiled_showtext_renderer
+    , "EntityId":           get_compiled_entityid_renderer
+    , "Markdown":           get_compiled_text_markdown_renderer
+    , "ShowMarkdown":       get_compiled_show_markdown_renderer
+    , "URILink":            get_compiled_uri_link_renderer
+    , "EntityTypeId":       get_compiled_entitytype_renderer
+    , "Enum":               get_compiled_select_renderer
+    , "Enum_optional":      get_compiled_select_renderer
+    , "Enum_choice":        get_compiled_choice_renderer
+    , "Enum_choice_opt":    get_compiled_choice_renderer
+    # Render types recognized for backward compatibility
+    , "Type":               get_compiled_select_renderer
+    , "View":               get_compiled_select_renderer
+    , "List":               get_compiled_select_renderer
+    , "Field":              get_compiled_select_renderer
+    , "List_sel":           get_compiled_choice_renderer
+    })
+
 _field_value_mappers = (
     { "TokenSet":           TokenSetValueMapper
     , "CheckBox":           BoolCheckboxValueMapper
@@ -140,23 +172,32 @@ def is_repeat_field_render_type(render_type):
         ])
     return render_type in repeat_field_render_types
 
-def get_field_base_renderer(field_render_type):
+def get_field_base_renderer(field_render_type, compiled=None):
     """
     Lookup and return base renderer for given field type.
+
+    compiled    if True, selects a renderer implemented in Python code in place 
+                of Django templates, if one is available for the render type.
+                If None, the `ANNALIST_COMPILED_RENDERERS` setting is used.
     """
-    if field_render_type not in _field_renderers:
+    if compiled is None:
+        compiled = settings.ANNALIST_COMPILED_RENDERERS
+    renderer_key = (field_render_type, compiled)
+    if renderer_key not in _field_renderers:
         # Create and cache renderer
-        if ( (field_render_type in _field_view_files) or
+        if compiled and (field_render_type in _field_compiled_renderer_functions):
+            _field_renderers[renderer_key] = _field_compiled_renderer_functions[field_render_type]()
+        elif ( (field_render_type in _field_view_files) or
              (field_render_type in _field_edit_files) ):
             viewfile = _field_view_files.get(field_render_type, None)
             editfile = _field_edit_files.get(field_render_type, None)
-            _field_renderers[field_render_type] = RenderFieldValue(
+            _field_renderers[renderer_key] = RenderFieldValue(
                 field_render_type,
                 view_file=viewfile, edit_file=editfile
                 )
         elif field_render_type in _field_get_renderer_functions:
-            _field_renderers[field_render_type] = _field_get_renderer_functions[field_render_type]()
-    return _field_renderers.get(field_render_type, None)
+            _field_renderers[renderer_key] = _field_get_renderer_functions[field_render_type]()
+    return _field_renderers.get(renderer_key, None)
 
 def get_entityref_edit_renderer(renderer, field_render_type):
     """
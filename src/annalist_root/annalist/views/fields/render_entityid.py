@@ -12,7 +12,11 @@ log = logging.getLogger(__name__)
 # from django.http        import HttpResponse
 from django.template    import Template
 
-from annalist.views.fields.render_base  import RenderBase
+from annalist.views.fields.render_base          import RenderBase
+from annalist.views.fields.render_fieldvalue    import (
+    CompiledRenderFieldValue,
+    render_context_value
+    )
 
 #   ----------------------------------------------------------------------------
 #
@@ -42,7 +46,46 @@ class EntityIdValueMapper(RenderBase):
 #
 #   ----------------------------------------------------------------------------
 
+#   Entity Id fields are normally rendered using template files (see 
+#   `annalist.views.fields.find_renderers`).  The compiled renderers here return 
+#   the same results.
 
+class entityid_view_compiled_renderer(object):
 
+    def render(self, context):
+        """
+        Renders an entity Id for viewing: see "field/annalist_view_entityid.html"
+        """
+        return (
+            u"""<!-- field/annalist_view_entityid.html -->\n"""+
+            u"""<a href="%s%s">%s</a>"""
+            )%( render_context_value(context, ("field", "entity_link"))
+              , render_context_value(context, ("field", "continuation_param"))
+              , render_context_value(context, ("field", "field_value"))
+              )
+
+class entityid_edit_compiled_renderer(object):
+
+    def render(self, context):
+        """
+        Renders an entity Id for editing: see "field/annalist_edit_entityid.html"
+        """
+        return (
+            u"""<!-- field/annalist_edit_entityid.html (uses a fixed field name 'entity_id') -->\n"""+
+            u"""<input type="text" size="64" name="entity_id" \n"""+
+            u"""       placeholder="%s"\n"""+
+            u"""       value="%s"/>"""
+            )%( render_context_value(context, ("field", "description", "field_placeholder"))
+              , render_context_value(context, ("field", "field_value"))
+              )
+
+def get_compiled_entityid_renderer():
+    """
+    Return compiled field renderer object for entity Id values
+    """
+    return CompiledRenderFieldValue("EntityId",
+        view_renderer=entityid_view_compiled_renderer(), 
+        edit_renderer=entityid_edit_compiled_renderer(),
+        )
 
 # End.
@@ -20,8 +20,12 @@ import traceback
 import logging
 log = logging.getLogger(__name__)
 
-from django.http        import HttpResponse
-from django.template    import Template, Context
+from django.conf                import settings
+from django.http                import HttpResponse
+from django.template            import Template, Context
+from django.template.base       import render_value_in_context
+from django.utils.encoding      import force_text
+from django.utils.safestring    import mark_safe
 
 import django
 django.setup()  # Needed for template loader
@@ -171,6 +175,52 @@ class TemplateWrapValueRenderer(object):
                 del tb
                 return "\n".join(response_parts)
 
+class IncludeValueRenderer(object):
+    """
+    Render class invokes a value renderer with the same error handling as 
+    `{% include value_renderer %}` in a wrapper template.
+    """
+    def __init__(self, value_renderer):
+        self.value_renderer = value_renderer
+        return
+    def render(self, context):
+        try:
+            return self.value_renderer.render(context)
+        except Exception as e:
+            if settings.TEMPLATE_DEBUG:
+                raise
+            log.warning("Exception in IncludeValueRenderer.render: %r"%(e,))
+            return ""
+
+class FunctionWrapValueRenderer(object):
+    """
+    Render class combines a value renderer with a wrapper function.
+
+    The wrapper function is called with the render context and value renderer,
+    and returns the same string as the corresponding wrapper template (see 
+    `compiled_wrapper_functions`), but without the overhead of rendering a 
+    Django template for every field.
+    """
+    def __init__(self, wrapper_function, value_renderer):
+        self.wrapper_function = wrapper_function
+        self.value_renderer   = IncludeValueRenderer(value_renderer)
+        return
+    def render(self, context):
+        try:
+            return mark_safe(self.wrapper_function(context, self.value_renderer))
+        except Exception as e:
+            log.exception("Exception in FunctionWrapValueRenderer.render")
+            ex_type, ex, tb = sys.exc_info()
+            traceback.print_tb(tb)
+            response_parts = (
+                ["Exception in FunctionWrapValueRenderer.render"]+
+                [repr(e)]+
+                traceback.format_exception(ex_type, ex, tb)+
+                ["***FunctionWrapValueRenderer.render***"]
+                )
+            del tb
+            return "\n".join(response_parts)
+
 class ModeWrapValueRenderer(object):
     """
     Render class invokes a value renderer with a specified render mode.
@@ -300,6 +350,14 @@ class RenderFieldValue(object):
             (self._render_type, self._view_renderer, self._edit_renderer)
             )
 
+    def _wrap_value_renderer(self, wrapper_template, value_renderer):
+        """
+        Returns a renderer that combines the supplied wrapper template and value
+        renderer.  Subclasses may override this to use a different wrapper 
+        implementation.
+        """
+        return TemplateWrapValueRenderer(wrapper_template, value_renderer)
+
     # Template access functions
 
     def label(self):
@@ -310,7 +368,7 @@ class RenderFieldValue(object):
         if not self._render_label:
             self._render_label = ModeWrapValueRenderer(
                 "label",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     label_template, None
                     )
                 )
@@ -325,7 +383,7 @@ class RenderFieldValue(object):
         if not self._render_view:
             self._render_view = ModeWrapValueRenderer(
                 "view",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     view_value_wrapper_template, self._view_renderer
                     )
                 )
@@ -338,7 +396,7 @@ class RenderFieldValue(object):
         if not self._render_edit:
             self._render_edit = ModeWrapValueRenderer(
                 "edit",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     edit_value_wrapper_template, self._edit_renderer
                     )
                 )
@@ -351,7 +409,7 @@ class RenderFieldValue(object):
         if not self._render_label_view:
             self._render_label_view = ModeWrapValueRenderer(
                 "label_view",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     label_view_value_wrapper_template, self._view_renderer
                     )
                 )
@@ -364,7 +422,7 @@ class RenderFieldValue(object):
         if not self._render_label_edit:
             self._render_label_edit = ModeWrapValueRenderer(
                 "label_edit",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     label_edit_value_wrapper_template, self._edit_renderer
                     )
                 )
@@ -378,7 +436,7 @@ class RenderFieldValue(object):
         if not self._render_col_head:
             self._render_col_head = ModeWrapValueRenderer(
                 "col_head",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     col_head_wrapper_template, self._label_renderer
                     )
                 )
@@ -393,7 +451,7 @@ class RenderFieldValue(object):
         if not self._render_col_head_view and self._col_head_view_renderer:
             self._render_col_head_view = ModeWrapValueRenderer(
                 "col_head_view",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     col_head_wrapper_template, self._col_head_view_renderer
                     )
                 )
@@ -408,7 +466,7 @@ class RenderFieldValue(object):
         if not self._render_col_head_edit and self._col_head_edit_renderer:
             self._render_col_head_edit = ModeWrapValueRenderer(
                 "col_head_edit",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     col_head_wrapper_template, self._col_head_edit_renderer
                     )
                 )
@@ -422,7 +480,7 @@ class RenderFieldValue(object):
         if not self._render_col_view:
             self._render_col_view = ModeWrapValueRenderer(
                 "col_view",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     col_label_view_value_wrapper_template, self._view_renderer
                     )
                 )
@@ -436,12 +494,167 @@ class RenderFieldValue(object):
         if not self._render_col_edit:
             self._render_col_edit = ModeWrapValueRenderer(
                 "col_edit",
-                TemplateWrapValueRenderer(
+                self._wrap_value_renderer(
                     col_label_edit_value_wrapper_template, self._edit_renderer
                     )
                 )
         return self._render_col_edit
 
+#   ------------------------------------------------------------
+#   Compiled wrapper functions
+#   ------------------------------------------------------------
+
+#   These functions return the same strings as the corresponding wrapper 
+#   templates above, with the value renderer supplied as an argument rather
+#   than in the view context.  Changes to the wrapper templates must be
+#   reflected here (see `annalist.tests.test_render_compiled`).
+
+field_label_names           = ("field", "description", "field_label")
+field_tooltip_names         = ("field", "field_tooltip_attr")
+placement_field_names       = ("field", "description", "field_placement", "field")
+placement_label_names       = ("field", "description", "field_placement", "label")
+placement_value_names       = ("field", "description", "field_placement", "value")
+
+def label_wrapper(context, value_renderer):
+    # See: label_template
+    return (
+        u"""<span>%s</span>"""%
+        (render_context_value(context, field_label_names, default="&nbsp;"),)
+        )
+
+def value_wrapper(tooltip):
+    # See: value_wrapper_template
+    def wrapper(context, value_renderer):
+        return (
+            u"""<div class="view-value %s"%s>\n"""+
+            u"""  %s\n"""+
+            u"""</div>"""
+            )%( render_context_value(context, placement_field_names)
+              , tooltip(context)
+              , value_renderer.render(context)
+              )
+    return wrapper
+
+def label_value_wrapper(tooltip):
+    # See: label_value_wrapper_template
+    def wrapper(context, value_renderer):
+        return (
+            u"""<div class="%s"%s>\n"""+
+            u"""  <div class="row view-value-row">\n"""+
+            u"""    <div class="view-label %s">\n"""+
+            u"""      <span>%s</span>\n"""+
+            u"""    </div>\n"""+
+            u"""    <div class="view-value %s">\n"""+
+            u"""      %s\n"""+
+            u"""    </div>\n"""+
+            u"""  </div>\n"""+
+            u"""</div>"""
+            )%( render_context_value(context, placement_field_names)
+              , tooltip(context)
+              , render_context_value(context, placement_label_names)
+              , render_context_value(context, field_label_names)
+              , render_context_value(context, placement_value_names)
+              , value_renderer.render(context)
+              )
+    return wrapper
+
+def col_head_wrapper(context, value_renderer):
+    # See: col_head_wrapper_template
+    return (
+        u"""<div class="view-label col-head %s">\n"""+
+        u"""  %s\n"""+
+        u"""</div>"""
+        )%( render_context_value(context, placement_field_names)
+          , value_renderer.render(context)
+          )
+
+def col_label_value_wrapper(tooltip):
+    # See: col_label_value_wrapper_template
+    def wrapper(context, value_renderer):
+        return (
+            u"""<div class="%s"%s>\n"""+
+            u"""  <div class="row show-for-small-only">\n"""+
+            u"""    <div class="view-label small-12 columns">\n"""+
+            u"""      <span>%s</span>\n"""+
+            u"""    </div>\n"""+
+            u"""  </div>\n"""+
+            u"""  <div class="row view-value-col">\n"""+
+            u"""    <div class="view-value small-12 columns">\n"""+
+            u"""      %s\n"""+
+            u"""    </div>\n"""+
+            u"""  </div>\n"""+
+            u"""</div>"""
+            )%( render_context_value(context, placement_field_names)
+              , tooltip(context)
+              , render_context_value(context, field_label_names)
+              , value_renderer.render(context)
+              )
+    return wrapper
+
+def no_tooltip_value(context):
+    # See: no_tooltip
+    return u""
+
+def with_tooltip_value(context):
+    # See: with_tooltip
+    return render_context_value(context, field_tooltip_names, safe=True)
+
+compiled_wrapper_functions = (
+    { label_template:                           label_wrapper
+    , view_value_wrapper_template:              value_wrapper(no_tooltip_value)
+    , edit_value_wrapper_template:              value_wrapper(with_tooltip_value)
+    , label_view_value_wrapper_template:        label_value_wrapper(no_tooltip_value)
+    , label_edit_value_wrapper_template:        label_value_wrapper(with_tooltip_value)
+    , col_head_wrapper_template:                col_head_wrapper
+    , col_label_view_value_wrapper_template:    col_label_value_wrapper(no_tooltip_value)
+    , col_label_edit_value_wrapper_template:    col_label_value_wrapper(with_tooltip_value)
+    })
+
+class LabelValueRenderer(object):
+    """
+    Renders a field label: equivalent to `label_template`.
+    """
+    def render(self, context):
+        return label_wrapper(context, None)
+
+#   ------------------------------------------------------------
+#   Compiled renderer factory class
+#   ------------------------------------------------------------
+
+class CompiledRenderFieldValue(RenderFieldValue):
+    """
+    Renderer constructor for an entity value field, which uses Python functions 
+    in place of the wrapper templates used by `RenderFieldValue`.
+
+    The resulting renderers produce the same output as those returned by
+    `RenderFieldValue`, but avoid the cost of Django template rendering for
+    the field label and value wrappers.  The view and edit renderers supplied
+    are used as given, so the greatest benefit is obtained when these are also 
+    implemented in Python.
+
+    Use of compiled renderers is selected by the `ANNALIST_COMPILED_RENDERERS`
+    setting (see `annalist.views.fields.find_renderers`).
+    """
+
+    def __init__(self, render_type, **kwargs):
+        super(CompiledRenderFieldValue, self).__init__(render_type, **kwargs)
+        self._label_renderer = LabelValueRenderer()
+        return
+
+    def __repr__(self):
+        return (
+            "CompiledRenderFieldValue(render_type=%s, view_renderer=%r, edit_renderer=%r)"%
+            (self._render_type, self._view_renderer, self._edit_renderer)
+            )
+
+    def _wrap_value_renderer(self, wrapper_template, value_renderer):
+        wrapper_function = compiled_wrapper_functions.get(wrapper_template, None)
+        if wrapper_function is None:
+            return super(CompiledRenderFieldValue, self)._wrap_value_renderer(
+                wrapper_template, value_renderer
+                )
+        return FunctionWrapValueRenderer(wrapper_function, value_renderer)
+
 # Helper function for caller to get template content.
 # This uses the configured Django template loader.
 
@@ -483,5 +696,80 @@ def get_context_field_description_value(context, key, default):
     field = get_context_value(context, 'field', None)
     return get_context_value(field.description, key, default)
 
+# Helper functions for compiled renderers: these access and format values from
+# the context in the same way as Django template variable references.
+
+class _Unresolved(object):
+    """
+    Value returned when a context value cannot be resolved
+    """
+    def __repr__(self):
+        return "unresolved_value"
+
+unresolved_value = _Unresolved()
+
+def resolve_context_value(context, names):
+    """
+    Returns the value obtained by following a sequence of names from the supplied 
+    context, as by a Django template variable reference `{{name1.name2...}}`, or 
+    `unresolved_value` if the value cannot be found.
+
+    As for Django templates, each name after the first is looked up as a 
+    dictionary key, then as an attribute, and callable values are called.
+
+    >>> context = Context({'a': {'b': "value", 'c': lambda: "called"}})
+    >>> resolve_context_value(context, ("a", "b"))
+    'value'
+    >>> resolve_context_value(context, ("a", "c"))
+    'called'
+    >>> resolve_context_value(context, ("a", "b", "upper"))
+    'VALUE'
+    >>> resolve_context_value(context, ("a", "d"))
+    unresolved_value
+    >>> resolve_context_value(context, ("x",))
+    unresolved_value
+    """
+    value = context
+    for name in names:
+        try:
+            value = value[name]
+        except (TypeError, AttributeError, KeyError, ValueError, IndexError):
+            if value is context:
+                return unresolved_value
+            try:
+                value = getattr(value, name)
+            except (TypeError, AttributeError):
+                return unresolved_value
+        if callable(value):
+            if getattr(value, 'do_not_call_in_templates', False):
+                pass
+            elif getattr(value, 'alters_data', False):
+                return unresolved_value
+            else:
+                try:
+                    value = value()
+                except TypeError:
+                    return unresolved_value
+    return value
+
+def render_context_value(context, names, default=None, safe=False):
+    """
+    Returns a string for a value from the supplied context (see 
+    `resolve_context_value`), formatted as by a Django template variable 
+    reference with autoescaping.
+
+    default     if supplied, is a string that is used without escaping in place of a 
+                missing or false value, as for `{{name1.name2...|default:"..."}}`.
+    safe        if True, the value is not escaped, as for `{{name1.name2...|safe}}`.
+    """
+    value = resolve_context_value(context, names)
+    if value is unresolved_value:
+        value = ""
+    if default is not None and not value:
+        return default
+    if safe:
+        return force_text(value)
+    return render_value_in_context(value, context)
+
 # End.
 #........1.........2.........3.........4.........5.........6.........7.........8
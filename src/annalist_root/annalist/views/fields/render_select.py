@@ -18,13 +18,15 @@ from annalist.util          import fill_type_entity_id
 
 from annalist.views.fields.render_base          import RenderBase
 from annalist.views.fields.render_fieldvalue    import (
-    RenderFieldValue,
+    RenderFieldValue, CompiledRenderFieldValue,
     get_field_edit_value,
-    get_field_view_value
+    get_field_view_value,
+    render_context_value
     )
 from annalist.views.form_utils.fieldchoice      import FieldChoice, update_choice_labels
 
 from django.template        import Template, Context
+from django.template.base   import render_value_in_context
 
 #   ----------------------------------------------------------------------------
 #
@@ -186,9 +188,13 @@ class Select_view_renderer(object):
         return
 
     def render(self, context):
+        # Values used if the selected value cannot be determined
+        labelval = None
+        linkval  = None
+        linkcont = ""
         try:
             # val      = get_field_view_value(context, None)
-            val      = get_field_edit_value(context, None)
+            val      = get_field_edit_value(context, None) or ""
             typval   = fill_type_entity_id(
                 val, context['field'].description['field_ref_type']
                 )
@@ -196,39 +202,42 @@ class Select_view_renderer(object):
             labelval = textval
             linkval  = None
             linkcont = context['field']['continuation_param']
-            options  = context['field']['options']
-            for o in options:
-                # log.info("Select_view_renderer.render: option %r"%(o,))
-                if textval == o.value:
-                    labelval = o.label
-                    linkval  = o.link
-                    break
+            option   = context['field'].get_field_option(textval)
+            if option:
+                labelval = option.label
+                linkval  = option.link
             # log.info(
             #     "Select_view_renderer.render: textval %s, labelval %s, linkval %s"%
             #     (textval, labelval, linkval)
             #     )
         except TargetIdNotFound_Error as e:
             log.debug(repr(e))
-            textval = ""
+            textval  = ""
+            labelval = textval
         except TargetEntityNotFound_Error as e:        
             log.debug(repr(e))
-            textval = repr(e)
+            textval  = repr(e)
+            labelval = textval
         except Exception as e:
             log.error(repr(e))
-            textval = repr(e)
+            textval  = repr(e)
+            labelval = textval
         with context.push(
             field_textval=textval, 
             field_labelval=labelval, 
             field_linkval=linkval,
             field_continuation_param=linkcont):
             try:
-                result = self._template.render(context)
+                result = self.render_template(context)
             except Exception as e:
                 log.error(repr(e))
                 result = repr(e)
         # log.debug("Select_view_renderer.render: result %r"%(result,))
         return result
 
+    def render_template(self, context):
+        return self._template.render(context)
+
 class Select_edit_renderer(object):
     """
     Render select value for editing using supplied template
@@ -251,7 +260,7 @@ class Select_edit_renderer(object):
                 options = list(options)                   # clone
                 options.insert(0, FieldChoice(textval))   # Add missing current value to options
             with context.push(encoded_field_value=textval, field_options=options):
-                result = self._template.render(context)
+                result = self.render_template(context)
         except Exception as e:
             log.exception("Exception in Select_edit_renderer.render")
             log.error("Select_edit_renderer.render: "+repr(e))
@@ -263,6 +272,143 @@ class Select_edit_renderer(object):
             result = repr(e)
         return result
 
+    def render_template(self, context):
+        return self._template.render(context)
+
+#   ----------------------------------------------------------------------------
+#
+#   Compiled select text field renderers
+#
+#   ----------------------------------------------------------------------------
+
+#   These renderers use the same logic as those above to determine the values 
+#   displayed, then format them using Python code that returns the same result 
+#   as the corresponding template.
+
+class Select_view_compiled_renderer(Select_view_renderer):
+    """
+    Render select value for viewing: same result as `view_select`, `view_choice`
+    or `view_entitytype`, as indicated by the supplied template name.
+    """
+    def __init__(self, template_name):
+        self._template_name = template_name
+        return
+
+    def render_template(self, context):
+        if context['field_linkval']:
+            value = (
+                u"""\n      <a href="%s%s">%s</a>\n    """%
+                ( render_context_value(context, ("field_linkval",))
+                , render_context_value(context, ("field_continuation_param",))
+                , render_context_value(context, ("field_labelval",))
+                ))
+        elif context['field_textval'] and context['field_textval'] != "":
+            value = (
+                u"""\n      <span class="value-missing">%s</span>\n    """%
+                (render_context_value(context, ("field_labelval",)),)
+                )
+        else:
+            value = (
+                u"""\n    <span class="value-blank">%s</span>\n    """%
+                (message.NO_SELECTION%
+                    {'id': render_context_value(context, ("field", "description", "field_label"))},
+                ))
+        return (
+            u"""<!-- fields.render_select.%s -->\n    %s\n    """%
+            (self._template_name, value)
+            )
+
+def render_edit_options(context):
+    """
+    Returns options for a select control: same result as `edit_options`
+    """
+    textval     = context['encoded_field_value']
+    placeholder = None
+    options     = []
+    for opt in context['field_options']:
+        if opt.value == textval:
+            selected = u''' selected="selected"'''
+        else:
+            selected = u''''''
+        if opt.value == "":
+            if placeholder is None:
+                placeholder = render_context_value(
+                    context, ("field", "description", "field_placeholder")
+                    )
+            option = u"""<option value=""%s>%s</option>\n"""%(selected, placeholder)
+        else:
+            option = (
+                u"""<option value="%s"%s>%s</option>\n"""%
+                ( render_value_in_context(opt.value, context)
+                , selected
+                , render_value_in_context(opt.choice_html(), context)
+                ))
+        options.append(u"""   %s  """%(option,))
+    return u"".join(options)+u""" """
+
+class Select_edit_compiled_renderer(Select_edit_renderer):
+    """
+    Render select value for editing: same result as `edit_select`, `edit_choice`
+    or `edit_entitytype`, as indicated by the supplied template name.
+    """
+    def __init__(self, template_name):
+        self._template_name = template_name
+        return
+
+    def render_template(self, context):
+        return getattr(self, "render_"+self._template_name)(context)
+
+    def render_edit_select(self, context):
+        field_name  = (
+            render_context_value(context, ("repeat_prefix",)) +
+            render_context_value(context, ("field", "description", "field_name"))
+            )
+        return (
+            u"""<!-- fields.render_select.edit_select -->\n"""+
+            u"""    <div class="row"> \n"""+
+            u"""      <div class="small-10 columns view-value less-new-button">\n"""+
+            u"""        <select name="%s">\n"""+
+            u"""    %s\n"""+
+            u"""        </select>\n"""+
+            u"""      </div>\n"""+
+            u"""      <div class="small-2 columns view-value new-button left small-text-right">\n"""+
+            u"""        <button type="submit" \n"""+
+            u"""                name="%s__new_edit" \n"""+
+            u"""                value="New"\n"""+
+            u"""                title="Define new or edit %s"\n"""+
+            u"""        >\n"""+
+            u"""          <span class="select-edit-button-text">+&#x270D;</span>\n"""+
+            u"""        </button>\n"""+
+            u"""      </div>\n"""+
+            u"""    </div>\n"""+
+            u"""    """
+            )%( field_name
+              , render_edit_options(context)
+              , field_name
+              , render_context_value(context, ("field", "description", "field_label"))
+              )
+
+    def render_edit_choice(self, context):
+        return (
+            u"""<!-- fields.render_select.edit_choice -->\n"""+
+            u"""    <select name="%s%s">\n"""+
+            u"""    %s\n"""+
+            u"""    </select>\n"""+
+            u"""    """
+            )%( render_context_value(context, ("repeat_prefix",))
+              , render_context_value(context, ("field", "description", "field_name"))
+              , render_edit_options(context)
+              )
+
+    def render_edit_entitytype(self, context):
+        return (
+            u"""<!-- fields.render_select.edit_entitytype -->\n"""+
+            u"""    <select name="entity_type">\n"""+
+            u"""    %s\n"""+
+            u"""    </select>\n"""+
+            u"""    """
+            )%(render_edit_options(context),)
+
 #   ----------------------------------------------------------------------------
 #
 #   Return render objects for select or choice controls (with or without '+' button)
@@ -308,4 +454,31 @@ def get_view_choice_renderer():
         edit_renderer=Select_edit_renderer(edit_view_choice),
         )
 
+def get_compiled_select_renderer():
+    """
+    Return compiled field renderer object for value selector (with '+' button)
+    """
+    return CompiledRenderFieldValue("select",
+        view_renderer=Select_view_compiled_renderer("view_select"),
+        edit_renderer=Select_edit_compiled_renderer("edit_select"),
+        )
+
+def get_compiled_choice_renderer():
+    """
+    Return compiled field renderer object for value selector (without '+' button)
+    """
+    return CompiledRenderFieldValue("choice",
+        view_renderer=Select_view_compiled_renderer("view_choice"),
+        edit_renderer=Select_edit_compiled_renderer("edit_choice"),
+        )
+
+def get_compiled_entitytype_renderer():
+    """
+    Return compiled field renderer object for entitytype
+    """
+    return CompiledRenderFieldValue("entitytype",
+        view_renderer=Select_view_compiled_renderer("view_entitytype"),
+        edit_renderer=Select_edit_compiled_renderer("edit_entitytype"),
+        )
+
 # End.
@@ -12,7 +12,11 @@ log = logging.getLogger(__name__)
 from django.http        import HttpResponse
 from django.template    import Template
 
-from annalist.views.fields.render_base  import RenderBase
+from annalist.views.fields.render_base          import RenderBase
+from annalist.views.fields.render_fieldvalue    import (
+    RenderFieldValue, CompiledRenderFieldValue,
+    render_context_value
+    )
 
 #   ----------------------------------------------------------------------------
 #
@@ -72,6 +76,67 @@ class text_edit_renderer(object):
         responsebody = responsetemplate.render(context)
         return responsebody
 
+#   ----------------------------------------------------------------------------
+#
+#   Compiled text field renderers
+#
+#   ----------------------------------------------------------------------------
+
+#   These renderers return the same result as the template files used for
+#   "Text" and "Showtext" render types (see `annalist.views.fields.find_renderers`)
+
+class text_view_compiled_renderer(object):
+
+    def render(self, context):
+        """
+        Renders a simple text field for viewing: see "field/annalist_view_text.html"
+        """
+        return (
+            u"""<!-- field/annalist_view_text.html -->\n"""+
+            u"""<span>%s</span>"""
+            )%(render_context_value(context, ("field", "field_value"), default="&nbsp;"),)
+
+class text_edit_compiled_renderer(object):
+
+    def render(self, context):
+        """
+        Renders a simple text field for editing: see "field/annalist_edit_text.html"
+        """
+        return (
+            u"""<!-- field/annalist_edit_text.html -->\n"""+
+            u"""<input type="text" size="64" name="%s%s" \n"""+
+            u"""       placeholder="%s"\n"""+
+            u"""       value="%s" />"""
+            )%( render_context_value(context, ("repeat_prefix",))
+              , render_context_value(context, ("field", "description", "field_name"))
+              , render_context_value(context, ("field", "description", "field_placeholder"))
+              , render_context_value(context, ("field", "field_value"))
+              )
+
+def get_compiled_text_renderer():
+    """
+    Return compiled field renderer object for text values
+    """
+    return CompiledRenderFieldValue("Text",
+        view_renderer=text_view_compiled_renderer(), 
+        edit_renderer=text_edit_compiled_renderer(),
+        )
+
+def get_compiled_showtext_renderer():
+    """
+    Return compiled field renderer object for display-only text values
+    """
+    return CompiledRenderFieldValue("Showtext",
+        view_renderer=text_view_compiled_renderer(), 
+        edit_renderer=text_view_compiled_renderer(),
+        )
+
+#   ----------------------------------------------------------------------------
+#
+#   Return render objects
+#
+#   ----------------------------------------------------------------------------
+
 def get_text_renderer():
     """
     Return field renderer object for text values
@@ -15,12 +15,14 @@ from annalist.views.displayinfo                 import apply_substitutions
 
 from annalist.views.fields.render_base          import RenderBase
 from annalist.views.fields.render_fieldvalue    import (
-    RenderFieldValue,
+    RenderFieldValue, CompiledRenderFieldValue,
     get_field_edit_value,
     get_field_view_value,
+    render_context_value
     )
 
-from django.template    import Template, Context
+from django.template        import Template, Context
+from django.template.base   import render_value_in_context
 
 #   ----------------------------------------------------------------------------
 #
@@ -78,6 +80,25 @@ class text_markdown_edit_renderer(object):
             result = self._template.render(context)
         return result
 
+class text_markdown_edit_compiled_renderer(object):
+
+    def render(self, context):
+        """
+        Render Markdown text for editing: same result as `text_markdown_edit_renderer`
+        """
+        val     = get_field_edit_value(context, None)
+        textval = TextMarkdownValueMapper.encode(val)
+        return (
+            u'''<textarea cols="64" rows="6" name="%s%s" '''+
+                      u'''class="small-rows-4 medium-rows-8" '''+
+                      u'''placeholder="%s" '''+
+                      u'''>%s</textarea>'''
+            )%( render_context_value(context, ("repeat_prefix",))
+              , render_context_value(context, ("field", "description", "field_name"))
+              , render_context_value(context, ("field", "description", "field_placeholder"))
+              , render_value_in_context(textval, context)
+              )
+
 def get_text_markdown_renderer():
     """
     Return field renderer object for Markdown text
@@ -96,4 +117,22 @@ def get_show_markdown_renderer():
         edit_renderer=text_markdown_view_renderer(),
         )
 
+def get_compiled_text_markdown_renderer():
+    """
+    Return compiled field renderer object for Markdown text
+    """
+    return CompiledRenderFieldValue("markdown",
+        view_renderer=text_markdown_view_renderer(), 
+        edit_renderer=text_markdown_edit_compiled_renderer(),
+        )
+
+def get_compiled_show_markdown_renderer():
+    """
+    Return compiled field renderer object for display-only Markdown text
+    """
+    return CompiledRenderFieldValue("show_markdown",
+        view_renderer=text_markdown_view_renderer(), 
+        edit_renderer=text_markdown_view_renderer(),
+        )
+
 # End.
@@ -11,8 +11,9 @@ log = logging.getLogger(__name__)
 
 from annalist.views.fields.render_base          import RenderBase
 from annalist.views.fields.render_fieldvalue    import (
-    RenderFieldValue,
-    get_field_edit_value, get_field_view_value
+    RenderFieldValue, CompiledRenderFieldValue,
+    get_field_edit_value, get_field_view_value,
+    render_context_value
     )
 
 from django.template    import Template, Context
@@ -108,6 +109,22 @@ class uri_link_edit_renderer(object):
         """
         return self._template.render(context)
 
+class uri_link_edit_compiled_renderer(object):
+
+    def render(self, context):
+        """
+        Render link for editing: same result as `uri_link_edit_renderer`
+        """
+        return (
+            u'''<input type="text" size="64" name="%s%s" '''+
+                   u'''placeholder="%s" '''+
+                   u'''value="%s" />'''
+            )%( render_context_value(context, ("repeat_prefix",))
+              , render_context_value(context, ("field", "description", "field_name"))
+              , render_context_value(context, ("field", "description", "field_placeholder"))
+              , render_context_value(context, ("field", "field_edit_value"))
+              )
+
 def get_uri_link_renderer():
     """
     Return field renderer object for URI link values
@@ -117,4 +134,13 @@ def get_uri_link_renderer():
         edit_renderer=uri_link_edit_renderer(),
         )
 
+def get_compiled_uri_link_renderer():
+    """
+    Return compiled field renderer object for URI link values
+    """
+    return CompiledRenderFieldValue("uri_link",
+        view_renderer=uri_link_view_renderer(), 
+        edit_renderer=uri_link_edit_compiled_renderer(),
+        )
+
 # End.
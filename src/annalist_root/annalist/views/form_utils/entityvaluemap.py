@@ -64,6 +64,22 @@ class EntityValueMap(object):
         self._map.append(map_entry)
         return
 
+    def bind_view_context(self, view_context):
+        """
+        Returns a copy of this entity/value map for processing a single request, with 
+        field descriptions bound to the supplied view context.  The copy does not 
+        share any values that may be updated when processing the request (e.g. field 
+        choices), so a single entity/value map may be used for many requests (see 
+        `annalist.views.form_utils.formdescriptioncache`).
+
+        view_context    is a dictionary of values that may be used when determining
+                        field choices (cf. `FieldListValueMap.__init__`).
+        """
+        bound  = {}
+        result = copy.copy(self)
+        result._map = [ kmap.bind_view_context(view_context, bound) for kmap in self._map ]
+        return result
+
     def map_value_to_context(self, entity_values, **kwargs):
         """
         Map data from entity values to view context for rendering.
@@ -13,6 +13,7 @@ __license__     = "MIT (http://opensource.org/licenses/MIT)"
 import logging
 log = logging.getLogger(__name__)
 
+import copy
 # import collections
 
 from django.conf                        import settings
@@ -261,6 +262,16 @@ class FieldListValueMap(object):
             "FieldListValueMap.fm: %r\n"%(self.fm)
             )
 
+    def bind_view_context(self, view_context, bound):
+        """
+        Returns a copy of this value map using field descriptions bound to the 
+        supplied view context (see `FieldDescription.bind_view_context`).
+        """
+        result    = copy.copy(self)
+        result.fd = [ fd.bind_view_context(view_context, bound) for fd in self.fd ]
+        result.fm = [ fm.bind_view_context(view_context, bound) for fm in self.fm ]
+        return result
+
     def map_entity_to_context(self, entityvals, context_extra_values=None):
         listcontext = []
         for f in self.fm:
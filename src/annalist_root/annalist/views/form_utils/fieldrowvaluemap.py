@@ -15,6 +15,8 @@ __license__     = "MIT (http://opensource.org/licenses/MIT)"
 import logging
 log = logging.getLogger(__name__)
 
+import copy
+
 # import collections
 
 from django.conf                        import settings
@@ -86,6 +88,18 @@ class FieldRowValueMap(object):
             "FieldRowValueMap.fd: %r\n"%(self.fd)
             )
 
+    def bind_view_context(self, view_context, bound):
+        """
+        Returns a copy of this value map using field descriptions bound to the 
+        supplied view context (see `FieldDescription.bind_view_context`).
+        """
+        result    = copy.copy(self)
+        result.fd = [ fd.bind_view_context(view_context, bound) for fd in self.fd ]
+        result.fm = [ fm.bind_view_context(view_context, bound) for fm in self.fm ]
+        result.rd = self.rd.bind_view_context(view_context, bound)
+        result.rd['row_field_descs'] = result.fd
+        return result
+
     def map_entity_to_context(self, entityvals, context_extra_values=None):
         """
         Add row of fields to display context.
@@ -24,6 +24,8 @@ __license__     = "MIT (http://opensource.org/licenses/MIT)"
 import logging
 log = logging.getLogger(__name__)
 
+import copy
+
 from django.conf                        import settings
 
 from annalist.views.fields.bound_field  import bound_field
@@ -57,6 +59,15 @@ class FieldValueMap(object):
             "FieldValueMap.i: %s\n"%(self.i)
             )
 
+    def bind_view_context(self, view_context, bound):
+        """
+        Returns a copy of this value map using field descriptions bound to the 
+        supplied view context (see `FieldDescription.bind_view_context`).
+        """
+        result   = copy.copy(self)
+        result.f = self.f.bind_view_context(view_context, bound)
+        return result
+
     def map_entity_to_context(self, entityvals, context_extra_values=None):
         """
         Returns a bound_field, which is a dictionary-like of values to be added 
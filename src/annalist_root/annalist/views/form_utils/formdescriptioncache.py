@@ -0,0 +1,105 @@
+"""
+Process-wide cache of compiled form descriptions.
+
+The entity/value map used to render or process a view or list form (see
+`EntityValueMap`) is built from the view or list description and the descriptions
+of all of the fields it uses, including any nested field lists.  Building it
+involves creating a `FieldDescription` for each field, with placement classes,
+renderers and value mappers.  These depend only on the collection configuration,
+so compiled entity/value maps are saved here for each collection and view or list,
+and re-used by subsequent requests.  Values that depend on the request (e.g. the
+entity being rendered and field choices) are bound to a copy of the saved map for
+each request (see `EntityValueMap.bind_view_context`).
+
+Each saved form description records the collection object for which it was built
+and the collection configuration version (see `get_config_cache_version` in
+`annalist.models.collectionentitycache`), which changes whenever any view, list,
+field or other configuration entity is updated, or any collection configuration
+cache is flushed (e.g. when changes are made by another process).  A saved form
+description is used only if both of these are unchanged.
+
+Saved form descriptions are shared by all users of the cache, and must not be
+used for rendering without first being bound to a request.
+"""
+
+__author__      = "Graham Klyne (GK@ACM.ORG)"
+__copyright__   = "Copyright 2018, G. Klyne"
+__license__     = "MIT (http://opensource.org/licenses/MIT)"
+
+import logging
+log = logging.getLogger(__name__)
+
+from annalist.models.collectionentitycache  import get_config_cache_version
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Form description cache
+#
+#   -------------------------------------------------------------------------------------------
+
+# Number of form descriptions saved.  Each collection normally has a modest number of
+# views and lists; the limit just guards against unbounded growth.
+form_cache_max = 500
+
+class FormDescriptionCache(object):
+    """
+    Compiled form descriptions, indexed by collection and form identifier.
+    """
+
+    def __init__(self):
+        super(FormDescriptionCache, self).__init__()
+        self._forms = {}    # (coll_dir, form_key) -> (coll, version, form)
+        return
+
+    def get_form(self, coll, form_key, make_form):
+        """
+        Returns a compiled form description for the indicated collection and form,
+        using a saved form description if one is available for the current
+        collection configuration.
+
+        coll        is the collection object for which the form is required.
+        form_key    is a hashable value that identifies the form within the collection
+                    (e.g. `("view", view_id)`).
+        make_form   is a function that returns a new compiled form description.
+        """
+        key     = (coll._entitydir, form_key)
+        version = get_config_cache_version()
+        entry   = self._forms.get(key, None)
+        if entry and (entry[0] is coll) and (entry[1] == version):
+            return entry[2]
+        form = make_form()
+        if get_config_cache_version() == version:
+            # Not saved if configuration changed while building form description
+            if len(self._forms) >= form_cache_max:
+                self._forms.clear()
+            self._forms[key] = (coll, version, form)
+        return form
+
+    def flush(self):
+        self._forms = {}
+        return
+
+form_description_cache = FormDescriptionCache()
+
+#   -------------------------------------------------------------------------------------------
+#
+#   Form description cache access functions
+#
+#   -------------------------------------------------------------------------------------------
+
+def get_cached_form(coll, form_key, make_form):
+    """
+    Returns a compiled form description for the indicated collection and form (see
+    `FormDescriptionCache.get_form`).  The value returned may be shared, and must be
+    bound to a view context before use (see `EntityValueMap.bind_view_context`).
+    """
+    return form_description_cache.get_form(coll, form_key, make_form)
+
+def flush_form_cache():
+    """
+    Discard all saved form descriptions.
+    """
+    form_description_cache.flush()
+    return
+
+# End.
@@ -50,6 +50,17 @@ class RepeatValuesMap(FieldValueMap):
             "RepeatValuesMap.fieldlist: %r\n"%(self.fieldlist)
             )
 
+    def bind_view_context(self, view_context, bound):
+        """
+        Returns a copy of this value map using field descriptions bound to the 
+        supplied view context (see `FieldDescription.bind_view_context`).
+        """
+        result = super(RepeatValuesMap, self).bind_view_context(view_context, bound)
+        # cf. FieldListValueMap.__init__
+        view_field_context = dict(view_context, group=result.f._field_desc)
+        result.fieldlist   = self.fieldlist.bind_view_context(view_field_context, bound)
+        return result
+
     def map_form_to_entity(self, formvals, entityvals):
         # log.info(repr(formvals))
         prefix_template  = self.i+"__%d__"
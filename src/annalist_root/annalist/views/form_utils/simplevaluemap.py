@@ -35,6 +35,12 @@ class SimpleValueMap(_SimpleValueMap_tuple):
     f       HTML input form field name (used as key in POST results)
     """
 
+    def bind_view_context(self, view_context, bound):
+        """
+        Simple value maps do not depend on the view context, so are used unchanged.
+        """
+        return self
+
     def map_entity_to_context(self, entityvals, context_extra_values=None):
         subcontext = {}
         if self.c:
@@ -16,10 +16,14 @@ import logging
 log = logging.getLogger(__name__)
 
 from django.http                    import HttpResponse
+from django.http                    import StreamingHttpResponse
 from django.http                    import HttpResponseRedirect
+from django.http                    import HttpResponseNotModified
 from django.template                import RequestContext, loader
+from django.utils.http              import http_date, parse_http_date_safe, parse_etags, quote_etag
 from django.views                   import generic
 from django.views.decorators.csrf   import csrf_exempt
+from django.middleware.csrf         import get_token
 from django.core.urlresolvers       import resolve, reverse
 
 from django.conf import settings
@@ -34,6 +38,7 @@ from annalist                       import layout
 from annalist                       import util
 from annalist.identifiers           import RDF, RDFS, ANNAL
 from annalist.models.site           import Site
+from annalist.models.derivedresourcecache import derived_resource_version
 from annalist.models.annalistuser   import (
     AnnalistUser, 
     site_default_user_id, site_default_user_uri, 
@@ -75,7 +80,7 @@ class AnnalistGenericView(ContentNegotiationView):
 
     def site(self, host=""):
         if not self._site:
-            self._site = Site(self._sitebaseuri, self._sitebasedir, host=host)
+            self._site = Site.get_cached(self._sitebaseuri, self._sitebasedir, host=host)
         return self._site
 
     def site_data(self, host=""):
@@ -172,13 +177,115 @@ class AnnalistGenericView(ContentNegotiationView):
         Construct response containing body of referenced resource (or list),
         with supplied resource_type as its content_type
         """
-        # @@TODO: assumes response can reasonably be held in memory;
-        #         consider 'StreamingHttpResponse'?
+        # NOTE: assumes response can reasonably be held in memory;
+        #       see also 'resource_stream_response'.
         response = HttpResponse(content_type=resource_type)
         response = self.add_link_header(response, links)
         response.write(resource_file.read())
         return response
 
+    def resource_stream_response(self, resource_chunks, resource_type, links={}):
+        """
+        Construct streaming response containing the body of a resource (or list) 
+        supplied as an iterator over strings, with supplied resource_type as its 
+        content_type.
+
+        The iterator is consumed as the response is sent, so the resource is not 
+        held in memory.  The first string is generated when this method is called, 
+        so that any exception raised is seen by the caller before a response status 
+        is sent.  An exception raised while generating later strings is logged, and
+        the response body is ended with an error message (which makes the body 
+        invalid, as the response cannot be replaced once it has been started).
+        """
+        def resource_stream(first_chunk, resource_chunks):
+            yield first_chunk
+            try:
+                for chunk in resource_chunks:
+                    yield chunk
+            except Exception as e:
+                log.exception("Error generating streamed %s response: %s"%(resource_type, e))
+                yield "\n\n*** Error generating response: %s - see server log for details\n"%(e,)
+            return
+        resource_chunks = iter(resource_chunks)
+        first_chunk     = next(resource_chunks, "")
+        response = StreamingHttpResponse(
+            resource_stream(first_chunk, resource_chunks), content_type=resource_type
+            )
+        response = self.add_link_header(response, links)
+        return response
+
+    # HTTP conditional request handling
+
+    def get_response_validators(self, stamps, *values):
+        """
+        Returns a pair `(etag, last_modified)` of HTTP validators for a response to
+        the current request whose content is determined by the supplied change stamps 
+        and other values, or `(None, None)` if any of the change stamps is None.
+
+        stamps      is a list of change stamps, each of which is a tuple whose first 
+                    element is a modification time (see `FileEntityStore.change_stamp`
+                    and `Collection.get_data_stamp`).
+        values      are any other values on which the response content depends.  The 
+                    request URL and Annalist software version are always included.
+        """
+        if (not stamps) or (None in stamps):
+            return (None, None)
+        etag = derived_resource_version(
+            annalist.__version__, self.get_request_host(), self.get_request_path(),
+            *(list(stamps)+list(values))
+            )
+        last_modified = int(max( s[0] for s in stamps ))
+        return (quote_etag(etag), last_modified)
+
+    def get_html_response_validators(self, collection):
+        """
+        Returns HTTP validators for an HTML page generated from collection data, 
+        which may depend on any entity in the collection, the requesting user, the
+        requested content type and the CSRF token used in forms.
+        """
+        return self.get_response_validators(
+            list(collection.get_data_stamp()),
+            self.get_user_identity(),
+            self.request.META.get("HTTP_ACCEPT", ""),
+            get_token(self.request)
+            )
+
+    def not_modified_response(self, validators):
+        """
+        Returns a "304 Not Modified" response if the current request is a conditional 
+        GET or HEAD request whose `If-None-Match` or `If-Modified-Since` header is 
+        satisfied by the supplied validators (see `get_response_validators`), 
+        otherwise None.
+
+        Per RFC7232, `If-Modified-Since` is ignored if `If-None-Match` is present.
+        """
+        (etag, last_modified) = validators
+        if (etag is None) or (self.request.method not in ("GET", "HEAD")):
+            return None
+        if_none_match     = self.request.META.get("HTTP_IF_NONE_MATCH", None)
+        if_modified_since = self.request.META.get("HTTP_IF_MODIFIED_SINCE", None)
+        not_modified      = False
+        if if_none_match is not None:
+            etags        = parse_etags(if_none_match)
+            not_modified = ("*" in etags) or (etag in [ quote_etag(e) for e in etags ])
+        elif if_modified_since is not None:
+            since        = parse_http_date_safe(if_modified_since)
+            not_modified = (since is not None) and (last_modified <= since)
+        if not not_modified:
+            return None
+        return self.add_validator_headers(HttpResponseNotModified(), validators)
+
+    def add_validator_headers(self, response, validators):
+        """
+        Add HTTP `ETag` and `Last-Modified` headers to a successful response, 
+        and return the updated response.
+        """
+        (etag, last_modified) = validators
+        if (etag is not None) and (response.status_code in (200, 304)):
+            response["ETag"]          = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
     def continuation_next(self, request_dict={}, default_cont=None):
         """
         Returns a continuation URL to be used when returning from the current view,
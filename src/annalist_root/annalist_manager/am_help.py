@@ -39,6 +39,7 @@ command_summary_help = ("\n"+
     "  %(prog)s migrationreport old_coll_id new_coll_id [ CONFIG ]\n"+
     "  %(prog)s migratecollection coll_id [ CONFIG ]\n"+
     "  %(prog)s migrateallcollections [ CONFIG ]\n"+
+    "  %(prog)s rebuildsearchindex [ coll_id ] [ CONFIG ]\n"+
     "  %(prog)s runserver [ CONFIG ]\n"+
     "  %(prog)s sitedirectory [ CONFIG ]\n"+
     "  %(prog)s settingsmodule [ CONFIG ]\n"+
@@ -355,6 +356,19 @@ def am_help(options, progname):
             config_options_help+
             "\n"+
             "")
+    elif options.args[0].startswith("rebuilds"):
+        help_text = ("\n"+
+            "  %(prog)s rebuildsearchindex [ coll_id ] [ CONFIG ]\n"+
+            "\n"+
+            "This command reads all entities in collection 'coll_id', or in all\n"+
+            "collections if 'coll_id' is not specified, and saves an index of words\n"+
+            "used in entity values.  The saved index is used to speed up entity list\n"+
+            "searches.  Entities that are changed after the index is saved are\n"+
+            "re-indexed when they are next searched.\n"+
+            "\n"+
+            config_options_help+
+            "\n"+
+            "")
     elif options.args[0].startswith("runs"):
         help_text = ("\n"+
             "  %(prog)s runserver [ CONFIG ]\n"+
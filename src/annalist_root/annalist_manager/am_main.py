@@ -44,7 +44,8 @@ from am_createuser          import (
     )
 from am_managecollections   import (
     am_installcollection, am_copycollection,
-    am_migrationreport, am_migratecollection, am_migrateallcollections
+    am_migrationreport, am_migratecollection, am_migrateallcollections,
+    am_rebuildsearchindex
     )
 from am_help                import am_help, command_summary_help
 
@@ -156,6 +157,8 @@ def run(userhome, userconfig, options, progname):
         return am_migratecollection(annroot, userhome, options)
     if options.command.startswith("migratea"):              # migrateallcollections
         return am_migrateallcollections(annroot, userhome, options)
+    if options.command.startswith("rebuilds"):              # rebuildsearchindex
+        return am_rebuildsearchindex(annroot, userhome, options)
     if options.command.startswith("runs"):                  # runserver
         return am_runserver(annroot, userhome, options)
     if options.command.startswith("serv"):                  # serverlog
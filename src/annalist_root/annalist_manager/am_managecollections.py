@@ -33,6 +33,7 @@ from annalist.models.recordlist     import RecordList
 from annalist.models.recordfield    import RecordField
 from annalist.models.recordgroup    import RecordGroup
 from annalist.models.collectiondata import initialize_coll_data, copy_coll_data, migrate_coll_data
+from annalist.models.collectiondata import rebuild_coll_search_index
 
 import am_errors
 from am_settings                    import am_get_settings, am_get_site_settings, am_get_site
@@ -635,4 +636,39 @@ def am_migrateallcollections(annroot, userhome, options):
     print("Data migrations complete.")
     return status
 
+def am_rebuildsearchindex(annroot, userhome, options):
+    """
+    Rebuild entity search index for a specified collection, or for all collections
+
+        annalist_manager rebuildsearchindex [coll]
+
+    Reads every entity in a collection, and saves an index of words used in entity
+    values that is used to speed up entity list searches.
+
+    annroot     is the root directory for the Annalist software installation.
+    userhome    is the home directory for the host system user issuing the command.
+    options     contains options parsed from the command line.
+
+    returns     0 if all is well, or a non-zero status code.
+                This value is intended to be used as an exit status code
+                for the calling program.
+    """
+    status, settings, site = get_settings_site(annroot, userhome, options)
+    if status != am_errors.AM_SUCCESS:
+        return status
+    coll_id = getarg(options.args, 0)
+    if coll_id:
+        coll = Collection.load(site, coll_id)
+        if not (coll and coll.get_values()):
+            print("Collection not found: %s"%(coll_id), file=sys.stderr)
+            return am_errors.AM_NOCOLLECTION
+        colls = [coll]
+    else:
+        colls = list(site.collections())
+    for coll in colls:
+        log.info("========== Indexing '%s' =========="%(coll.get_id(),))
+        count = rebuild_coll_search_index(coll)
+        print("Collection '%s': indexed %d entities"%(coll.get_id(), count))
+    return status
+
 # End.
@@ -65,6 +65,44 @@ TRACE_FIELD_VALUE   = logging.INFO
 
 ALLOWED_HOSTS = []
 
+# Storage used for Annalist entity data: "file" stores each entity as a
+# directory of files; "sqlite" stores the data for each collection in a
+# single SQLite database in the collection directory.
+# (See annalist.models.entitystore.)
+ANNALIST_ENTITY_STORE = "file"
+
+# Maximum total size (bytes) of entity bodies whose values are held in memory
+# by each server process to avoid re-reading them from storage; 0 disables
+# the cache.  (See annalist.models.entityvaluecache.)
+ANNALIST_ENTITY_CACHE_SIZE = 16*1024*1024
+
+# Default maximum number of entities displayed on a single page of an entity
+# list view.  The page size can be overridden by a `limit` URI parameter.
+# (See annalist.views.entitylist.)
+ANNALIST_LIST_PAGE_SIZE = 500
+
+# If True, derived representations of entity and list data (e.g. Turtle) are
+# saved in a cache directory in the site data area, and re-used while the data
+# from which they are derived is unchanged.  The total size of the saved data is
+# limited to the indicated number of bytes, by discarding least recently used 
+# representations.  (See annalist.models.derivedresourcecache.)
+ANNALIST_DERIVED_RESOURCE_CACHE = True
+ANNALIST_DERIVED_RESOURCE_CACHE_SIZE = 64*1024*1024
+
+# If True, each server process watches the site data directory for changes
+# made by other processes, and discards cached collection data affected by
+# the changes.  Uses inotify events if the `pyinotify` package is installed,
+# otherwise checks collection configuration files at the indicated interval
+# (seconds).  (See annalist.models.sitewatcher.)
+ANNALIST_SITE_WATCHER = False
+ANNALIST_SITE_WATCHER_POLL_INTERVAL = 2.0
+
+# If True, commonly used field renderers (text, entity id, selection, URI link,
+# Markdown) and the label/value wrappers used to place fields in a form are
+# rendered by Python code rather than Django templates.  Output is the same
+# either way.  (See annalist.views.fields.find_renderers.)
+ANNALIST_COMPILED_RENDERERS = True
+
 # Application definition
 
 INSTALLED_APPS = (